@@ -4,6 +4,7 @@ import yaml
 import argparse
 from qualtrics_util import QualtricsDist
 import os
+import threading
 import requests
 from pprint import pprint
 
@@ -15,7 +16,7 @@ from requests.packages.urllib3.exceptions import InsecureRequestWarning
 
 
 
-__version_info__ = ('0', '5', '0')
+__version_info__ = ('0', '5', '2')
 __version__ = '.'.join(__version_info__)
 
 
@@ -56,10 +57,19 @@ class StudySteps(QualtricsDist):
         if self.sslwarning == False:
             requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
+        # keep-alive session shared by all api calls
+        self.session = self.create_session()
+
         # account, library_id, mailing_list_name, category_name
        
         self.directoryId = self.cfg['account']['DEFAULT_DIRECTORY']
         self.mailingListId = self.cfg['project']['MAILING_LIST_ID']
+        self.open_cache()
+        # embedded data changes waiting to be written, see queue_update
+        self.pendingUpdates = {}
+        self.updatesLock = threading.Lock()
+        # number of update_embedded calls that had nothing to write
+        self.skippedWrites = 0
         #self.surveyId = self.cfg['project']['SURVEY_ID']
         self.libraryId = self.cfg['project'].get('LIBRARY_ID')    
         self.timeZone = self.cfg['project'].get('TIMEZONE','America/Chicago') 
@@ -70,22 +80,25 @@ class StudySteps(QualtricsDist):
         # load the contact list
         self.contactList = self.get_contact_list()
         
-        self.loadSteps()
         self.loadSurveys()
         
         pass
     
     def loadSurveys(self):
         # load surveys into a dictionary for each step
+        # the exports of every step's survey are started together, checked in
+        # one loop and downloaded as they finish, see export_many, and kept in
+        # self.surveyCache so load actions do not export them again
+        
+        surveyIds = [v['survey'] for v in self.steps.values()]
+        self.surveyCache = self.export_many(surveyIds, fileFormat='json',
+                                            returnFormat='ddict')
         
         self.SurveyData = {}
         
         for k,v in self.steps.items():
             
-            self.surveyId = v['survey']
-            data = self.export_surveys(waitTime=7.5, fileFormat='json', 
-                                 returnFormat='ddict', keep=True)          
-            self.SurveyData[k] = data
+            self.SurveyData[k] = self.surveyCache[v['survey']]
             
             pass
         pass
@@ -122,8 +135,8 @@ class StudySteps(QualtricsDist):
                         pass
                     case "filter":
                         ddict = self.thisStep['ddict']['responses']
-                        # just use values
-                        newDdict = [d['values'] for d in ddict] 
+                        # just use values, copied since the export is shared between steps
+                        newDdict = [dict(d['values']) for d in ddict] 
                         # make sure vars exist in dict
                         addDdict = self.addVars(newDdict)              
                         filter = self.thisStep['condition']
@@ -167,17 +180,19 @@ class StudySteps(QualtricsDist):
     def loadAction(self, surveyId):
         """
         Load the survey, be default uses the ['survey']
-
+        
+        Surveys already exported by loadSurveys come from self.surveyCache
+        
         Args:
             surveyd_id (_type_, optional): _description_. Defaults to None.
         """
         
-
         self.surveyId =  surveyId           
-        df = self.export_surveys(waitTime=7.5, fileFormat='json', 
-                                 returnFormat='ddict', keep=True)
-        return df
-    
+        if surveyId not in self.surveyCache:
+            self.surveyCache[surveyId] = self.export_surveys(fileFormat='json', 
+                                 returnFormat='ddict', keep=True, surveyId=surveyId)
+        return self.surveyCache[surveyId]
+
 # read the mconfig file
 mconfig_file = "mconfig_covid.yaml"
 
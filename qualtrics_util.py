@@ -27,6 +27,11 @@ import tempfile
 import glob
 import shutil
 import textwrap
+import sqlite3
+import threading
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
 
 
 # Setting user Parameters
@@ -34,13 +39,47 @@ from dotenv import dotenv_values
 import random
 
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 
-__version_info__ = ('2', '0', '31')
+__version_info__ = ('2', '0', '63')
 __version__ = '.'.join(__version_info__)
 __version_history__ = \
 """
+2.0.63 - the distribution index is created up front and built under a lock
+2.0.62 - with CONTACT_SYNC send and delete select their contacts with indexed queries, the mirror keeps the list order
+2.0.61 - a finished schedule is reused when run again, time ranges are not drawn and posted a second time
+2.0.60 - note that the cache tables shared with the qualtrics_util package must match its schemas
+2.0.59 - the library message cache is created in initialize and locked, invalidateLibraryMessage removed
+2.0.58 - cases whose send times all passed are not scheduled again until their StartDate changes
+2.0.57 - a delete that raises is reported as failed, the other deletes and the DeleteUnsent reset still run
+2.0.56 - export_many starts every export, checks them in one loop and downloads finished ones in the pool
+2.0.55 - sync_contacts reads the mirror under the cache lock and resyncs at once when the listing has no lastModifiedDate
+2.0.54 - bulk contact import is opt in (account:BULK_IMPORT_MIN has no default), imports are polled like exports and failed rows are PUT
+2.0.53 - posts are only retried on 429 or 503 with Retry-After, Retry-After waits are capped
+2.0.52 - send journal keys invites by schedule, a new StartDate after a finished run is scheduled again
+2.0.51 - past send times are skipped and counted instead of posted (project:SEND_GRACE_MINUTES)
+2.0.50 - send journal, invites are journaled before posting and interrupted runs resume without duplicates
+2.0.49 - plan command writes the invitations send would schedule to a plan file (project:PLAN_FILE) and diffs it with the ledger
+2.0.48 - send_times computes a case's schedule once, startDate and the time zone are parsed once per case
+2.0.47 - export_many exports several surveys concurrently (account:EXPORT_WORKERS), export_surveys takes a surveyId
+2.0.46 - export_surveys paces progress checks by the estimated completion within a time budget (account:EXPORT_TIMEOUT)
+2.0.45 - export_surveys streams the download to a spooled file and reads the zip member directly
+2.0.44 - local ledger of scheduled distributions, status command (project:DELETE_FROM_LEDGER)
+2.0.43 - optional local contact mirror synced by lastModifiedDate (project:CONTACT_SYNC)
+2.0.42 - bulk contact import job for large embeddedData updates (account:BULK_IMPORT_MIN)
+2.0.41 - update_embedded skips the PUT when the embeddedData would not change
+2.0.40 - buffer SurveysScheduled and write one contact update per participant
+2.0.39 - schedule contacts concurrently in check_for_send (project:SEND_WORKERS)
+2.0.38 - cache library message text per run (account:MESSAGE_CACHE_TTL)
+2.0.37 - delete unsent distributions concurrently (account:DELETE_WORKERS)
+2.0.36 - delete_unsent lists distributions once per run and indexes them by contactLookupId
+2.0.35 - cache contactLookupIds in a sqlite db next to the config (project:CACHE_FILE)
+2.0.34 - get_contact_list follows nextPage, lists longer than one page were truncated
+2.0.33 - retry 429/5xx responses with backoff and Retry-After (account:MAX_RETRIES)
+2.0.32 - use a pooled keep-alive session for all api calls (account:POOL_SIZE)
 2.0.31 - changed pyinstaller spec to strip=True to reduce size of executable
 2.0.30 - fixed another extra key with contactLookupId in update_embedded
 2.0.29 - fixed VA error on getting extra key mailingListUnsubscribed 
@@ -97,6 +136,27 @@ class VersionHistoryAction(argparse.Action):
         print(__version_history__)
         parser.exit()
 
+class ApiRetry(Retry):
+    """
+    Retry policy of the api session
+    
+    Idempotent requests are retried on 429, 502, 503 and 504. A post (or
+    patch) may already have created its distribution when a 5xx comes
+    back, so it is only retried on 429, or on 503 with a Retry-After
+    header, which mean the request was not processed. Retry-After waits
+    are capped at RETRY_AFTER_MAX seconds.
+    """
+    RETRY_AFTER_MAX = 120
+    
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method.upper() not in self.DEFAULT_ALLOWED_METHODS:
+            return bool(self.total) and (status_code == 429 or (status_code == 503 and has_retry_after))
+        return super().is_retry(method, status_code, has_retry_after)
+    
+    def get_retry_after(self, response):
+        retryAfter = super().get_retry_after(response)
+        return None if retryAfter is None else min(retryAfter, self.RETRY_AFTER_MAX)
+
 class QualtricsDist:
 
     """
@@ -138,19 +198,157 @@ class QualtricsDist:
         if self.sslwarning == False:
             requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
+        # keep-alive session shared by all api calls
+        self.session = self.create_session()
+
         # account, library_id, mailing_list_name, category_name
        
         self.directoryId = self.cfg['account']['DEFAULT_DIRECTORY']
         self.mailingListId = self.cfg['project']['MAILING_LIST_ID']
+
+        # local database next to the config for the contactLookupId cache
+        self.open_cache()
+        # embedded data changes waiting to be written, see queue_update
+        self.pendingUpdates = {}
+        self.updatesLock = threading.Lock()
+        # number of update_embedded calls that had nothing to write
+        self.skippedWrites = 0
+        # library message text by (libraryId, messageId, language), see getLibraryMessage
+        self.messageCache = {}
+        self.messageLock = threading.Lock()
+        # distributions by channel and contactLookupId, see get_distribution_index
+        self.distributionIndex = {}
+        self.distributionLock = threading.Lock()
+
         self.surveyId = self.cfg['project']['SURVEY_ID']
         self.libraryId = self.cfg['account'].get('LIBRARY_ID')    
         self.messageId = self.cfg['project']['MESSAGE_ID']    
         self.messageIdEmail = self.cfg['project'].get('MESSAGE_ID_EMAIL','unknown')   
         self.timeZone = self.cfg['project'].get('TIMEZONE','America/Chicago') 
         self.minutesExpire = self.cfg['project'].get('MINUTES_EXP', 60)
+        # send times less than this many minutes ahead are skipped like past ones
+        self.graceMinutes = self.cfg['project'].get('SEND_GRACE_MINUTES', 0)
         
         pass
 
+    def create_session(self):
+        """
+        Create a keep-alive session with a pooled connection to the data center
+        
+        Every api call goes through this session so the TLS connection to
+        {dataCenter}.qualtrics.com is reused instead of re-negotiated for
+        each contact update, lookup and distribution post.
+        
+        POOL_SIZE in the account section sets the number of connections
+        kept alive per host, default 10.
+        
+        Rate limited (429) and unavailable (502, 503, 504) responses are
+        retried with jittered exponential backoff, honoring Retry-After.
+        Posts are only retried when they were not processed (see ApiRetry).
+        MAX_RETRIES in the account section sets the retries, default 5.
+        """
+        poolSize = self.cfg['account'].get('POOL_SIZE', 10)
+        retries = ApiRetry(
+            total=self.cfg['account'].get('MAX_RETRIES', 5),
+            status_forcelist=(429, 502, 503, 504),
+            backoff_factor=1,
+            backoff_jitter=1.0,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=poolSize, max_retries=retries)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def open_cache(self):
+        """
+        Open the local sqlite database kept next to the config file
+        
+        config/config_x.yaml uses config/config_x.db unless CACHE_FILE is set
+        in the project section. It holds the contactLookupId cache, since the
+        CGC lookup id of a mailing list membership never changes.
+
+        The package (src/qualtrics_util) opens the same file, so
+        contact_lookup_ids, distribution_ledger and send_journal must stay
+        identical to the SCHEMA of storage/lookup_cache.py, storage/ledger.py
+        and storage/journal.py; change both copies together
+        (tests/test_storage/test_legacy_schema.py compares them).
+        """
+        cacheFile = self.cfg['project'].get('CACHE_FILE')
+        if not cacheFile:
+            cacheFile = os.path.splitext(self._config_file_path)[0] + '.db'
+
+        self.cacheLock = threading.Lock()
+        self.cache = sqlite3.connect(cacheFile, check_same_thread=False)
+        with self.cacheLock, self.cache:
+            self.cache.execute(
+                "CREATE TABLE IF NOT EXISTS contact_lookup_ids ("
+                "directory_id TEXT NOT NULL, mailing_list_id TEXT NOT NULL, "
+                "contact_id TEXT NOT NULL, lookup_id TEXT NOT NULL, "
+                "PRIMARY KEY (directory_id, mailing_list_id, contact_id))"
+            )
+            # a mirror without the indexed columns is rebuilt by the next sync
+            columns = [row[1] for row in self.cache.execute("PRAGMA table_info(contact_mirror)")]
+            if columns and 'position' not in columns:
+                self.cache.execute("DROP TABLE contact_mirror")
+            self.cache.execute(
+                "CREATE TABLE IF NOT EXISTS contact_mirror ("
+                "mailing_list_id TEXT NOT NULL, contact_id TEXT NOT NULL, "
+                "modified TEXT, data TEXT NOT NULL, position INTEGER NOT NULL DEFAULT 0, "
+                "surveys_scheduled INTEGER NOT NULL DEFAULT 0, num_days INTEGER NOT NULL DEFAULT 0, "
+                "delete_unsent INTEGER NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (mailing_list_id, contact_id))"
+            )
+            self.cache.execute(
+                "CREATE INDEX IF NOT EXISTS contact_mirror_send "
+                "ON contact_mirror (mailing_list_id, surveys_scheduled, num_days)")
+            self.cache.execute(
+                "CREATE INDEX IF NOT EXISTS contact_mirror_delete "
+                "ON contact_mirror (mailing_list_id, delete_unsent)")
+            # append only, deletions are added as 'deleted' rows
+            self.cache.execute(
+                "CREATE TABLE IF NOT EXISTS distribution_ledger ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, recorded_at REAL NOT NULL, "
+                "event TEXT NOT NULL, distribution_id TEXT NOT NULL, channel TEXT, "
+                "contact_id TEXT, lookup_id TEXT, mailing_list_id TEXT, survey_id TEXT, "
+                "send_date TEXT, expiration_date TEXT, config TEXT)"
+            )
+            self.cache.execute(
+                "CREATE INDEX IF NOT EXISTS distribution_ledger_contact "
+                "ON distribution_ledger (contact_id, send_date)")
+            self.cache.execute(
+                "CREATE INDEX IF NOT EXISTS distribution_ledger_send_date "
+                "ON distribution_ledger (send_date)")
+            self.cache.execute(
+                "CREATE INDEX IF NOT EXISTS distribution_ledger_distribution "
+                "ON distribution_ledger (distribution_id, event)")
+            # write-ahead journal of send runs, planned -> posting -> done
+            self.cache.execute(
+                "CREATE TABLE IF NOT EXISTS send_journal ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, mailing_list_id TEXT NOT NULL, "
+                "contact_id TEXT NOT NULL, channel TEXT NOT NULL, schedule_id TEXT NOT NULL DEFAULT '', "
+                "send_date TEXT NOT NULL, "
+                "expiration_date TEXT, state TEXT NOT NULL, lookup_id TEXT, distribution_id TEXT, "
+                "error TEXT, updated_at REAL NOT NULL, "
+                "UNIQUE (mailing_list_id, contact_id, channel, schedule_id, send_date))"
+            )
+            self.cache.execute(
+                "CREATE INDEX IF NOT EXISTS send_journal_state "
+                "ON send_journal (mailing_list_id, state)")
+    
+    def warm_lookup_cache(self, contactList):
+        """
+        Store the contactLookupIds carried by a mailing list contact listing
+        so later sends and deletes don't have to resolve them one by one
+        """
+        rows = [(self.directoryId, self.mailingListId, c['contactId'], c['contactLookupId'])
+                for c in contactList if c.get('contactLookupId')]
+        with self.cacheLock, self.cache:
+            self.cache.executemany(
+                "INSERT OR REPLACE INTO contact_lookup_ids VALUES (?, ?, ?, ?)", rows)
+
     def work(self, cmd):
         """
         Do work based on cmd
@@ -192,8 +390,15 @@ class QualtricsDist:
             pass
         elif cmd == 'delete':
             self.delete_unsent(self.index)
+        elif cmd == 'plan':
+            # dry run of send, writes the plan file
+            self.check_for_send(self.mailingListId, sendFlag=False)
+        elif cmd == 'status':
+            # scheduled distributions from the local ledger, no api calls
+            self.print_ledger_status()
         elif cmd == 'export':
-            self.export_surveys(fileFormat=self.format)
+            # only the file is needed, don't build a df
+            self.export_surveys(fileFormat=self.format, returnFormat=None)
         elif cmd == 'list':
             # update the EmbeddedData before list
             self.update_contact_list()
@@ -205,14 +410,11 @@ class QualtricsDist:
             # short listing
             # update the EmbeddedData before list
             self.update_contact_list()
-            contactList = self.get_contact_list()
-            # print the list
-            self.print_contact_list(contactList, format='short')
+            # print the list as pages arrive
+            self.print_contact_list(self.iter_contacts(), format='short')
         elif cmd == 'update':
             # update the embeddedData in the contactList
-            contactList = self.get_contact_list()
-            for contact in contactList:
-                self.update_embedded(contact['contactId'])
+            self.update_contact_list()
         else:
             print(f"Error: {cmd} is an unknown command")
             
@@ -353,156 +555,400 @@ class QualtricsDist:
                     #     )
                     
                     index += 1
-
-    def export_surveys(self, waitTime=7.5, fileFormat='json', 
-                       returnFormat = 'df', keep=True):
+    
+    def start_poll(self, waitTime, timeout):
+        """
+        State of a polled job (export or contact import) for next_poll_interval
+        """
+        return {'start': time.monotonic(), 'timeout': timeout, 'idle': waitTime, 'first': None}
+    
+    def next_poll_interval(self, poll, percent):
+        """
+        Seconds to wait before checking a job again, None once its timeout passed
+        
+        The remaining time is estimated from how fast percentComplete has
+        moved since the first check. While the job reports no progress the
+        wait starts at waitTime and grows by 1.5. Bounded to 0.5 - 30 seconds
+        and the time left.
+        """
+        now = time.monotonic()
+        left = poll['timeout'] - (now - poll['start'])
+        if left <= 0:
+            return None
+        
+        if poll['first'] is None:
+            poll['first'] = (now, percent)
+        firstTime, firstPercent = poll['first']
+        if percent > firstPercent and now > firstTime:
+            rate = (percent - firstPercent) / (now - firstTime)
+            interval = (100 - percent) / rate
+        else:
+            interval = poll['idle']
+            poll['idle'] *= 1.5
+        return min(max(interval, 0.5), 30, left)
+    
+    def export_surveys(self, waitTime=1.0, fileFormat='json', 
+                       returnFormat = 'df', keep=True, surveyId=None):
         """
         export surveys to a file and also return a df
     
         https://api.qualtrics.com/u9e5lh4172v0v-survey-response-export-guide
         
+        The download is streamed into a spooled temp file (on disk past 32MB)
+        and the export is read straight from the zip, returnFormat=None only
+        writes the file and does not build a df
+        
+        Progress is checked after waitTime seconds, then around the time the
+        export should finish going by how fast percentComplete moves (0.5 to
+        30 seconds apart), until account:EXPORT_TIMEOUT seconds (1800) pass
+        
+        surveyId defaults to self.surveyId, see export_many to export
+        several surveys at once
+        
         """
-
-# Setting user Parameters
-
-
-
-        apiToken = self.apiToken
-        surveyId = self.surveyId
-        dataCenter = self.dataCenter
-
-        # Setting static parameters
-        requestCheckProgress = 0.0
-        progressStatus = "inProgress"
-        url = "https://{0}.qualtrics.com/API/v3/surveys/{1}/export-responses/".format(dataCenter, surveyId)
-        headers = {
+        
+        surveyId = surveyId or self.surveyId
+        
+        # Step 1: Creating Data Export
+        progressId = self.start_export(surveyId, fileFormat)
+        
+        timeout = self.cfg['account'].get('EXPORT_TIMEOUT', 1800)
+        poll = self.start_poll(waitTime, timeout)
+        
+        # Step 2: Checking on Data Export Progress and waiting until export is ready
+        while True:
+            progressStatus, requestCheckProgress, isFile = self.check_export(surveyId, progressId)
+            print("Download is " + str(requestCheckProgress) + " complete")
+            if progressStatus in ["complete", "failed"] or isFile is not None:
+                break
+            print("File not ready")
+            
+            sleep_interval = self.next_poll_interval(poll, requestCheckProgress)
+            if sleep_interval is None:
+                print(f"Export not finished after {timeout} seconds. Exiting.")
+                sys.exit('Exiting program')
+            print(f"Checking again in {sleep_interval:.1f} seconds...")
+            time.sleep(sleep_interval)
+        
+        if isFile is None:
+            print(f"Export {progressStatus}. Exiting.")
+            sys.exit('Exiting program')
+        
+        # Step 3: Downloading file
+        with self.download_export(surveyId, isFile) as spool:
+            # Step 4: Unzipping the file
+            return self.read_export(spool, fileFormat, returnFormat)
+    
+    def export_headers(self):
+        """Headers of the export-responses calls"""
+        return {
             "content-type": "application/json",
-            "x-api-token": apiToken,
+            "x-api-token": self.apiToken,
             }
-
-        # Step 1: Creating Data Export
+    
+    def export_url(self, surveyId):
+        """Base url of a survey's response exports"""
+        return "https://{0}.qualtrics.com/API/v3/surveys/{1}/export-responses/".format(self.dataCenter, surveyId)
+    
+    def start_export(self, surveyId, fileFormat='json'):
+        """Start a response export of a survey, returns its progressId"""
         data = {
                 "format": fileFormat,
                 #"seenUnansweredRecode": 2
             }
-
-        downloadRequestResponse = requests.request("POST", url, json=data, headers=headers,verify=self.verify)
-        # print(downloadRequestResponse.json())
-
+        response = self.session.request("POST", self.export_url(surveyId), json=data,
+                                        headers=self.export_headers(), verify=self.verify)
         try:
-            progressId = downloadRequestResponse.json()["result"]["progressId"]
+            return response.json()["result"]["progressId"]
         except KeyError:
-            print(downloadRequestResponse.json())
+            print(response.json())
             sys.exit(2)
-            
-        isFile = None
-
-        max_retries = 5
-        retry_count = 0
-
-        # Step 2: Checking on Data Export Progress and waiting until export is ready
-        while progressStatus != "complete" and progressStatus != "failed" and isFile is None:
-            if isFile is None:
-                print("File not ready")
-            else:
-                print("ProgressStatus=", progressStatus)
-            
-            requestCheckUrl = url + progressId
-            requestCheckResponse = requests.request("GET", requestCheckUrl, headers=headers,verify=self.verify)
-            
-            try:
-                isFile = requestCheckResponse.json()["result"]["fileId"]
-            except KeyError:
-                1==1
-
-            #print(requestCheckResponse.json())
-            requestCheckProgress = requestCheckResponse.json()["result"]["percentComplete"]
-            print("Download is " + str(requestCheckProgress) + " complete")
-            progressStatus = requestCheckResponse.json()["result"]["status"]
-
-            if progressStatus not in ["complete", "failed"]:
-                # Implement exponential backoff with a maximum number of retries
-                retry_count += 1
-                if retry_count > max_retries:
-                    print("Exceeded maximum retries. Exiting.")
-                    sys.exit('Exiting program')
-                
-                # Calculate the next sleep interval using exponential backoff (The first retry will occur after 200 seconds, the second after 400 seconds, the third after 600 seconds, and so on, until the max_retries limit is reached)
-                sleep_interval = waitTime * ( 2 ** (retry_count-1))
-                print(f"Retrying in {sleep_interval} seconds...")
-                time.sleep(sleep_interval)
-
-        # Step 3: Downloading file
-        requestDownloadUrl = url + isFile + '/file'
-        requestDownload = requests.request("GET", requestDownloadUrl, headers=headers, stream=True,verify=self.verify)
-
-        # Step 4: Unzipping the file
-        # create temp_dir
-        with tempfile.TemporaryDirectory() as temp_dir:
-
-            zipfile.ZipFile(io.BytesIO(requestDownload.content)).extractall(temp_dir)
-            # get the expected single file
-            tmpPath = glob.glob(os.path.join(temp_dir, f"*{fileFormat}"))[0]
-            baseName = os.path.basename(tmpPath)
-            # clean up baseName
-            cleanBaseName = baseName.replace(" ","_").replace(":","")
-            localDir = os.getcwd()
-            newPath = os.path.join(localDir, cleanBaseName)
-            
-            if fileFormat == 'csv':
-                # copy the file
-                shutil.copy(tmpPath, newPath)
-                # skip the 0 index rows 1 and 2
-                df = pd.read_csv(tmpPath, skiprows=[ 1, 2])
-                pass
-            elif fileFormat == 'json':
-                # make copy of the json file with indent output
-                with open(tmpPath) as fp:
-                    ddict = json.load(fp)
-                # add source key
-                ddict['source'] = 'qualtrics'
-                # write out file with indent
-                with open(newPath,'w') as fp:
-                    json.dump(ddict, fp, indent=4)
-                # read into df
+    
+    def check_export(self, surveyId, progressId):
+        """
+        Check an export once, returns (status, percentComplete, fileId),
+        fileId is None until the file is ready
+        """
+        response = self.session.request("GET", self.export_url(surveyId) + progressId,
+                                        headers=self.export_headers(), verify=self.verify)
+        result = response.json()["result"]
+        return result["status"], result["percentComplete"], result.get("fileId")
+    
+    def download_export(self, surveyId, fileId):
+        """
+        Stream a finished export into a spooled temp file (on disk past 32MB)
+        
+        Returns the temp file, rewound, the caller closes it
+        """
+        requestDownload = self.session.request("GET", self.export_url(surveyId) + fileId + '/file',
+                                               headers=self.export_headers(), stream=True, verify=self.verify)
+        spool = tempfile.SpooledTemporaryFile(max_size=32*1024*1024)
+        for chunk in requestDownload.iter_content(chunk_size=1024*1024):
+            spool.write(chunk)
+        spool.seek(0)
+        return spool
+    
+    def read_export(self, spool, fileFormat='json', returnFormat='df'):
+        """
+        Write the export in a downloaded zip to the current directory
+        
+        Returns a df for returnFormat='df', the export dict for json
+        otherwise (None for csv)
+        """
+        archive = zipfile.ZipFile(spool)
+        # get the expected single file
+        member = [name for name in archive.namelist() if name.endswith(fileFormat)][0]
+        baseName = os.path.basename(member)
+        # clean up baseName
+        cleanBaseName = baseName.replace(" ","_").replace(":","")
+        localDir = os.getcwd()
+        newPath = os.path.join(localDir, cleanBaseName)
+        
+        df = None
+        ddict = None
+        if fileFormat == 'csv':
+            # copy the file
+            with archive.open(member) as src, open(newPath, 'wb') as dst:
+                shutil.copyfileobj(src, dst, 1024*1024)
+            # skip the 0 index rows 1 and 2
+            if returnFormat == 'df':
+                df = pd.read_csv(newPath, skiprows=[ 1, 2])
+            pass
+        elif fileFormat == 'json':
+            # make copy of the json file with indent output
+            with archive.open(member) as fp:
+                ddict = json.load(fp)
+            # add source key
+            ddict['source'] = 'qualtrics'
+            # write out file with indent
+            with open(newPath,'w') as fp:
+                json.dump(ddict, fp, indent=4)
+            # read into df
+            if returnFormat == 'df':
                 df = pd.DataFrame(ddict['responses'])
-                pass
-            
-            print(f'Complete: data written to {newPath}') 
-            
+            pass
+        archive.close()
+        
+        print(f'Complete: data written to {newPath}') 
+        
         if returnFormat =='df':   
             return df
         else:
             return ddict
+    
+    def export_many(self, surveyIds, fileFormat='json', returnFormat='ddict'):
+        """
+        Export several surveys at once
+        
+        Every export job is started first, then the jobs are checked
+        together in one loop, each paced like export_surveys, and the
+        loop waits for the job expected to finish first. A finished export
+        is downloaded in a pool of EXPORT_WORKERS threads (account section,
+        default 4) while the others are still running. The downloads are
+        read and written one at a time in this thread, so whole exports are
+        not parsed and dumped concurrently. A survey listed more than once
+        is exported once.
+        
+        Returns a dict of surveyId -> export_surveys result
+        """
+        surveyIds = list(dict.fromkeys(surveyIds))
+        if len(surveyIds) == 0:
+            return {}
+        
+        timeout = self.cfg['account'].get('EXPORT_TIMEOUT', 1800)
+        jobs = {}
+        for surveyId in surveyIds:
+            jobs[surveyId] = (self.start_export(surveyId, fileFormat), self.start_poll(1.0, timeout))
+        if self.verbose: print(f"Started {len(jobs)} exports")
+        
+        maxWorkers = self.cfg['account'].get('EXPORT_WORKERS', 4)
+        with ThreadPoolExecutor(max_workers=min(maxWorkers, len(surveyIds))) as executor:
+            downloads = {}
+            while len(jobs) > 0:
+                wait = None
+                for surveyId, (progressId, poll) in list(jobs.items()):
+                    status, percent, fileId = self.check_export(surveyId, progressId)
+                    if fileId is not None:
+                        downloads[surveyId] = executor.submit(self.download_export, surveyId, fileId)
+                        del jobs[surveyId]
+                        continue
+                    if status in ["complete", "failed"]:
+                        print(f"Export of {surveyId} {status}. Exiting.")
+                        sys.exit('Exiting program')
+                    interval = self.next_poll_interval(poll, percent)
+                    if interval is None:
+                        print(f"Export of {surveyId} not finished after {timeout} seconds. Exiting.")
+                        sys.exit('Exiting program')
+                    wait = interval if wait is None else min(wait, interval)
+                if len(jobs) > 0:
+                    time.sleep(wait)
+            
+            results = {}
+            for surveyId in surveyIds:
+                with downloads[surveyId].result() as spool:
+                    results[surveyId] = self.read_export(spool, fileFormat, returnFormat)
+            return results
+    
+    def get_contact_list(self, embedded = True, pageSize = 100, select = None):
+        """
+        Returns mailing list's contact list, all pages
+        
+        With CONTACT_SYNC set in the project section the list comes from the
+        local contact mirror, see sync_contacts. select 'send' or 'delete'
+        then only returns the contacts to schedule or to delete for, without
+        it select is ignored and the caller checks the fields.
+        """
         
+        if embedded and self.cfg['project'].get('CONTACT_SYNC', False):
+            d = self.sync_contacts(pageSize=pageSize, select=select)
+        else:
+            d = list(self.iter_contacts(embedded=embedded, pageSize=pageSize))
+        self.contactList = d
+        self.warm_lookup_cache(d)
+        return d
+
+    def iter_contacts(self, embedded = True, pageSize = 100):
+        """
+        Stream the mailing list's contacts page by page
         
-    def get_contact_list(self, embedded = True):
-        """Returns mailing list's contact list """
+        Follows nextPage so lists longer than one page are complete. Pages
+        are only fetched as the contacts are consumed.
+        """
     
-        baseUrl = "https://{0}.qualtrics.com/API/v3/directories/{1}/mailinglists/{2}/contacts".format(
+        baseUrl = "https://{0}.qualtrics.com/API/v3/directories/{1}/mailinglists/{2}/contacts?pageSize={3}".format(
               self.dataCenter, 
               self.directoryId, 
-              self.mailingListId)
+              self.mailingListId,
+              pageSize)
         
         if embedded == True:
-            baseUrl = baseUrl + "?includeEmbedded=true"
+            baseUrl = baseUrl + "&includeEmbedded=true"
 
         headers = {
             "x-api-token": self.apiToken,
         }
 
+        # loop over multiple pages if needed
+        while baseUrl is not None:
+            try:
+                response = self.session.get(baseUrl, headers=headers, verify=self.verify)
+                response.raise_for_status()
+            except Exception as e:
+                print(f"Error contact_list: {e}")
+                sys.exit('Exiting program')
+
+            d = json.loads(response.text)['result']
+            yield from d['elements']
+            baseUrl = d.get('nextPage')
+    
+    def sync_contacts(self, pageSize = 100, select = None):
+        """
+        Bring the local contact mirror up to date and return its contacts
+        
+        Contacts are returned in mailing list order. select 'send' returns
+        the contacts with SurveysScheduled 0 and NumDays > 0, plus those with
+        unfinished invites in the send journal; select 'delete' the contacts
+        with DeleteUnsent 1. Both are indexed queries on the mirror.
+        
+        The mailing list is listed without embeddedData and only contacts
+        whose lastModifiedDate changed, or that are new, are fetched with
+        their embeddedData. Contacts that left the list are dropped. When
+        the mirror is empty, or more than a quarter of the list changed, or
+        the listing has no lastModifiedDate, the whole list is downloaded
+        with embeddedData instead.
+        """
+        with self.cacheLock:
+            rows = self.cache.execute(
+                "SELECT contact_id, modified FROM contact_mirror WHERE mailing_list_id = ?",
+                (self.mailingListId,)).fetchall()
+        stored = dict(rows)
+        
+        listing, stale = [], []
+        full = len(stored) == 0
+        if not full:
+            listing = list(self.iter_contacts(embedded=False, pageSize=pageSize))
+            # without lastModifiedDate there is nothing to compare
+            full = len(listing) > 0 and not listing[0].get('lastModifiedDate')
+        if not full:
+            stale = [c for c in listing
+                     if not c.get('lastModifiedDate') or stored.get(c['contactId']) != c['lastModifiedDate']]
+            full = len(stale) > len(listing) / 4
+        
+        if full:
+            changed = list(self.iter_contacts(embedded=True, pageSize=pageSize))
+            listing = changed
+            mode = 'full'
+        else:
+            # the listing keeps contactLookupId, the contact GET does not
+            changed = [dict(c, **self.get_contact(c['contactId'])) for c in stale]
+            mode = 'incremental'
+        
+        def field(contact, key):
+            try:
+                return int(contact.get('embeddedData', {}).get(key, 0))
+            except (TypeError, ValueError):
+                return 0
+
+        listedIds = set(c['contactId'] for c in listing)
+        removed = [(self.mailingListId, cid) for cid in stored if cid not in listedIds]
+        with self.cacheLock, self.cache:
+            # an updated contact keeps its position
+            self.cache.executemany(
+                "INSERT INTO contact_mirror (mailing_list_id, contact_id, modified, data, "
+                "surveys_scheduled, num_days, delete_unsent) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (mailing_list_id, contact_id) DO UPDATE SET modified = excluded.modified, "
+                "data = excluded.data, surveys_scheduled = excluded.surveys_scheduled, "
+                "num_days = excluded.num_days, delete_unsent = excluded.delete_unsent",
+                [(self.mailingListId, c['contactId'], c.get('lastModifiedDate'), json.dumps(c),
+                  field(c, 'SurveysScheduled'), field(c, 'NumDays'), field(c, 'DeleteUnsent'))
+                 for c in changed])
+            self.cache.executemany(
+                "DELETE FROM contact_mirror WHERE mailing_list_id = ? AND contact_id = ?", removed)
+            # keep the order of the mailing list
+            self.cache.executemany(
+                "UPDATE contact_mirror SET position = ? "
+                "WHERE mailing_list_id = ? AND contact_id = ? AND position != ?",
+                [(n, self.mailingListId, c['contactId'], n) for n, c in enumerate(listing)])
+        
+        if self.verbose > 1:
+            print(f"Contact sync ({mode}): {len(listing)} listed, {len(changed)} fetched, "
+                  f"{len(removed)} removed")
+        
+        where = {
+            None: "1 = 1",
+            'send': "num_days > 0 AND (surveys_scheduled = 0 OR contact_id IN "
+                    "(SELECT contact_id FROM send_journal WHERE mailing_list_id = ?1 "
+                    "AND state NOT IN ('done', 'skipped')))",
+            'delete': "delete_unsent = 1",
+        }[select]
+        with self.cacheLock:
+            rows = self.cache.execute(
+                f"SELECT data FROM contact_mirror WHERE mailing_list_id = ?1 AND {where} ORDER BY position",
+                (self.mailingListId,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+    
+    def get_contact(self, contactId):
+        """Get one mailing list contact with its embeddedData"""
+        
+        baseUrl = "https://{0}.qualtrics.com/API/v3/directories/{1}/mailinglists/{2}/contacts/{3}".format(
+            self.dataCenter, 
+            self.directoryId, 
+            self.mailingListId,
+            contactId)
+        
+        headers = {
+            "x-api-token": self.apiToken,
+        }
+        
         try:
-            response = requests.get(baseUrl, headers=headers, verify=self.verify)
+            response = self.session.get(baseUrl, headers=headers, verify=self.verify)
             response.raise_for_status()
         except Exception as e:
-            print(f"Error contact_list: {e}")
-            d = None
+            print(f"Error get_contact: {e}")
             sys.exit('Exiting program')
-        else:
-            d = json.loads(response.text)['result']['elements']
-            self.contactList = d
-        return d
-
+        
+        return json.loads(response.text)['result']
+    
     def get_distribution_email(self, sendStartDate=None, distributionRequestType='Invite'):
         """
         
@@ -532,7 +978,7 @@ class QualtricsDist:
         }
 
         # TODO try
-        response = requests.get(baseUrl, headers=headers, verify=self.verify)
+        response = self.session.get(baseUrl, headers=headers, verify=self.verify)
     
         dataElements = []  
 
@@ -548,7 +994,7 @@ class QualtricsDist:
 
             if d['result']['nextPage'] is not None:
                 # more pages so get next page
-                response = requests.get(d['result']['nextPage'], headers=headers,verify=self.verify)
+                response = self.session.get(d['result']['nextPage'], headers=headers,verify=self.verify)
                 d = json.loads(response.text)
                 status = d['meta']['httpStatus']
             else:
@@ -586,7 +1032,7 @@ class QualtricsDist:
         }
 
         # try
-        response = requests.get(baseUrl, headers=headers,verify=self.verify)
+        response = self.session.get(baseUrl, headers=headers,verify=self.verify)
     
         dataElements = []  
 
@@ -602,7 +1048,7 @@ class QualtricsDist:
 
             if d['result']['nextPage'] is not None:
                 # more pages so get next page
-                response = requests.get(d['result']['nextPage'], headers=headers,verify=self.verify)
+                response = self.session.get(d['result']['nextPage'], headers=headers,verify=self.verify)
                 d = json.loads(response.text)
                 status = d['meta']['httpStatus']
             else:
@@ -617,16 +1063,24 @@ class QualtricsDist:
     def delete_unsent(self, index):
         """
         Delete unsent distributions
+
+        The survey's distributions are listed once per run (per channel) and
+        looked up by contactLookupId, instead of listing them for each contact.
         """
 
         if index < 0:
-            contacts = self.get_contact_list()
+            # only contacts with DeleteUnsent 1 when the mirror is used
+            contacts = self.get_contact_list(select='delete')
         else:
             # get the contact information for the index
             contacts = self.get_contact_list()
             # reduce list down to one based on index
             contacts = [ contacts[index-1]]
-            
+        
+        # DELETE_FROM_LEDGER looks up the unsent distributions in the local
+        # ledger, only distributions scheduled by this tool are found
+        fromLedger = self.cfg['project'].get('DELETE_FROM_LEDGER', False)
+        
         for contact in contacts:
             
             if contact['embeddedData'].get('DeleteUnsent','0') =='1':
@@ -635,30 +1089,15 @@ class QualtricsDist:
                 # check if sms or email
                 if (contact['embeddedData'].get('UseSMS','0')=='1') or (contact['embeddedData'].get('ContactMethod','SMS').upper()=='SMS'):
                     # sms
-                    distributions = self.get_distribution_sms(self.surveyId)
-                    # bring contactId to top level of hierarchy
-                    for i in range(len(distributions)):
-                        distributions[i]['contactLookupId'] = distributions[i]['recipients']['contactId']
-
-                    dt_now = datetime.now()
-                    # convert to UTC
-                    dt_now_utc = dt_now.astimezone(timezone.utc)
-                    dt_now_str = dt_now_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
-                    df = pd.DataFrame(distributions)
-                    # filter for contactLookupId and sendDate
-                    df.query(f"contactLookupId == '{contactLookupId}'", inplace=True)
-                    df.query(f"sendDate > '{dt_now_str}'", inplace=True)
-
-                    if self.verbose >= 1: print(f"Found {len(df)} unsent messages for {contact['lastName']}")
+                    if fromLedger:
+                        unsent = self.get_ledger_unsent(contact['contactId'], 'sms')
+                    else:
+                        unsent = self.get_unsent_distributions(contactLookupId, 'sms')
+                    
+                    if self.verbose >= 1: print(f"Found {len(unsent)} unsent messages for {contact['lastName']}")
                     
-                    if len(df) > 0:
-                        # iterate over rows
-                        count = 1
-                        for index, row in df.iterrows():
-                            if self.verbose >= 1: print(f"Deleting {count} of {len(df)}...", end="")
-                            # delete a single distribution
-                            res = self.delete_sms_distribution(row.id, self.surveyId)
-                            count+=1
+                    # delete them concurrently
+                    report = self.delete_distributions(unsent, 'sms')
                     # update the contact embedded data
                     # comment this out because of of limits on embedded data size
                     # TODO just save most recent with datetime
@@ -668,31 +1107,15 @@ class QualtricsDist:
                     pass
                 else:
                     # email
-                    # get all the distributions for this survey
-                    distributions = self.get_distribution_email()
-                    # bring contactId to top level of hierarchy
-                    for i in range(len(distributions)):
-                        distributions[i]['contactLookupId'] = distributions[i]['recipients']['contactId']
-
-                    dt_now = datetime.now()
-                    # convert to UTC
-                    dt_now_utc = dt_now.astimezone(timezone.utc)
-                    dt_now_str = dt_now_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
-                    df = pd.DataFrame(distributions)
-                    # filter for contactLookupId and sendDate
-                    df.query(f"contactLookupId == '{contactLookupId}'", inplace=True)
-                    df.query(f"sendDate > '{dt_now_str}'", inplace=True)
-
-                    if self.verbose >= 1: print(f"Found {len(df)} unsent messages for {contact['lastName']}")
+                    if fromLedger:
+                        unsent = self.get_ledger_unsent(contact['contactId'], 'email')
+                    else:
+                        unsent = self.get_unsent_distributions(contactLookupId, 'email')
+                    
+                    if self.verbose >= 1: print(f"Found {len(unsent)} unsent messages for {contact['lastName']}")
                     
-                    if len(df) > 0:
-                        # iterate over rows
-                        count = 1
-                        for index, row in df.iterrows():
-                            if self.verbose >= 1: print(f"Deleting {count} of {len(df)}...", end="")
-                            # delete a single distribution
-                            res = self.delete_email_distribution(row.id)
-                            count+=1
+                    # delete them concurrently
+                    report = self.delete_distributions(unsent, 'email')
                     # update the contact list
                     response = self.update_embedded(contact['contactId'], updateFields={"LogData": {"action":"delete_unsent"}})
                     # update the contact list for DeleteUnsent to 0
@@ -702,6 +1125,158 @@ class QualtricsDist:
                 pass
             pass
 
+    def delete_distributions(self, distributionIds, channel):
+        """
+        Delete a list of distributions concurrently ('sms' or 'email')
+
+        DELETE_WORKERS in the account section sets the number of deletes
+        in flight, default 8. Retries and backoff come from the session. A
+        delete that raises (e.g. connection error, non json response) is
+        reported as failed and does not stop the others.
+        
+        Returns a dict of distributionId -> True/False
+        """
+        if len(distributionIds) == 0:
+            return {}
+        
+        def delete(distributionId):
+            try:
+                if channel == 'sms':
+                    return self.delete_sms_distribution(distributionId, self.surveyId)
+                return self.delete_email_distribution(distributionId)
+            except Exception as e:
+                if self.verbose >= 1: print(f"Error deleting {distributionId}: {e}")
+                return False
+        
+        maxWorkers = self.cfg['account'].get('DELETE_WORKERS', 8)
+        with ThreadPoolExecutor(max_workers=min(maxWorkers, len(distributionIds))) as executor:
+            report = dict(zip(distributionIds, executor.map(delete, distributionIds)))
+
+        failed = [distributionId for distributionId, ok in report.items() if not ok]
+        self.record_deleted([distributionId for distributionId, ok in report.items() if ok], channel)
+        if self.verbose >= 1:
+            print(f"Deleted {len(report) - len(failed)} of {len(report)} {channel} distributions")
+            for distributionId in failed:
+                print(f"Failed to delete {distributionId}")
+
+        return report
+    
+    def record_distribution(self, contactId, contactLookupId, response, sendDate, expDate, channel):
+        """
+        Append a scheduled distribution to the local ledger
+        
+        response is the distribution post response, its result id is the
+        distributionId. Dates are UTC datetimes.
+        """
+        distributionId = response.json().get('result', {}).get('id')
+        if not distributionId:
+            if self.verbose > 0: print(f"No distribution id returned for {contactId}, not recorded")
+            return
+        
+        with self.cacheLock, self.cache:
+            self.cache.execute(
+                "INSERT INTO distribution_ledger (recorded_at, event, distribution_id, channel, "
+                "contact_id, lookup_id, mailing_list_id, survey_id, send_date, expiration_date, config) "
+                "VALUES (?, 'scheduled', ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), distributionId, channel, contactId, contactLookupId,
+                 self.mailingListId, self.surveyId,
+                 sendDate.strftime('%Y-%m-%dT%H:%M:%SZ'), expDate.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                 self._config_file_path))
+    
+    def record_deleted(self, distributionIds, channel):
+        """Append deleted distributions to the local ledger"""
+        now = time.time()
+        with self.cacheLock, self.cache:
+            self.cache.executemany(
+                "INSERT INTO distribution_ledger (recorded_at, event, distribution_id, channel) "
+                "VALUES (?, 'deleted', ?, ?)",
+                [(now, distributionId, channel) for distributionId in distributionIds])
+    
+    def get_ledger_unsent(self, contactId, channel):
+        """
+        Return the distribution ids in the ledger for contactId with a sendDate
+        in the future that were not deleted
+        """
+        dt_now_str = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        rows = self.cache.execute(
+            "SELECT distribution_id FROM distribution_ledger "
+            "WHERE event = 'scheduled' AND contact_id = ? AND channel = ? AND send_date > ? "
+            "AND distribution_id NOT IN "
+            "(SELECT distribution_id FROM distribution_ledger WHERE event = 'deleted') "
+            "ORDER BY send_date",
+            (contactId, channel, dt_now_str)).fetchall()
+        return [row[0] for row in rows]
+    
+    def print_ledger_status(self):
+        """
+        Print the distributions recorded in the local ledger per channel,
+        with verbose > 1 also the unsent ones
+        """
+        dt_now_str = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        live = ("event = 'scheduled' AND distribution_id NOT IN "
+                "(SELECT distribution_id FROM distribution_ledger WHERE event = 'deleted')")
+        rows = self.cache.execute(
+            f"SELECT channel, COUNT(*), "
+            f"SUM(CASE WHEN {live} AND send_date <= ? THEN 1 ELSE 0 END), "
+            f"SUM(CASE WHEN {live} AND send_date > ? THEN 1 ELSE 0 END) "
+            f"FROM distribution_ledger WHERE event = 'scheduled' AND mailing_list_id = ? "
+            f"GROUP BY channel ORDER BY channel",
+            (dt_now_str, dt_now_str, self.mailingListId)).fetchall()
+        
+        if len(rows) == 0:
+            print("No distributions recorded in the ledger")
+        for channel, scheduled, sent, pending in rows:
+            print(f"{channel}: {scheduled} scheduled, {sent} sent, {pending} pending, "
+                  f"{scheduled - sent - pending} deleted")
+        
+        if self.verbose > 1:
+            rows = self.cache.execute(
+                f"SELECT send_date, channel, contact_id, distribution_id FROM distribution_ledger "
+                f"WHERE {live} AND send_date > ? AND mailing_list_id = ? ORDER BY send_date",
+                (dt_now_str, self.mailingListId)).fetchall()
+            for row in rows:
+                print(' '.join(row))
+    
+    def get_distribution_index(self, channel):
+        """
+        Index of the survey's distributions for a channel ('sms' or 'email')
+
+        The distributions are downloaded once per run and kept in memory as
+        contactLookupId -> [(sendDate, distributionId), ...] sorted by sendDate.
+        The lock makes concurrent callers wait for one download.
+        """
+        with self.distributionLock:
+            if channel not in self.distributionIndex:
+                if channel == 'sms':
+                    distributions = self.get_distribution_sms(self.surveyId)
+                else:
+                    # get all the distributions for this survey
+                    distributions = self.get_distribution_email()
+
+                index = {}
+                for distribution in distributions:
+                    # the contactId of the recipient is the contactLookupId
+                    contactLookupId = distribution['recipients']['contactId']
+                    index.setdefault(contactLookupId, []).append((distribution['sendDate'], distribution['id']))
+                # sendDate is ISO format in UTC so a string sort is chronological
+                for entries in index.values():
+                    entries.sort()
+                self.distributionIndex[channel] = index
+
+            return self.distributionIndex[channel]
+
+    def get_unsent_distributions(self, contactLookupId, channel):
+        """
+        Return the distribution ids for contactLookupId with a sendDate in the future
+        """
+        dt_now_utc = datetime.now(timezone.utc)
+        dt_now_str = dt_now_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        entries = self.get_distribution_index(channel).get(contactLookupId, [])
+        # first entry with sendDate > now
+        first = bisect.bisect_right(entries, dt_now_str, key=lambda entry: entry[0])
+        return [distributionId for sendDate, distributionId in entries[first:]]
+
 
     def delete_sms_distribution(self, smsDistributionId, surveyId):
         """
@@ -712,7 +1287,7 @@ class QualtricsDist:
         https://yul1.qualtrics.com/API/v3/distributions/sms/{smsDistributionId}
         
         """
-        if self.verbose > 0:
+        if self.verbose > 1:
             print(f"Deleting sms distribution {smsDistributionId}...", end="")
 
         baseUrl = "https://{0}.qualtrics.com/API/v3/distributions/sms/{1}?surveyId={2}".format(
@@ -728,20 +1303,19 @@ class QualtricsDist:
         }
 
         # try
-        response = requests.delete(baseUrl, headers=headers,verify=self.verify)
+        response = self.session.delete(baseUrl, headers=headers,verify=self.verify)
 
         d = json.loads(response.text)
 
         status = d['meta']['httpStatus']
         nextPage = 'OK'  # initialize to something not null
 
-        if self.verbose > 0:
-            if '200' in status:
-                if self.verbose>0: print(f"Success")
-                return True
-            else:
-                if self.verbose>0: print(f"Failed")
-                return False
+        if '200' in status:
+            if self.verbose>1: print(f"Success")
+            return True
+        else:
+            if self.verbose>1: print(f"Failed")
+            return False
             
     def delete_email_distribution(self, distributionId):
         """
@@ -767,20 +1341,19 @@ class QualtricsDist:
         }
 
         # try
-        response = requests.delete(baseUrl, headers=headers,verify=self.verify)
+        response = self.session.delete(baseUrl, headers=headers,verify=self.verify)
 
         d = json.loads(response.text)
 
         status = d['meta']['httpStatus']
         nextPage = 'OK'  # initialize to something not null
 
-        if self.verbose > 0:
-            if '200' in status:
-                if self.verbose>0: print(f"Success")
-                return True
-            else:
-                if self.verbose>0: print(f"Failed")
-                return False
+        if '200' in status:
+            if self.verbose>1: print(f"Success")
+            return True
+        else:
+            if self.verbose>1: print(f"Failed")
+            return False
             
 
     def reorg_distribution_list(self, dataElements):
@@ -823,11 +1396,28 @@ class QualtricsDist:
         # update the EmbeddedData
         contactList = self.get_contact_list()
         if contactList is not None:
+            # opt in: lists of at least account:BULK_IMPORT_MIN contacts are written
+            # with one import job instead of a PUT per contact. The import matches
+            # contacts by email/phone/extRef, not contactId, so only use it for
+            # lists where those are unique
+            bulkMin = self.cfg['account'].get('BULK_IMPORT_MIN')
+            bulk = bulkMin is not None and len(contactList) >= bulkMin
+            self.importQueue = []
+            skippedBefore = self.skippedWrites
             for contact in contactList:
                 # debug
                 if contact['email'] == 'kolim@umn.edu':
                     print("Debug kolim")
-                self.update_embedded(contact['contactId'])
+                self.update_embedded(contact['contactId'], queue=bulk)
+            if len(self.importQueue) > 0:
+                summary = self.import_contacts([data for _, data in self.importQueue])
+                # rows the import could not write are PUT by contactId
+                for failure in summary.get('failures', []):
+                    contactId, data = self.importQueue[int(failure.get('index', 0))]
+                    self.put_contact(contactId, data)
+            skipped = self.skippedWrites - skippedBefore
+            if self.verbose > 0:
+                print(f"Updated {len(contactList) - skipped} contacts, skipped {skipped} unchanged")
 
     def embedded_flat2nested(self, embData:dict, sep='__')-> dict:
         """
@@ -947,7 +1537,7 @@ class QualtricsDist:
             else:
                 data[key] = value
 
-        response = requests.put(baseUrl, json=data, headers=headers)
+        response = self.session.put(baseUrl, json=data, headers=headers)
 
         d = json.loads(response.text)
 
@@ -956,11 +1546,14 @@ class QualtricsDist:
         return status, response
 
 
-    def update_embedded(self, contactId, updateFields={}):
+    def update_embedded(self, contactId, updateFields={}, queue=False):
         """ 
         
         updateFields is a dictionary of items in the embeddedData that you want to change.
         
+        queue - when True (contactId, data) is added to self.importQueue
+        instead of being PUT, see import_contacts
+        
         To add an entry to LogData
         {"LogData":{"action":"update"}}
         
@@ -983,20 +1576,12 @@ class QualtricsDist:
         for item in self.contactList:
             if item['contactId'] == contactId:
                 data = item.copy()
+        # embeddedData as fetched, to check if anything changes
+        origEmbeddedData = dict(data['embeddedData'])
         
-        baseUrl = "https://{0}.qualtrics.com/API/v3/directories/{1}/mailinglists/{2}/contacts/{3}".format(
-            self.dataCenter, 
-            self.directoryId, 
-            self.mailingListId,
-            contactId, # self.contactList[index]['contactId'] #contactId
-        )
-        headers = {
-            "x-api-token": self.apiToken,
-            "Content-Type": "application/json"
-        }
-
-        # read default values from config file
-        embeddedFields = self.cfg['embedded_data']
+        # read default values from config file, copied since contacts
+        # are updated from several threads
+        embeddedFields = dict(self.cfg['embedded_data'])
         # update the values
         for key, value in updateFields.items():
             embeddedFields[key] = value
@@ -1051,6 +1636,13 @@ class QualtricsDist:
             # test nested emb data
             newDict = self.embedded_flat2nested(data['embeddedData'])  
             pass
+
+        # skip the PUT if nothing changed, values come back from qualtrics as strings
+        if data['embeddedData'].keys() == origEmbeddedData.keys() and \
+            all(str(data['embeddedData'][key]) == str(origEmbeddedData[key]) for key in origEmbeddedData):
+            self.skippedWrites += 1
+            if self.verbose > 2: print(f"Skipping unchanged contact {contactId}")
+            return '200 - OK', None
               
         # 20251201 - on va getting extra key 'mailingListUnsubscribed' which causes error
         if 'mailingListUnsubscribed' in data:
@@ -1062,8 +1654,30 @@ class QualtricsDist:
         # 20251221 - getting error with Error: Unexpected json key provided: contactLookupId
         if 'contactLookupId' in data:
             del data['contactLookupId']
-            
-        response = requests.put(baseUrl, json=data, headers=headers,verify=self.verify)
+
+        if queue:
+            # written later by import_contacts in one job
+            self.importQueue.append((contactId, data))
+            return 'queued', None
+        
+        return self.put_contact(contactId, data)
+    
+    def put_contact(self, contactId, data):
+        """
+        Write a contact of the mailing list, returns (status, response)
+        """
+        baseUrl = "https://{0}.qualtrics.com/API/v3/directories/{1}/mailinglists/{2}/contacts/{3}".format(
+            self.dataCenter,
+            self.directoryId,
+            self.mailingListId,
+            contactId,
+        )
+        headers = {
+            "x-api-token": self.apiToken,
+            "Content-Type": "application/json"
+        }
+        
+        response = self.session.put(baseUrl, json=data, headers=headers,verify=self.verify)
 
         d = json.loads(response.text)
 
@@ -1071,19 +1685,79 @@ class QualtricsDist:
         if '200' not in status:
             print(f"Error: {d['meta']['error']['errorMessage']}")
         return status, response
+    
+    def import_contacts(self, contacts, waitTime=2, timeout=1800):
+        """
+        Import contacts into the mailing list with one asynchronous job
+
+        https://yul1.qualtrics.com/API/v3/directories/{directoryId}/mailinglists/{mailingListId}/contactimports
+        
+        Existing contacts are matched by Qualtrics and updated. The job is
+        polled like export_surveys (see next_poll_interval) for up to
+        timeout seconds, then its summary is checked and the rows that
+        failed are printed.
+        
+        Returns the import summary, its failures list the index of each
+        failed row in contacts
+        """
+        importFields = ['firstName', 'lastName', 'email', 'phone', 'extRef', 'language', 'embeddedData']
+        rows = [{key: contact[key] for key in importFields if contact.get(key) is not None}
+                for contact in contacts]
+
+        baseUrl = "https://{0}.qualtrics.com/API/v3/directories/{1}/mailinglists/{2}/contactimports".format(
+            self.dataCenter,
+            self.directoryId,
+            self.mailingListId,
+        )
+        headers = {
+            "x-api-token": self.apiToken,
+            "Content-Type": "application/json"
+        }
+
+        response = self.session.post(baseUrl, json={'contacts': rows}, headers=headers, verify=self.verify)
+        if response.status_code != 200:
+            print(f"Error: {response.status_code}")
+            print(response.content)
+            sys.exit('Exiting program')
+        importId = response.json()['result']['id']
+        if self.verbose > 0: print(f"Importing {len(rows)} contacts, job {importId}")
+
+        # wait for the job to finish
+        poll = self.start_poll(waitTime, timeout)
+        while True:
+            progress = self.session.get(f"{baseUrl}/{importId}", headers=headers, verify=self.verify).json()['result']
+            status = str(progress.get('status', '')).lower()
+            percent = progress.get('percentComplete', 0)
+            if self.verbose > 1: print(f"Import is {percent}% complete")
+            if status == 'complete':
+                break
+            if status == 'failed':
+                print(f"Error: contact import {importId} failed")
+                pprint(progress)
+                sys.exit('Exiting program')
+            interval = self.next_poll_interval(poll, percent)
+            if interval is None:
+                print(f"Error: contact import {importId} did not finish after {timeout} seconds")
+                sys.exit('Exiting program')
+            time.sleep(interval)
+        
+        summary = self.session.get(f"{baseUrl}/{importId}/summary", headers=headers, verify=self.verify).json()['result']
+        for failure in summary.get('failures', []):
+            row = rows[int(failure.get('index', 0))]
+            print(f"Import failed for {row.get('email') or row.get('phone')}: "
+                  f"{failure.get('message') or failure.get('error')}")
+        if self.verbose > 0:
+            print(f"Import complete {summary.get('contacts', {}).get('count', {})}")
+
+        return summary
 
     def initialize_all_embedded(self):
         """
         Initialize the embedded fields for all the contacts in the contact list
 
         """
-        index = 0
-        for contact in self.contactList:
-            # check if embeddedData is empty
-            # if not contact['embeddedData']:
-            self.update_embedded(index)
-            index += 1
-            pass
+        # fills in the config embedded_data defaults, in bulk for large lists
+        self.update_contact_list()
 
 
 
@@ -1118,6 +1792,15 @@ class QualtricsDist:
         
         """
         
+        # lookup ids never change, so use the cached one if we have it
+        with self.cacheLock:
+            row = self.cache.execute(
+                "SELECT lookup_id FROM contact_lookup_ids "
+                "WHERE directory_id = ? AND mailing_list_id = ? AND contact_id = ?",
+                (self.directoryId, mailingListId, contactId)).fetchone()
+        if row is not None:
+            return row[0]
+
         baseUrl = "https://{0}.qualtrics.com/API/v3/directories/{1}/contacts/{2}"\
             .format(self.dataCenter, self.directoryId, contactId)
         
@@ -1125,7 +1808,7 @@ class QualtricsDist:
             "x-api-token": self.apiToken,
             }
 
-        response = requests.get(baseUrl, headers=headers, verify=self.verify)
+        response = self.session.get(baseUrl, headers=headers, verify=self.verify)
         
         # if OK
         if response.status_code == 200:
@@ -1138,6 +1821,11 @@ class QualtricsDist:
             except Exception as e:
                 print(f"Error in getContactLookupId {e}")
                 sys.exit('Exiting program')
+
+            with self.cacheLock, self.cache:
+                self.cache.execute(
+                    "INSERT OR REPLACE INTO contact_lookup_ids VALUES (?, ?, ?, ?)",
+                    (self.directoryId, mailingListId, contactId, contactLookupId))
                 
             return contactLookupId
         else:
@@ -1147,14 +1835,31 @@ class QualtricsDist:
             return None   
         
 
-    def getLibraryMessage(self, libraryId, messageId):
+    def getLibraryMessage(self, libraryId, messageId, language='en'):
         """
         Get a library message
         
         https://api.qualtrics.com/b41dc5c6eac64-get-library-message
         https://yul1.qualtrics.com/API/v3/libraries/{libraryId}/messages/{messageId}
         
+        The text is cached by (libraryId, messageId, language) so scheduling
+        many invites fetches the template once. MESSAGE_CACHE_TTL in the
+        account section sets how long an entry is kept, default 3600 seconds.
+        Workers share the cache, the lock makes a missing message be fetched
+        by one of them while the others wait for it.
         """
+        with self.messageLock:
+            return self.fetchLibraryMessage(libraryId, messageId, language)
+
+    def fetchLibraryMessage(self, libraryId, messageId, language):
+        """Cached library message text, fetched when missing or expired; call with messageLock held"""
+        key = (libraryId, messageId, language)
+        ttl = self.cfg['account'].get('MESSAGE_CACHE_TTL', 3600)
+        if key in self.messageCache:
+            stored, message = self.messageCache[key]
+            if ttl is None or time.monotonic() - stored <= ttl:
+                return message
+            del self.messageCache[key]
         
         baseUrl = "https://{0}.qualtrics.com/API/v3/libraries/{1}/messages/{2}".format(
             self.dataCenter, 
@@ -1166,26 +1871,49 @@ class QualtricsDist:
             "Content-Type": "application/json"
         }
 
-        response = requests.get(baseUrl, headers=headers,verify=self.verify)
+        response = self.session.get(baseUrl, headers=headers,verify=self.verify)
 
         d = json.loads(response.text)
 
         status = d['meta']['httpStatus']
         
         if status == '200 - OK':
-            message = d['result']['messages']['en']
+            # all languages come back together, cache each of them
+            for lang, text in d['result']['messages'].items():
+                self.messageCache[(libraryId, messageId, lang)] = (time.monotonic(), text)
+            message = d['result']['messages'][language]
         else:
             message = None
             print(f"Error in get LibraryMessage {response.text} for messageId {messageId}")
             sys.exit('Exiting program')
         
         return message       
-    
+
     def check_for_send(self, mailingListId, sendFlag=True):
         """
         check a mailing list for cases which need invitations to be sent
+
+        Eligible contacts are scheduled concurrently, SEND_WORKERS in the
+        project section sets how many at once, default 8. Each contact is
+        handled by one worker so its invites are still posted in order.
+        Contacts with unfinished invites in the send journal are resumed
+        even if SurveysScheduled is no longer 0. Contacts whose journaled
+        invites were all skipped as past are left out, so their
+        contactLookupId is not resolved on every run.
+        With sendFlag False nothing is scheduled, the invitations are
+        written to a plan file instead (see write_plan).
         """
-        contactList = self.get_contact_list()
+        # only the contacts to schedule when the mirror is used, the checks
+        # below still apply
+        contactList = self.get_contact_list(select='send')
+        # contacts of an interrupted run, resumed from the journal
+        unfinished = self.get_journal_unfinished()
+        # (contactId, channel, scheduleId) whose invites all passed unsent
+        passed = self.get_journal_skipped()
+        # (schedule function, sendParams) for each contact to schedule
+        toSchedule = []
+        # (channel, sendParams) for each contact to plan when sendFlag is False
+        toPlan = []
         # for mailing list
         for contact in contactList:
             # load values
@@ -1202,7 +1930,8 @@ class QualtricsDist:
             
             
             # check if SurveysSchedule == 0 and numDays > 0
-            if surveysScheduled == 0 and numDays>0:
+            # or the contact has journaled invites that were not posted
+            if (surveysScheduled == 0 or contact['contactId'] in unfinished) and numDays>0:
             # if surveysScheduled == 0 and ( useSMS == 1 or contactMethod == 'SMS') and numDays>0:
 
                 # get the time slots, depends on format TimeSlots or TimeX mode
@@ -1237,9 +1966,9 @@ class QualtricsDist:
                 # prepare parameters for schedule_multiple_xxxx
                 sendParams={}
 
-                # get the contactLookupId
+                # the contactLookupId is resolved by the worker in schedule_contact
                 sendParams['contactId'] = contact['contactId']
-                sendParams['contactLookupId'] = self.getContactLookupId(mailingListId, contact['contactId'])
+                sendParams['mailingListId'] = mailingListId
                 # set timezone
                 # see  if in the embeddedData
                 if contact['embeddedData'].get('TimeZone') is not None:
@@ -1256,12 +1985,21 @@ class QualtricsDist:
                 sendParams['contactInfo'] = contact
                 sendParams['ExpireMinutes'] = ExpireMinutes
 
+                # still SurveysScheduled 0, but an earlier run skipped every invite
+                channel = 'email' if contactMethod == 'EMAIL' else 'sms'
+                if (contact['contactId'], channel, self.journal_schedule_id(sendParams)) in passed:
+                    if self.verbose > 0:
+                        print(f"Skipping {contact['contactId']}, all its send times have passed")
+                    continue
+
                 # check for EMAIL first
                 if contactMethod == 'EMAIL':
                     # do the stuff for email
                     if sendFlag:
                         # send to scheduler
-                        resp = self.schedule_multiple_email(sendParams)
+                        toSchedule.append((self.schedule_multiple_email, sendParams))
+                    else:
+                        toPlan.append(('email', sendParams))
                     
                     pass
                 # order is important for check contactMethod first
@@ -1269,19 +2007,228 @@ class QualtricsDist:
 
                     if sendFlag:
                         # send to scheduler
-                        resp = self.schedule_multiple_sms(sendParams)
+                        toSchedule.append((self.schedule_multiple_sms, sendParams))
                         # TODO check ok
                         # response = self.update_embedded(sendParams['contactId'], updateFields={"LogData": {"action":"send"}})
                     else:
-                        pprint.pprint(contact)
+                        toPlan.append(('sms', sendParams))
 
                 else:
                     # error not match for contactMethod
                     print(f"Error no contact method match {contactMethod} for {contact}")
                     pass
             pass    
+
+        if not sendFlag:
+            return self.write_plan(toPlan)
+
+        if len(toSchedule) == 0:
+            return
+
+        sendWorkers = self.cfg['project'].get('SEND_WORKERS', 8)
+        if self.verbose: print(f"Scheduling {len(toSchedule)} contacts with {sendWorkers} workers")
+        try:
+            with ThreadPoolExecutor(max_workers=min(sendWorkers, len(toSchedule))) as executor:
+                futures = [executor.submit(self.schedule_contact, schedule, sendParams)
+                           for schedule, sendParams in toSchedule]
+                # result() re-raises a worker's error (e.g. sys.exit) after the others finish
+                for future in futures:
+                    future.result()
+        finally:
+            # checkpoint, write anything still queued if the run was interrupted
+            self.flush_updates()
         pass
+
+    def write_plan(self, toPlan):
+        """
+        Write the invitations a send run would create, no api calls are made
+
+        toPlan is a list of (channel, sendParams) from check_for_send. The
+        plan has one row per contact_id, channel, send_date and
+        expiration_date (UTC), time ranges are drawn when planning and send
+        times that have passed are left out (see is_future). It is
+        written to project:PLAN_FILE, default config_x_plan.csv next to
+        the config file, a .parquet name writes parquet (needs pyarrow).
+
+        The plan is compared with the local ledger: invitations that are
+        new, already scheduled, or scheduled but not in the plan.
+        """
+        fmt = '%Y-%m-%dT%H:%M:%SZ'
+        rows = []
+        skipped = 0
+        for channel, sendParams in toPlan:
+            for sendDate, expDate in self.send_times(sendParams):
+                if not self.is_future(sendDate):
+                    skipped += 1
+                    continue
+                rows.append((sendParams['contactId'], channel, sendDate.strftime(fmt), expDate.strftime(fmt)))
+        plan = pd.DataFrame(rows, columns=['contact_id', 'channel', 'send_date', 'expiration_date'])
+
+        planFile = self.cfg['project'].get('PLAN_FILE')
+        if not planFile:
+            planFile = os.path.splitext(self._config_file_path)[0] + '_plan.csv'
+        if planFile.endswith('.parquet'):
+            plan.to_parquet(planFile, index=False)
+        else:
+            plan.to_csv(planFile, index=False)
+
+        # match on contact, channel and send date
+        scheduled = Counter(self.cache.execute(
+            "SELECT contact_id, channel, send_date FROM distribution_ledger "
+            "WHERE event = 'scheduled' AND mailing_list_id = ? AND distribution_id NOT IN "
+            "(SELECT distribution_id FROM distribution_ledger WHERE event = 'deleted')",
+            (self.mailingListId,)).fetchall())
+        new = 0
+        for row in rows:
+            if scheduled[row[:3]] > 0:
+                scheduled[row[:3]] -= 1
+            else:
+                new += 1
+
+        print(f"Planned {len(rows)} invitations for {plan['contact_id'].nunique()} contacts in {planFile}")
+        print(f"{new} new, {len(rows) - new} already scheduled, "
+              f"{sum(scheduled.values())} scheduled but not planned, {skipped} skipped as past")
+        return plan
+
+    def queue_update(self, contactId, updateFields):
+        """
+        Record embedded data changes for a contact without writing them
+
+        Changes to the same field are coalesced, the last value wins.
+        flush_updates writes them with one update_embedded per contact.
+        """
+        with self.updatesLock:
+            self.pendingUpdates.setdefault(contactId, {}).update(updateFields)
+
+    def flush_updates(self, contactId=None):
+        """
+        Write the queued embedded data changes, one update per contact
+
+        contactId - contact to flush, None flushes every pending contact
+        """
+        with self.updatesLock:
+            if contactId is None:
+                batch, self.pendingUpdates = self.pendingUpdates, {}
+            elif contactId in self.pendingUpdates:
+                batch = {contactId: self.pendingUpdates.pop(contactId)}
+            else:
+                batch = {}
+
+        for cid, updateFields in batch.items():
+            self.update_embedded(cid, updateFields=updateFields)
+
+        return len(batch)
+
+    def schedule_contact(self, schedule, sendParams):
+        """
+        Resolve the contactLookupId and schedule all invites of one contact
+
+        schedule is schedule_multiple_sms or schedule_multiple_email
+        """
+        sendParams['contactLookupId'] = self.getContactLookupId(sendParams['mailingListId'], sendParams['contactId'])
+        return schedule(sendParams)
     
+    def is_future(self, sendDate):
+        """
+        True if sendDate (UTC) is more than project:SEND_GRACE_MINUTES
+        (default 0) ahead, past send times are not posted
+        """
+        return sendDate > datetime.now(timezone.utc) + timedelta(minutes=self.graceMinutes)
+
+    def journal_entries(self, params, channel):
+        """
+        Journaled invites of a case as (seq, sendDate, expDate, state)
+        
+        A case with invites that are still planned or posting is resumed
+        from them. Otherwise its send times are written to the send journal
+        before anything is posted, under a schedule id made of StartDate,
+        timeSlots and NumDays, unless that schedule is journaled already in
+        any state: a new StartDate starts a new generation of invites, while
+        the same schedule reuses its journaled times (e.g. after the
+        SurveysScheduled write was lost), so a case keeps the times drawn
+        for its time ranges and done invites are not posted again.
+        """
+        fmt = '%Y-%m-%dT%H:%M:%SZ'
+        key = (params['mailingListId'], params['contactId'], channel)
+        with self.cacheLock, self.cache:
+            row = self.cache.execute(
+                "SELECT schedule_id FROM send_journal WHERE mailing_list_id = ? AND contact_id = ? "
+                "AND channel = ? AND state NOT IN ('done', 'skipped') ORDER BY seq LIMIT 1", key).fetchone()
+            if row is not None:
+                scheduleId = row[0]
+            else:
+                scheduleId = self.journal_schedule_id(params)
+            journaled = self.cache.execute(
+                "SELECT 1 FROM send_journal WHERE mailing_list_id = ? AND contact_id = ? "
+                "AND channel = ? AND schedule_id = ? LIMIT 1", key + (scheduleId,)).fetchone()
+            if journaled is None:
+                now = time.time()
+                self.cache.executemany(
+                    "INSERT OR IGNORE INTO send_journal (mailing_list_id, contact_id, channel, schedule_id, "
+                    "send_date, expiration_date, state, updated_at) VALUES (?, ?, ?, ?, ?, ?, 'planned', ?)",
+                    [key + (scheduleId, sendDate.strftime(fmt), expDate.strftime(fmt), now)
+                     for sendDate, expDate in self.send_times(params)])
+            rows = self.cache.execute(
+                "SELECT seq, send_date, expiration_date, state FROM send_journal "
+                "WHERE mailing_list_id = ? AND contact_id = ? AND channel = ? AND schedule_id = ? ORDER BY seq",
+                key + (scheduleId,)).fetchall()
+        
+        utc = ZoneInfo("UTC")
+        return [(seq, datetime.strptime(sendDate, fmt).replace(tzinfo=utc),
+                 datetime.strptime(expDate, fmt).replace(tzinfo=utc), state)
+                for seq, sendDate, expDate, state in rows]
+
+    def journal_schedule_id(self, params):
+        """Schedule id of a case's send journal entries: StartDate/timeSlots/NumDays"""
+        slots = ','.join(str(slot) for slot in params['timeSlots'])
+        return f"{params['startDate']}/{slots}/{params['numDays']}"
+
+    def mark_journal(self, seq, state, lookupId=None, distributionId=None, error=None):
+        """Set the state of a journaled invite, lookupId is kept once set"""
+        with self.cacheLock, self.cache:
+            self.cache.execute(
+                "UPDATE send_journal SET state = ?, lookup_id = COALESCE(?, lookup_id), "
+                "distribution_id = ?, error = ?, updated_at = ? WHERE seq = ?",
+                (state, lookupId, distributionId, error, time.time(), seq))
+
+    def journal_posted(self, seq, state, contactLookupId, sendDate, channel):
+        """
+        True if a journaled invite is already in qualtrics
+
+        Done invites are. An invite left posting by an interrupted run may
+        have been created, it is looked up in the survey's distributions
+        by contactLookupId and sendDate and marked done if found.
+        """
+        if state == 'done':
+            return True
+        if state != 'posting':
+            return False
+
+        sendDateStr = sendDate.strftime('%Y-%m-%dT%H:%M:%SZ')
+        for distSendDate, distributionId in self.get_distribution_index(channel).get(contactLookupId, []):
+            if distSendDate == sendDateStr:
+                if self.verbose: print(f"Found {distributionId} at {sendDateStr}, not posting again")
+                self.mark_journal(seq, 'done', distributionId=distributionId)
+                return True
+        return False
+
+    def get_journal_unfinished(self):
+        """Return the contactIds with journaled invites that are neither done nor skipped"""
+        rows = self.cache.execute(
+            "SELECT DISTINCT contact_id FROM send_journal "
+            "WHERE mailing_list_id = ? AND state NOT IN ('done', 'skipped')",
+            (self.mailingListId,)).fetchall()
+        return {row[0] for row in rows}
+
+    def get_journal_skipped(self):
+        """Return (contactId, channel, scheduleId) of the schedules whose invites were all skipped"""
+        with self.cacheLock:
+            rows = self.cache.execute(
+                "SELECT contact_id, channel, schedule_id FROM send_journal WHERE mailing_list_id = ? "
+                "GROUP BY contact_id, channel, schedule_id HAVING SUM(state != 'skipped') = 0",
+                (self.mailingListId,)).fetchall()
+        return {tuple(row) for row in rows}
+
     def schedule_multiple_email(self, params={}):
         """
         Schedule multiple email for a case 
@@ -1323,49 +2270,49 @@ class QualtricsDist:
             print(f"Error in  format of timeSlots {params['timeSlots']}")
             return -1
             
-        total_count = params['numDays'] * len(params['timeSlots'])
+        # journaled before the first post, an earlier run's times are reused
+        entries = self.journal_entries(params, 'email')
+        total_count = len(entries)
         emailAddress =params['contactInfo']['email']
         if self.verbose: print(f"Sending {total_count} surveys to {emailAddress}")
-        for day in range(params['numDays']):
-            pass
-            for raw_time in params['timeSlots']:  
-                
-                time = self.get_time(raw_time)                
-                #TODO - adjust if there is a time zone difference between 
-                
-                # create datetime object for recipient
-                # dobj = datetime.strptime(params['startDate'], '%Y-%m-%d')
-                dobj = dateutil.parser.parse(params['startDate'])
-                hour = int(time)//100
-                min = int(time)%100
-                
-                start_recipient_time = datetime(dobj.year, dobj.month, dobj.day,hour,min, 0, 
-                                          tzinfo=ZoneInfo(params['timeZone']))
-                # add the day delta
-                recipient_time = start_recipient_time + timedelta(days=day)
-                # convert to utc
-                recipient_time_utc = recipient_time.astimezone(ZoneInfo("UTC"))
-                
-                ExpireMinutes = params.get('ExpireMinutes',self.minutesExpire)
-                
-                expiration_time_utc = recipient_time.astimezone(ZoneInfo("UTC")) \
-                                        + timedelta(minutes=ExpireMinutes)                
-                # don't schedule if now is > recipient_time
-                
-                response = self.send_email(params['contactLookupId'], recipient_time_utc, expiration_time_utc )
-
-                # if OK
-                if response.status_code == 200:
-                    if self.verbose: print(f"Scheduled {invite_count} of {total_count} surveys to {emailAddress}")                
-                    # update the SurveysScheduled entry for this contact
-                    response = self.update_embedded(params['contactId'], updateFields={"SurveysScheduled": invite_count})
-                    invite_count += 1
-                else:
-                    print(f"Error: {response.status_code}")
-                    #pprint.pprint(response.content) 
-                    print(response.content) 
-                    sys.exit('Exiting program')
-
+        skipped = 0
+        for seq, recipient_time_utc, expiration_time_utc, state in entries:
+            if self.journal_posted(seq, state, params['contactLookupId'], recipient_time_utc, 'email'):
+                # posted by an earlier run
+                self.queue_update(params['contactId'], {"SurveysScheduled": invite_count})
+                invite_count += 1
+                continue
+            # don't schedule if now is > recipient_time
+            if not self.is_future(recipient_time_utc):
+                self.mark_journal(seq, 'skipped')
+                skipped += 1
+                continue
+            
+            self.mark_journal(seq, 'posting', lookupId=params['contactLookupId'])
+            response = self.send_email(params['contactLookupId'], recipient_time_utc, expiration_time_utc )
+            
+            # if OK
+            if response.status_code == 200:
+                self.mark_journal(seq, 'done', distributionId=response.json().get('result', {}).get('id'))
+                self.record_distribution(params['contactId'], params['contactLookupId'], response,
+                                         recipient_time_utc, expiration_time_utc, 'email')
+                if self.verbose: print(f"Scheduled {invite_count} of {total_count} surveys to {emailAddress}")                
+                # record the SurveysScheduled entry, written once for this contact
+                self.queue_update(params['contactId'], {"SurveysScheduled": invite_count})
+                invite_count += 1
+            else:
+                # rejected, post it again next run; a server error may have created it
+                self.mark_journal(seq, 'planned' if response.status_code < 500 else 'posting',
+                                  error=f"{response.status_code} {response.text[:200]}")
+                print(f"Error: {response.status_code}")
+                #pprint.pprint(response.content) 
+                print(response.content) 
+                # keep track of the invites already scheduled
+                self.flush_updates(params['contactId'])
+                sys.exit('Exiting program')
+        
+        if skipped and self.verbose: print(f"Skipped {skipped} of {total_count} surveys, their send time has passed")
+        self.flush_updates(params['contactId'])
 
         return 1
 
@@ -1397,8 +2344,7 @@ class QualtricsDist:
         #message['messageId']= self.messageIdEmail
         #message['libraryId']= self.libraryId
         
-        # retrieve the original message
-        self.getLibraryMessages(self.libraryId)
+        # retrieve the original message (cached after the first invite)
         origMessageText = self.getLibraryMessage(
             self.libraryId, self.messageIdEmail
         )
@@ -1451,7 +2397,7 @@ class QualtricsDist:
         if self.verbose > 2:
             pprint(data)
 
-        response = requests.post(url, json=data, headers=headers,verify=self.verify)
+        response = self.session.post(url, json=data, headers=headers,verify=self.verify)
         # response = requests.post(url, json=data, headers=headers,verify=self.verify)
         if self.verbose > 1: pprint(response.text)
 
@@ -1503,50 +2449,49 @@ class QualtricsDist:
             print(f"Error in  format of timeSlots {params['timeSlots']}")
             return -1
             
-        total_count = params['numDays'] * len(params['timeSlots'])
+        # journaled before the first post, an earlier run's times are reused
+        entries = self.journal_entries(params, 'sms')
+        total_count = len(entries)
         phoneNumber=params['contactInfo']['phone']
         if self.verbose: print(f"Sending {total_count} surveys to {phoneNumber}")
-        for day in range(params['numDays']):
-            pass
-            for raw_time in params['timeSlots']:  
-                
-                time = self.get_time(raw_time)                
-                #TODO - adjust if there is a time zone difference between 
-                
-                # create datetime object for recipient
-                # dobj = datetime.strptime(params['startDate'], '%Y-%m-%d')
-                dobj = dateutil.parser.parse(params['startDate'])
-                hour = int(time)//100
-                # need to check time, for correct e.g. 2366
-                min = int(time)%100
-                
-                start_recipient_time = datetime(dobj.year, dobj.month, dobj.day,hour,min, 0, 
-                                          tzinfo=ZoneInfo(params['timeZone']))
-                # add the day delta
-                recipient_time = start_recipient_time + timedelta(days=day)
-                # convert to utc
-                recipient_time_utc = recipient_time.astimezone(ZoneInfo("UTC"))
-                
-                ExpireMinutes = params.get('ExpireMinutes',self.minutesExpire)
-                
-                expiration_time_utc = recipient_time.astimezone(ZoneInfo("UTC")) \
-                                        + timedelta(minutes=ExpireMinutes)                
-                # don't schedule if now is > recipient_time
-                
-                response = self.send_sms(params['contactLookupId'], recipient_time_utc, expiration_time_utc )
-
-                # if OK
-                if response.status_code == 200:
-                    if self.verbose: print(f"Sent {invite_count} of {total_count} surveys to {phoneNumber}")                
-                    # update the SurveysScheduled entry for this contact
-                    response = self.update_embedded(params['contactId'], updateFields={"SurveysScheduled": invite_count})
-                    invite_count += 1
-                else:
-                    print(f"Error: {response.status_code}")
-                    #pprint.pprint(response.content) 
-                    print(response.content) 
-                    sys.exit('Exiting program')
-
+        skipped = 0
+        for seq, recipient_time_utc, expiration_time_utc, state in entries:
+            if self.journal_posted(seq, state, params['contactLookupId'], recipient_time_utc, 'sms'):
+                # posted by an earlier run
+                self.queue_update(params['contactId'], {"SurveysScheduled": invite_count})
+                invite_count += 1
+                continue
+            # don't schedule if now is > recipient_time
+            if not self.is_future(recipient_time_utc):
+                self.mark_journal(seq, 'skipped')
+                skipped += 1
+                continue
+            
+            self.mark_journal(seq, 'posting', lookupId=params['contactLookupId'])
+            response = self.send_sms(params['contactLookupId'], recipient_time_utc, expiration_time_utc )
+            
+            # if OK
+            if response.status_code == 200:
+                self.mark_journal(seq, 'done', distributionId=response.json().get('result', {}).get('id'))
+                self.record_distribution(params['contactId'], params['contactLookupId'], response,
+                                         recipient_time_utc, expiration_time_utc, 'sms')
+                if self.verbose: print(f"Sent {invite_count} of {total_count} surveys to {phoneNumber}")                
+                # record the SurveysScheduled entry, written once for this contact
+                self.queue_update(params['contactId'], {"SurveysScheduled": invite_count})
+                invite_count += 1
+            else:
+                # rejected, post it again next run; a server error may have created it
+                self.mark_journal(seq, 'planned' if response.status_code < 500 else 'posting',
+                                  error=f"{response.status_code} {response.text[:200]}")
+                print(f"Error: {response.status_code}")
+                #pprint.pprint(response.content) 
+                print(response.content) 
+                # keep track of the invites already scheduled
+                self.flush_updates(params['contactId'])
+                sys.exit('Exiting program')
+        
+        if skipped and self.verbose: print(f"Skipped {skipped} of {total_count} surveys, their send time has passed")
+        self.flush_updates(params['contactId'])
 
         return 1
 
@@ -1609,7 +2554,7 @@ class QualtricsDist:
         if self.verbose > 2:
             pprint(data)
 
-        response = requests.post(url, json=data, headers=headers,verify=self.verify)
+        response = self.session.post(url, json=data, headers=headers,verify=self.verify)
         if self.verbose > 1: pprint(response.text)
         
         return response    
@@ -1660,11 +2605,39 @@ class QualtricsDist:
 
         print(data)
 
-        response = requests.post(url, json=data, headers=headers,verify=self.verify)
+        response = self.session.post(url, json=data, headers=headers,verify=self.verify)
         if self.verbose > 1: print(response.text)
         
         return response    
     
+    def send_times(self, params):
+        """
+        Send and expiration times (UTC) of every survey for a case
+        
+        Returns a list of (send, expiration) datetimes, day by day and slot
+        by slot within a day. startDate is parsed and the time zone looked
+        up once, and each local time is converted with its day's offset.
+        ExpireMinutes defaults to project:ExpireMinutes.
+        """
+        dobj = dateutil.parser.parse(params['startDate'])
+        tz = ZoneInfo(params['timeZone'])
+        utc = ZoneInfo("UTC")
+        ExpireMinutes = timedelta(minutes=params.get('ExpireMinutes',self.minutesExpire))
+        
+        times = []
+        for day in range(params['numDays']):
+            date = dobj.date() + timedelta(days=day)
+            for raw_time in params['timeSlots']:
+                time = self.get_time(raw_time)
+                hour = int(time)//100
+                # need to check time, for correct e.g. 2366
+                min = int(time)%100
+                
+                recipient_time = datetime(date.year, date.month, date.day, hour, min, 0, tzinfo=tz)
+                recipient_time_utc = recipient_time.astimezone(utc)
+                times.append((recipient_time_utc, recipient_time_utc + ExpireMinutes))
+        return times
+    
     def check_time_slots(self, parts: list):
         """
         Args:
@@ -1766,7 +2739,7 @@ class QualtricsDist:
             "Content-Type": "application/json"
         }
 
-        response = requests.get(baseUrl, headers=headers,verify=self.verify)
+        response = self.session.get(baseUrl, headers=headers,verify=self.verify)
 
         # if OK
         if response.status_code == 200:
@@ -1876,9 +2849,16 @@ if __name__ == "__main__":
     Schedules the sending of invitations for the specified mailing_list, for 
     all contacts with SurveysScheduled == 0 and NumDays > 0.
     
+    $ qualtrics_util --config config_qualtrics.yaml --cmd plan
+    Writes the invitations send would schedule to a plan file, without
+    scheduling them, and compares them with the local ledger
+    
     $ qualtrics_util --config config_qualtrics.yaml --cmd delete
     Deletes all unsent invitations for the specified mailing_list
-     
+    
+    $ qualtrics_util --config config_qualtrics.yaml --cmd status
+    Prints the invitations scheduled by this tool, from the local ledger
+    
     ''')
     
     parser = argparse.ArgumentParser(
@@ -1891,7 +2871,7 @@ if __name__ == "__main__":
                      ) 
     
     parser.add_argument("--cmd", type = str,
-                     help="cmd - check, delete, export, list, slist, send, update, default: list",
+                     help="cmd - check, delete, export, list, plan, slist, send, status, update, default: list",
                      default='list') 
 
     parser.add_argument("--token", type = str,
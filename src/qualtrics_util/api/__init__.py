@@ -4,17 +4,38 @@ API layer for Qualtrics interactions.
 This package contains modules for interacting with the Qualtrics REST API.
 """
 
-from .base import BaseQualtricsClient, QualtricsAPIError
+from .base import BaseQualtricsClient, QualtricsAPIError, create_session
+from .rate_limit import RateLimiter
+from .polling import AdaptivePoller, PollTimeout
 from .contacts import ContactsAPI
 from .distributions import DistributionsAPI
 from .surveys import SurveysAPI
-from .messages import MessagesAPI
+from .messages import MessagesAPI, MessageCache
+from .async_api import (
+    ConcurrencyLimit,
+    AsyncBaseQualtricsClient,
+    AsyncContactsAPI,
+    AsyncDistributionsAPI,
+    AsyncSurveysAPI,
+    AsyncMessagesAPI,
+)
 
 __all__ = [
     'BaseQualtricsClient',
     'QualtricsAPIError',
+    'create_session',
+    'RateLimiter',
+    'AdaptivePoller',
+    'PollTimeout',
     'ContactsAPI',
     'DistributionsAPI',
     'SurveysAPI',
     'MessagesAPI',
+    'MessageCache',
+    'ConcurrencyLimit',
+    'AsyncBaseQualtricsClient',
+    'AsyncContactsAPI',
+    'AsyncDistributionsAPI',
+    'AsyncSurveysAPI',
+    'AsyncMessagesAPI',
 ]
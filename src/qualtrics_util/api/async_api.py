@@ -0,0 +1,444 @@
+"""
+Asyncio variants of the Qualtrics API clients.
+
+This module mirrors the synchronous clients in this package with the same
+method names, but every API call is a coroutine. Calls run on a thread pool
+sized to the concurrency, over the pooled keep-alive session, and a
+semaphore bounds how many requests are in flight at once. Both belong to a
+ConcurrencyLimit that several clients can share. Methods returning iterators
+(iter_contacts, iter_responses, ...) become async generators that fetch each
+item on the pool.
+
+Only the local helpers in LOCAL_METHODS are forwarded to the synchronous
+client as plain methods; any other synchronous method without an async
+version raises AttributeError instead of blocking the event loop.
+
+Example:
+    >>> async def schedule(api, invites):
+    ...     tasks = [api.send_sms_distribution(**invite) for invite in invites]
+    ...     return await asyncio.gather(*tasks)
+"""
+
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+import pandas as pd
+import requests
+from .base import BaseQualtricsClient
+from .contacts import ContactsAPI
+from .distributions import DistributionsAPI
+from .messages import MessagesAPI
+from .surveys import SurveysAPI
+
+
+# Default number of requests allowed in flight at once
+DEFAULT_MAX_CONCURRENCY = 10
+
+
+class ConcurrencyLimit:
+    """
+    Bound on the requests in flight of one or more async clients.
+    
+    Blocking calls run on a dedicated thread pool with max_concurrency
+    workers, so they neither wait behind nor crowd out other users of the
+    event loop's default executor. The semaphore that keeps excess calls
+    from queuing in the pool is created lazily for each event loop, since
+    an asyncio.Semaphore cannot be used from a loop other than its own
+    (e.g. a second asyncio.run).
+    
+    Example:
+        >>> limit = ConcurrencyLimit(10)
+        >>> contacts_api = AsyncContactsAPI(..., limit=limit)
+        >>> distributions_api = AsyncDistributionsAPI(..., limit=limit, session=contacts_api.session)
+    """
+    
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        """
+        Initialize the limit.
+        
+        Args:
+            max_concurrency: Maximum number of requests in flight
+        """
+        self.max_concurrency = max_concurrency
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='qualtrics-async')
+        # event loop -> semaphore, dropped with the loop
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+    
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Semaphore of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+            return semaphore
+    
+    async def run(self, func, *args, **kwargs) -> Any:
+        """
+        Run a blocking call on the thread pool under the semaphore.
+        
+        Args:
+            func: Function to call
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+        
+        Returns:
+            Whatever func returns
+        """
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+    
+    def shutdown(self) -> None:
+        """Stop the thread pool once the running calls finish."""
+        self.executor.shutdown(wait=False)
+
+
+class AsyncBaseQualtricsClient:
+    """
+    Async wrapper around a synchronous Qualtrics API client.
+    
+    Each coroutine runs the matching synchronous method through a
+    ConcurrencyLimit, so at most max_concurrency requests are outstanding.
+    Pass the same limit and session to several async clients to bound them
+    together.
+    """
+    
+    sync_class = BaseQualtricsClient
+    
+    # Synchronous methods that make no request and are forwarded as they are
+    LOCAL_METHODS = frozenset({'build_url', 'get_headers', 'throughput'})
+    
+    def __init__(
+        self,
+        *args,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        limit: Optional[ConcurrencyLimit] = None,
+        **kwargs
+    ):
+        """
+        Initialize the async client.
+        
+        Args:
+            *args: Arguments to pass to the synchronous client
+            max_concurrency: Maximum number of requests in flight
+            limit: Optional shared limit (overrides max_concurrency)
+            **kwargs: Additional arguments to pass to the synchronous client
+        """
+        if limit is not None:
+            max_concurrency = limit.max_concurrency
+        # Size an owned connection pool to the concurrency so that
+        # parallel requests don't open throwaway connections
+        if kwargs.get('session') is None:
+            kwargs.setdefault('pool_maxsize', max_concurrency)
+        
+        self.client = self.sync_class(*args, **kwargs)
+        self._owns_limit = limit is None
+        self.limit = limit or ConcurrencyLimit(max_concurrency)
+    
+    def __getattr__(self, name: str) -> Any:
+        # Expose ids and helpers (survey_id, build_url, ...) of the sync client
+        if name in ('client', 'limit', '_owns_limit'):
+            raise AttributeError(name)
+        value = getattr(self.client, name)
+        if callable(value) and name not in self.LOCAL_METHODS:
+            # a blocking call would stall the event loop
+            raise AttributeError(
+                f"{type(self).__name__} has no async version of {name}; use .client.{name} to block"
+            )
+        return value
+    
+    async def _run(self, func, *args, **kwargs) -> Any:
+        """
+        Run a blocking client call through the concurrency limit.
+        
+        Args:
+            func: Bound method of the synchronous client
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+        
+        Returns:
+            Whatever func returns
+        """
+        return await self.limit.run(func, *args, **kwargs)
+    
+    async def _iterate(self, func, *args, **kwargs) -> AsyncIterator[Any]:
+        """
+        Iterate a blocking client iterator, one item per call on the pool.
+        
+        Args:
+            func: Bound method of the synchronous client returning an iterator
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+        
+        Yields:
+            The items of the iterator
+        """
+        iterator = await self._run(lambda: iter(func(*args, **kwargs)))
+        done = object()
+        try:
+            while True:
+                item = await self._run(next, iterator, done)
+                if item is done:
+                    return
+                yield item
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                await self._run(close)
+    
+    async def make_request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict] = None,
+        **kwargs
+    ) -> requests.Response:
+        """Async version of BaseQualtricsClient.make_request."""
+        return await self._run(
+            self.client.make_request, method, url,
+            headers=headers, params=params, json_data=json_data, **kwargs
+        )
+    
+    async def get_paginated(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        max_pages: Optional[int] = None
+    ) -> List[Dict]:
+        """Async version of BaseQualtricsClient.get_paginated."""
+        return await self._run(
+            self.client.get_paginated, url, headers=headers, max_pages=max_pages
+        )
+    
+    async def iter_paginated(self, *args, **kwargs) -> AsyncIterator[Dict]:
+        """Async version of BaseQualtricsClient.iter_paginated."""
+        async for item in self._iterate(self.client.iter_paginated, *args, **kwargs):
+            yield item
+    
+    async def close(self) -> None:
+        """Close the underlying session and thread pool if the client owns them."""
+        self.client.close()
+        if self._owns_limit:
+            self.limit.shutdown()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+class AsyncContactsAPI(AsyncBaseQualtricsClient):
+    """Async API for managing contacts in Qualtrics mailing lists."""
+    
+    sync_class = ContactsAPI
+    
+    async def get_contact_list(self, include_embedded: bool = True) -> List[Dict[str, Any]]:
+        """Async version of ContactsAPI.get_contact_list."""
+        return await self._run(self.client.get_contact_list, include_embedded=include_embedded)
+    
+    async def get_contact(self, contact_id: str) -> Dict[str, Any]:
+        """Async version of ContactsAPI.get_contact."""
+        return await self._run(self.client.get_contact, contact_id)
+    
+    async def get_contact_lookup_id(self, mailing_list_id: str, contact_id: str) -> str:
+        """Async version of ContactsAPI.get_contact_lookup_id."""
+        return await self._run(self.client.get_contact_lookup_id, mailing_list_id, contact_id)
+    
+    async def update_contact(self, contact_id: str, data: Dict[str, Any], **kwargs) -> bool:
+        """Async version of ContactsAPI.update_contact."""
+        return await self._run(self.client.update_contact, contact_id, data, **kwargs)
+    
+    async def iter_contacts(self, *args, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Async version of ContactsAPI.iter_contacts."""
+        async for contact in self._iterate(self.client.iter_contacts, *args, **kwargs):
+            yield contact
+    
+    async def update_embedded(self, contact: Dict[str, Any], *args, **kwargs) -> bool:
+        """Async version of ContactsAPI.update_embedded."""
+        return await self._run(self.client.update_embedded, contact, *args, **kwargs)
+    
+    async def bulk_update_embedded(self, contacts, *args, **kwargs) -> Dict[str, Any]:
+        """Async version of ContactsAPI.bulk_update_embedded."""
+        return await self._run(self.client.bulk_update_embedded, list(contacts), *args, **kwargs)
+    
+    async def import_contacts(self, contacts, **kwargs) -> Dict[str, Any]:
+        """Async version of ContactsAPI.import_contacts."""
+        return await self._run(self.client.import_contacts, list(contacts), **kwargs)
+    
+    async def start_contact_import(self, contacts: List[Dict[str, Any]]) -> str:
+        """Async version of ContactsAPI.start_contact_import."""
+        return await self._run(self.client.start_contact_import, contacts)
+    
+    async def get_contact_import(self, import_id: str) -> Dict[str, Any]:
+        """Async version of ContactsAPI.get_contact_import."""
+        return await self._run(self.client.get_contact_import, import_id)
+    
+    async def get_contact_import_summary(self, import_id: str) -> Dict[str, Any]:
+        """Async version of ContactsAPI.get_contact_import_summary."""
+        return await self._run(self.client.get_contact_import_summary, import_id)
+    
+    async def sync_contact_store(self, store, **kwargs) -> Dict[str, Any]:
+        """Async version of ContactsAPI.sync_contact_store."""
+        return await self._run(self.client.sync_contact_store, store, **kwargs)
+    
+    async def warm_lookup_cache(self, contacts=None) -> int:
+        """Async version of ContactsAPI.warm_lookup_cache."""
+        if contacts is not None:
+            contacts = list(contacts)
+        return await self._run(self.client.warm_lookup_cache, contacts)
+
+
+class AsyncDistributionsAPI(AsyncBaseQualtricsClient):
+    """Async API for managing survey distributions in Qualtrics."""
+    
+    sync_class = DistributionsAPI
+    
+    async def get_email_distributions(
+        self,
+        mailing_list_id: Optional[str] = None,
+        send_start_date: Optional[str] = None,
+        distribution_type: str = 'Invite'
+    ) -> List[Dict[str, Any]]:
+        """Async version of DistributionsAPI.get_email_distributions."""
+        return await self._run(
+            self.client.get_email_distributions,
+            mailing_list_id=mailing_list_id,
+            send_start_date=send_start_date,
+            distribution_type=distribution_type
+        )
+    
+    async def get_sms_distributions(self, survey_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Async version of DistributionsAPI.get_sms_distributions."""
+        return await self._run(self.client.get_sms_distributions, survey_id=survey_id)
+    
+    async def delete_sms_distribution(
+        self,
+        distribution_id: str,
+        survey_id: Optional[str] = None
+    ) -> bool:
+        """Async version of DistributionsAPI.delete_sms_distribution."""
+        return await self._run(self.client.delete_sms_distribution, distribution_id, survey_id=survey_id)
+    
+    async def delete_email_distribution(self, distribution_id: str) -> bool:
+        """Async version of DistributionsAPI.delete_email_distribution."""
+        return await self._run(self.client.delete_email_distribution, distribution_id)
+    
+    async def delete_distributions(self, distribution_ids, **kwargs) -> Dict[str, bool]:
+        """Async version of DistributionsAPI.delete_distributions."""
+        return await self._run(self.client.delete_distributions, list(distribution_ids), **kwargs)
+    
+    async def send_sms_distribution(self, *args, **kwargs) -> requests.Response:
+        """Async version of DistributionsAPI.send_sms_distribution."""
+        return await self._run(self.client.send_sms_distribution, *args, **kwargs)
+    
+    async def send_email_distribution(self, *args, **kwargs) -> requests.Response:
+        """Async version of DistributionsAPI.send_email_distribution."""
+        return await self._run(self.client.send_email_distribution, *args, **kwargs)
+    
+    async def iter_email_distributions(self, *args, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Async version of DistributionsAPI.iter_email_distributions."""
+        async for distribution in self._iterate(self.client.iter_email_distributions, *args, **kwargs):
+            yield distribution
+    
+    async def iter_sms_distributions(self, *args, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Async version of DistributionsAPI.iter_sms_distributions."""
+        async for distribution in self._iterate(self.client.iter_sms_distributions, *args, **kwargs):
+            yield distribution
+
+
+class AsyncMessagesAPI(AsyncBaseQualtricsClient):
+    """Async API for working with Qualtrics message libraries."""
+    
+    sync_class = MessagesAPI
+    
+    async def get_message(self, message_id: str, **kwargs) -> str:
+        """Async version of MessagesAPI.get_message."""
+        return await self._run(self.client.get_message, message_id, **kwargs)
+    
+    async def get_message_with_random_text(self, message_id: str, random_length: int = 8, **kwargs) -> str:
+        """Async version of MessagesAPI.get_message_with_random_text."""
+        return await self._run(
+            self.client.get_message_with_random_text, message_id, random_length=random_length, **kwargs
+        )
+    
+    async def get_all_messages(self) -> Dict[str, Any]:
+        """Async version of MessagesAPI.get_all_messages."""
+        return await self._run(self.client.get_all_messages)
+    
+    async def invalidate_message(self, *args, **kwargs) -> int:
+        """Async version of MessagesAPI.invalidate_message."""
+        return await self._run(self.client.invalidate_message, *args, **kwargs)
+
+
+class AsyncSurveysAPI(AsyncBaseQualtricsClient):
+    """Async API for exporting survey data from Qualtrics."""
+    
+    sync_class = SurveysAPI
+    
+    async def export_responses(self, *args, **kwargs) -> Union[pd.DataFrame, dict]:
+        """Async version of SurveysAPI.export_responses."""
+        return await self._run(self.client.export_responses, *args, **kwargs)
+    
+    def for_survey(self, survey_id: str) -> 'AsyncSurveysAPI':
+        """
+        Async client for another survey sharing this client's session and limit.
+        
+        Args:
+            survey_id: Survey ID
+        
+        Returns:
+            AsyncSurveysAPI for survey_id (closing it leaves the session and pool open)
+        """
+        other = type(self).__new__(type(self))
+        other.client = self.client.for_survey(survey_id)
+        other.limit = self.limit
+        other._owns_limit = False
+        return other
+    
+    async def start_export(self, *args, **kwargs) -> str:
+        """Async version of SurveysAPI.start_export."""
+        return await self._run(self.client.start_export, *args, **kwargs)
+    
+    async def check_export(self, progress_id: str):
+        """Async version of SurveysAPI.check_export."""
+        return await self._run(self.client.check_export, progress_id)
+    
+    async def poll_export(self, progress_id: str, **kwargs) -> Dict[str, Any]:
+        """Async version of SurveysAPI.poll_export."""
+        return await self._run(self.client.poll_export, progress_id, **kwargs)
+    
+    async def wait_for_export(self, progress_id: str, **kwargs) -> str:
+        """Async version of SurveysAPI.wait_for_export."""
+        return await self._run(self.client.wait_for_export, progress_id, **kwargs)
+    
+    async def download_export(self, file_id: str):
+        """Async version of SurveysAPI.download_export."""
+        return await self._run(self.client.download_export, file_id)
+    
+    async def stream_export(self, *args, **kwargs) -> str:
+        """Async version of SurveysAPI.stream_export."""
+        return await self._run(self.client.stream_export, *args, **kwargs)
+    
+    async def read_export(self, spool, *args, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Async version of SurveysAPI.read_export."""
+        async for response in self._iterate(self.client.read_export, spool, *args, **kwargs):
+            yield response
+    
+    async def iter_export_file(self, file_id: str, *args, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Async version of SurveysAPI.iter_export_file."""
+        async for response in self._iterate(self.client.iter_export_file, file_id, *args, **kwargs):
+            yield response
+    
+    async def iter_responses(self, *args, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Async version of SurveysAPI.iter_responses."""
+        async for response in self._iterate(self.client.iter_responses, *args, **kwargs):
+            yield response
@@ -6,9 +6,57 @@ including authentication, request handling, and error management.
 """
 
 import requests
-from typing import Dict, Optional, Any, List
+from typing import Dict, Optional, Any, List, Iterator, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import json
+import time
+from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
+from .rate_limit import RateLimiter
+
+
+# Connection pool defaults for the shared keep-alive session
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 10
+
+SUPPORTED_METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+
+
+def create_session(
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    pool_block: bool = False
+) -> requests.Session:
+    """
+    Create a keep-alive HTTP session with a pooled transport.
+    
+    Reusing one session keeps the TLS connection to
+    {data_center}.qualtrics.com open between calls instead of
+    performing a new handshake for every request.
+    
+    Args:
+        pool_connections: Number of per-host connection pools to cache
+        pool_maxsize: Maximum number of connections kept open per host
+        pool_block: Block when the per-host pool is exhausted instead of
+            opening (and discarding) extra connections
+            
+    Returns:
+        Configured requests.Session
+        
+    Example:
+        >>> session = create_session(pool_maxsize=20)
+        >>> contacts_api = ContactsAPI(..., session=session)
+        >>> distributions_api = DistributionsAPI(..., session=session)
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
 
 
 class QualtricsAPIError(Exception):
@@ -30,9 +78,21 @@ class BaseQualtricsClient:
     - Consistent request/response handling
     - Error handling and logging
     - URL construction helpers
+    - A pooled keep-alive session that can be shared between API clients
+    - Rate limiting with retries for 429/5xx responses
     """
     
-    def __init__(self, api_token: str, data_center: str, verify: bool = True, verbose: int = 1):
+    def __init__(
+        self,
+        api_token: str,
+        data_center: str,
+        verify: bool = True,
+        verbose: int = 1,
+        session: Optional[requests.Session] = None,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        rate_limiter: Optional[RateLimiter] = None
+    ):
         """
         Initialize the base Qualtrics API client.
         
@@ -41,16 +101,55 @@ class BaseQualtricsClient:
             data_center: Qualtrics data center (e.g., 'yul1')
             verify: Whether to verify SSL certificates (default: True)
             verbose: Verbosity level (0-3, default: 1)
+            session: Optional shared session (see create_session). When not
+                provided, the client creates and owns its own session.
+            pool_connections: Per-host pools to cache for an owned session
+            pool_maxsize: Connections kept alive per host for an owned session
+            rate_limiter: Optional shared RateLimiter. Share one instance
+                between clients so they draw on the same budgets.
         """
         self.api_token = api_token
         self.data_center = data_center
         self.verify = verify
         self.verbose = verbose
         
+        # Use the shared transport if given, otherwise own one
+        self._owns_session = session is None
+        if session is None:
+            session = create_session(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize
+            )
+        self.session = session
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        
         # Disable SSL warnings if verify is False
         if not verify:
             requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
     
+    def close(self) -> None:
+        """Close the underlying session if this client owns it."""
+        if self._owns_session:
+            self.session.close()
+    
+    def throughput(self, family: Optional[str] = None) -> float:
+        """
+        Current request rate of this client's rate limiter.
+        
+        Args:
+            family: Restrict to one endpoint family (None for all)
+            
+        Returns:
+            Requests per second over the last minute
+        """
+        return self.rate_limiter.throughput(family)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
     def get_headers(self, content_type: str = 'application/json') -> Dict[str, str]:
         """
         Get request headers with authentication.
@@ -101,6 +200,11 @@ class BaseQualtricsClient:
         """
         Make an HTTP request to the Qualtrics API.
         
+        The request waits for its endpoint family budget in the rate
+        limiter. 429 and 5xx responses are retried after the Retry-After
+        delay, or a jittered exponential backoff, up to
+        rate_limiter.max_retries times.
+        
         Args:
             method: HTTP method (GET, POST, PUT, DELETE)
             url: Complete URL
@@ -118,26 +222,44 @@ class BaseQualtricsClient:
         if headers is None:
             headers = self.get_headers()
         
-        try:
-            if method.upper() == 'GET':
-                response = requests.get(url, headers=headers, params=params, verify=self.verify, **kwargs)
-            elif method.upper() == 'POST':
-                response = requests.post(url, headers=headers, json=json_data, params=params, verify=self.verify, **kwargs)
-            elif method.upper() == 'PUT':
-                response = requests.put(url, headers=headers, json=json_data, params=params, verify=self.verify, **kwargs)
-            elif method.upper() == 'DELETE':
-                response = requests.delete(url, headers=headers, params=params, verify=self.verify, **kwargs)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+        method = method.upper()
+        if method not in SUPPORTED_METHODS:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(url)
             
-            # Check for API errors
-            if not response.ok:
-                self._handle_error_response(response)
+            try:
+                response = self.session.request(
+                    method,
+                    url,
+                    headers=headers,
+                    params=params,
+                    json=json_data,
+                    verify=self.verify,
+                    **kwargs
+                )
+            except requests.exceptions.RequestException as e:
+                raise QualtricsAPIError(f"Request failed: {str(e)}") from e
+            
+            if response.ok:
+                return response
             
-            return response
+            # Retry rate limited and server errors
+            if attempt < self.rate_limiter.max_retries and \
+                    self.rate_limiter.should_retry(method, response.status_code, response):
+                delay = self.rate_limiter.backoff_delay(attempt, response)
+                if response.status_code == 429:
+                    self.rate_limiter.pause(url, delay)
+                if self.verbose > 1:
+                    print(f"Status {response.status_code}, retrying in {delay:.1f} seconds...")
+                time.sleep(delay)
+                attempt += 1
+                continue
             
-        except requests.exceptions.RequestException as e:
-            raise QualtricsAPIError(f"Request failed: {str(e)}") from e
+            # Check for API errors
+            self._handle_error_response(response)
     
     def _handle_error_response(self, response: requests.Response) -> None:
         """
@@ -166,11 +288,95 @@ class BaseQualtricsClient:
             response=error_data if 'error_data' in locals() else None
         )
     
+    def _fetch_page(
+        self,
+        url: str,
+        headers: Dict[str, str]
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Fetch one page of a paginated GET request.
+        
+        Args:
+            url: Page URL
+            headers: Request headers
+            
+        Returns:
+            Tuple of (elements, nextPage URL or None)
+        """
+        response = self.make_request('GET', url, headers=headers)
+        
+        data = response.json()
+        status = data.get('meta', {}).get('httpStatus', '200 - OK')
+        
+        # Check if we got valid data
+        if '200' not in status:
+            return [], None
+        
+        result = data.get('result', {})
+        return result.get('elements', []), result.get('nextPage')
+    
+    def iter_paginated(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        max_pages: Optional[int] = None,
+        prefetch: bool = False
+    ) -> Iterator[Dict]:
+        """
+        Iterate over the elements of a paginated GET request.
+        
+        Pages are requested lazily, so callers can process the elements of
+        a page before the next one is downloaded. With prefetch, the next
+        page is downloaded on a background thread while the current page
+        is being consumed, so long listings are bound by bandwidth rather
+        than by round trips.
+        
+        Args:
+            url: Initial URL
+            headers: Optional request headers
+            max_pages: Maximum number of pages to fetch (None for all)
+            prefetch: Download the next page in the background
+            
+        Yields:
+            Result elements, page by page
+        """
+        if headers is None:
+            headers = self.get_headers()
+        
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        
+        try:
+            pending = executor.submit(self._fetch_page, url, headers) if executor else None
+            current_url = url
+            page_count = 0
+            
+            while current_url:
+                if executor:
+                    elements, current_url = pending.result()
+                else:
+                    elements, current_url = self._fetch_page(current_url, headers)
+                page_count += 1
+                
+                if current_url and max_pages and page_count >= max_pages:
+                    if self.verbose > 0:
+                        print(f"Reached max pages limit ({max_pages})")
+                    current_url = None
+                
+                # Start downloading the next page before handing out this one
+                if executor and current_url:
+                    pending = executor.submit(self._fetch_page, current_url, headers)
+                
+                yield from elements
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+    
     def get_paginated(
         self,
         url: str,
         headers: Optional[Dict[str, str]] = None,
-        max_pages: Optional[int] = None
+        max_pages: Optional[int] = None,
+        prefetch: bool = False
     ) -> List[Dict]:
         """
         Make a paginated GET request and collect all results.
@@ -179,52 +385,17 @@ class BaseQualtricsClient:
             url: Initial URL
             headers: Optional request headers
             max_pages: Maximum number of pages to fetch (None for all)
+            prefetch: Download the next page while collecting the current one
             
         Returns:
             List of all result elements from all pages
         """
-        if headers is None:
-            headers = self.get_headers()
-        
-        all_elements = []
-        current_url = url
-        page_count = 0
-        
         if self.verbose > 0:
             print("Getting results...", end="", flush=True)
         
-        while current_url:
-            try:
-                response = requests.get(current_url, headers=headers, verify=self.verify)
-                response.raise_for_status()
-                
-                data = response.json()
-                status = data.get('meta', {}).get('httpStatus', '')
-                
-                # Check if we got valid data
-                if '200' not in status:
-                    break
-                
-                # Collect elements from this page
-                elements = data.get('result', {}).get('elements', [])
-                all_elements.extend(elements)
-                
-                # Check for next page
-                next_page = data.get('result', {}).get('nextPage')
-                
-                if next_page:
-                    current_url = next_page
-                    page_count += 1
-                    
-                    if max_pages and page_count >= max_pages:
-                        if self.verbose > 0:
-                            print(f"Reached max pages limit ({max_pages})")
-                        break
-                else:
-                    current_url = None
-                    
-            except requests.exceptions.RequestException as e:
-                raise QualtricsAPIError(f"Pagination request failed: {str(e)}") from e
+        all_elements = list(self.iter_paginated(
+            url, headers=headers, max_pages=max_pages, prefetch=prefetch
+        ))
         
         if self.verbose > 0:
             print(f" Done ({len(all_elements)} items)")
@@ -5,7 +5,8 @@ This module provides functionality for managing survey distributions via
 SMS and email in Qualtrics.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Iterable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import requests
 import random
@@ -13,6 +14,10 @@ import string
 from .base import BaseQualtricsClient
 
 
+# Default number of deletes run at once by delete_distributions
+DEFAULT_DELETE_WORKERS = 8
+
+
 class DistributionsAPI(BaseQualtricsClient):
     """API for managing survey distributions in Qualtrics."""
     
@@ -28,6 +33,34 @@ class DistributionsAPI(BaseQualtricsClient):
         super().__init__(*args, **kwargs)
         self.survey_id = survey_id
     
+    def _email_distributions_url(
+        self,
+        mailing_list_id: Optional[str] = None,
+        send_start_date: Optional[str] = None,
+        distribution_type: str = 'Invite'
+    ) -> str:
+        """Build the URL for listing email distributions."""
+        params = {
+            'surveyId': self.survey_id,
+            'distributionRequestType': distribution_type,
+            'useNewPaginationScheme': 'true'
+        }
+        
+        if mailing_list_id:
+            params['mailingListId'] = mailing_list_id
+        
+        if send_start_date:
+            params['sendStartDate'] = send_start_date
+        
+        return self.build_url('/API/v3/distributions/', params)
+    
+    def _sms_distributions_url(self, survey_id: Optional[str] = None) -> str:
+        """Build the URL for listing SMS distributions."""
+        if survey_id is None:
+            survey_id = self.survey_id
+        
+        return self.build_url('/API/v3/distributions/sms', {'surveyId': survey_id})
+    
     def get_email_distributions(
         self,
         mailing_list_id: Optional[str] = None,
@@ -37,6 +70,8 @@ class DistributionsAPI(BaseQualtricsClient):
         """
         Get email distributions for a survey.
         
+        The next page is downloaded while the current one is collected.
+        
         Args:
             mailing_list_id: Optional mailing list ID to filter
             send_start_date: Optional start date filter
@@ -48,21 +83,33 @@ class DistributionsAPI(BaseQualtricsClient):
         Raises:
             QualtricsAPIError: If the API request fails
         """
-        params = {
-            'surveyId': self.survey_id,
-            'distributionRequestType': distribution_type,
-            'useNewPaginationScheme': 'true'
-        }
+        url = self._email_distributions_url(mailing_list_id, send_start_date, distribution_type)
         
-        if mailing_list_id:
-            params['mailingListId'] = mailing_list_id
+        return self.get_paginated(url, prefetch=True)
+    
+    def iter_email_distributions(
+        self,
+        mailing_list_id: Optional[str] = None,
+        send_start_date: Optional[str] = None,
+        distribution_type: str = 'Invite'
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream email distributions for a survey, prefetching the next page.
         
-        if send_start_date:
-            params['sendStartDate'] = send_start_date
+        Args:
+            mailing_list_id: Optional mailing list ID to filter
+            send_start_date: Optional start date filter
+            distribution_type: Type of distribution (default: 'Invite')
         
-        url = self.build_url('/API/v3/distributions/', params)
+        Yields:
+            Distribution dictionaries
         
-        return self.get_paginated(url)
+        Raises:
+            QualtricsAPIError: If an API request fails
+        """
+        url = self._email_distributions_url(mailing_list_id, send_start_date, distribution_type)
+        
+        return self.iter_paginated(url, prefetch=True)
     
     def get_sms_distributions(
         self,
@@ -71,6 +118,8 @@ class DistributionsAPI(BaseQualtricsClient):
         """
         Get SMS distributions for a survey.
         
+        The next page is downloaded while the current one is collected.
+        
         Args:
             survey_id: Optional survey ID (uses self.survey_id if not provided)
             
@@ -80,14 +129,25 @@ class DistributionsAPI(BaseQualtricsClient):
         Raises:
             QualtricsAPIError: If the API request fails
         """
-        if survey_id is None:
-            survey_id = self.survey_id
+        return self.get_paginated(self._sms_distributions_url(survey_id), prefetch=True)
+    
+    def iter_sms_distributions(
+        self,
+        survey_id: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream SMS distributions for a survey, prefetching the next page.
         
-        params = {'surveyId': survey_id}
+        Args:
+            survey_id: Optional survey ID (uses self.survey_id if not provided)
         
-        url = self.build_url('/API/v3/distributions/sms', params)
+        Yields:
+            SMS distribution dictionaries
         
-        return self.get_paginated(url)
+        Raises:
+            QualtricsAPIError: If an API request fails
+        """
+        return self.iter_paginated(self._sms_distributions_url(survey_id), prefetch=True)
     
     def delete_sms_distribution(
         self,
@@ -160,6 +220,58 @@ class DistributionsAPI(BaseQualtricsClient):
                 print(f"Error deleting email distribution {distribution_id}: {e}")
             return False
     
+    def delete_distributions(
+        self,
+        distribution_ids: Iterable[str],
+        channel: str = 'sms',
+        survey_id: Optional[str] = None,
+        max_workers: int = DEFAULT_DELETE_WORKERS
+    ) -> Dict[str, bool]:
+        """
+        Delete many distributions concurrently.
+        
+        The deletes run on a thread pool over the shared session and each
+        one goes through the client's rate limiter, so the pool size only
+        bounds how many are in flight.
+        
+        Args:
+            distribution_ids: Distribution IDs to delete
+            channel: 'sms' or 'email'
+            survey_id: Optional survey ID for SMS distributions
+            max_workers: Maximum number of deletes in flight
+        
+        Returns:
+            Dictionary mapping each distribution ID to True if it was deleted
+        
+        Raises:
+            ValueError: If channel is not 'sms' or 'email'
+        
+        Example:
+            >>> report = api.delete_distributions(['SMS_1', 'SMS_2'], channel='sms')
+            >>> failed = [d for d, ok in report.items() if not ok]
+        """
+        if channel == 'sms':
+            def delete(distribution_id):
+                return self.delete_sms_distribution(distribution_id, survey_id=survey_id)
+        elif channel == 'email':
+            delete = self.delete_email_distribution
+        else:
+            raise ValueError(f"Unknown distribution channel: {channel}")
+        
+        distribution_ids = list(dict.fromkeys(distribution_ids))
+        if not distribution_ids:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(distribution_ids))) as executor:
+            results = executor.map(delete, distribution_ids)
+            report = dict(zip(distribution_ids, results))
+        
+        if self.verbose > 0:
+            deleted = sum(report.values())
+            print(f"Deleted {deleted} of {len(report)} {channel} distributions")
+        
+        return report
+    
     def send_sms_distribution(
         self,
         contact_lookup_id: str,
@@ -239,4 +351,73 @@ class DistributionsAPI(BaseQualtricsClient):
             if self.verbose > 0:
                 print(f"Error sending SMS distribution: {e}")
             raise
-
+    
+    def send_email_distribution(
+        self,
+        contact_lookup_id: str,
+        send_date: datetime,
+        expiration_date: datetime,
+        message_text: str,
+        mailing_list_id: str,
+        from_name: str = 'UMN Qualtrics',
+        subject: str = 'UMN Survey',
+        survey_id: Optional[str] = None
+    ) -> requests.Response:
+        """
+        Send an email distribution.
+        
+        Args:
+            contact_lookup_id: Contact lookup ID
+            send_date: When to send the distribution
+            expiration_date: When the survey link expires
+            message_text: Email message text
+            mailing_list_id: Mailing list ID
+            from_name: Sender name shown to the recipient
+            subject: Email subject
+            survey_id: Optional survey ID
+        
+        Returns:
+            Response object
+        
+        Raises:
+            QualtricsAPIError: If the API request fails
+        """
+        if survey_id is None:
+            survey_id = self.survey_id
+        
+        url = self.build_url('/API/v3/distributions')
+        headers = self.get_headers()
+        
+        data = {
+            'header': {
+                'fromEmail': 'noreply@qualtrics.com',
+                'fromName': from_name,
+                'replyToEmail': 'noreply@qualtrics.com',
+                'subject': subject
+            },
+            'surveyLink': {
+                'surveyId': survey_id,
+                'type': 'Individual',
+                'expirationDate': expiration_date.strftime('%Y-%m-%dT%H:%M:%SZ')
+            },
+            'sendDate': send_date.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'recipients': {
+                'mailingListId': mailing_list_id,
+                'contactId': contact_lookup_id
+            },
+            'message': {
+                'messageText': message_text
+            }
+        }
+        
+        if self.verbose > 2:
+            from pprint import pprint
+            pprint(data)
+        
+        try:
+            return self.make_request('POST', url, headers=headers, json_data=data)
+        
+        except Exception as e:
+            if self.verbose > 0:
+                print(f"Error sending email distribution: {e}")
+            raise
@@ -2,43 +2,165 @@
 Message library operations.
 
 This module provides functionality for retrieving messages from
-Qualtrics message libraries.
+Qualtrics message libraries. Message text is cached so that scheduling
+many invitations fetches each template only once.
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import random
 import string
+import threading
+import time
 from .base import BaseQualtricsClient
 
 
+# Seconds a cached message stays valid (None keeps it until invalidated)
+DEFAULT_MESSAGE_TTL = 3600.0
+
+
+class MessageCache:
+    """
+    Thread-safe cache of library message text.
+    
+    Entries are keyed by (library_id, message_id, language) and expire
+    after ttl seconds. Share one instance between clients to share the
+    cached templates.
+    """
+    
+    def __init__(self, ttl: Optional[float] = DEFAULT_MESSAGE_TTL):
+        """
+        Initialize the cache.
+        
+        Args:
+            ttl: Seconds an entry stays valid (None for no expiry)
+        """
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, str, str], Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, library_id: str, message_id: str, language: str = 'en') -> Optional[str]:
+        """
+        Get a cached message.
+        
+        Args:
+            library_id: Library ID
+            message_id: Message ID
+            language: Language code
+        
+        Returns:
+            Message text, or None if not cached or expired
+        """
+        key = (library_id, message_id, language)
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            stored, text = entry
+            if self.ttl is not None and time.monotonic() - stored > self.ttl:
+                del self._entries[key]
+                return None
+            return text
+    
+    def set(self, library_id: str, message_id: str, language: str, text: str) -> None:
+        """
+        Store a message.
+        
+        Args:
+            library_id: Library ID
+            message_id: Message ID
+            language: Language code
+            text: Message text
+        """
+        with self._lock:
+            self._entries[(library_id, message_id, language)] = (time.monotonic(), text)
+    
+    def invalidate(
+        self,
+        library_id: Optional[str] = None,
+        message_id: Optional[str] = None,
+        language: Optional[str] = None
+    ) -> int:
+        """
+        Drop cached messages.
+        
+        Arguments left as None match everything, so invalidate() clears
+        the cache and invalidate(message_id='MS_1') drops every language
+        of that message.
+        
+        Args:
+            library_id: Library ID to match
+            message_id: Message ID to match
+            language: Language code to match
+        
+        Returns:
+            Number of entries dropped
+        """
+        pattern = (library_id, message_id, language)
+        
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if all(want is None or want == have for want, have in zip(pattern, key))
+            ]
+            for key in keys:
+                del self._entries[key]
+        
+        return len(keys)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
 class MessagesAPI(BaseQualtricsClient):
     """API for working with Qualtrics message libraries."""
     
-    def __init__(self, *args, library_id: str, **kwargs):
+    def __init__(
+        self,
+        *args,
+        library_id: str,
+        message_cache: Optional[MessageCache] = None,
+        cache_ttl: Optional[float] = DEFAULT_MESSAGE_TTL,
+        **kwargs
+    ):
         """
         Initialize the Messages API client.
         
         Args:
             *args: Arguments to pass to BaseQualtricsClient
             library_id: Library ID
+            message_cache: Optional shared MessageCache
+            cache_ttl: TTL in seconds for a cache created by this client
             **kwargs: Additional arguments to pass to BaseQualtricsClient
         """
         super().__init__(*args, **kwargs)
         self.library_id = library_id
+        self.message_cache = message_cache if message_cache is not None else MessageCache(cache_ttl)
     
-    def get_message(self, message_id: str) -> str:
+    def get_message(self, message_id: str, language: str = 'en', use_cache: bool = True) -> str:
         """
         Get a message from the library.
         
+        The text is served from the message cache when present.
+        
         Args:
             message_id: Message ID
+            language: Language code (default: 'en')
+            use_cache: Set to False to bypass and refresh the cache
             
         Returns:
-            Message text in English
+            Message text in the requested language
             
         Raises:
             QualtricsAPIError: If the API request fails
         """
+        if use_cache:
+            text = self.message_cache.get(self.library_id, message_id, language)
+            if text is not None:
+                return text
+        
         path = f"/API/v3/libraries/{self.library_id}/messages/{message_id}"
         
         url = self.build_url(path)
@@ -49,7 +171,11 @@ class MessagesAPI(BaseQualtricsClient):
             data = response.json()
             
             if 'meta' in data and data['meta'].get('httpStatus') == '200 - OK':
-                return data['result']['messages']['en']
+                messages = data['result']['messages']
+                # every language comes back in one response, cache them all
+                for lang, lang_text in messages.items():
+                    self.message_cache.set(self.library_id, message_id, lang, lang_text)
+                return messages[language]
             else:
                 raise Exception(f"Error getting message: {response.text}")
                 
@@ -58,18 +184,39 @@ class MessagesAPI(BaseQualtricsClient):
                 print(f"Error getting message {message_id}: {e}")
             raise
     
-    def get_message_with_random_text(self, message_id: str, random_length: int = 8) -> str:
+    def invalidate_message(self, message_id: Optional[str] = None, language: Optional[str] = None) -> int:
+        """
+        Drop cached text for this library (e.g. after editing a template).
+        
+        Args:
+            message_id: Message ID (None for all messages)
+            language: Language code (None for all languages)
+        
+        Returns:
+            Number of entries dropped
+        """
+        return self.message_cache.invalidate(self.library_id, message_id, language)
+    
+    def get_message_with_random_text(
+        self,
+        message_id: str,
+        random_length: int = 8,
+        language: str = 'en'
+    ) -> str:
         """
         Get a message and append random text to avoid duplicate message issues.
         
+        The template comes from the cache; only the suffix is new per call.
+        
         Args:
             message_id: Message ID
             random_length: Length of random text to append
+            language: Language code (default: 'en')
             
         Returns:
             Message text with random text appended
         """
-        message_text = self.get_message(message_id)
+        message_text = self.get_message(message_id, language=language)
         
         # Generate random text
         random_text = '\n[' + ''.join([
@@ -0,0 +1,134 @@
+"""
+Adaptive polling of long-running Qualtrics jobs.
+
+Response exports and contact imports report a percentComplete while they
+run. Instead of sleeping a fixed or doubling interval, the poller estimates
+the remaining time from how fast percentComplete has been moving and checks
+again around the expected completion, within a total time budget.
+"""
+
+import time
+from typing import Any, Callable, Optional, Tuple
+
+
+# Total time allowed for a job (seconds)
+DEFAULT_POLL_TIMEOUT = 1800.0
+
+# First check interval, used until the job reports progress (seconds)
+DEFAULT_INITIAL_INTERVAL = 1.0
+
+# Bounds of the interval between checks (seconds)
+DEFAULT_MIN_INTERVAL = 0.5
+DEFAULT_MAX_INTERVAL = 30.0
+
+# Growth of the interval while the job reports no progress
+NO_PROGRESS_BACKOFF = 1.5
+
+
+class PollTimeout(Exception):
+    """A polled job did not finish within its time budget."""
+    pass
+
+
+class AdaptivePoller:
+    """
+    Poll a job until it is done, pacing checks by its estimated completion.
+    
+    The completion rate is measured from the first check to the latest one
+    (percent per second) and the next check is scheduled when the job is
+    expected to finish, bounded by min_interval and max_interval. Until the
+    job reports progress the interval starts at initial_interval and grows
+    by NO_PROGRESS_BACKOFF per check.
+    
+    Example:
+        >>> def check():
+        ...     result = get_progress()
+        ...     return result['status'] == 'complete', result['percentComplete'], result
+        >>> result = AdaptivePoller(timeout=600).poll(check)
+    """
+    
+    def __init__(
+        self,
+        timeout: float = DEFAULT_POLL_TIMEOUT,
+        initial_interval: float = DEFAULT_INITIAL_INTERVAL,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        max_checks: Optional[int] = None
+    ):
+        """
+        Initialize the poller.
+        
+        Args:
+            timeout: Total time budget for the job (seconds)
+            initial_interval: Interval before any progress is reported
+            min_interval: Shortest interval between checks
+            max_interval: Longest interval between checks
+            max_checks: Optional limit on the number of checks
+        """
+        self.timeout = timeout
+        self.initial_interval = initial_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_checks = max_checks
+        self.checks = 0
+        self._first: Optional[Tuple[float, float]] = None
+        self._idle_interval = initial_interval
+    
+    def next_interval(self, now: float, percent: float) -> float:
+        """
+        Seconds to wait before the next check.
+        
+        Args:
+            now: Time of the latest check (time.monotonic)
+            percent: percentComplete reported by the latest check
+        
+        Returns:
+            Interval in seconds, between min_interval and max_interval
+        """
+        if self._first is None:
+            self._first = (now, percent)
+        
+        first_time, first_percent = self._first
+        elapsed = now - first_time
+        
+        if percent > first_percent and elapsed > 0:
+            rate = (percent - first_percent) / elapsed
+            interval = max(100.0 - percent, 0.0) / rate
+        else:
+            interval = self._idle_interval
+            self._idle_interval *= NO_PROGRESS_BACKOFF
+        
+        return min(max(interval, self.min_interval), self.max_interval)
+    
+    def poll(self, check: Callable[[], Tuple[bool, float, Any]], description: str = 'Job') -> Any:
+        """
+        Call check until it reports done.
+        
+        Args:
+            check: Function returning (done, percentComplete, result)
+            description: Name of the job for the timeout message
+        
+        Returns:
+            The result of the check that reported done
+        
+        Raises:
+            PollTimeout: If the job is not done within the time budget
+                or max_checks
+        """
+        start = time.monotonic()
+        deadline = start + self.timeout
+        
+        while True:
+            done, percent, result = check()
+            self.checks += 1
+            if done:
+                return result
+            
+            now = time.monotonic()
+            if now >= deadline or (self.max_checks is not None and self.checks >= self.max_checks):
+                raise PollTimeout(
+                    f"{description} not finished after {now - start:.0f} seconds "
+                    f"and {self.checks} checks ({percent}% complete)"
+                )
+            
+            time.sleep(min(self.next_interval(now, float(percent or 0)), deadline - now))
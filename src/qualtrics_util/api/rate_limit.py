@@ -0,0 +1,320 @@
+"""
+Rate limiting for Qualtrics API requests.
+
+Qualtrics enforces a brand-wide request limit plus per-endpoint limits.
+This module provides a thread-safe token-bucket scheduler with one budget
+per endpoint family (distributions, contacts, libraries, exports), retry
+decisions for 429/5xx responses and throughput reporting.
+"""
+
+from collections import deque
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional
+import random
+import threading
+import time
+import requests
+
+
+# Requests per minute allowed for each endpoint family
+DEFAULT_BUDGETS = {
+    'distributions': 3000,
+    'contacts': 3000,
+    'libraries': 3000,
+    'exports': 100,
+    'default': 3000,
+}
+
+# Requests per minute allowed across the whole brand
+DEFAULT_BRAND_LIMIT = 3000
+
+# Retry settings for 429 and 5xx responses
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_CAP = 60.0
+
+# Longest Retry-After (seconds) honored before retrying
+DEFAULT_RETRY_AFTER_CAP = 120.0
+
+# Methods that can be repeated without side effects
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS', 'TRACE'})
+
+# Window (seconds) used when reporting throughput, and how long requests
+# are remembered for it
+THROUGHPUT_WINDOW = 60.0
+
+
+def endpoint_family(url: str) -> str:
+    """
+    Classify a Qualtrics API URL into its rate-limit family.
+    
+    Args:
+        url: Complete request URL
+    
+    Returns:
+        Family name ('distributions', 'contacts', 'libraries', 'exports'
+        or 'default')
+    
+    Example:
+        >>> endpoint_family('https://yul1.qualtrics.com/API/v3/distributions/sms')
+        'distributions'
+    """
+    path = url.split('?', 1)[0]
+    
+    if '/export-responses' in path:
+        return 'exports'
+    if '/API/v3/distributions' in path:
+        return 'distributions'
+    if '/API/v3/directories' in path:
+        return 'contacts'
+    if '/API/v3/libraries' in path:
+        return 'libraries'
+    return 'default'
+
+
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """
+    Parse the Retry-After header of a response.
+    
+    Args:
+        response: HTTP response
+    
+    Returns:
+        Seconds to wait, or None if the header is absent or invalid
+    """
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return None
+    
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    # HTTP-date form
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+    
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    Each request consumes one token and waits when none are available.
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initialize the bucket.
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size (defaults to one second of tokens)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """Take a token and return how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            
+            # Going negative reserves a future token for this caller
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+    
+    def acquire(self) -> float:
+        """
+        Block until a token is available.
+        
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    def pause(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for the given number of seconds.
+        
+        Args:
+            seconds: Pause duration (e.g. from a Retry-After header)
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """
+    Request scheduler with per-endpoint-family token buckets.
+    
+    Every request takes a token from its family bucket and from the
+    brand-wide bucket. Responses with 429 or 5xx status are retried with
+    the Retry-After delay when given (up to max_retry_after), otherwise with
+    jittered exponential backoff. POST and other non-idempotent requests are
+    only retried when the response says they were not processed. A 429
+    pauses the whole family so concurrent callers back off together.
+    
+    Share one instance between API clients so that they draw on the same
+    budgets.
+    """
+    
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, float]] = None,
+        brand_limit: float = DEFAULT_BRAND_LIMIT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_cap: float = DEFAULT_BACKOFF_CAP,
+        max_retry_after: float = DEFAULT_RETRY_AFTER_CAP
+    ):
+        """
+        Initialize the rate limiter.
+        
+        Args:
+            budgets: Requests per minute per family, merged over DEFAULT_BUDGETS
+            brand_limit: Requests per minute across all families
+            max_retries: Maximum retries for a 429/5xx response
+            backoff_base: First backoff ceiling in seconds
+            backoff_cap: Largest backoff ceiling in seconds
+            max_retry_after: Largest Retry-After delay honored, in seconds
+        """
+        self.budgets = dict(DEFAULT_BUDGETS)
+        if budgets:
+            self.budgets.update(budgets)
+        
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_retry_after = max_retry_after
+        
+        self._buckets = {
+            family: TokenBucket(per_minute / 60.0)
+            for family, per_minute in self.budgets.items()
+        }
+        self._brand_bucket = TokenBucket(brand_limit / 60.0)
+        
+        self._history = deque()
+        self._history_lock = threading.Lock()
+    
+    def acquire(self, url: str) -> float:
+        """
+        Wait until a request to the given URL fits within the budgets.
+        
+        Args:
+            url: Complete request URL
+        
+        Returns:
+            Seconds spent waiting
+        """
+        family = endpoint_family(url)
+        bucket = self._buckets.get(family, self._buckets['default'])
+        
+        waited = bucket.acquire() + self._brand_bucket.acquire()
+        
+        now = time.monotonic()
+        with self._history_lock:
+            self._history.append((now, family))
+            # keep only what throughput can report on
+            cutoff = now - THROUGHPUT_WINDOW
+            while self._history[0][0] < cutoff:
+                self._history.popleft()
+        
+        return waited
+    
+    def should_retry(
+        self,
+        method: str,
+        status_code: int,
+        response: Optional[requests.Response] = None
+    ) -> bool:
+        """
+        Decide whether a failed response can be retried.
+        
+        Idempotent requests are retried on 429 and 5xx. A POST that got a
+        5xx may already have created its distribution, so non-idempotent
+        requests are only retried on 429, or on 503 with a Retry-After
+        header, which mean the request was not processed.
+        
+        Args:
+            method: HTTP method
+            status_code: Response status code
+            response: The response, checked for Retry-After
+        
+        Returns:
+            True if the request should be retried
+        """
+        if status_code == 429:
+            return True
+        if method.upper() not in IDEMPOTENT_METHODS:
+            return status_code == 503 and response is not None and 'Retry-After' in response.headers
+        return 500 <= status_code < 600
+    
+    def backoff_delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """
+        Seconds to wait before retrying.
+        
+        Honors Retry-After when present (capped at max_retry_after),
+        otherwise uses exponential backoff with full jitter.
+        
+        Args:
+            attempt: Zero-based retry attempt
+            response: The response that triggered the retry
+        
+        Returns:
+            Delay in seconds
+        """
+        if response is not None:
+            retry_after = retry_after_seconds(response)
+            if retry_after is not None:
+                return min(retry_after, self.max_retry_after)
+        
+        ceiling = min(self.backoff_cap, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+    
+    def pause(self, url: str, seconds: float) -> None:
+        """
+        Pause the family of the given URL (after a 429).
+        
+        Args:
+            url: Request URL
+            seconds: Pause duration
+        """
+        family = endpoint_family(url)
+        self._buckets.get(family, self._buckets['default']).pause(seconds)
+    
+    def throughput(self, family: Optional[str] = None, window: float = THROUGHPUT_WINDOW) -> float:
+        """
+        Current request rate.
+        
+        Args:
+            family: Restrict to one endpoint family (None for all)
+            window: Averaging window in seconds (at most THROUGHPUT_WINDOW)
+        
+        Returns:
+            Requests per second over the window
+        """
+        window = min(window, THROUGHPUT_WINDOW)
+        cutoff = time.monotonic() - window
+        
+        with self._history_lock:
+            count = sum(
+                1 for at, fam in self._history
+                if at >= cutoff and (family is None or fam == family)
+            )
+        
+        return count / window
@@ -3,20 +3,28 @@ Survey data export operations.
 
 This module provides functionality for exporting survey response data
 from Qualtrics surveys in various formats.
+
+Exports are streamed: the download goes to a spooled temporary file and the
+export file is read straight from the zip, one response at a time.
 """
 
-from typing import Optional, Union
-import requests
-import time
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple, Union
 import zipfile
 import io
 import os
-import glob
 import tempfile
 import shutil
-import json
 import pandas as pd
 from .base import BaseQualtricsClient
+from .polling import DEFAULT_INITIAL_INTERVAL, DEFAULT_POLL_TIMEOUT, AdaptivePoller
+from ..utils.streaming import JSONResponseWriter, TeeReader, atomic_output, iter_csv_records, iter_json_array
+
+
+# Downloads larger than this are spooled to disk instead of memory (bytes)
+SPOOL_MAX_SIZE = 32 * 1024 * 1024
+
+# Bytes read from the download at a time
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
 
 
 class SurveysAPI(BaseQualtricsClient):
@@ -34,103 +42,396 @@ class SurveysAPI(BaseQualtricsClient):
         super().__init__(*args, **kwargs)
         self.survey_id = survey_id
     
+    def for_survey(self, survey_id: str) -> 'SurveysAPI':
+        """
+        Client for another survey sharing this client's session and rate limiter.
+        
+        Args:
+            survey_id: Survey ID
+        
+        Returns:
+            SurveysAPI for survey_id (closing it leaves the session open)
+        """
+        return SurveysAPI(
+            api_token=self.api_token,
+            data_center=self.data_center,
+            survey_id=survey_id,
+            verify=self.verify,
+            verbose=self.verbose,
+            session=self.session,
+            rate_limiter=self.rate_limiter
+        )
+    
+    def start_export(
+        self,
+        file_format: str = 'json',
+        start_date: Optional[str] = None,
+        continuation_token: Optional[str] = None,
+        allow_continuation: bool = False
+    ) -> str:
+        """
+        Start a response export.
+        
+        Args:
+            file_format: Export format ('json' or 'csv')
+            start_date: Only export responses recorded from this time
+                (ISO 8601 UTC, e.g. '2024-05-01T12:00:00Z')
+            continuation_token: Export only the responses recorded since the
+                export that returned this token (not combined with start_date)
+            allow_continuation: Ask for a continuation token for the next export
+        
+        Returns:
+            Export progress ID
+        
+        Raises:
+            QualtricsAPIError: If the API request fails
+        """
+        url = self._export_url()
+        data: Dict[str, Any] = {'format': file_format}
+        if continuation_token:
+            data['continuationToken'] = continuation_token
+        elif start_date:
+            data['startDate'] = start_date
+        if allow_continuation:
+            data['allowContinuation'] = True
+        response = self.make_request('POST', url, json_data=data)
+        
+        try:
+            return response.json()["result"]["progressId"]
+        except KeyError:
+            print(response.json())
+            raise
+    
+    def wait_for_export(
+        self,
+        progress_id: str,
+        wait_time: Optional[float] = None,
+        timeout: float = DEFAULT_POLL_TIMEOUT
+    ) -> str:
+        """
+        Wait until an export is ready.
+        
+        Args:
+            progress_id: Export progress ID from start_export
+            wait_time: Interval before the export reports progress (seconds,
+                default DEFAULT_INITIAL_INTERVAL)
+            timeout: Total time allowed for the export (seconds)
+        
+        Returns:
+            File ID of the export
+        
+        Raises:
+            Exception: If the export fails
+            PollTimeout: If the export is not ready within timeout
+        """
+        return self.poll_export(progress_id, wait_time, timeout)['fileId']
+    
+    def poll_export(
+        self,
+        progress_id: str,
+        wait_time: Optional[float] = None,
+        timeout: float = DEFAULT_POLL_TIMEOUT
+    ) -> Dict[str, Any]:
+        """
+        Wait until an export is ready and return its final progress.
+        
+        Progress checks are paced by the estimated completion time of the
+        export (see AdaptivePoller), so small exports are picked up within
+        about a second and large ones are not checked needlessly often.
+        
+        Args:
+            progress_id: Export progress ID from start_export
+            wait_time: Interval before the export reports progress (seconds,
+                default DEFAULT_INITIAL_INTERVAL)
+            timeout: Total time allowed for the export (seconds)
+        
+        Returns:
+            Progress result with fileId, status and, for exports started with
+            allow_continuation, continuationToken
+        
+        Raises:
+            Exception: If the export fails
+            PollTimeout: If the export is not ready within timeout
+        """
+        poller = AdaptivePoller(
+            timeout=timeout,
+            initial_interval=wait_time if wait_time is not None else DEFAULT_INITIAL_INTERVAL
+        )
+        result = poller.poll(lambda: self.check_export(progress_id), description=f"Export {progress_id}")
+        
+        if result.get("fileId") is None:
+            raise Exception(f"Export {progress_id} {result['status']} without a file")
+        
+        return result
+    
+    def check_export(self, progress_id: str) -> Tuple[bool, float, Dict[str, Any]]:
+        """
+        Check the progress of an export once.
+        
+        Args:
+            progress_id: Export progress ID from start_export
+        
+        Returns:
+            (done, percentComplete, progress result), the form AdaptivePoller
+            expects from a check
+        
+        Raises:
+            Exception: If the export failed
+        """
+        result = self.make_request('GET', self._export_url() + progress_id).json()["result"]
+        
+        if self.verbose > 0:
+            print(f"Download is {result['percentComplete']}% complete")
+        
+        if result["status"] == "failed":
+            raise Exception(f"Export {progress_id} failed")
+        
+        done = result["status"] == "complete" or result.get("fileId") is not None
+        return done, result.get("percentComplete", 0), result
+    
+    def download_export(self, file_id: str) -> BinaryIO:
+        """
+        Download an export zip into a spooled temporary file.
+        
+        The file is streamed in chunks. It stays in memory up to
+        SPOOL_MAX_SIZE bytes and moves to disk beyond that.
+        
+        Args:
+            file_id: File ID from wait_for_export
+        
+        Returns:
+            Seekable binary file positioned at the start, close it when done
+        
+        Raises:
+            QualtricsAPIError: If the API request fails
+        """
+        url = self._export_url() + file_id + '/file'
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        
+        try:
+            with self.make_request('GET', url, stream=True) as response:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    spool.write(chunk)
+        except Exception:
+            spool.close()
+            raise
+        
+        spool.seek(0)
+        return spool
+    
+    def iter_responses(
+        self,
+        file_format: str = 'json',
+        wait_time: Optional[float] = None,
+        timeout: float = DEFAULT_POLL_TIMEOUT,
+        output_dir: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Export survey responses and iterate over them one record at a time.
+        
+        Records are read straight from the zip member of the download, no
+        DataFrame or list of all responses is built. CSV values are strings.
+        
+        Args:
+            file_format: Export format ('json' or 'csv')
+            wait_time: Interval before the export reports progress (seconds)
+            timeout: Total time allowed for the export (seconds)
+            output_dir: Also write the cleaned export file to this directory
+                in the same pass (None to only iterate)
+        
+        Yields:
+            One dictionary per response
+        
+        Raises:
+            QualtricsAPIError: If the export fails
+        """
+        progress_id = self.start_export(file_format)
+        file_id = self.wait_for_export(progress_id, wait_time, timeout)
+        
+        yield from self.iter_export_file(file_id, file_format, output_dir)
+    
+    def iter_export_file(
+        self,
+        file_id: str,
+        file_format: str = 'json',
+        output_dir: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Download a finished export and iterate over its responses.
+        
+        Args:
+            file_id: File ID from wait_for_export or poll_export
+            file_format: Format the export was started with
+            output_dir: Also write the cleaned export file to this directory
+        
+        Yields:
+            One dictionary per response
+        """
+        with self.download_export(file_id) as spool:
+            yield from self.read_export(spool, file_format, output_dir)
+    
+    def read_export(
+        self,
+        spool: BinaryIO,
+        file_format: str = 'json',
+        output_dir: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the responses of a downloaded export.
+        
+        The download can be read more than once, e.g. to infer column
+        types before writing them.
+        
+        Args:
+            spool: File returned by download_export
+            file_format: Format the export was started with
+            output_dir: Also write the cleaned export file to this directory
+        
+        Yields:
+            One dictionary per response
+        """
+        return self._read_export(spool, file_format, output_dir)
+    
+    def stream_export(
+        self,
+        file_format: str = 'json',
+        wait_time: Optional[float] = None,
+        timeout: float = DEFAULT_POLL_TIMEOUT,
+        output_dir: Optional[str] = None
+    ) -> str:
+        """
+        Export survey responses to a file without loading them.
+        
+        Args:
+            file_format: Export format ('json' or 'csv')
+            wait_time: Interval before the export reports progress (seconds)
+            timeout: Total time allowed for the export (seconds)
+            output_dir: Directory for the export file (default: cwd)
+        
+        Returns:
+            Path of the written file
+        
+        Raises:
+            QualtricsAPIError: If the export fails
+        """
+        progress_id = self.start_export(file_format)
+        file_id = self.wait_for_export(progress_id, wait_time, timeout)
+        
+        with self.download_export(file_id) as spool:
+            return self._write_export(spool, file_format, output_dir or os.getcwd())
+    
     def export_responses(
         self,
         file_format: str = 'json',
-        wait_time: float = 7.5,
+        wait_time: Optional[float] = None,
         return_format: str = 'df',
-        max_retries: int = 5
-    ) -> Union[pd.DataFrame, dict]:
+        timeout: float = DEFAULT_POLL_TIMEOUT
+    ) -> Union[pd.DataFrame, dict, str]:
         """
         Export survey responses to a file and return as dataframe or dict.
         
+        The file is written in one pass from the download, see stream_export.
+        
         Args:
             file_format: Export format ('json' or 'csv')
-            wait_time: Time to wait between progress checks (seconds)
-            return_format: Return format ('df' for DataFrame or 'dict')
-            max_retries: Maximum number of retries for export
-            
+            wait_time: Interval before the export reports progress (seconds)
+            return_format: Return format ('df' for DataFrame, 'dict', or
+                'path' for the file path without loading the responses)
+            timeout: Total time allowed for the export (seconds)
+        
         Returns:
-            DataFrame or dict containing survey responses
-            
+            DataFrame, dict or path of the exported file
+        
         Raises:
             QualtricsAPIError: If the export fails
         """
-        url = self.build_url(f'/API/v3/surveys/{self.survey_id}/export-responses/')
-        headers = self.get_headers()
+        new_path = self.stream_export(file_format, wait_time, timeout)
         
-        # Step 1: Create export request
-        data = {'format': file_format}
+        if return_format == 'path':
+            return new_path
         
-        try:
-            response = self.make_request('POST', url, headers=headers, json_data=data)
-            progress_id = response.json()["result"]["progressId"]
-        except KeyError:
-            print(response.json())
-            raise
+        if file_format == 'csv':
+            return pd.read_csv(new_path, skiprows=[1, 2])
         
-        # Step 2: Check export progress and wait until ready
-        progress_status = "inProgress"
-        file_id = None
-        retry_count = 0
+        with open(new_path) as fp:
+            responses = list(iter_json_array(fp))
+        if return_format == 'dict':
+            return {'responses': responses, 'source': 'qualtrics'}
+        return pd.DataFrame(responses)
+    
+    def _export_url(self) -> str:
+        """URL of the survey's export-responses endpoint."""
+        return self.build_url(f'/API/v3/surveys/{self.survey_id}/export-responses/')
+    
+    def _export_member(self, archive: zipfile.ZipFile, file_format: str) -> str:
+        """Name of the export file inside the zip."""
+        for name in archive.namelist():
+            if name.endswith(file_format):
+                return name
+        raise Exception(f"No {file_format} file in export: {archive.namelist()}")
+    
+    def _output_path(self, member: str, output_dir: str) -> str:
+        """Local path of an export member, without spaces and colons."""
+        clean_base_name = os.path.basename(member).replace(" ", "_").replace(":", "")
+        return os.path.join(output_dir, clean_base_name)
+    
+    def _read_export(
+        self,
+        spool: BinaryIO,
+        file_format: str,
+        output_dir: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the records of a downloaded export, optionally saving it.
         
-        while progress_status not in ["complete", "failed"] and file_id is None:
-            check_url = url + progress_id
-            progress_response = self.make_request('GET', check_url, headers=headers)
-            
-            try:
-                file_id = progress_response.json()["result"]["fileId"]
-            except KeyError:
-                pass
-            
-            progress = progress_response.json()["result"]["percentComplete"]
-            progress_status = progress_response.json()["result"]["status"]
-            
-            if self.verbose > 0:
-                print(f"Download is {progress}% complete")
-            
-            if progress_status not in ["complete", "failed"]:
-                retry_count += 1
-                if retry_count > max_retries:
-                    raise Exception("Exceeded maximum retries. Exiting.")
-                
-                sleep_interval = wait_time * (2 ** (retry_count - 1))
-                if self.verbose > 0:
-                    print(f"Retrying in {sleep_interval} seconds...")
-                time.sleep(sleep_interval)
-        
-        # Step 3: Download the file
-        download_url = url + file_id + '/file'
-        download_response = requests.get(download_url, headers=headers, stream=True, verify=self.verify)
-        
-        # Step 4: Unzip and process
-        with tempfile.TemporaryDirectory() as temp_dir:
-            zipfile.ZipFile(io.BytesIO(download_response.content)).extractall(temp_dir)
-            tmp_path = glob.glob(os.path.join(temp_dir, f"*{file_format}"))[0]
-            base_name = os.path.basename(tmp_path)
-            clean_base_name = base_name.replace(" ", "_").replace(":", "")
-            
-            local_dir = os.getcwd()
-            new_path = os.path.join(local_dir, clean_base_name)
+        The saved file replaces an earlier one only after every record was
+        read; if iteration stops early the earlier file is kept.
+        """
+        with zipfile.ZipFile(spool) as archive:
+            member = self._export_member(archive, file_format)
+            if output_dir is None:
+                with archive.open(member) as raw:
+                    if file_format == 'csv':
+                        yield from iter_csv_records(io.TextIOWrapper(raw, encoding='utf-8-sig', newline=''))
+                    else:
+                        yield from iter_json_array(io.TextIOWrapper(raw, encoding='utf-8-sig'))
+                return
             
-            if file_format == 'csv':
-                shutil.copy(tmp_path, new_path)
-                df = pd.read_csv(tmp_path, skiprows=[1, 2])
-                result_data = df
-            elif file_format == 'json':
-                with open(tmp_path) as fp:
-                    ddict = json.load(fp)
-                
-                ddict['source'] = 'qualtrics'
-                
-                with open(new_path, 'w') as fp:
-                    json.dump(ddict, fp, indent=4)
-                
-                df = pd.DataFrame(ddict['responses'])
-                result_data = ddict if return_format == 'dict' else df
+            new_path = self._output_path(member, output_dir)
+            with atomic_output(new_path, 'wb' if file_format == 'csv' else 'w') as out:
+                with archive.open(member) as raw:
+                    if file_format == 'csv':
+                        source = io.BufferedReader(TeeReader(raw, out))
+                        text = io.TextIOWrapper(source, encoding='utf-8-sig', newline='')
+                        yield from iter_csv_records(text)
+                    else:
+                        text = io.TextIOWrapper(raw, encoding='utf-8-sig')
+                        with JSONResponseWriter(out, extra={'source': 'qualtrics'}) as writer:
+                            for response in iter_json_array(text):
+                                writer.write(response)
+                                yield response
             
             if self.verbose > 0:
                 print(f'Complete: data written to {new_path}')
+    
+    def _write_export(self, spool: BinaryIO, file_format: str, output_dir: str) -> str:
+        """Write the cleaned export file from a download in one pass."""
+        with zipfile.ZipFile(spool) as archive:
+            member = self._export_member(archive, file_format)
+            new_path = self._output_path(member, output_dir)
             
-            return result_data
-
+            with archive.open(member) as raw:
+                if file_format == 'csv':
+                    with atomic_output(new_path, 'wb') as out:
+                        shutil.copyfileobj(raw, out, DOWNLOAD_CHUNK_SIZE)
+                else:
+                    text = io.TextIOWrapper(raw, encoding='utf-8-sig')
+                    with atomic_output(new_path, 'w') as out:
+                        with JSONResponseWriter(out, extra={'source': 'qualtrics'}) as writer:
+                            for response in iter_json_array(text):
+                                writer.write(response)
+        
+        if self.verbose > 0:
+            print(f'Complete: data written to {new_path}')
+        
+        return new_path
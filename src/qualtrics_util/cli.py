@@ -6,9 +6,18 @@ This module provides the CLI using the new modular architecture.
 
 import argparse
 import sys
-from typing import Optional
+from typing import Iterable, Optional
 from .config import load_configuration
-from .api import ContactsAPI, DistributionsAPI, MessagesAPI, SurveysAPI
+from .api import ContactsAPI, DistributionsAPI, MessagesAPI, SurveysAPI, RateLimiter, create_session
+from .api.base import DEFAULT_POOL_MAXSIZE
+from .api.messages import DEFAULT_MESSAGE_TTL
+from .storage.base import default_db_path
+from .storage.lookup_cache import LookupIdCache
+from .storage.contact_store import ContactStore
+from .storage.ledger import DistributionLedger
+from .storage.export_state import ExportStateStore
+from .models.embedded_data import get_embedded_field, should_send_survey
+from .services.exporter import SurveyExporter
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -42,7 +51,7 @@ def create_parser() -> argparse.ArgumentParser:
         '--cmd',
         type=str,
         default='list',
-        choices=['check', 'delete', 'export', 'list', 'slist', 'send', 'update'],
+        choices=['check', 'delete', 'export', 'list', 'slist', 'send', 'status', 'update'],
         help='Command to execute (default: list)'
     )
     
@@ -57,8 +66,8 @@ def create_parser() -> argparse.ArgumentParser:
         '--format',
         type=str,
         default='json',
-        choices=['json', 'csv'],
-        help='Export format (default: json)'
+        choices=['json', 'csv', 'parquet'],
+        help='Export format, parquet needs pyarrow (default: json)'
     )
     
     parser.add_argument(
@@ -75,6 +84,18 @@ def create_parser() -> argparse.ArgumentParser:
         help='Contact index for delete operation'
     )
     
+    parser.add_argument(
+        '--full-sync',
+        action='store_true',
+        help='Re-download the whole contact list into the local store'
+    )
+    
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Export only responses recorded since the last export (appended to project:EXPORT_DATASET)'
+    )
+    
     parser.add_argument(
         '-V', '--version',
         action='version',
@@ -110,12 +131,12 @@ def print_version_history():
     print(history)
 
 
-def print_contact_list(contacts: list, short_format: bool = False):
+def print_contact_list(contacts: Iterable[dict], short_format: bool = False):
     """
     Print the contact list.
     
     Args:
-        contacts: List of contact dictionaries
+        contacts: List or iterator of contact dictionaries
         short_format: If True, use short format
     """
     for index, contact in enumerate(contacts, 1):
@@ -137,6 +158,49 @@ def print_contact_list(contacts: list, short_format: bool = False):
             pprint(contact)
 
 
+def load_contacts(
+    contacts_api: ContactsAPI,
+    contact_store: Optional[ContactStore] = None,
+    full_sync: bool = False,
+    max_age: Optional[float] = None,
+    selection: Optional[str] = None
+) -> Iterable[dict]:
+    """
+    Contacts of the mailing list, from the local store when one is used.
+    
+    With a store the send and delete selections are indexed queries
+    (ContactStore.eligible_for_send and pending_delete); without one the
+    streamed contacts are filtered on the same fields.
+    
+    Args:
+        contacts_api: Contacts API instance
+        contact_store: Optional local contact mirror (None to stream from Qualtrics)
+        full_sync: Re-download the whole list into the store
+        max_age: Skip syncing the store if it is younger than this many seconds
+        selection: None for every contact, 'send' for contacts to schedule
+            (SurveysScheduled == 0 and NumDays > 0) or 'delete' for
+            contacts with DeleteUnsent == 1
+    
+    Returns:
+        List or iterator of contact dictionaries, in mailing list order
+    """
+    if contact_store is None:
+        contacts = contacts_api.iter_contacts()
+        if selection == 'send':
+            return (contact for contact in contacts if should_send_survey(contact))
+        if selection == 'delete':
+            return (contact for contact in contacts if str(get_embedded_field(contact, 'DeleteUnsent', '0')) == '1')
+        return contacts
+    
+    mailing_list_id = contacts_api.mailing_list_id
+    contacts_api.sync_contact_store(contact_store, full=full_sync, max_age=max_age)
+    if selection == 'send':
+        return contact_store.eligible_for_send(mailing_list_id)
+    if selection == 'delete':
+        return contact_store.pending_delete(mailing_list_id)
+    return contact_store.contacts(mailing_list_id)
+
+
 def handle_command(
     cmd: str,
     config_loader,
@@ -186,24 +250,43 @@ def handle_command(
             print(f"❌ Error accessing message: {e}")
     
     elif cmd == 'list':
-        # List all contacts in detail
-        contacts = contacts_api.get_contact_list()
+        # List all contacts in detail, printing each page as it arrives
+        contacts = load_contacts(
+            contacts_api, kwargs.get('contact_store'), kwargs.get('full_sync', False),
+            config_loader.get('project.CONTACT_MAX_AGE')
+        )
         print_contact_list(contacts, short_format=False)
     
     elif cmd == 'slist':
-        # List all contacts in short format
-        contacts = contacts_api.get_contact_list()
+        # List all contacts in short format, printing each page as it arrives
+        contacts = load_contacts(
+            contacts_api, kwargs.get('contact_store'), kwargs.get('full_sync', False),
+            config_loader.get('project.CONTACT_MAX_AGE')
+        )
         print_contact_list(contacts, short_format=True)
     
     elif cmd == 'export':
         # Export survey data
         format_type = kwargs.get('format', 'json')
         
-        print(f"Exporting survey data in {format_type} format...")
-        if format_type == 'json':
-            results = surveys_api.export_responses(file_format='json')
+        if kwargs.get('incremental'):
+            # new responses are appended to a JSON Lines dataset
+            dataset_file = config_loader.get('project.EXPORT_DATASET') or \
+                f"{surveys_api.survey_id}_responses.jsonl"
+            print(f"Exporting new survey responses to {dataset_file}...")
+            state = ExportStateStore(kwargs['db_path'])
+            try:
+                SurveyExporter(surveys_api, verbose=verbose).export_incremental(state, dataset_file)
+            finally:
+                state.close()
+        elif format_type == 'parquet':
+            SurveyExporter(surveys_api, verbose=verbose).export_to_parquet(
+                config_loader.get('project.EXPORT_PARQUET')
+            )
         else:
-            results = surveys_api.export_responses(file_format='csv')
+            print(f"Exporting survey data in {format_type} format...")
+            # streamed to a file in the current directory, nothing is loaded
+            surveys_api.stream_export(file_format=format_type)
         
         print("✅ Export complete")
     
@@ -211,6 +294,22 @@ def handle_command(
         print("Send command not yet implemented in new architecture")
         print("Using original implementation from qualtrics_util.py")
     
+    elif cmd == 'status':
+        # Scheduled distributions of this mailing list from the local
+        # ledger, no API calls; the database may be shared by several lists
+        ledger = kwargs['ledger']
+        mailing_list_id = config_loader.get('project.MAILING_LIST_ID')
+        status = ledger.status(mailing_list_id=mailing_list_id)
+        if not status:
+            print("No distributions recorded in the ledger")
+        for channel, counts in sorted(status.items()):
+            print(f"{channel}: {counts['scheduled']} scheduled, {counts['sent']} sent, "
+                  f"{counts['pending']} pending, {counts['deleted']} deleted")
+        if verbose > 1:
+            for entry in ledger.unsent(mailing_list_id=mailing_list_id):
+                print(f"{entry['send_date']} {entry['channel']} {entry['contact_id']} "
+                      f"{entry['distribution_id']}")
+    
     elif cmd == 'update':
         print("Update command not yet implemented in new architecture")
         print("Using original implementation from qualtrics_util.py")
@@ -245,13 +344,32 @@ def main():
     
     # Initialize API clients
     try:
+        # One keep-alive session shared by all clients so every call
+        # reuses the pooled connection to the data center
+        session = create_session(
+            pool_maxsize=config_loader.get('account.POOL_SIZE', DEFAULT_POOL_MAXSIZE)
+        )
+        # One rate limiter so all clients draw on the same budgets;
+        # account:RATE_LIMITS overrides requests per minute per family
+        rate_limiter = RateLimiter(budgets=config_loader.get('account.RATE_LIMITS'))
+        # contactLookupIds persist next to the config between runs
+        db_path = config_loader.get('project.CACHE_FILE') or default_db_path(config_loader._config_file_path)
+        lookup_cache = LookupIdCache(db_path)
+        # project:CONTACT_SYNC keeps a local mirror of the mailing list in the same database
+        contact_store = ContactStore(db_path) if config_loader.get('project.CONTACT_SYNC', False) else None
+        # every distribution this tool schedules is recorded in the same database
+        ledger = DistributionLedger(db_path)
+        
         contacts_api = ContactsAPI(
             api_token=config_loader.api_token,
             data_center=config_loader.get('account.DATA_CENTER'),
             directory_id=config_loader.get('account.DEFAULT_DIRECTORY'),
             mailing_list_id=config_loader.get('project.MAILING_LIST_ID'),
+            lookup_cache=lookup_cache,
             verify=not config_loader.get('account.VERIFY', True),
-            verbose=args.verbose
+            verbose=args.verbose,
+            session=session,
+            rate_limiter=rate_limiter
         )
         
         distributions_api = DistributionsAPI(
@@ -259,15 +377,20 @@ def main():
             data_center=config_loader.get('account.DATA_CENTER'),
             survey_id=config_loader.get('project.SURVEY_ID'),
             verify=not config_loader.get('account.VERIFY', True),
-            verbose=args.verbose
+            verbose=args.verbose,
+            session=session,
+            rate_limiter=rate_limiter
         )
         
         messages_api = MessagesAPI(
             api_token=config_loader.api_token,
             data_center=config_loader.get('account.DATA_CENTER'),
             library_id=config_loader.get('account.LIBRARY_ID'),
+            cache_ttl=config_loader.get('account.MESSAGE_CACHE_TTL', DEFAULT_MESSAGE_TTL),
             verify=not config_loader.get('account.VERIFY', True),
-            verbose=args.verbose
+            verbose=args.verbose,
+            session=session,
+            rate_limiter=rate_limiter
         )
         
         surveys_api = SurveysAPI(
@@ -275,7 +398,9 @@ def main():
             data_center=config_loader.get('account.DATA_CENTER'),
             survey_id=config_loader.get('project.SURVEY_ID'),
             verify=not config_loader.get('account.VERIFY', True),
-            verbose=args.verbose
+            verbose=args.verbose,
+            session=session,
+            rate_limiter=rate_limiter
         )
         
     except Exception as e:
@@ -293,7 +418,12 @@ def main():
             surveys_api,
             args.verbose,
             format=args.format,
-            index=args.index
+            index=args.index,
+            contact_store=contact_store,
+            full_sync=args.full_sync,
+            ledger=ledger,
+            incremental=args.incremental,
+            db_path=db_path
         )
     except KeyboardInterrupt:
         print("\n\nOperation cancelled by user")
@@ -304,3 +434,9 @@ def main():
             import traceback
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        session.close()
+        lookup_cache.close()
+        ledger.close()
+        if contact_store is not None:
+            contact_store.close()
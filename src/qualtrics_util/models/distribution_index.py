@@ -0,0 +1,96 @@
+"""
+In-memory index of survey distributions.
+
+A survey's distributions are listed once and indexed by contactLookupId,
+with each contact's distributions ordered by sendDate. Finding the unsent
+invitations of a contact is then a dictionary lookup plus a bisect instead
+of a new listing per contact.
+"""
+
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# Format of sendDate in Qualtrics distribution listings
+SEND_DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def distribution_lookup_id(distribution: Dict[str, Any]) -> Optional[str]:
+    """
+    Get the contactLookupId a distribution was sent to.
+    
+    Args:
+        distribution: Distribution dictionary from a listing
+    
+    Returns:
+        contactLookupId (CGC_...) or None
+    """
+    return distribution.get('recipients', {}).get('contactId')
+
+
+class DistributionIndex:
+    """
+    Distributions indexed by contactLookupId and sendDate.
+    
+    Example:
+        >>> index = DistributionIndex(distributions_api.iter_sms_distributions())
+        >>> for distribution in index.unsent('CGC_abc'):
+        ...     distributions_api.delete_sms_distribution(distribution['id'])
+    """
+    
+    def __init__(self, distributions: Iterable[Dict[str, Any]]):
+        """
+        Build the index.
+        
+        Args:
+            distributions: Distribution dictionaries from a listing
+        """
+        self._by_contact: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+        self._count = 0
+        
+        for distribution in distributions:
+            lookup_id = distribution_lookup_id(distribution)
+            if lookup_id is None:
+                continue
+            entry = (distribution.get('sendDate') or '', distribution)
+            self._by_contact.setdefault(lookup_id, []).append(entry)
+            self._count += 1
+        
+        # sendDate strings are ISO 8601 UTC so they sort chronologically
+        for entries in self._by_contact.values():
+            entries.sort(key=lambda entry: entry[0])
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def for_contact(self, lookup_id: str) -> List[Dict[str, Any]]:
+        """
+        All distributions of a contact ordered by sendDate.
+        
+        Args:
+            lookup_id: contactLookupId
+        
+        Returns:
+            List of distribution dictionaries
+        """
+        return [distribution for _, distribution in self._by_contact.get(lookup_id, [])]
+    
+    def unsent(self, lookup_id: str, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Distributions of a contact scheduled after now.
+        
+        Args:
+            lookup_id: contactLookupId
+            now: Reference time (defaults to the current UTC time)
+        
+        Returns:
+            List of distribution dictionaries ordered by sendDate
+        """
+        if now is None:
+            now = datetime.now(timezone.utc)
+        now_str = now.astimezone(timezone.utc).strftime(SEND_DATE_FORMAT)
+        
+        entries = self._by_contact.get(lookup_id, [])
+        start = bisect_right(entries, now_str, key=lambda entry: entry[0])
+        return [distribution for _, distribution in entries[start:]]
@@ -5,7 +5,8 @@ This module provides functions for working with embedded data in Qualtrics conta
 including flattening nested structures and parsing field values.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import ast
 import json
 
 
@@ -118,6 +119,68 @@ def update_log_data(log_data_json: str, new_action: Dict[str, Any]) -> str:
         return json.dumps([{"action": "init"}, new_action])
 
 
+def merge_embedded_data(
+    current: Dict[str, Any],
+    defaults: Optional[Dict[str, Any]] = None,
+    updates: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Merge config defaults and field updates into a contact's embedded data.
+    
+    Defaults only fill in fields the contact does not have yet. Updates
+    replace existing values, except LogData where the update is appended
+    to the log. Dictionaries are stored as JSON strings.
+    
+    Args:
+        current: Embedded data as fetched (not modified)
+        defaults: Default fields, e.g. the config's embedded_data section
+        updates: Fields to change
+    
+    Returns:
+        New embedded data dictionary
+    
+    Example:
+        >>> merge_embedded_data({'NumDays': '7'}, {'NumDays': 0, 'SendStatus': 0}, {'NumDays': 10})
+        {'NumDays': 10, 'SendStatus': 0}
+    """
+    merged = dict(current)
+    updates = updates or {}
+    
+    for key, value in (defaults or {}).items():
+        if key not in merged:
+            merged[key] = json.dumps(value) if isinstance(value, dict) else value
+    
+    for key, value in updates.items():
+        if key == 'LogData' and key in current:
+            merged[key] = update_log_data(current[key], value)
+        elif isinstance(value, dict):
+            merged[key] = json.dumps(value)
+        else:
+            merged[key] = value
+    
+    return merged
+
+
+def embedded_data_changed(current: Dict[str, Any], merged: Dict[str, Any]) -> bool:
+    """
+    Check whether merged embedded data differs from what was fetched.
+    
+    Qualtrics returns embedded data values as strings, so values are
+    compared as strings (10 equals '10').
+    
+    Args:
+        current: Embedded data as fetched
+        merged: Embedded data to be written
+    
+    Returns:
+        True if an update would change the contact
+    """
+    if current.keys() != merged.keys():
+        return True
+    
+    return any(str(current[key]) != str(merged[key]) for key in merged)
+
+
 def get_embedded_field(contact: Dict[str, Any], field_name: str, default: Any = None) -> Any:
     """
     Safely get an embedded data field from a contact.
@@ -214,9 +277,8 @@ def get_time_slots(contact: Dict[str, Any]) -> List[Any]:
     time_slots_str = embedded_data.get('TimeSlots')
     if time_slots_str:
         try:
-            import eval
-            return eval(f"[{time_slots_str}]")
-        except:
+            return ast.literal_eval(f"[{time_slots_str}]")
+        except (ValueError, SyntaxError):
             pass
     
     # Fallback to TimeX format
@@ -230,8 +292,10 @@ def get_time_slots(contact: Dict[str, Any]) -> List[Any]:
     time_keys.sort()
     
     for key in time_keys:
-        value = embedded_data[key]
-        if isinstance(value, int):
-            time_slots.append(value)
+        # embedded data values usually come back as strings
+        try:
+            time_slots.append(int(embedded_data[key]))
+        except (TypeError, ValueError):
+            pass
     
     return time_slots
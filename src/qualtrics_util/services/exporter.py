@@ -3,12 +3,58 @@ Export service for survey data.
 
 This module provides functionality for exporting survey responses
 to various formats with progress tracking.
+
+Incremental exports append only new responses to a local JSON Lines
+dataset, see SurveyExporter.export_incremental.
 """
 
-from typing import Optional, Union, Dict, Any
+from datetime import datetime, timezone
+from typing import Optional, Union, Dict, Any, List
+import json
+import os
 import pandas as pd
 from ..api.surveys import SurveysAPI
-from ..api.base import BaseQualtricsClient
+from ..api.base import BaseQualtricsClient, QualtricsAPIError
+from ..api.polling import DEFAULT_POLL_TIMEOUT
+from ..storage.export_state import ExportStateStore
+from ..utils.columnar import DEFAULT_ROW_GROUP_SIZE, ParquetResponseWriter, infer_column_types
+
+
+# Responses checked against the exported IDs and appended per transaction
+APPEND_BATCH_SIZE = 500
+
+
+def recorded_date(response: Dict[str, Any]) -> Optional[str]:
+    """
+    recordedDate of a response from a JSON export.
+    
+    Args:
+        response: Response dictionary
+    
+    Returns:
+        recordedDate string, or None if the response has none
+    """
+    return response.get('values', {}).get('recordedDate') or response.get('recordedDate')
+
+
+def export_start_date(value: str) -> str:
+    """
+    Format a recordedDate as an export startDate.
+    
+    The startDate must be whole seconds in UTC. Fractions are dropped, so
+    the export overlaps the previous one by up to a second and the
+    overlapping responses are removed by their responseId.
+    
+    Args:
+        value: ISO 8601 timestamp, e.g. '2024-05-01T12:34:56.789Z'
+    
+    Returns:
+        Timestamp in the form '2024-05-01T12:34:56Z'
+    """
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
 
 
 class SurveyExporter:
@@ -33,15 +79,15 @@ class SurveyExporter:
     def export_to_csv(
         self,
         output_file: Optional[str] = None,
-        wait_time: float = 7.5
+        wait_time: Optional[float] = None
     ) -> pd.DataFrame:
         """
         Export survey responses to CSV file.
         
         Args:
             output_file: Output file path (defaults to auto-generated name)
-            wait_time: Time to wait between progress checks
-            
+            wait_time: Interval before the export reports progress
+        
         Returns:
             DataFrame containing survey responses
         """
@@ -63,15 +109,15 @@ class SurveyExporter:
     def export_to_json(
         self,
         output_file: Optional[str] = None,
-        wait_time: float = 7.5
+        wait_time: Optional[float] = None
     ) -> Union[pd.DataFrame, Dict[str, Any]]:
         """
         Export survey responses to JSON file.
         
         Args:
             output_file: Output file path (defaults to auto-generated name)
-            wait_time: Time to wait between progress checks
-            
+            wait_time: Interval before the export reports progress
+        
         Returns:
             DataFrame or dictionary containing survey responses
         """
@@ -99,6 +145,207 @@ class SurveyExporter:
         
         return result
     
+    def export_to_parquet(
+        self,
+        output_file: Optional[str] = None,
+        wait_time: Optional[float] = None,
+        timeout: float = DEFAULT_POLL_TIMEOUT,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE
+    ) -> str:
+        """
+        Export survey responses to a Parquet file with typed columns.
+        
+        The JSON export is downloaded once into a spooled file and read
+        twice: the first pass infers the column types, the second writes
+        the rows in row groups. Neither pass holds more than one row group.
+        Requires pyarrow.
+        
+        Args:
+            output_file: Output file path (default: <survey_id>_responses.parquet)
+            wait_time: Interval before the export reports progress
+            timeout: Total time allowed for the export (seconds)
+            row_group_size: Rows per Parquet row group
+        
+        Returns:
+            Path of the written file
+        
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        output_file = output_file or f"{self.surveys_api.survey_id}_responses.parquet"
+        
+        if self.verbose > 0:
+            print("Exporting survey responses to Parquet...")
+        
+        progress_id = self.surveys_api.start_export('json')
+        file_id = self.surveys_api.wait_for_export(progress_id, wait_time, timeout)
+        
+        with self.surveys_api.download_export(file_id) as spool:
+            column_types = infer_column_types(self.surveys_api.read_export(spool, 'json'))
+            with ParquetResponseWriter(output_file, column_types, row_group_size) as writer:
+                for response in self.surveys_api.read_export(spool, 'json'):
+                    writer.write(response)
+        
+        if self.verbose > 0:
+            print(f"Parquet exported to: {output_file} ({writer.count} responses, "
+                  f"{len(column_types)} columns, {writer.row_groups} row groups)")
+        
+        return output_file
+    
+    def export_incremental(
+        self,
+        state: ExportStateStore,
+        dataset_file: str,
+        wait_time: Optional[float] = None,
+        timeout: float = DEFAULT_POLL_TIMEOUT,
+        full: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Append the responses recorded since the last export to a dataset.
+        
+        The export continues from the continuation token of the previous
+        export. If there is no token, or Qualtrics rejects it, the export
+        starts at the latest recordedDate seen. The first export, or one
+        with full=True, requests every response. Responses whose responseId
+        was already exported are skipped. New ones are appended to
+        dataset_file as JSON Lines, one response per line.
+        
+        Lines an interrupted export appended before their IDs were recorded
+        are recorded first (see _recover), so they are not appended again.
+        
+        Args:
+            state: Store holding the watermark and exported response IDs
+            dataset_file: JSON Lines file the responses are appended to
+            wait_time: Interval before the export reports progress
+            timeout: Total time allowed for the export (seconds)
+            full: Ignore the watermark and request every response. Responses
+                already in the dataset are still skipped, so this fills in
+                missing responses; call state.reset(survey_id) first to
+                rebuild the dataset from scratch
+        
+        Returns:
+            Report dictionary with mode ('continuation', 'since' or 'full'),
+            exported, appended and duplicates counts, and the new recorded_date
+        """
+        survey_id = self.surveys_api.survey_id
+        self._recover(state, survey_id, dataset_file)
+        watermark = None if full else state.watermark(survey_id)
+        progress_id = None
+        mode = 'full'
+        
+        if watermark and watermark['continuation_token']:
+            try:
+                progress_id = self.surveys_api.start_export(
+                    'json', continuation_token=watermark['continuation_token'], allow_continuation=True
+                )
+                mode = 'continuation'
+            except QualtricsAPIError as e:
+                if self.verbose > 0:
+                    print(f"Continuation token rejected, exporting by date: {e}")
+        
+        if progress_id is None:
+            start_date = watermark['recorded_date'] if watermark else None
+            progress_id = self.surveys_api.start_export(
+                'json',
+                start_date=export_start_date(start_date) if start_date else None,
+                allow_continuation=True
+            )
+            mode = 'since' if start_date else 'full'
+        
+        result = self.surveys_api.poll_export(progress_id, wait_time, timeout)
+        
+        report = {
+            'mode': mode,
+            'exported': 0,
+            'appended': 0,
+            'duplicates': 0,
+            'recorded_date': watermark['recorded_date'] if watermark else None,
+        }
+        
+        batch: List[Dict[str, Any]] = []
+        with open(dataset_file, 'a') as out:
+            for response in self.surveys_api.iter_export_file(result['fileId'], 'json'):
+                report['exported'] += 1
+                batch.append(response)
+                if len(batch) >= APPEND_BATCH_SIZE:
+                    self._append(state, survey_id, batch, out, report)
+                    batch = []
+            self._append(state, survey_id, batch, out, report)
+        
+        state.set_watermark(survey_id, report['recorded_date'], result.get('continuationToken'))
+        
+        if self.verbose > 0:
+            print(f"Appended {report['appended']} new responses to {dataset_file} "
+                  f"({report['duplicates']} already exported)")
+        
+        return report
+    
+    def _append(
+        self,
+        state: ExportStateStore,
+        survey_id: str,
+        batch: List[Dict[str, Any]],
+        out,
+        report: Dict[str, Any]
+    ) -> None:
+        """Append the responses of a batch that were not exported before."""
+        new = []
+        seen = state.exported(survey_id, [response.get('responseId') for response in batch])
+        for response in batch:
+            response_id = response.get('responseId')
+            if response_id in seen:
+                report['duplicates'] += 1
+                continue
+            seen.add(response_id)
+            new.append(response)
+        
+        for response in new:
+            out.write(json.dumps(response) + '\n')
+        # the lines are on disk before their IDs are marked as exported, and
+        # the file size after the IDs (see _recover)
+        out.flush()
+        
+        state.add_responses(survey_id, [(r.get('responseId'), recorded_date(r)) for r in new])
+        state.set_dataset_size(survey_id, os.path.abspath(out.name), os.fstat(out.fileno()).st_size)
+        report['appended'] += len(new)
+        
+        dates = [d for d in (recorded_date(r) for r in new) if d]
+        if dates:
+            report['recorded_date'] = max(dates + [report['recorded_date'] or ''])
+    
+    def _recover(self, state: ExportStateStore, survey_id: str, dataset_file: str) -> None:
+        """
+        Record the lines an interrupted export appended to the dataset.
+        
+        Lines past the size stored with the last recorded batch were written
+        but their IDs were not recorded. Their IDs are recorded now, and a
+        last line cut off mid-write is truncated.
+        """
+        path = os.path.abspath(dataset_file)
+        if not os.path.exists(path):
+            return
+        
+        recorded_size = state.dataset_size(survey_id, path)
+        if os.path.getsize(path) <= recorded_size:
+            return
+        
+        recovered = []
+        with open(path, 'rb+') as fp:
+            fp.seek(recorded_size)
+            end = recorded_size
+            for line in fp:
+                if not line.endswith(b'\n'):
+                    break
+                response = json.loads(line)
+                recovered.append((response.get('responseId'), recorded_date(response)))
+                end += len(line)
+            fp.truncate(end)
+        
+        state.add_responses(survey_id, recovered)
+        state.set_dataset_size(survey_id, path, end)
+        if self.verbose > 0:
+            print(f"Recorded {len(recovered)} responses left unrecorded in {dataset_file}")
+    
     def export_summary_statistics(self) -> Dict[str, Any]:
         """
         Export summary statistics about survey responses.
@@ -108,7 +355,6 @@ class SurveyExporter:
         """
         df = self.surveys_api.export_responses(
             file_format='json',
-            wait_time=7.5,
             return_format='df'
         )
         
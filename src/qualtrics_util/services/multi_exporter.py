@@ -0,0 +1,148 @@
+"""
+Concurrent response exports of several surveys.
+
+A multi-step study reads the responses of one survey per step. Instead of
+running one export cycle (start, poll, download) after another, every export
+job is started up front, the jobs are polled together in one loop paced by
+their estimated completion, and each finished export is downloaded in a
+bounded thread pool while the others are still running. The responses are
+kept per survey, so repeated loads of the same survey do not export it again.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+from ..api.polling import DEFAULT_POLL_TIMEOUT, AdaptivePoller, PollTimeout
+from ..api.surveys import SurveysAPI
+
+
+# Default number of exports downloaded at once
+DEFAULT_EXPORT_WORKERS = 4
+
+
+class MultiSurveyExporter:
+    """
+    Export the responses of several surveys concurrently.
+    
+    Example:
+        >>> exporter = MultiSurveyExporter(surveys_api)
+        >>> data = exporter.export(['SV_1', 'SV_2', 'SV_3'])
+        >>> responses = exporter.responses('SV_2')  # served from the first export
+    """
+    
+    def __init__(
+        self,
+        surveys_api: SurveysAPI,
+        file_format: str = 'json',
+        max_workers: int = DEFAULT_EXPORT_WORKERS,
+        verbose: int = 1
+    ):
+        """
+        Initialize the exporter.
+        
+        Args:
+            surveys_api: Client whose session and rate limiter are shared by
+                the per-survey clients (see SurveysAPI.for_survey)
+            file_format: Export format ('json' or 'csv')
+            max_workers: Maximum number of downloads at once
+            verbose: Verbosity level
+        """
+        self.surveys_api = surveys_api
+        self.file_format = file_format
+        self.max_workers = max_workers
+        self.verbose = verbose
+        self._responses: Dict[str, List[Dict[str, Any]]] = {}
+    
+    def export(
+        self,
+        survey_ids: Iterable[str],
+        output_dir: Optional[str] = None,
+        timeout: float = DEFAULT_POLL_TIMEOUT,
+        refresh: bool = False
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Export the responses of several surveys.
+        
+        Surveys already exported by this exporter are not exported again
+        unless refresh is set, and a survey listed twice is exported once.
+        
+        Args:
+            survey_ids: Survey IDs
+            output_dir: Also write each cleaned export file to this directory
+            timeout: Total time allowed for all exports (seconds)
+            refresh: Export surveys again even if they were already exported
+        
+        Returns:
+            Survey ID -> list of responses, for every requested survey
+        
+        Raises:
+            Exception: If an export fails
+            PollTimeout: If the exports are not ready within timeout
+        """
+        survey_ids = list(dict.fromkeys(survey_ids))
+        missing = [s for s in survey_ids if refresh or s not in self._responses]
+        
+        if missing:
+            self._responses.update(self._export(missing, output_dir, timeout))
+        
+        return {survey_id: self._responses[survey_id] for survey_id in survey_ids}
+    
+    def responses(self, survey_id: str) -> List[Dict[str, Any]]:
+        """
+        Responses of one survey, exported on first use.
+        
+        Args:
+            survey_id: Survey ID
+        
+        Returns:
+            List of responses
+        """
+        return self.export([survey_id])[survey_id]
+    
+    def _export(
+        self,
+        survey_ids: List[str],
+        output_dir: Optional[str],
+        timeout: float
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Start, poll and download the exports of survey_ids."""
+        start = time.monotonic()
+        deadline = start + timeout
+        
+        # Start every export job before waiting on any of them
+        jobs = {}
+        for survey_id in survey_ids:
+            api = self.surveys_api.for_survey(survey_id)
+            jobs[survey_id] = (api, api.start_export(self.file_format), AdaptivePoller(timeout=timeout))
+        
+        if self.verbose > 0:
+            print(f"Started {len(jobs)} exports")
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as executor:
+            downloads = {}
+            
+            while jobs:
+                wait = None
+                for survey_id, (api, progress_id, poller) in list(jobs.items()):
+                    done, percent, result = api.check_export(progress_id)
+                    if done:
+                        # Download while the other exports are still running
+                        downloads[survey_id] = executor.submit(self._download, api, result['fileId'], output_dir)
+                        del jobs[survey_id]
+                    else:
+                        interval = poller.next_interval(time.monotonic(), float(percent or 0))
+                        wait = interval if wait is None else min(wait, interval)
+                
+                if jobs:
+                    now = time.monotonic()
+                    if now >= deadline:
+                        raise PollTimeout(
+                            f"Exports of {', '.join(jobs)} not finished after {now - start:.0f} seconds"
+                        )
+                    time.sleep(min(wait, deadline - now))
+            
+            return {survey_id: future.result() for survey_id, future in downloads.items()}
+    
+    def _download(self, api: SurveysAPI, file_id: str, output_dir: Optional[str]) -> List[Dict[str, Any]]:
+        """Download one finished export and read its responses."""
+        return list(api.iter_export_file(file_id, self.file_format, output_dir))
@@ -0,0 +1,378 @@
+"""
+Dry-run planning of survey invitations.
+
+A plan is every invitation a send run would create, one row per
+(contact, channel, send date, expiration date), computed from the contact
+list without any API calls. Plans are kept as columns (NumPy arrays), can
+be written to Parquet (with pyarrow) or CSV and read back, and can be
+diffed against the distribution ledger or a live distribution listing
+before anything is posted. SendEngine.run_plan executes a plan later.
+"""
+
+import csv
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from ..models.distribution_index import SEND_DATE_FORMAT, distribution_lookup_id
+from ..storage.ledger import DistributionLedger
+from ..utils.zone_offsets import ZoneOffsetIndex
+from .scheduler import DEFAULT_GRACE_MINUTES, build_schedule_batch
+from .send_engine import build_send_params
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+    pq = None
+
+
+# Columns of a plan file
+PLAN_COLUMNS = ('contact_id', 'channel', 'send_date', 'expiration_date')
+
+# (contact_id, channel, send_date) of an invitation
+PlanKey = Tuple[str, str, str]
+
+
+def _format_date(value: Any) -> str:
+    """UTC send date string of a datetime64, datetime or ISO string."""
+    if isinstance(value, np.datetime64):
+        value = value.astype('datetime64[s]').item()
+    elif isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime(SEND_DATE_FORMAT)
+
+
+def _parse_dates(values: Iterable[str]) -> np.ndarray:
+    """UTC date strings to datetime64[s]."""
+    return np.array([value.rstrip('Z') for value in values], dtype='datetime64[s]')
+
+
+class SendPlan:
+    """
+    Invitations a send run would create.
+    
+    Rows are grouped by contact, in the order of the contact list, and
+    within a contact follow the order the run posts them (day, then slot).
+    
+    Attributes:
+        contact_id: Contact ID of each row
+        channel: 'sms' or 'email'
+        send_date: UTC send instant (datetime64[s])
+        expiration_date: UTC expiration instant (datetime64[s])
+        skipped: Contact ID -> number of past send times left out
+    
+    Example:
+        >>> plan = SendPlan.from_contacts(contacts_api.iter_contacts(), 'America/Chicago')
+        >>> plan.write('plan.parquet')
+        >>> diff = SendPlan.read('plan.parquet').diff_ledger(ledger)
+        >>> engine.run_plan(SendPlan.from_rows(diff['new']))
+    """
+    
+    def __init__(
+        self,
+        contact_id: np.ndarray,
+        channel: np.ndarray,
+        send_date: np.ndarray,
+        expiration_date: np.ndarray
+    ):
+        self.contact_id = np.asarray(contact_id, dtype=object)
+        self.channel = np.asarray(channel, dtype=object)
+        self.send_date = np.asarray(send_date, dtype='datetime64[s]')
+        self.expiration_date = np.asarray(expiration_date, dtype='datetime64[s]')
+        # contact_id -> send times left out because they had passed
+        self.skipped: Dict[str, int] = {}
+    
+    @classmethod
+    def from_contacts(
+        cls,
+        contacts: Iterable[Dict[str, Any]],
+        default_time_zone: str,
+        default_expire_minutes: int = 60,
+        rng: Optional[np.random.Generator] = None,
+        offsets: Optional[ZoneOffsetIndex] = None,
+        future_only: bool = True,
+        grace_minutes: float = DEFAULT_GRACE_MINUTES,
+        now: Optional[datetime] = None
+    ) -> 'SendPlan':
+        """
+        Plan the invitations of every eligible contact.
+        
+        Contacts are selected and scheduled like SendEngine.run. Time
+        ranges are drawn when planning, so the plan fixes the send times.
+        Send times that have already passed (e.g. of a late enrollment
+        whose StartDate is in the past) are left out and counted in
+        skipped.
+        
+        Args:
+            contacts: Contact dictionaries with embeddedData
+            default_time_zone: Time zone used when a contact has none
+            default_expire_minutes: Expiration used when a contact has none
+            rng: Random generator for time ranges (see build_schedule_batch)
+            offsets: Zone offset index with the DST policies to use
+            future_only: Leave out send times that have passed
+            grace_minutes: Also leave out send times less than this many
+                minutes ahead (see should_schedule_future_only)
+            now: Reference time (default: current UTC time)
+        
+        Returns:
+            SendPlan
+        """
+        send_params = []
+        for contact in contacts:
+            params = build_send_params(contact, default_time_zone, default_expire_minutes)
+            if params is not None:
+                send_params.append(params)
+        
+        batch = build_schedule_batch(send_params, rng=rng, offsets=offsets)
+        if future_only:
+            batch = batch.future_only(now, grace_minutes)
+        contact_ids = np.array([params['contactId'] for params in send_params] or [''], dtype=object)
+        channels = np.array(
+            ['email' if params['method'] == 'EMAIL' else 'sms' for params in send_params] or [''], dtype=object
+        )
+        plan = cls(
+            contact_ids[batch.participant], channels[batch.participant],
+            batch.send_times, batch.expiration_times
+        )
+        for index, count in enumerate(batch.skipped_counts(len(send_params)).tolist()):
+            if count:
+                plan.skipped[send_params[index]['contactId']] = count
+        return plan
+    
+    def __len__(self) -> int:
+        return len(self.contact_id)
+    
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the plan as dictionaries.
+        
+        Yields:
+            Dictionary with contact_id, channel and UTC send_date and
+            expiration_date strings
+        """
+        for contact_id, channel, send_date, expiration_date in zip(
+            self.contact_id.tolist(), self.channel.tolist(), self.send_date, self.expiration_date
+        ):
+            yield {
+                'contact_id': contact_id,
+                'channel': channel,
+                'send_date': _format_date(send_date),
+                'expiration_date': _format_date(expiration_date),
+            }
+    
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """
+        Number of contacts and invitations per channel.
+        
+        Returns:
+            channel -> {'contacts', 'invitations'}
+        """
+        counts = {}
+        for channel in sorted(set(self.channel.tolist())):
+            rows = self.channel == channel
+            counts[channel] = {
+                'contacts': len(set(self.contact_id[rows].tolist())),
+                'invitations': int(rows.sum()),
+            }
+        return counts
+    
+    def send_params(self) -> List[Dict[str, Any]]:
+        """
+        Group the plan per contact for SendEngine.schedule_contact.
+        
+        Returns:
+            One dictionary per contact with contactId, method and sendTimes
+        """
+        utc = timezone.utc
+        grouped: Dict[Tuple[str, str], List[Tuple[datetime, datetime]]] = {}
+        for contact_id, channel, send_date, expiration_date in zip(
+            self.contact_id.tolist(), self.channel.tolist(), self.send_date.tolist(), self.expiration_date.tolist()
+        ):
+            grouped.setdefault((contact_id, channel), []).append(
+                (send_date.replace(tzinfo=utc), expiration_date.replace(tzinfo=utc))
+            )
+        
+        return [
+            {'contactId': contact_id, 'method': channel.upper(), 'sendTimes': send_times}
+            for (contact_id, channel), send_times in grouped.items()
+        ]
+    
+    def write(self, path: str) -> None:
+        """
+        Write the plan to a file.
+        
+        Args:
+            path: Parquet file (.parquet) or CSV file (any other extension)
+        
+        Raises:
+            ImportError: If a Parquet file is requested without pyarrow
+        """
+        if path.endswith('.parquet'):
+            _require_pyarrow()
+            table = pa.table({
+                'contact_id': pa.array(self.contact_id.tolist(), pa.string()),
+                'channel': pa.array(self.channel.tolist(), pa.string()).dictionary_encode(),
+                'send_date': pa.array(self.send_date, pa.timestamp('s', tz='UTC')),
+                'expiration_date': pa.array(self.expiration_date, pa.timestamp('s', tz='UTC')),
+            })
+            pq.write_table(table, path, compression='snappy')
+            return
+        
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=PLAN_COLUMNS)
+            writer.writeheader()
+            writer.writerows(self.rows())
+    
+    @classmethod
+    def read(cls, path: str) -> 'SendPlan':
+        """
+        Read a plan written by write.
+        
+        Args:
+            path: Parquet or CSV plan file
+        
+        Returns:
+            SendPlan
+        
+        Raises:
+            ImportError: If a Parquet file is read without pyarrow
+        """
+        if path.endswith('.parquet'):
+            _require_pyarrow()
+            table = pq.read_table(path, columns=list(PLAN_COLUMNS))
+            return cls(
+                table.column('contact_id').to_pylist(),
+                [str(channel) for channel in table.column('channel').to_pylist()],
+                # drop the time zone, plans hold UTC instants
+                table.column('send_date').cast(pa.timestamp('s')).to_numpy(),
+                table.column('expiration_date').cast(pa.timestamp('s')).to_numpy()
+            )
+        
+        with open(path, newline='') as f:
+            return cls.from_rows(csv.DictReader(f))
+    
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> 'SendPlan':
+        """
+        Build a plan from row dictionaries, e.g. the new rows of a diff.
+        
+        Args:
+            rows: Dictionaries with contact_id, channel and UTC send_date
+                and expiration_date strings (see rows)
+        
+        Returns:
+            SendPlan
+        """
+        rows = list(rows)
+        return cls(
+            [row['contact_id'] for row in rows],
+            [row['channel'] for row in rows],
+            _parse_dates(row['send_date'] for row in rows),
+            _parse_dates(row['expiration_date'] for row in rows)
+        )
+    
+    def diff(self, scheduled: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Compare the plan with distributions that are already scheduled.
+        
+        Invitations match on contact, channel and send date (to the second).
+        
+        Args:
+            scheduled: Dictionaries with contact_id, channel and send_date
+                (see diff_ledger and diff_distributions)
+        
+        Returns:
+            Dictionary with
+            - new: plan rows that are not scheduled yet
+            - scheduled: plan rows that are already scheduled
+            - unplanned: scheduled entries that are not in the plan
+        """
+        remaining = Counter()
+        unmatched: Dict[PlanKey, List[Dict[str, Any]]] = {}
+        for entry in scheduled:
+            key = (entry['contact_id'], entry['channel'], _format_date(entry['send_date']))
+            remaining[key] += 1
+            unmatched.setdefault(key, []).append(entry)
+        
+        result = {'new': [], 'scheduled': [], 'unplanned': []}
+        for row in self.rows():
+            key = (row['contact_id'], row['channel'], row['send_date'])
+            if remaining[key] > 0:
+                remaining[key] -= 1
+                unmatched[key].pop()
+                result['scheduled'].append(row)
+            else:
+                result['new'].append(row)
+        
+        for entries in unmatched.values():
+            result['unplanned'].extend(entries)
+        return result
+    
+    def diff_ledger(
+        self,
+        ledger: DistributionLedger,
+        mailing_list_id: Optional[str] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Compare the plan with the distributions recorded in the ledger.
+        
+        Args:
+            ledger: Distribution ledger
+            mailing_list_id: Only distributions of this mailing list
+        
+        Returns:
+            See diff, unplanned entries are ledger entries
+        """
+        return self.diff(ledger.live(mailing_list_id=mailing_list_id))
+    
+    def diff_distributions(
+        self,
+        distributions: Iterable[Dict[str, Any]],
+        channel: str,
+        contact_ids: Dict[str, str]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Compare the plan with a live distribution listing.
+        
+        Listings identify recipients by contactLookupId. Distributions of
+        recipients missing from contact_ids are reported as unplanned.
+        
+        Args:
+            distributions: Distribution dictionaries of one channel
+                (DistributionsAPI.iter_sms_distributions or
+                iter_email_distributions)
+            channel: 'sms' or 'email'
+            contact_ids: contactLookupId -> contactId
+        
+        Returns:
+            See diff, unplanned entries are distribution dictionaries with
+            contact_id, channel and send_date added
+        """
+        def entries():
+            for distribution in distributions:
+                lookup_id = distribution_lookup_id(distribution)
+                if lookup_id is None or not distribution.get('sendDate'):
+                    continue
+                yield dict(
+                    distribution,
+                    contact_id=contact_ids.get(lookup_id, lookup_id),
+                    channel=channel,
+                    send_date=distribution['sendDate']
+                )
+        
+        plan = self._channel(channel)
+        return plan.diff(entries())
+    
+    def _channel(self, channel: str) -> 'SendPlan':
+        """Rows of one channel."""
+        rows = self.channel == channel
+        return SendPlan(self.contact_id[rows], self.channel[rows], self.send_date[rows], self.expiration_date[rows])
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Parquet plan files need pyarrow: pip install pyarrow")
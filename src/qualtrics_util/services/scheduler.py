@@ -3,12 +3,28 @@ Scheduler service for distributing surveys via SMS or Email.
 
 This module handles scheduling of survey distributions with time slots
 and timezone management.
+
+Schedules are built in batches (see build_schedule_batch): the send and
+expiration instants of many participants are computed as NumPy datetime64
+arrays, with range slots drawn in one vectorized call and UTC offsets
+looked up in a ZoneOffsetIndex of the zones and dates of the batch.
+ScheduleBatch.future_only drops the rows whose send time has passed before
+they are posted.
 """
 
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Tuple
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 from zoneinfo import ZoneInfo
 import dateutil.parser
+import numpy as np
+from ..utils.zone_offsets import ZoneOffsetIndex, epoch_days
+
+
+# Minutes in a day, slot times must fall before midnight
+MINUTES_PER_DAY = 24 * 60
+
+# Send times less than this many minutes ahead are skipped like past ones
+DEFAULT_GRACE_MINUTES = 0
 
 
 def check_time_slots(parts: list) -> bool:
@@ -109,42 +125,220 @@ def calculate_send_times(params: Dict[str, Any]) -> List[Tuple[datetime, datetim
     Returns:
         List of tuples containing (send_time_utc, expiration_time_utc)
     """
-    # Check time slots format
-    if not check_time_slots(params['timeSlots']):
-        raise ValueError(f"Error in format of timeSlots {params['timeSlots']}")
-    
-    total_count = params['numDays'] * len(params['timeSlots'])
-    send_times = []
-    
-    for day in range(params['numDays']):
-        for raw_time in params['timeSlots']:
-            
-            time = get_time(raw_time)
-            
-            # Parse start date
-            dobj = dateutil.parser.parse(params['startDate'])
-            hour = int(time) // 100
-            min = int(time) % 100
-            
-            # Create datetime in recipient's timezone
-            start_recipient_time = datetime(
-                dobj.year, dobj.month, dobj.day, hour, min, 0,
-                tzinfo=ZoneInfo(params['timeZone'])
-            )
-            
-            # Add the day delta
-            recipient_time = start_recipient_time + timedelta(days=day)
-            
-            # Convert to UTC
-            recipient_time_utc = recipient_time.astimezone(ZoneInfo("UTC"))
-            
-            # Calculate expiration time
-            expire_minutes = params.get('ExpireMinutes', 60)
-            expiration_time_utc = recipient_time_utc + timedelta(minutes=expire_minutes)
-            
-            send_times.append((recipient_time_utc, expiration_time_utc))
-    
-    return send_times
+    return build_schedule_batch([params]).for_participant(0)
+
+
+class ScheduleBatch:
+    """
+    Send and expiration instants of many participants.
+    
+    Rows are grouped by participant and ordered by day, then by time slot,
+    like calculate_send_times. Instants are UTC datetime64[s] values.
+    
+    Attributes:
+        participant: Index of each row's participant in the input
+        send_times: UTC send instant of each row
+        expiration_times: UTC expiration instant of each row
+        skipped: Participant index of each row dropped by future_only
+    """
+    
+    def __init__(
+        self,
+        participant: np.ndarray,
+        send_times: np.ndarray,
+        expiration_times: np.ndarray,
+        skipped: Optional[np.ndarray] = None
+    ):
+        self.participant = participant
+        self.send_times = send_times
+        self.expiration_times = expiration_times
+        self.skipped = skipped if skipped is not None else np.empty(0, dtype=participant.dtype)
+    
+    def __len__(self) -> int:
+        return len(self.participant)
+    
+    def rows(self, index: int) -> slice:
+        """Rows of one participant."""
+        return slice(
+            int(np.searchsorted(self.participant, index, 'left')),
+            int(np.searchsorted(self.participant, index, 'right'))
+        )
+    
+    def future_only(self, now: Optional[datetime] = None, grace_minutes: float = 0) -> 'ScheduleBatch':
+        """
+        Drop the rows whose send time has passed.
+        
+        Args:
+            now: Reference time (default: current UTC time)
+            grace_minutes: Also drop send times less than this many minutes
+                after now (see should_schedule_future_only)
+        
+        Returns:
+            ScheduleBatch of the remaining rows, with the dropped rows'
+            participants added to skipped
+        """
+        keep = future_only_mask(self.send_times, now, grace_minutes)
+        return ScheduleBatch(
+            self.participant[keep], self.send_times[keep], self.expiration_times[keep],
+            np.concatenate([self.skipped, self.participant[~keep]])
+        )
+    
+    def skipped_counts(self, size: int) -> np.ndarray:
+        """
+        Number of rows future_only dropped per participant.
+        
+        Args:
+            size: Number of participants in the batch input
+        
+        Returns:
+            Array of counts indexed by participant
+        """
+        return np.bincount(self.skipped, minlength=size)
+    
+    def for_participant(self, index: int) -> List[Tuple[datetime, datetime]]:
+        """
+        Schedule of one participant as datetimes.
+        
+        Args:
+            index: Index of the participant in the input of build_schedule_batch
+        
+        Returns:
+            List of (send_time_utc, expiration_time_utc) timezone-aware datetimes
+        """
+        rows = self.rows(index)
+        utc = ZoneInfo("UTC")
+        return [
+            (send.replace(tzinfo=utc), expire.replace(tzinfo=utc))
+            for send, expire in zip(self.send_times[rows].tolist(), self.expiration_times[rows].tolist())
+        ]
+
+
+def build_schedule_batch(
+    participants: Sequence[Dict[str, Any]],
+    rng: Optional[np.random.Generator] = None,
+    offsets: Optional[ZoneOffsetIndex] = None
+) -> ScheduleBatch:
+    """
+    Calculate the send and expiration times of many participants at once.
+    
+    Each participant is scheduled like calculate_send_times: every time slot
+    on numDays days from startDate, in local time of timeZone. A range slot
+    gets a random minute within the range, drawn per day.
+    
+    Slots skipped or repeated by a DST transition follow the policies of
+    the offset index. The default index uses the offset in effect before
+    the transition, like datetime does.
+    
+    Args:
+        participants: Dictionaries with startDate, timeSlots, numDays,
+            timeZone and optionally ExpireMinutes (default 60)
+        rng: NumPy random generator for range slots (default: fresh generator)
+        offsets: Offset index covering the zones and dates of the batch
+            (default: built for this batch)
+    
+    Returns:
+        ScheduleBatch with one row per scheduled survey
+    
+    Raises:
+        ValueError: If a participant's timeSlots are malformed, or a
+            date is outside the window of offsets
+        NonexistentTimeError: For a skipped slot if offsets raises on them
+        AmbiguousTimeError: For a repeated slot if offsets raises on them
+    
+    Example:
+        >>> batch = build_schedule_batch(cohort)
+        >>> batch.send_times[batch.rows(0)]
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    count = len(participants)
+    
+    zones: Dict[str, int] = {}
+    start_dates: Dict[str, int] = {}
+    slot_sets: Dict[str, int] = {}
+    slot_low: List[int] = []
+    slot_high: List[int] = []
+    slot_first: List[int] = []
+    slot_count: List[int] = []
+    zone, start, num_days, expire_minutes, slot_set = [], [], [], [], []
+    
+    # Participants of a cohort share few start dates, zones and slot lists,
+    # each distinct value is parsed once
+    for params in participants:
+        slots_key = repr(params['timeSlots'])
+        if slots_key not in slot_sets:
+            if not check_time_slots(params['timeSlots']):
+                raise ValueError(f"Error in format of timeSlots {params['timeSlots']}")
+            slot_sets[slots_key] = len(slot_first)
+            slot_first.append(len(slot_low))
+            slot_count.append(len(params['timeSlots']))
+            for slot in params['timeSlots']:
+                low, high = _slot_minutes(slot)
+                slot_low.append(low)
+                slot_high.append(high)
+        if params['startDate'] not in start_dates:
+            start_dates[params['startDate']] = _parse_start_date(params['startDate'])
+        
+        zone.append(zones.setdefault(params['timeZone'], len(zones)))
+        start.append(start_dates[params['startDate']])
+        num_days.append(params['numDays'])
+        expire_minutes.append(params.get('ExpireMinutes', 60))
+        slot_set.append(slot_sets[slots_key])
+    
+    zone = np.asarray(zone, dtype=np.int64)
+    start = np.asarray(start, dtype=np.int64)
+    num_days = np.asarray(num_days, dtype=np.int64)
+    expire_minutes = np.asarray(expire_minutes, dtype=np.int64)
+    slot_set = np.asarray(slot_set, dtype=np.int64)
+    num_slots = np.asarray(slot_count, dtype=np.int64)[slot_set]
+    
+    # One row per participant, day and slot, day-major within a participant
+    per_participant = np.maximum(num_days, 0) * num_slots
+    participant = np.repeat(np.arange(count), per_participant)
+    first_row = np.cumsum(per_participant) - per_participant
+    position = np.arange(len(participant)) - first_row[participant]
+    day = position // num_slots[participant]
+    slot = np.asarray(slot_first, dtype=np.int64)[slot_set][participant] + position % num_slots[participant]
+    
+    # Range slots: one draw per row, truncated to the minute
+    low = np.asarray(slot_low, dtype=np.int64)[slot]
+    high = np.asarray(slot_high, dtype=np.int64)[slot]
+    minutes = low + np.floor(rng.random(len(slot)) * (high - low)).astype(np.int64)
+    
+    local_date = start[participant] + day
+    local = (local_date * 86400 + minutes * 60).astype('datetime64[s]')
+    
+    if len(local_date) == 0:
+        offset = np.zeros(0, dtype=np.int64)
+    else:
+        if offsets is None:
+            offsets = ZoneOffsetIndex(zones, int(local_date.min()), int(local_date.max()))
+        zone_rows = np.asarray([offsets.zone_index(name) for name in zones], dtype=np.int64)
+        offset = offsets.offsets(zone_rows[zone[participant]], local_date, minutes)
+    send_times = local - offset.astype('timedelta64[s]')
+    expiration_times = send_times + (expire_minutes[participant] * 60).astype('timedelta64[s]')
+    
+    return ScheduleBatch(participant, send_times, expiration_times)
+
+
+def _parse_start_date(value: str) -> int:
+    """Local start date of a schedule as days since 1970-01-01, ISO dates without dateutil."""
+    try:
+        day = date.fromisoformat(value[:10])
+    except ValueError:
+        day = dateutil.parser.parse(value).date()
+    return epoch_days(day)
+
+
+def _slot_minutes(slot) -> Tuple[int, int]:
+    """Minutes after midnight of a slot, (low, high) for a range, (t, t) otherwise."""
+    if isinstance(slot, list):
+        # like random.uniform, a reversed range draws between its ends
+        low, high = sorted(hhmm // 100 * 60 + hhmm % 100 for hhmm in slot)
+    else:
+        low = high = int(slot) // 100 * 60 + int(slot) % 100
+    if not 0 <= low <= high < MINUTES_PER_DAY:
+        raise ValueError(f"Time slot {slot} is not within one day")
+    return low, high
 
 
 def format_qualtrics_datetime(dt: datetime) -> str:
@@ -160,18 +354,48 @@ def format_qualtrics_datetime(dt: datetime) -> str:
     return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
 
 
-def should_schedule_future_only(send_time: datetime) -> bool:
+def should_schedule_future_only(
+    send_time: datetime,
+    now: Optional[datetime] = None,
+    grace_minutes: float = 0
+) -> bool:
     """
-    Check if send time is in the future.
+    Check if send time is far enough in the future to schedule.
     
     Args:
         send_time: UTC datetime to check
+        now: Reference time (default: current UTC time)
+        grace_minutes: Also skip send times less than this many minutes
+            after now
     
     Returns:
-        bool: True if send time is in the future, False otherwise
+        bool: True if send time is more than grace_minutes after now, False otherwise
     """
-    from datetime import datetime
-    from zoneinfo import ZoneInfo
+    if now is None:
+        now = datetime.now(ZoneInfo("UTC"))
+    return send_time > now + timedelta(minutes=grace_minutes)
+
+
+def future_only_mask(
+    send_times: np.ndarray,
+    now: Optional[datetime] = None,
+    grace_minutes: float = 0
+) -> np.ndarray:
+    """
+    Vectorized should_schedule_future_only.
+    
+    Args:
+        send_times: UTC send instants (datetime64)
+        now: Reference time (default: current UTC time)
+        grace_minutes: Also skip send times less than this many minutes
+            after now
     
-    now = datetime.now(ZoneInfo("UTC"))
-    return send_time > now
+    Returns:
+        Boolean array, True for send times to schedule
+    """
+    if now is None:
+        now = datetime.now(ZoneInfo("UTC"))
+    if now.tzinfo is not None:
+        now = now.astimezone(ZoneInfo("UTC")).replace(tzinfo=None)
+    cutoff = np.datetime64(now + timedelta(minutes=grace_minutes), 's')
+    return np.asarray(send_times, dtype='datetime64[s]') > cutoff
@@ -0,0 +1,516 @@
+"""
+Concurrent scheduling of survey invitations.
+
+Eligible contacts are fanned out over a bounded thread pool. Each contact is
+handled by a single worker, so its invitations are posted in order and its
+SurveysScheduled counter is collected in a ContactUpdateBuffer and written
+once, after the last invitation. All requests go through the clients'
+shared session and rate limiter. With a DistributionLedger every posted
+invitation is recorded locally with its distributionId. A plan computed
+earlier (see planner.SendPlan) can be executed with run_plan.
+
+With a SendJournal a contact's invitations are journaled before the first
+POST and each one is marked done after it, so an interrupted run resumes
+where it stopped: the journaled send times are reused and invitations that
+are done are not posted again.
+
+Send times that have already passed (or are less than grace_minutes ahead)
+are skipped before they reach the API and counted per contact. With a
+journal they are journaled as skipped, and a contact whose schedule was
+skipped entirely is left out of later runs until its schedule changes.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+from ..api.base import QualtricsAPIError
+from ..api.contacts import ContactsAPI
+from ..api.distributions import DistributionsAPI
+from ..api.messages import MessagesAPI
+from ..models.distribution_index import SEND_DATE_FORMAT, DistributionIndex
+from ..models.embedded_data import get_contact_method, get_time_slots, should_send_survey
+from ..storage.journal import DONE, POSTING, SKIPPED, SendJournal
+from ..storage.ledger import DistributionLedger
+from .scheduler import DEFAULT_GRACE_MINUTES, build_schedule_batch, calculate_send_times, should_schedule_future_only
+from .update_buffer import ContactUpdateBuffer
+
+
+# Default number of contacts scheduled at once
+DEFAULT_SEND_WORKERS = 8
+
+
+def build_send_params(
+    contact: Dict[str, Any],
+    default_time_zone: str,
+    default_expire_minutes: int = 60
+) -> Optional[Dict[str, Any]]:
+    """
+    Build scheduling parameters for a contact.
+    
+    Args:
+        contact: Contact dictionary with embeddedData
+        default_time_zone: Time zone used when the contact has none
+        default_expire_minutes: Expiration used when the contact has none
+    
+    Returns:
+        Parameters for calculate_send_times plus contactId, method and
+        contactInfo, or None if the contact should not be scheduled
+    """
+    if not should_send_survey(contact):
+        return None
+    
+    time_slots = get_time_slots(contact)
+    if len(time_slots) == 0:
+        return None
+    
+    embedded_data = contact.get('embeddedData', {})
+    
+    return {
+        'contactId': contact['contactId'],
+        'method': get_contact_method(contact),
+        'timeZone': embedded_data.get('TimeZone') or default_time_zone,
+        'startDate': embedded_data['StartDate'],
+        'timeSlots': time_slots,
+        'numDays': int(embedded_data.get('NumDays', 0)),
+        'ExpireMinutes': int(embedded_data.get('ExpireMinutes', default_expire_minutes)),
+        'contactInfo': contact,
+    }
+
+
+def schedule_id(params: Dict[str, Any]) -> Optional[str]:
+    """
+    Identify the schedule of a contact's parameters.
+    
+    Contacts scheduled from their embedded data are identified by
+    StartDate, time slots and NumDays, so a new StartDate is a new schedule
+    while rerunning the same one is not. Planned contacts (see
+    SendPlan.send_params) are identified by their send times.
+    
+    Args:
+        params: Parameters from build_send_params or SendPlan.send_params
+    
+    Returns:
+        Schedule ID, or None for parameters without a schedule (contacts
+        resumed from the journal)
+    """
+    if 'startDate' in params:
+        slots = ','.join(str(slot) for slot in params['timeSlots'])
+        return f"{params['startDate']}/{slots}/{params['numDays']}"
+    if params.get('sendTimes'):
+        send_dates = [send_time.strftime(SEND_DATE_FORMAT) for send_time, _ in params['sendTimes']]
+        return f"plan/{send_dates[0]}/{send_dates[-1]}/{len(send_dates)}"
+    return None
+
+
+class SendEngine:
+    """
+    Schedule invitations for many contacts concurrently.
+    
+    Example:
+        >>> engine = SendEngine(contacts_api, distributions_api, messages_api,
+        ...                     sms_message_id='MS_1', email_message_id='MS_2')
+        >>> contacts = contact_store.eligible_for_send(contacts_api.mailing_list_id)
+        >>> results = engine.run(contacts, default_time_zone='America/Chicago')
+    """
+    
+    def __init__(
+        self,
+        contacts_api: ContactsAPI,
+        distributions_api: DistributionsAPI,
+        messages_api: MessagesAPI,
+        sms_message_id: str,
+        email_message_id: Optional[str] = None,
+        max_workers: int = DEFAULT_SEND_WORKERS,
+        update_buffer: Optional[ContactUpdateBuffer] = None,
+        ledger: Optional[DistributionLedger] = None,
+        journal: Optional[SendJournal] = None,
+        future_only: bool = True,
+        grace_minutes: float = DEFAULT_GRACE_MINUTES,
+        config_file: Optional[str] = None,
+        verbose: int = 1
+    ):
+        """
+        Initialize the send engine.
+        
+        Args:
+            contacts_api: ContactsAPI for lookup IDs and counter updates
+            distributions_api: DistributionsAPI used to post invitations
+            messages_api: MessagesAPI serving the (cached) message templates
+            sms_message_id: Library message for SMS invitations
+            email_message_id: Library message for email invitations
+                (defaults to sms_message_id)
+            max_workers: Maximum number of contacts scheduled at once
+            update_buffer: Optional buffer for the embedded data updates
+            ledger: Optional ledger recording every posted invitation
+            journal: Optional write-ahead journal that makes runs resumable
+            future_only: Skip send times that have passed
+            grace_minutes: Also skip send times less than this many minutes
+                ahead (see should_schedule_future_only)
+            config_file: Configuration file recorded in the ledger
+            verbose: Verbosity level (0-3)
+        """
+        self.contacts_api = contacts_api
+        self.distributions_api = distributions_api
+        self.messages_api = messages_api
+        self.sms_message_id = sms_message_id
+        self.email_message_id = email_message_id or sms_message_id
+        self.max_workers = max_workers
+        self.updates = update_buffer or ContactUpdateBuffer(contacts_api, verbose=verbose)
+        self.ledger = ledger
+        self.journal = journal
+        self.future_only = future_only
+        self.grace_minutes = grace_minutes
+        self.config_file = config_file
+        self.verbose = verbose
+        # survey distributions per channel, listed once to check in-doubt posts
+        self._posted: Dict[str, DistributionIndex] = {}
+        self._posted_lock = threading.Lock()
+    
+    def schedule_contact(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Post every invitation of one contact in order, then update its counter.
+        
+        Scheduling stops at the first failed invitation. The counter is
+        still set to the number of invitations posted so far. Until the
+        contact is flushed the counter only lives in the update buffer.
+        
+        With a journal the contact's journaled invitations are used when
+        there are any (see _journal_entries) and the counter counts the
+        invitations posted by earlier runs too.
+        
+        Args:
+            params: Parameters from build_send_params, with sendTimes when
+                the schedule was already computed (see run)
+        
+        Returns:
+            Dictionary with contactId, scheduled, total, skipped (send times
+            that had passed) and error (None on success)
+        """
+        contact_id = params['contactId']
+        mailing_list_id = self.contacts_api.mailing_list_id
+        result = {'contactId': contact_id, 'scheduled': 0, 'total': 0, 'skipped': params.get('skipped', 0), 'error': None}
+        
+        try:
+            if self.journal is not None:
+                entries = self._journal_entries(params)
+            else:
+                send_times = params['sendTimes'] if 'sendTimes' in params else calculate_send_times(params)
+                entries = [{'send_time': send, 'expiration_time': expire} for send, expire in send_times]
+            result['total'] = len(entries)
+            
+            lookup_id = self.contacts_api.get_contact_lookup_id(mailing_list_id, contact_id)
+            
+            for entry in entries:
+                if self.journal is not None and self._already_posted(params, lookup_id, entry):
+                    pass
+                elif self._passed(entry['send_time']):
+                    # e.g. a plan or journal entry that was not posted in time
+                    result['skipped'] += 1
+                    if self.journal is not None:
+                        self.journal.mark_skipped(entry['seq'])
+                    continue
+                else:
+                    self._post(params, lookup_id, entry)
+                result['scheduled'] += 1
+                self.updates.update(contact_id, {'SurveysScheduled': result['scheduled']})
+        except Exception as e:
+            result['error'] = str(e)
+        
+        try:
+            self.updates.flush(contact_id)
+        except Exception as e:
+            # still pending, retried at the end of the run
+            result['error'] = result['error'] or f"SurveysScheduled update failed: {e}"
+        
+        if self.verbose > 0:
+            if result['error'] is None:
+                skipped = f", skipped {result['skipped']} past" if result['skipped'] else ""
+                print(f"Scheduled {result['scheduled']} surveys for {contact_id}{skipped}")
+            else:
+                print(f"Scheduled {result['scheduled']} of {result['total']} surveys for "
+                      f"{contact_id} before error: {result['error']}")
+        
+        return result
+    
+    def _passed(self, send_time: datetime) -> bool:
+        """Whether a send time is to be skipped as past."""
+        return self.future_only and not should_schedule_future_only(send_time, grace_minutes=self.grace_minutes)
+    
+    def _post(self, params: Dict[str, Any], lookup_id: str, entry: Dict[str, Any]) -> None:
+        """Post one invitation, journaling it around the POST."""
+        mailing_list_id = self.contacts_api.mailing_list_id
+        send_time, expiration_time = entry['send_time'], entry['expiration_time']
+        
+        if self.journal is not None:
+            self.journal.mark_posting(entry['seq'], lookup_id)
+        
+        try:
+            if params['method'] == 'EMAIL':
+                response = self.distributions_api.send_email_distribution(
+                    lookup_id, send_time, expiration_time,
+                    self.messages_api.get_message_with_random_text(self.email_message_id),
+                    mailing_list_id
+                )
+            else:
+                # send_sms_distribution adds its own random suffix
+                response = self.distributions_api.send_sms_distribution(
+                    lookup_id, send_time, expiration_time,
+                    self.messages_api.get_message(self.sms_message_id),
+                    mailing_list_id
+                )
+        except Exception as e:
+            if self.journal is not None:
+                if isinstance(e, QualtricsAPIError) and e.status_code is not None and e.status_code < 500:
+                    # rejected, nothing was created
+                    self.journal.mark_planned(entry['seq'], str(e))
+                else:
+                    # no answer, it may have been created: stays posting
+                    self.journal.set_error(entry['seq'], str(e))
+            raise
+        
+        distribution_id = self._record(params, lookup_id, send_time, expiration_time, response)
+        if self.journal is not None:
+            self.journal.mark_done(entry['seq'], distribution_id)
+    
+    def _journal_entries(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Journal entries of a contact's current schedule.
+        
+        A contact that still has planned or posting invitations is resumed
+        from them, whatever its parameters are. Otherwise the schedule of
+        the parameters (see schedule_id) is journaled first, unless it
+        already is, in any state: a new StartDate starts a new generation,
+        while rerunning the same schedule (e.g. after its counter update was
+        lost) reuses its entries, so time ranges keep the times drawn the
+        first time and done invitations are not posted again.
+        """
+        mailing_list_id = self.contacts_api.mailing_list_id
+        contact_id = params['contactId']
+        channel = _channel(params)
+        
+        current = self.journal.unfinished_schedule(mailing_list_id, contact_id, channel)
+        if current is None:
+            current = schedule_id(params)
+            if current is None:
+                return []
+            if not self.journal.has_schedule(mailing_list_id, contact_id, channel, current):
+                send_times = params['sendTimes'] if 'sendTimes' in params else calculate_send_times(params)
+                self.journal.add(mailing_list_id, contact_id, channel, send_times, current)
+        
+        entries = self.journal.entries(mailing_list_id, contact_id, channel, schedule_id=current)
+        for entry in entries:
+            entry['send_time'] = _parse_date(entry['send_date'])
+            entry['expiration_time'] = _parse_date(entry['expiration_date'])
+        return entries
+    
+    def _already_posted(self, params: Dict[str, Any], lookup_id: str, entry: Dict[str, Any]) -> bool:
+        """
+        Whether a journaled invitation is already in Qualtrics.
+        
+        Done entries are. Entries left posting by an interrupted run are
+        looked up in the survey's distribution listing by recipient and
+        send date, and marked done when found.
+        """
+        if entry['state'] == DONE:
+            return True
+        if entry['state'] != POSTING:
+            return False
+        
+        for distribution in self._posted_index(_channel(params)).for_contact(lookup_id):
+            if distribution.get('sendDate') == entry['send_date']:
+                if self.verbose > 0:
+                    print(f"Found {distribution.get('id')} for {params['contactId']} at {entry['send_date']}, not posting again")
+                self.journal.mark_done(entry['seq'], distribution.get('id'))
+                return True
+        return False
+    
+    def _posted_index(self, channel: str) -> DistributionIndex:
+        """Distributions of the survey for a channel, listed once."""
+        with self._posted_lock:
+            if channel not in self._posted:
+                if channel == 'email':
+                    distributions = self.distributions_api.iter_email_distributions(self.contacts_api.mailing_list_id)
+                else:
+                    distributions = self.distributions_api.iter_sms_distributions()
+                self._posted[channel] = DistributionIndex(distributions)
+            return self._posted[channel]
+    
+    def _record(self, params, lookup_id, send_time, expiration_time, response) -> Optional[str]:
+        """Add a posted invitation to the ledger, if one is used, and return its distribution ID."""
+        if self.ledger is None and self.journal is None:
+            return None
+        
+        distribution_id = response.json().get('result', {}).get('id')
+        if self.ledger is None:
+            return distribution_id
+        
+        if not distribution_id:
+            if self.verbose > 0:
+                print(f"No distribution ID returned for {params['contactId']}, not recorded")
+            return None
+        
+        self.ledger.record(
+            distribution_id, params['contactId'], lookup_id, send_time, expiration_time,
+            _channel(params),
+            mailing_list_id=self.contacts_api.mailing_list_id,
+            survey_id=self.distributions_api.survey_id,
+            config=self.config_file
+        )
+        return distribution_id
+    
+    def run(
+        self,
+        contacts: Iterable[Dict[str, Any]],
+        default_time_zone: str,
+        default_expire_minutes: int = 60
+    ) -> List[Dict[str, Any]]:
+        """
+        Schedule every eligible contact.
+        
+        Args:
+            contacts: Contact dictionaries with embeddedData
+            default_time_zone: Time zone used when a contact has none
+            default_expire_minutes: Expiration used when a contact has none
+        
+        Returns:
+            One result dictionary per scheduled contact (see schedule_contact)
+        
+        Counters that are still buffered when the run is interrupted are
+        written before the exception propagates. With a journal, contacts with
+        unfinished journaled invitations are resumed as well, and contacts
+        whose current schedule was already skipped entirely are left out.
+        """
+        send_params = []
+        for contact in contacts:
+            params = build_send_params(contact, default_time_zone, default_expire_minutes)
+            if params is not None:
+                send_params.append(params)
+        
+        if self.journal is not None:
+            # still eligible (counter 0) but nothing left to send
+            passed = self.journal.skipped_schedules(self.contacts_api.mailing_list_id)
+            eligible = len(send_params)
+            send_params = [
+                params for params in send_params
+                if (params['contactId'], _channel(params), schedule_id(params)) not in passed
+            ]
+            if self.verbose > 0 and len(send_params) < eligible:
+                print(f"Left out {eligible - len(send_params)} contacts whose send times all passed in earlier runs")
+        
+        # Compute every contact's schedule in one batch, without past send times
+        full_batch = build_schedule_batch(send_params)
+        batch = full_batch.future_only(grace_minutes=self.grace_minutes) if self.future_only else full_batch
+        skipped = batch.skipped_counts(len(send_params)).tolist()
+        for index, params in enumerate(send_params):
+            params['sendTimes'] = batch.for_participant(index)
+            params['skipped'] = skipped[index]
+        
+        # Contacts whose send times have all passed need no API calls
+        idle = [index for index, params in enumerate(send_params) if not params['sendTimes']]
+        
+        # Contacts of an interrupted run are resumed even though their
+        # counter is no longer 0
+        resumed = self.unfinished_params(
+            exclude=[params['contactId'] for params in send_params if params['sendTimes']]
+        )
+        resumed_ids = {params['contactId'] for params in resumed}
+        idle = [index for index in idle if send_params[index]['contactId'] not in resumed_ids]
+        idle_results = [
+            {'contactId': send_params[index]['contactId'], 'scheduled': 0, 'total': 0,
+             'skipped': send_params[index]['skipped'], 'error': None}
+            for index in idle
+        ]
+        if self.journal is not None:
+            # the next run leaves these contacts out (see skipped_schedules)
+            for index in idle:
+                params = send_params[index]
+                if self.journal.has_schedule(
+                    self.contacts_api.mailing_list_id, params['contactId'], _channel(params), schedule_id(params)
+                ):
+                    continue
+                self.journal.add(
+                    self.contacts_api.mailing_list_id, params['contactId'], _channel(params),
+                    full_batch.for_participant(index), schedule_id(params), state=SKIPPED
+                )
+        send_params = [params for params in send_params if params['sendTimes']] + resumed
+        
+        if self.verbose > 0:
+            if sum(skipped):
+                print(f"Skipped {sum(skipped)} past send times of {sum(1 for n in skipped if n)} contacts")
+            print(f"Scheduling {len(send_params)} contacts with {self.max_workers} workers")
+            if resumed:
+                print(f"Resuming {len(resumed)} contacts from the journal")
+        
+        if not send_params:
+            return idle_results
+        
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(send_params))) as executor:
+                return list(executor.map(self.schedule_contact, send_params)) + idle_results
+        finally:
+            self.updates.checkpoint()
+    
+    def run_plan(self, plan) -> List[Dict[str, Any]]:
+        """
+        Schedule the invitations of a plan.
+        
+        The send times come from the plan, so nothing is recomputed and
+        the contacts are not checked again. Diff the plan against the
+        ledger first (SendPlan.diff_ledger) to leave out invitations that
+        are already scheduled. SurveysScheduled is set to the number of
+        invitations of the contact posted in this run. Planned send times
+        that have passed by now are skipped.
+        
+        Args:
+            plan: SendPlan to execute
+        
+        Returns:
+            One result dictionary per contact (see schedule_contact)
+        """
+        send_params = plan.send_params()
+        if not send_params:
+            return []
+        
+        if self.verbose > 0:
+            print(f"Scheduling {len(plan)} planned invitations for {len(send_params)} contacts "
+                  f"with {self.max_workers} workers")
+        
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(send_params))) as executor:
+                return list(executor.map(self.schedule_contact, send_params))
+        finally:
+            self.updates.checkpoint()
+    
+    def unfinished_params(self, exclude: Iterable[str] = ()) -> List[Dict[str, Any]]:
+        """
+        Parameters of the contacts with unfinished journaled invitations.
+        
+        Args:
+            exclude: Contact IDs to leave out
+        
+        Returns:
+            Parameters for schedule_contact (contactId and method), empty
+            without a journal
+        """
+        if self.journal is None:
+            return []
+        
+        exclude = set(exclude)
+        return [
+            {'contactId': contact_id, 'method': channel.upper()}
+            for contact_id, channel in self.journal.unfinished(self.contacts_api.mailing_list_id)
+            if contact_id not in exclude
+        ]
+
+
+def _channel(params: Dict[str, Any]) -> str:
+    """Ledger and journal channel of a contact's parameters."""
+    return 'email' if params['method'] == 'EMAIL' else 'sms'
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    """UTC datetime of a journaled date string."""
+    if value is None:
+        return None
+    return datetime.strptime(value, SEND_DATE_FORMAT).replace(tzinfo=timezone.utc)
@@ -0,0 +1,138 @@
+"""
+Write-behind buffer for contact embedded data.
+
+Scheduling a participant changes the same embedded data fields (such as
+SurveysScheduled) after every invitation. The buffer collects these changes
+in memory and writes one PUT per contact when the contact is done, or for
+every pending contact at a checkpoint, so an interrupted run still records
+what was scheduled.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+from ..api.contacts import ContactsAPI
+
+
+class ContactUpdateBuffer:
+    """
+    Collect embedded data changes and flush one update per contact.
+    
+    Changes to the same field are coalesced, the last value wins. Use the
+    buffer as a context manager to flush everything that is still pending
+    on exit, including when an exception or KeyboardInterrupt ends the run.
+    
+    Example:
+        >>> with ContactUpdateBuffer(contacts_api) as updates:
+        ...     for count, invite in enumerate(invites, start=1):
+        ...         post(invite)
+        ...         updates.update(contact_id, {'SurveysScheduled': count})
+        ...     updates.flush(contact_id)
+    """
+    
+    def __init__(self, contacts_api: ContactsAPI, verbose: int = 0):
+        """
+        Initialize the buffer.
+        
+        Args:
+            contacts_api: ContactsAPI used to write the updates
+            verbose: Verbosity level (0-3)
+        """
+        self.contacts_api = contacts_api
+        self.verbose = verbose
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.coalesced = 0
+    
+    def update(self, contact_id: str, fields: Dict[str, Any]) -> None:
+        """
+        Record embedded data changes for a contact.
+        
+        Args:
+            contact_id: Contact ID
+            fields: Embedded data fields and their new values
+        """
+        with self._lock:
+            pending = self._pending.setdefault(contact_id, {})
+            if pending:
+                self.coalesced += 1
+            pending.update(fields)
+    
+    def pending(self, contact_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Changes not written yet.
+        
+        Args:
+            contact_id: Contact ID (None for all contacts)
+        
+        Returns:
+            Fields of one contact, or contact ID -> fields for all
+        """
+        with self._lock:
+            if contact_id is not None:
+                return dict(self._pending.get(contact_id, {}))
+            return {cid: dict(fields) for cid, fields in self._pending.items()}
+    
+    def flush(self, contact_id: Optional[str] = None) -> int:
+        """
+        Write pending changes, one update per contact.
+        
+        A contact whose update fails keeps its changes pending (merged
+        under any newer ones) and the error is raised after the other
+        contacts have been written.
+        
+        Args:
+            contact_id: Contact to flush (None for every pending contact)
+        
+        Returns:
+            Number of contacts written
+        
+        Raises:
+            QualtricsAPIError: If an update fails
+        """
+        with self._lock:
+            if contact_id is None:
+                batch, self._pending = self._pending, {}
+            elif contact_id in self._pending:
+                batch = {contact_id: self._pending.pop(contact_id)}
+            else:
+                batch = {}
+        
+        written = 0
+        error = None
+        
+        for cid, fields in batch.items():
+            try:
+                # embedded data only, the contact keeps its language
+                self.contacts_api.update_contact(cid, {'embeddedData': dict(fields)}, default_language=False)
+                written += 1
+            except Exception as e:
+                with self._lock:
+                    fields.update(self._pending.get(cid, {}))
+                    self._pending[cid] = fields
+                error = error or e
+        
+        with self._lock:
+            self.writes += written
+        
+        if self.verbose > 1 and written:
+            print(f"Flushed embedded data for {written} contacts")
+        
+        if error is not None:
+            raise error
+        return written
+    
+    def checkpoint(self) -> int:
+        """
+        Flush every pending contact.
+        
+        Returns:
+            Number of contacts written
+        """
+        return self.flush()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.checkpoint()
@@ -0,0 +1,6 @@
+"""
+Local storage for qualtrics_util.
+
+This package contains SQLite-backed stores kept next to the configuration
+file, such as caches of values that never change on the Qualtrics side.
+"""
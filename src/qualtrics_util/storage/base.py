@@ -0,0 +1,96 @@
+"""
+SQLite helpers shared by the local stores.
+
+Each configuration file gets one database next to it (config_x.yaml ->
+config_x.db). Stores create their own tables in that database and are safe
+to use from worker threads.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Any, Iterable, List, Optional, Sequence
+
+
+def default_db_path(config_file: str) -> str:
+    """
+    Database path for a configuration file.
+    
+    Args:
+        config_file: Path to the YAML configuration file
+        
+    Returns:
+        Path of the SQLite database next to the config file
+        
+    Example:
+        >>> default_db_path('config/config_ema.yaml')
+        'config/config_ema.db'
+    """
+    return os.path.splitext(config_file)[0] + '.db'
+
+
+class SQLiteStore:
+    """
+    Base class for thread-safe SQLite stores.
+    
+    Subclasses set SCHEMA to the statements that create their tables, and
+    can override _migrate to adapt tables an older version created.
+    """
+    
+    SCHEMA: Sequence[str] = ()
+    
+    def __init__(self, path: str):
+        """
+        Open (and create if needed) the store.
+        
+        Args:
+            path: SQLite database path, or ':memory:'
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        
+        with self._lock, self._conn:
+            self._migrate(self._conn)
+            for statement in self.SCHEMA:
+                self._conn.execute(statement)
+    
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """Adapt existing tables before SCHEMA runs (nothing by default)."""
+    
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        """Execute one statement and commit."""
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params)
+    
+    def executemany(self, sql: str, rows: Iterable[Sequence[Any]]) -> int:
+        """
+        Execute a statement for many rows in one transaction.
+        
+        Returns:
+            Number of rows affected
+        """
+        with self._lock, self._conn:
+            return self._conn.executemany(sql, rows).rowcount
+    
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        """Run a query and return all rows."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+    
+    def query_one(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        """Run a query and return the first row or None."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
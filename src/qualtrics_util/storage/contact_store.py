@@ -0,0 +1,275 @@
+"""
+Local mirror of mailing-list contacts.
+
+Contacts are stored per mailing list, keyed by contactId, with a content
+hash, the Qualtrics modification time, their position in the mailing list
+and the fields the commands filter on (SurveysScheduled, NumDays,
+DeleteUnsent) in indexed columns. ContactsAPI.sync_contact_store keeps the
+mirror up to date, so commands read the contacts locally instead of
+downloading the whole list, and select the contacts to send to or delete
+for with an indexed query instead of scanning them.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from .base import SQLiteStore
+
+
+# Contact fields that carry the Qualtrics modification time
+MODIFIED_FIELDS = ('lastModifiedDate', 'lastModified', 'modifiedDate')
+
+
+def contact_modified(contact: Dict[str, Any]) -> Optional[str]:
+    """
+    Modification time reported by Qualtrics for a contact.
+    
+    Args:
+        contact: Contact dictionary
+    
+    Returns:
+        Modification timestamp string, or None if the contact has none
+    """
+    for field in MODIFIED_FIELDS:
+        if contact.get(field):
+            return str(contact[field])
+    return None
+
+
+def contact_hash(contact: Dict[str, Any]) -> str:
+    """
+    Content hash of a contact, independent of key order.
+    
+    Args:
+        contact: Contact dictionary
+    
+    Returns:
+        Hex digest
+    """
+    return hashlib.sha1(json.dumps(contact, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _int_field(embedded_data: Dict[str, Any], key: str) -> int:
+    """Embedded data field as an int (0 when missing or not a number)."""
+    try:
+        return int(embedded_data.get(key, 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+class ContactStore(SQLiteStore):
+    """
+    SQLite mirror of mailing-list contacts.
+    
+    Example:
+        >>> store = ContactStore(default_db_path(config_file))
+        >>> contacts_api.sync_contact_store(store, max_age=900)
+        >>> for contact in store.eligible_for_send(mailing_list_id):
+        ...     schedule(contact)
+    """
+    
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS contacts (
+            mailing_list_id TEXT NOT NULL,
+            contact_id TEXT NOT NULL,
+            data TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            modified TEXT,
+            position INTEGER NOT NULL DEFAULT 0,
+            surveys_scheduled INTEGER NOT NULL DEFAULT 0,
+            num_days INTEGER NOT NULL DEFAULT 0,
+            delete_unsent INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (mailing_list_id, contact_id)
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS contacts_send
+        ON contacts (mailing_list_id, surveys_scheduled, num_days)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS contacts_delete
+        ON contacts (mailing_list_id, delete_unsent)
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS contact_sync (
+            mailing_list_id TEXT PRIMARY KEY,
+            synced_at REAL NOT NULL,
+            full_synced_at REAL
+        )
+        """,
+    )
+    
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """Drop a mirror without the indexed columns, the next sync is full."""
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(contacts)")]
+        if columns and 'position' not in columns:
+            conn.execute("DROP TABLE contacts")
+            conn.execute("DROP TABLE IF EXISTS contact_sync")
+    
+    def _row(self, mailing_list_id: str, contact: Dict[str, Any]) -> tuple:
+        """Build the table row for a contact."""
+        embedded_data = contact.get('embeddedData') or {}
+        return (
+            mailing_list_id,
+            contact['contactId'],
+            json.dumps(contact),
+            contact_hash(contact),
+            contact_modified(contact),
+            _int_field(embedded_data, 'SurveysScheduled'),
+            _int_field(embedded_data, 'NumDays'),
+            _int_field(embedded_data, 'DeleteUnsent'),
+        )
+    
+    def upsert(self, mailing_list_id: str, contacts: Iterable[Dict[str, Any]]) -> int:
+        """
+        Store contacts whose content changed.
+        
+        A contact keeps its position; new contacts are added at the end
+        until set_order places them.
+        
+        Args:
+            mailing_list_id: Mailing list ID
+            contacts: Contact dictionaries with embeddedData
+        
+        Returns:
+            Number of contacts added or changed
+        """
+        stored = self.hashes(mailing_list_id)
+        rows = [
+            row for row in (self._row(mailing_list_id, contact) for contact in contacts)
+            if stored.get(row[1]) != row[3]
+        ]
+        self.executemany(
+            "INSERT INTO contacts (mailing_list_id, contact_id, data, content_hash, modified, "
+            "surveys_scheduled, num_days, delete_unsent, position) VALUES (?, ?, ?, ?, ?, ?, ?, ?, "
+            "(SELECT COALESCE(MAX(position), -1) + 1 FROM contacts WHERE mailing_list_id = ?1)) "
+            "ON CONFLICT (mailing_list_id, contact_id) DO UPDATE SET data = excluded.data, "
+            "content_hash = excluded.content_hash, modified = excluded.modified, "
+            "surveys_scheduled = excluded.surveys_scheduled, num_days = excluded.num_days, "
+            "delete_unsent = excluded.delete_unsent", rows
+        )
+        return len(rows)
+    
+    def set_order(self, mailing_list_id: str, contact_ids: Sequence[str]) -> int:
+        """
+        Store the order of the mailing list, as listed by Qualtrics.
+        
+        Args:
+            mailing_list_id: Mailing list ID
+            contact_ids: Contact IDs in listing order
+        
+        Returns:
+            Number of contacts whose position changed
+        """
+        return self.executemany(
+            "UPDATE contacts SET position = ? WHERE mailing_list_id = ? AND contact_id = ? AND position != ?",
+            [(position, mailing_list_id, contact_id, position) for position, contact_id in enumerate(contact_ids)]
+        )
+    
+    def remove(self, mailing_list_id: str, contact_ids: Iterable[str]) -> int:
+        """
+        Remove contacts that left the mailing list.
+        
+        Args:
+            mailing_list_id: Mailing list ID
+            contact_ids: Contact IDs to remove
+        
+        Returns:
+            Number of contacts removed
+        """
+        rows = [(mailing_list_id, contact_id) for contact_id in contact_ids]
+        self.executemany(
+            "DELETE FROM contacts WHERE mailing_list_id = ? AND contact_id = ?", rows
+        )
+        return len(rows)
+    
+    def hashes(self, mailing_list_id: str) -> Dict[str, str]:
+        """Content hash of every stored contact, by contactId."""
+        rows = self.query(
+            "SELECT contact_id, content_hash FROM contacts WHERE mailing_list_id = ?",
+            (mailing_list_id,)
+        )
+        return {row['contact_id']: row['content_hash'] for row in rows}
+    
+    def modified(self, mailing_list_id: str) -> Dict[str, Optional[str]]:
+        """Qualtrics modification time of every stored contact, by contactId."""
+        rows = self.query(
+            "SELECT contact_id, modified FROM contacts WHERE mailing_list_id = ?",
+            (mailing_list_id,)
+        )
+        return {row['contact_id']: row['modified'] for row in rows}
+    
+    def get(self, mailing_list_id: str, contact_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get one stored contact.
+        
+        Args:
+            mailing_list_id: Mailing list ID
+            contact_id: Contact ID
+        
+        Returns:
+            Contact dictionary, or None if not stored
+        """
+        row = self.query_one(
+            "SELECT data FROM contacts WHERE mailing_list_id = ? AND contact_id = ?",
+            (mailing_list_id, contact_id)
+        )
+        return json.loads(row['data']) if row else None
+    
+    def contacts(self, mailing_list_id: str) -> List[Dict[str, Any]]:
+        """All stored contacts of a mailing list, in listing order."""
+        return self._select(mailing_list_id, '1 = 1')
+    
+    def eligible_for_send(self, mailing_list_id: str) -> List[Dict[str, Any]]:
+        """Contacts with SurveysScheduled == 0 and NumDays > 0."""
+        return self._select(mailing_list_id, 'surveys_scheduled = 0 AND num_days > 0')
+    
+    def pending_delete(self, mailing_list_id: str) -> List[Dict[str, Any]]:
+        """Contacts with DeleteUnsent == 1."""
+        return self._select(mailing_list_id, 'delete_unsent = 1')
+    
+    def _select(self, mailing_list_id: str, where: str) -> List[Dict[str, Any]]:
+        """Stored contacts matching a fixed WHERE clause, in listing order."""
+        rows = self.query(
+            f"SELECT data FROM contacts WHERE mailing_list_id = ? AND {where} ORDER BY position",
+            (mailing_list_id,)
+        )
+        return [json.loads(row['data']) for row in rows]
+    
+    def mark_synced(self, mailing_list_id: str, full: bool = False) -> None:
+        """
+        Record that the mailing list was just synced.
+        
+        Args:
+            mailing_list_id: Mailing list ID
+            full: Whether this was a full resync
+        """
+        now = time.time()
+        previous = self.query_one(
+            "SELECT full_synced_at FROM contact_sync WHERE mailing_list_id = ?",
+            (mailing_list_id,)
+        )
+        full_synced_at = now if full else (previous['full_synced_at'] if previous else None)
+        self.execute(
+            "INSERT OR REPLACE INTO contact_sync VALUES (?, ?, ?)",
+            (mailing_list_id, now, full_synced_at)
+        )
+    
+    def synced_at(self, mailing_list_id: str) -> Optional[float]:
+        """Time of the last sync (epoch seconds), or None if never synced."""
+        row = self.query_one(
+            "SELECT synced_at FROM contact_sync WHERE mailing_list_id = ?",
+            (mailing_list_id,)
+        )
+        return row['synced_at'] if row else None
+    
+    def count(self, mailing_list_id: Optional[str] = None) -> int:
+        """Number of stored contacts."""
+        if mailing_list_id is None:
+            return self.query_one("SELECT COUNT(*) FROM contacts")[0]
+        return self.query_one(
+            "SELECT COUNT(*) FROM contacts WHERE mailing_list_id = ?", (mailing_list_id,)
+        )[0]
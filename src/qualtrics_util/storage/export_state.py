@@ -0,0 +1,170 @@
+"""
+Persistent state of incremental response exports.
+
+For each survey the store keeps a watermark (the latest recordedDate seen
+and the continuation token Qualtrics returned with the last export) and the
+IDs of the responses already written to the local dataset, so overlapping
+exports never append a response twice. The size of the dataset file after
+the last recorded batch is kept as well, so lines appended by an export
+that stopped before their IDs were recorded can be found on the next run.
+"""
+
+import time
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+from .base import SQLiteStore
+
+
+# Response IDs per IN (...) query, below SQLite's variable limit
+QUERY_CHUNK_SIZE = 500
+
+
+class ExportStateStore(SQLiteStore):
+    """SQLite store of export watermarks and exported response IDs."""
+    
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS export_watermarks (
+            survey_id TEXT PRIMARY KEY,
+            recorded_date TEXT,
+            continuation_token TEXT,
+            updated_at REAL NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS exported_responses (
+            survey_id TEXT NOT NULL,
+            response_id TEXT NOT NULL,
+            recorded_date TEXT,
+            PRIMARY KEY (survey_id, response_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS export_datasets (
+            survey_id TEXT NOT NULL,
+            path TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            PRIMARY KEY (survey_id, path)
+        )
+        """,
+    )
+    
+    def watermark(self, survey_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the watermark of a survey.
+        
+        Args:
+            survey_id: Survey ID
+        
+        Returns:
+            Dictionary with recorded_date, continuation_token and updated_at,
+            or None if the survey was never exported incrementally
+        """
+        row = self.query_one(
+            "SELECT recorded_date, continuation_token, updated_at FROM export_watermarks "
+            "WHERE survey_id = ?", (survey_id,)
+        )
+        return dict(row) if row else None
+    
+    def set_watermark(
+        self,
+        survey_id: str,
+        recorded_date: Optional[str] = None,
+        continuation_token: Optional[str] = None
+    ) -> None:
+        """
+        Store the watermark of a survey.
+        
+        Args:
+            survey_id: Survey ID
+            recorded_date: Latest recordedDate written to the dataset
+            continuation_token: Token for the next export (None if not available)
+        """
+        self.execute(
+            "INSERT OR REPLACE INTO export_watermarks VALUES (?, ?, ?, ?)",
+            (survey_id, recorded_date, continuation_token, time.time())
+        )
+    
+    def reset(self, survey_id: str) -> None:
+        """
+        Forget the watermark and exported responses of a survey.
+        
+        Args:
+            survey_id: Survey ID
+        """
+        self.execute("DELETE FROM export_watermarks WHERE survey_id = ?", (survey_id,))
+        self.execute("DELETE FROM exported_responses WHERE survey_id = ?", (survey_id,))
+        self.execute("DELETE FROM export_datasets WHERE survey_id = ?", (survey_id,))
+    
+    def add_responses(self, survey_id: str, responses: Iterable[Tuple[str, Optional[str]]]) -> int:
+        """
+        Record response IDs as exported.
+        
+        Args:
+            survey_id: Survey ID
+            responses: (responseId, recordedDate) pairs
+        
+        Returns:
+            Number of responses that were not recorded before
+        """
+        return self.executemany(
+            "INSERT OR IGNORE INTO exported_responses VALUES (?, ?, ?)",
+            [(survey_id, response_id, recorded_date) for response_id, recorded_date in responses]
+        )
+    
+    def exported(self, survey_id: str, response_ids: Iterable[str]) -> Set[str]:
+        """
+        The response IDs that were already written to the dataset.
+        
+        Args:
+            survey_id: Survey ID
+            response_ids: Response IDs to check
+        
+        Returns:
+            Subset of response_ids recorded as exported
+        """
+        ids = list(response_ids)
+        found: Set[str] = set()
+        for start in range(0, len(ids), QUERY_CHUNK_SIZE):
+            chunk = ids[start:start + QUERY_CHUNK_SIZE]
+            rows = self.query(
+                f"SELECT response_id FROM exported_responses WHERE survey_id = ? "
+                f"AND response_id IN ({', '.join('?' * len(chunk))})",
+                [survey_id] + chunk
+            )
+            found.update(row['response_id'] for row in rows)
+        return found
+    
+    def dataset_size(self, survey_id: str, path: str) -> int:
+        """
+        Size of a dataset file after the last recorded batch of a survey.
+        
+        Args:
+            survey_id: Survey ID
+            path: Absolute path of the dataset file
+        
+        Returns:
+            Size in bytes (0 if nothing was recorded)
+        """
+        row = self.query_one(
+            "SELECT size FROM export_datasets WHERE survey_id = ? AND path = ?", (survey_id, path)
+        )
+        return row['size'] if row else 0
+    
+    def set_dataset_size(self, survey_id: str, path: str, size: int) -> None:
+        """
+        Store the size of a dataset file once its lines are recorded.
+        
+        Args:
+            survey_id: Survey ID
+            path: Absolute path of the dataset file
+            size: Size in bytes
+        """
+        self.execute(
+            "INSERT OR REPLACE INTO export_datasets VALUES (?, ?, ?)", (survey_id, path, size)
+        )
+    
+    def count(self, survey_id: str) -> int:
+        """Number of exported responses of a survey."""
+        return self.query_one(
+            "SELECT COUNT(*) FROM exported_responses WHERE survey_id = ?", (survey_id,)
+        )[0]
@@ -0,0 +1,295 @@
+"""
+Write-ahead journal of send runs.
+
+Before a contact's first invitation is posted, all of its planned
+invitations are written to the journal. Each invitation is marked posting
+just before its POST and done with its distributionId right after, so a run
+that crashed or was killed can resume from the journal: done invitations
+are not posted again, and the send times are not recomputed. An invitation
+left in posting may or may not have reached Qualtrics; it is checked
+against the survey's distribution listing before it is posted again.
+Planned invitations whose send time passed before they were posted are
+marked skipped. A schedule whose invitations were all skipped is finished,
+so the contact is not scheduled again until its schedule changes.
+
+Invitations are keyed by a schedule ID (see send_engine.schedule_id). A
+schedule is journaled once: rerunning it reuses its entries whatever their
+state, so send times drawn from a time range are not drawn again. Once
+every invitation of a contact is done or skipped, a new schedule of the
+contact (e.g. a new StartDate with SurveysScheduled set back to 0) is
+journaled as a new generation next to the old one.
+"""
+
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+from .base import SQLiteStore
+from .ledger import _format_date
+
+
+PLANNED = 'planned'
+POSTING = 'posting'
+DONE = 'done'
+SKIPPED = 'skipped'
+
+
+class SendJournal(SQLiteStore):
+    """
+    SQLite journal of planned, in-flight, posted and skipped invitations.
+    
+    Example:
+        >>> journal = SendJournal(default_db_path(config_file))
+        >>> journal.add('CG_1', 'CID_1', 'sms', send_times, schedule_id)
+        >>> for entry in journal.entries('CG_1', 'CID_1', schedule_id=schedule_id):
+        ...     journal.mark_posting(entry['seq'], lookup_id)
+        ...     response = post(entry)
+        ...     journal.mark_done(entry['seq'], response.json()['result']['id'])
+    """
+    
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS send_journal (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            mailing_list_id TEXT NOT NULL,
+            contact_id TEXT NOT NULL,
+            channel TEXT NOT NULL,
+            schedule_id TEXT NOT NULL DEFAULT '',
+            send_date TEXT NOT NULL,
+            expiration_date TEXT,
+            state TEXT NOT NULL,
+            lookup_id TEXT,
+            distribution_id TEXT,
+            error TEXT,
+            updated_at REAL NOT NULL,
+            UNIQUE (mailing_list_id, contact_id, channel, schedule_id, send_date)
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS send_journal_state
+        ON send_journal (mailing_list_id, state)
+        """,
+    )
+    
+    def add(
+        self,
+        mailing_list_id: str,
+        contact_id: str,
+        channel: str,
+        send_times: Iterable[Tuple[Union[datetime, str], Union[datetime, str, None]]],
+        schedule_id: str = '',
+        state: str = PLANNED
+    ) -> int:
+        """
+        Write the planned invitations of a contact.
+        
+        Invitations already in the journal (same contact, channel, schedule
+        and send date) are left as they are, so adding a plan twice is
+        harmless.
+        
+        Args:
+            mailing_list_id: Mailing list ID
+            contact_id: Contact ID
+            channel: 'sms' or 'email'
+            send_times: (send_time, expiration_time) UTC datetimes or strings
+            schedule_id: Schedule the invitations belong to
+            state: State of the new invitations, SKIPPED for send times that
+                passed before they were planned
+        
+        Returns:
+            Number of invitations added
+        """
+        now = time.time()
+        rows = [
+            (mailing_list_id, contact_id, channel, schedule_id, _format_date(send_time),
+             _format_date(expiration_time), state, now)
+            for send_time, expiration_time in send_times
+        ]
+        return self.executemany(
+            "INSERT OR IGNORE INTO send_journal (mailing_list_id, contact_id, channel, schedule_id, send_date, "
+            "expiration_date, state, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+        )
+    
+    def entries(
+        self,
+        mailing_list_id: str,
+        contact_id: str,
+        channel: Optional[str] = None,
+        schedule_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Journal entries of a contact in the order they were planned.
+        
+        Args:
+            mailing_list_id: Mailing list ID
+            contact_id: Contact ID
+            channel: Only this channel (None for both)
+            schedule_id: Only this schedule (None for all)
+        
+        Returns:
+            Entries with seq, schedule_id, send_date, expiration_date, state,
+            distribution_id, ...
+        """
+        where = "mailing_list_id = ? AND contact_id = ?"
+        params: List[Any] = [mailing_list_id, contact_id]
+        if channel is not None:
+            where += " AND channel = ?"
+            params.append(channel)
+        if schedule_id is not None:
+            where += " AND schedule_id = ?"
+            params.append(schedule_id)
+        rows = self.query(f"SELECT * FROM send_journal WHERE {where} ORDER BY seq", params)
+        return [dict(row) for row in rows]
+    
+    def unfinished_schedule(self, mailing_list_id: str, contact_id: str, channel: str) -> Optional[str]:
+        """
+        Schedule of a contact that still has planned or posting invitations.
+        
+        Args:
+            mailing_list_id: Mailing list ID
+            contact_id: Contact ID
+            channel: 'sms' or 'email'
+        
+        Returns:
+            Schedule ID of the earliest unfinished invitation, or None when
+            every invitation of the contact is done or skipped
+        """
+        row = self.query_one(
+            f"SELECT schedule_id FROM send_journal WHERE mailing_list_id = ? AND contact_id = ? AND channel = ? "
+            f"AND state NOT IN ('{DONE}', '{SKIPPED}') ORDER BY seq LIMIT 1",
+            (mailing_list_id, contact_id, channel)
+        )
+        return None if row is None else row['schedule_id']
+    
+    def has_schedule(self, mailing_list_id: str, contact_id: str, channel: str, schedule_id: str) -> bool:
+        """
+        Whether a schedule of a contact was journaled, in any state.
+        
+        Args:
+            mailing_list_id: Mailing list ID
+            contact_id: Contact ID
+            channel: 'sms' or 'email'
+            schedule_id: Schedule ID
+        """
+        return self.query_one(
+            "SELECT 1 FROM send_journal WHERE mailing_list_id = ? AND contact_id = ? AND channel = ? "
+            "AND schedule_id = ? LIMIT 1",
+            (mailing_list_id, contact_id, channel, schedule_id)
+        ) is not None
+    
+    def unfinished(self, mailing_list_id: str) -> List[Tuple[str, str]]:
+        """
+        Contacts with invitations that are neither done nor skipped.
+        
+        Args:
+            mailing_list_id: Mailing list ID
+        
+        Returns:
+            (contact_id, channel) pairs in the order they were planned
+        """
+        rows = self.query(
+            f"SELECT contact_id, channel, MIN(seq) AS first FROM send_journal "
+            f"WHERE mailing_list_id = ? AND state NOT IN ('{DONE}', '{SKIPPED}') "
+            f"GROUP BY contact_id, channel ORDER BY first",
+            (mailing_list_id,)
+        )
+        return [(row['contact_id'], row['channel']) for row in rows]
+    
+    def skipped_schedules(self, mailing_list_id: str) -> Set[Tuple[str, str, str]]:
+        """
+        Schedules whose invitations were all skipped.
+        
+        Args:
+            mailing_list_id: Mailing list ID
+        
+        Returns:
+            (contact_id, channel, schedule_id) of every such schedule
+        """
+        rows = self.query(
+            f"SELECT contact_id, channel, schedule_id FROM send_journal WHERE mailing_list_id = ? "
+            f"GROUP BY contact_id, channel, schedule_id HAVING SUM(state != '{SKIPPED}') = 0",
+            (mailing_list_id,)
+        )
+        return {(row['contact_id'], row['channel'], row['schedule_id']) for row in rows}
+    
+    def mark_posting(self, seq: int, lookup_id: Optional[str] = None) -> None:
+        """
+        Mark an invitation as being posted, before its POST.
+        
+        Args:
+            seq: Journal entry
+            lookup_id: contactLookupId the invitation is sent to
+        """
+        self.execute(
+            f"UPDATE send_journal SET state = '{POSTING}', lookup_id = ?, error = NULL, updated_at = ? "
+            f"WHERE seq = ?", (lookup_id, time.time(), seq)
+        )
+    
+    def mark_done(self, seq: int, distribution_id: Optional[str]) -> None:
+        """
+        Mark an invitation as posted.
+        
+        Args:
+            seq: Journal entry
+            distribution_id: Distribution ID returned by Qualtrics
+        """
+        self.execute(
+            f"UPDATE send_journal SET state = '{DONE}', distribution_id = ?, error = NULL, updated_at = ? "
+            f"WHERE seq = ?", (distribution_id, time.time(), seq)
+        )
+    
+    def mark_skipped(self, seq: int) -> None:
+        """
+        Mark a planned invitation whose send time passed as skipped.
+        
+        Args:
+            seq: Journal entry
+        """
+        self.execute(
+            f"UPDATE send_journal SET state = '{SKIPPED}', updated_at = ? WHERE seq = ?", (time.time(), seq)
+        )
+    
+    def mark_planned(self, seq: int, error: Optional[str] = None) -> None:
+        """
+        Return an invitation to planned after a POST that Qualtrics rejected.
+        
+        Args:
+            seq: Journal entry
+            error: Why the POST failed
+        """
+        self.execute(
+            f"UPDATE send_journal SET state = '{PLANNED}', error = ?, updated_at = ? WHERE seq = ?",
+            (error, time.time(), seq)
+        )
+    
+    def set_error(self, seq: int, error: str) -> None:
+        """
+        Record the error of a POST whose outcome is unknown, the entry
+        stays posting.
+        
+        Args:
+            seq: Journal entry
+            error: Error message
+        """
+        self.execute("UPDATE send_journal SET error = ?, updated_at = ? WHERE seq = ?", (error, time.time(), seq))
+    
+    def status(self, mailing_list_id: str) -> Dict[str, int]:
+        """
+        Number of invitations per state.
+        
+        Args:
+            mailing_list_id: Mailing list ID
+        
+        Returns:
+            state -> count for planned, posting, done and skipped
+        """
+        rows = self.query(
+            "SELECT state, COUNT(*) AS n FROM send_journal WHERE mailing_list_id = ? GROUP BY state",
+            (mailing_list_id,)
+        )
+        counts = {PLANNED: 0, POSTING: 0, DONE: 0, SKIPPED: 0}
+        counts.update({row['state']: row['n'] for row in rows})
+        return counts
+    
+    def count(self) -> int:
+        """Number of journal entries."""
+        return self.query_one("SELECT COUNT(*) FROM send_journal")[0]
@@ -0,0 +1,268 @@
+"""
+Local ledger of the distributions this tool scheduled.
+
+Every invitation posted to Qualtrics is recorded with its distributionId,
+contact, send date and expiry when it is scheduled, and every deletion is
+recorded as a separate entry. Rows are only ever appended, so the ledger is
+also an audit trail. Unsent distributions of a contact are found with an
+indexed query instead of listing all of the survey's distributions.
+
+The legacy qualtrics_util.py script creates the same table in the same
+database (QualtricsDist.open_cache); the two schemas must be kept in sync.
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Union
+from ..models.distribution_index import SEND_DATE_FORMAT
+from .base import SQLiteStore
+
+
+SCHEDULED = 'scheduled'
+DELETED = 'deleted'
+
+
+def _format_date(value: Union[datetime, str, None]) -> Optional[str]:
+    """Send dates are stored as UTC strings so they sort chronologically."""
+    if value is None or isinstance(value, str):
+        return value
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime(SEND_DATE_FORMAT)
+
+
+class DistributionLedger(SQLiteStore):
+    """
+    Append-only SQLite record of scheduled and deleted distributions.
+    
+    Example:
+        >>> ledger = DistributionLedger(default_db_path(config_file))
+        >>> ledger.record('EMD_1', 'CID_1', 'CGC_1', send_time, expiration_time, 'sms')
+        >>> ids = [entry['distribution_id'] for entry in ledger.unsent('CID_1')]
+        >>> ledger.record_deleted(ids, 'sms')
+    """
+    
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS distribution_ledger (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            recorded_at REAL NOT NULL,
+            event TEXT NOT NULL,
+            distribution_id TEXT NOT NULL,
+            channel TEXT,
+            contact_id TEXT,
+            lookup_id TEXT,
+            mailing_list_id TEXT,
+            survey_id TEXT,
+            send_date TEXT,
+            expiration_date TEXT,
+            config TEXT
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS distribution_ledger_contact
+        ON distribution_ledger (contact_id, send_date)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS distribution_ledger_send_date
+        ON distribution_ledger (send_date)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS distribution_ledger_distribution
+        ON distribution_ledger (distribution_id, event)
+        """,
+    )
+    
+    # scheduled entries without a later deletion
+    _LIVE = (
+        f"event = '{SCHEDULED}' AND distribution_id NOT IN "
+        f"(SELECT distribution_id FROM distribution_ledger WHERE event = '{DELETED}')"
+    )
+    
+    def record(
+        self,
+        distribution_id: str,
+        contact_id: str,
+        lookup_id: Optional[str],
+        send_date: Union[datetime, str],
+        expiration_date: Union[datetime, str, None],
+        channel: str,
+        mailing_list_id: Optional[str] = None,
+        survey_id: Optional[str] = None,
+        config: Optional[str] = None
+    ) -> None:
+        """
+        Record a scheduled distribution.
+        
+        Args:
+            distribution_id: Distribution ID returned by Qualtrics
+            contact_id: Contact ID
+            lookup_id: contactLookupId the distribution was sent to
+            send_date: Send time (UTC datetime or ISO string)
+            expiration_date: Survey link expiration time
+            channel: 'sms' or 'email'
+            mailing_list_id: Mailing list ID
+            survey_id: Survey ID
+            config: Configuration file that scheduled it
+        """
+        self.execute(
+            "INSERT INTO distribution_ledger (recorded_at, event, distribution_id, channel, "
+            "contact_id, lookup_id, mailing_list_id, survey_id, send_date, expiration_date, config) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (time.time(), SCHEDULED, distribution_id, channel, contact_id, lookup_id,
+             mailing_list_id, survey_id, _format_date(send_date), _format_date(expiration_date),
+             config)
+        )
+    
+    def record_deleted(self, distribution_ids: Iterable[str], channel: Optional[str] = None) -> int:
+        """
+        Record deleted distributions.
+        
+        Args:
+            distribution_ids: Distribution IDs that were deleted
+            channel: 'sms' or 'email'
+        
+        Returns:
+            Number of deletions recorded
+        """
+        now = time.time()
+        rows = [(now, DELETED, distribution_id, channel) for distribution_id in distribution_ids]
+        self.executemany(
+            "INSERT INTO distribution_ledger (recorded_at, event, distribution_id, channel) "
+            "VALUES (?, ?, ?, ?)", rows
+        )
+        return len(rows)
+    
+    def unsent(
+        self,
+        contact_id: Optional[str] = None,
+        channel: Optional[str] = None,
+        now: Optional[datetime] = None,
+        mailing_list_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Scheduled distributions whose send date has not passed and that
+        were not deleted.
+        
+        Args:
+            contact_id: Only this contact (None for all contacts)
+            channel: Only this channel (None for both)
+            now: Reference time (default: current UTC time)
+            mailing_list_id: Only this mailing list (None for all)
+        
+        Returns:
+            Ledger entries ordered by send date
+        """
+        where = [self._LIVE, "send_date > ?"]
+        params: List[Any] = [_format_date(now or datetime.now(timezone.utc))]
+        if contact_id is not None:
+            where.append("contact_id = ?")
+            params.append(contact_id)
+        if channel is not None:
+            where.append("channel = ?")
+            params.append(channel)
+        if mailing_list_id is not None:
+            where.append("mailing_list_id = ?")
+            params.append(mailing_list_id)
+        return self._select(" AND ".join(where), params)
+    
+    def live(self, channel: Optional[str] = None, mailing_list_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Scheduled distributions that were not deleted, sent or not.
+        
+        Args:
+            channel: Only this channel (None for both)
+            mailing_list_id: Only this mailing list (None for all)
+        
+        Returns:
+            Ledger entries ordered by send date
+        """
+        where = [self._LIVE]
+        params: List[Any] = []
+        if channel is not None:
+            where.append("channel = ?")
+            params.append(channel)
+        if mailing_list_id is not None:
+            where.append("mailing_list_id = ?")
+            params.append(mailing_list_id)
+        return self._select(" AND ".join(where), params)
+    
+    def for_contact(self, contact_id: str) -> List[Dict[str, Any]]:
+        """
+        Every distribution scheduled for a contact, with a deleted flag.
+        
+        Args:
+            contact_id: Contact ID
+        
+        Returns:
+            Ledger entries ordered by send date
+        """
+        entries = self._select(f"event = '{SCHEDULED}' AND contact_id = ?", [contact_id])
+        deleted = self._deleted([entry['distribution_id'] for entry in entries])
+        for entry in entries:
+            entry['deleted'] = entry['distribution_id'] in deleted
+        return entries
+    
+    def status(
+        self,
+        now: Optional[datetime] = None,
+        mailing_list_id: Optional[str] = None
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Counts of scheduled distributions per channel.
+        
+        Args:
+            now: Reference time (default: current UTC time)
+            mailing_list_id: Only this mailing list (None for all)
+        
+        Returns:
+            channel -> {'scheduled', 'sent', 'pending', 'deleted'}, where
+            sent and pending split the distributions that were not deleted
+            by whether their send date has passed
+        """
+        where = f"event = '{SCHEDULED}'"
+        params: List[Any] = [_format_date(now or datetime.now(timezone.utc))] * 2
+        if mailing_list_id is not None:
+            where += " AND mailing_list_id = ?"
+            params.append(mailing_list_id)
+        rows = self.query(
+            f"SELECT channel, "
+            f"COUNT(*) AS scheduled, "
+            f"SUM(CASE WHEN {self._LIVE} AND send_date <= ? THEN 1 ELSE 0 END) AS sent, "
+            f"SUM(CASE WHEN {self._LIVE} AND send_date > ? THEN 1 ELSE 0 END) AS pending "
+            f"FROM distribution_ledger WHERE {where} GROUP BY channel",
+            params
+        )
+        return {
+            row['channel']: {
+                'scheduled': row['scheduled'],
+                'sent': row['sent'],
+                'pending': row['pending'],
+                'deleted': row['scheduled'] - row['sent'] - row['pending'],
+            }
+            for row in rows
+        }
+    
+    def _deleted(self, distribution_ids: List[str]) -> set:
+        """Which of the distributions have a deletion entry."""
+        deleted = set()
+        # stay below SQLite's host parameter limit
+        for start in range(0, len(distribution_ids), 500):
+            chunk = distribution_ids[start:start + 500]
+            rows = self.query(
+                f"SELECT distribution_id FROM distribution_ledger WHERE event = '{DELETED}' "
+                f"AND distribution_id IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            deleted.update(row['distribution_id'] for row in rows)
+        return deleted
+    
+    def _select(self, where: str, params: List[Any]) -> List[Dict[str, Any]]:
+        """Scheduled entries matching a WHERE clause, ordered by send date."""
+        rows = self.query(
+            f"SELECT * FROM distribution_ledger WHERE {where} ORDER BY send_date, seq", params
+        )
+        return [dict(row) for row in rows]
+    
+    def count(self) -> int:
+        """Number of ledger entries."""
+        return self.query_one("SELECT COUNT(*) FROM distribution_ledger")[0]
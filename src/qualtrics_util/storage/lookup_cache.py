@@ -0,0 +1,92 @@
+"""
+Persistent cache of contactLookupIds.
+
+The contactLookupId (CGC_...) of a contact in a mailing list never changes,
+so it only needs to be resolved once. The cache is keyed by
+(directory, mailing list, contact) and can be warmed in bulk from a
+mailing-list contact listing, which already carries the lookup IDs.
+"""
+
+from typing import Any, Dict, Iterable, Optional
+from .base import SQLiteStore
+
+
+class LookupIdCache(SQLiteStore):
+    """SQLite cache of contactLookupIds."""
+    
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS contact_lookup_ids (
+            directory_id TEXT NOT NULL,
+            mailing_list_id TEXT NOT NULL,
+            contact_id TEXT NOT NULL,
+            lookup_id TEXT NOT NULL,
+            PRIMARY KEY (directory_id, mailing_list_id, contact_id)
+        )
+        """,
+    )
+    
+    def get(self, directory_id: str, mailing_list_id: str, contact_id: str) -> Optional[str]:
+        """
+        Look up a cached contactLookupId.
+        
+        Args:
+            directory_id: Directory ID
+            mailing_list_id: Mailing list ID
+            contact_id: Contact ID
+            
+        Returns:
+            contactLookupId, or None if not cached
+        """
+        row = self.query_one(
+            "SELECT lookup_id FROM contact_lookup_ids "
+            "WHERE directory_id = ? AND mailing_list_id = ? AND contact_id = ?",
+            (directory_id, mailing_list_id, contact_id)
+        )
+        return row['lookup_id'] if row else None
+    
+    def set(self, directory_id: str, mailing_list_id: str, contact_id: str, lookup_id: str) -> None:
+        """
+        Store a contactLookupId.
+        
+        Args:
+            directory_id: Directory ID
+            mailing_list_id: Mailing list ID
+            contact_id: Contact ID
+            lookup_id: contactLookupId (CGC_...)
+        """
+        self.execute(
+            "INSERT OR REPLACE INTO contact_lookup_ids VALUES (?, ?, ?, ?)",
+            (directory_id, mailing_list_id, contact_id, lookup_id)
+        )
+    
+    def warm(
+        self,
+        directory_id: str,
+        mailing_list_id: str,
+        contacts: Iterable[Dict[str, Any]]
+    ) -> int:
+        """
+        Store the lookup IDs of contacts from a mailing-list listing.
+        
+        Contacts without a contactLookupId are skipped.
+        
+        Args:
+            directory_id: Directory ID
+            mailing_list_id: Mailing list ID
+            contacts: Contact dictionaries from the mailing-list listing
+            
+        Returns:
+            Number of lookup IDs stored
+        """
+        rows = [
+            (directory_id, mailing_list_id, contact['contactId'], contact['contactLookupId'])
+            for contact in contacts
+            if contact.get('contactId') and contact.get('contactLookupId')
+        ]
+        self.executemany("INSERT OR REPLACE INTO contact_lookup_ids VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+    
+    def count(self) -> int:
+        """Number of cached lookup IDs."""
+        return self.query_one("SELECT COUNT(*) FROM contact_lookup_ids")[0]
@@ -0,0 +1,285 @@
+"""
+Columnar (Parquet) output for survey response exports.
+
+A JSON export response is flattened to one row: responseId plus every entry
+of its values (metadata such as recordedDate, question values QID..., and
+embedded data fields). Column types are inferred in a first pass over the
+responses, so the whole file has one schema, and the rows are then written
+in row groups while streaming. Each column records its kind ('metadata',
+'question' or 'embedded') in the Parquet field metadata.
+
+pyarrow is optional and only needed to write Parquet files.
+"""
+
+import json
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+    pq = None
+
+
+# Rows per Parquet row group
+DEFAULT_ROW_GROUP_SIZE = 10000
+
+# Response metadata fields of a Qualtrics export
+METADATA_FIELDS = {
+    'responseId', '_recordId', 'startDate', 'endDate', 'recordedDate', 'status',
+    'ipAddress', 'progress', 'duration', 'finished', 'locationLatitude',
+    'locationLongitude', 'distributionChannel', 'userLanguage', 'recipientEmail',
+    'recipientFirstName', 'recipientLastName', 'externalDataReference',
+}
+
+# Metadata fields stored as UTC timestamps
+TIMESTAMP_FIELDS = {'startDate', 'endDate', 'recordedDate'}
+
+_QUESTION = re.compile(r'^QID\d+')
+
+
+def column_kind(name: str) -> str:
+    """
+    Kind of an export column.
+    
+    Args:
+        name: Column name
+    
+    Returns:
+        'metadata', 'question' or 'embedded'
+    """
+    if name in METADATA_FIELDS:
+        return 'metadata'
+    if _QUESTION.match(name):
+        return 'question'
+    return 'embedded'
+
+
+def flatten_response(response: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten a JSON export response to one row.
+    
+    Args:
+        response: Response with responseId and values
+    
+    Returns:
+        Column name -> value
+    """
+    row = {'responseId': response.get('responseId')}
+    row.update(response.get('values', {}))
+    return row
+
+
+def _value_kind(value: Any) -> str:
+    """Kind of a single value, bool before int since bool is an int."""
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int'
+    if isinstance(value, float):
+        return 'float'
+    if isinstance(value, list):
+        return 'list'
+    return 'str'
+
+
+def _is_timestamp(value: str) -> bool:
+    try:
+        datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return True
+    except ValueError:
+        return False
+
+
+def _numeric_type(kinds: set) -> Optional[str]:
+    """int64 or float64 for numeric kinds, None otherwise."""
+    if kinds <= {'int'}:
+        return 'int64'
+    if kinds <= {'int', 'float'}:
+        return 'float64'
+    return None
+
+
+def infer_column_types(responses: Iterable[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Infer the column types of a response export.
+    
+    Integers stay int64 unless a float appears (float64), lists of numbers
+    become list<int64>/list<float64>, recordedDate, startDate and endDate
+    become timestamps, and anything mixed becomes a string. Columns that
+    are always empty are strings.
+    
+    Args:
+        responses: JSON export responses (iterated once)
+    
+    Returns:
+        Column name -> 'string', 'int64', 'float64', 'bool', 'timestamp',
+        'list<int64>', 'list<float64>' or 'list<string>', in first-seen order
+    """
+    kinds: Dict[str, set] = {'responseId': set()}
+    element_kinds: Dict[str, set] = {}
+    
+    for response in responses:
+        for name, value in flatten_response(response).items():
+            seen = kinds.setdefault(name, set())
+            if value is None:
+                continue
+            kind = _value_kind(value)
+            if name in TIMESTAMP_FIELDS and kind == 'str' and not _is_timestamp(value):
+                kind = 'text'
+            seen.add(kind)
+            if kind == 'list':
+                element_kinds.setdefault(name, set()).update(
+                    _value_kind(item) for item in value if item is not None
+                )
+    
+    types = {}
+    for name, seen in kinds.items():
+        if name in TIMESTAMP_FIELDS and seen == {'str'}:
+            types[name] = 'timestamp'
+        elif seen == {'bool'}:
+            types[name] = 'bool'
+        elif seen == {'list'}:
+            types[name] = f"list<{_numeric_type(element_kinds.get(name, set())) or 'string'}>"
+        elif seen and _numeric_type(seen):
+            types[name] = _numeric_type(seen)
+        else:
+            types[name] = 'string'
+    return types
+
+
+def _coerce(value: Any, column_type: str) -> Any:
+    """Convert a value to the Python type of its column."""
+    if value is None:
+        return None
+    if column_type == 'string':
+        return value if isinstance(value, str) else json.dumps(value)
+    if column_type == 'int64':
+        return int(value)
+    if column_type == 'float64':
+        return float(value)
+    if column_type == 'bool':
+        return bool(value)
+    if column_type == 'timestamp':
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    # list<...>
+    element_type = column_type[5:-1]
+    return [_coerce(item, element_type) for item in value]
+
+
+def _arrow_type(column_type: str):
+    """pyarrow type of a column type name."""
+    if column_type.startswith('list<'):
+        return pa.list_(_arrow_type(column_type[5:-1]))
+    return {
+        'string': pa.string(),
+        'int64': pa.int64(),
+        'float64': pa.float64(),
+        'bool': pa.bool_(),
+        'timestamp': pa.timestamp('ms', tz='UTC'),
+    }[column_type]
+
+
+def arrow_schema(column_types: Dict[str, str]):
+    """
+    Build the pyarrow schema of an export.
+    
+    Args:
+        column_types: Column name -> type from infer_column_types
+    
+    Returns:
+        pyarrow.Schema, with each field's kind in its metadata
+    
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    _require_pyarrow()
+    return pa.schema([
+        pa.field(name, _arrow_type(column_type), metadata={'kind': column_kind(name)})
+        for name, column_type in column_types.items()
+    ])
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow")
+
+
+class ParquetResponseWriter:
+    """
+    Write export responses to a Parquet file in row groups.
+    
+    Example:
+        >>> types = infer_column_types(read_responses())
+        >>> with ParquetResponseWriter('responses.parquet', types) as writer:
+        ...     for response in read_responses():
+        ...         writer.write(response)
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        column_types: Dict[str, str],
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        compression: str = 'snappy'
+    ):
+        """
+        Open the output file.
+        
+        Args:
+            path: Parquet file to write
+            column_types: Column name -> type from infer_column_types
+            row_group_size: Rows buffered per row group
+            compression: Parquet compression codec
+        
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        _require_pyarrow()
+        self.path = path
+        self.column_types = column_types
+        self.row_group_size = row_group_size
+        self.schema = arrow_schema(column_types)
+        self._writer = pq.ParquetWriter(path, self.schema, compression=compression)
+        self._rows = []
+        self.count = 0
+        self.row_groups = 0
+    
+    def write(self, response: Dict[str, Any]) -> None:
+        """
+        Add one response, writing a row group when the buffer is full.
+        
+        Columns that are not in column_types are dropped.
+        
+        Args:
+            response: JSON export response
+        """
+        row = flatten_response(response)
+        self._rows.append({
+            name: _coerce(row.get(name), column_type)
+            for name, column_type in self.column_types.items()
+        })
+        self.count += 1
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+    
+    def _flush(self) -> None:
+        if self._rows:
+            self._writer.write_table(pa.Table.from_pylist(self._rows, schema=self.schema))
+            self._rows = []
+            self.row_groups += 1
+    
+    def close(self) -> None:
+        """Write the last row group and close the file."""
+        self._flush()
+        self._writer.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
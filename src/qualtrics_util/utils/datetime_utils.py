@@ -10,6 +10,7 @@ from typing import List, Union, Optional
 from zoneinfo import ZoneInfo
 import dateutil.parser
 import random
+from .zone_offsets import ZoneOffsetIndex
 
 
 def parse_time_slots(time_slots_str: str) -> List[Union[int, List[int]]]:
@@ -83,7 +84,8 @@ def convert_to_utc(
     hour: int,
     minute: int,
     timezone: str,
-    days_offset: int = 0
+    days_offset: int = 0,
+    offsets: Optional[ZoneOffsetIndex] = None
 ) -> datetime:
     """
     Convert a date and time to UTC.
@@ -94,7 +96,9 @@ def convert_to_utc(
         minute: Minute (0-59)
         timezone: Timezone string (e.g., 'America/Chicago')
         days_offset: Number of days to add to the date (default: 0)
-        
+        offsets: Optional precomputed offsets covering timezone and the
+            date; times skipped or repeated by DST then follow its policies
+    
     Returns:
         Datetime object in UTC
         
@@ -105,6 +109,10 @@ def convert_to_utc(
     # Parse the date
     date_obj = dateutil.parser.parse(date_str)
     
+    if offsets is not None:
+        local_time = datetime(date_obj.year, date_obj.month, date_obj.day, hour, minute)
+        return offsets.convert(timezone, local_time + timedelta(days=days_offset))
+    
     # Create datetime in specified timezone
     local_time = datetime(
         date_obj.year,
@@ -146,18 +154,26 @@ def calculate_expiration_time(
     return send_time + timedelta(minutes=expiration_minutes)
 
 
-def should_schedule_future_only(send_time: datetime) -> bool:
+def should_schedule_future_only(
+    send_time: datetime,
+    now: Optional[datetime] = None,
+    grace_minutes: float = 0
+) -> bool:
     """
-    Check if the send time is in the future.
+    Check if the send time is far enough in the future to schedule.
     
     Args:
         send_time: Time to send the survey
-        
+        now: Reference time (defaults to the current UTC time)
+        grace_minutes: Also skip send times less than this many minutes
+            after now, which would pass while the run is still posting
+    
     Returns:
-        True if send time is in the future, False otherwise
+        True if send time is more than grace_minutes after now, False otherwise
     """
-    now = datetime.now(tz=ZoneInfo("UTC"))
-    return send_time > now
+    if now is None:
+        now = datetime.now(tz=ZoneInfo("UTC"))
+    return send_time > now + timedelta(minutes=grace_minutes)
 
 
 def validate_time_slots(time_slots: List[Union[int, List[int]]]) -> bool:
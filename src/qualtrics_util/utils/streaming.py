@@ -0,0 +1,266 @@
+"""
+Streaming readers and writers for survey response exports.
+
+A response export can be hundreds of megabytes. These helpers read the
+responses one record at a time from a file-like object (such as a zip
+member) and write the cleaned output as they go, so the export never has to
+be held in memory. Output goes to a temporary file that replaces the
+destination only once it is complete (see atomic_output).
+"""
+
+import csv
+import io
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Any, BinaryIO, Dict, Iterator, Optional, TextIO
+
+
+# Characters read from the source at a time
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+# Permissions of new output files (an existing file keeps its own)
+OUTPUT_FILE_MODE = 0o644
+
+
+class _JSONStream:
+    """Buffered reader that decodes one JSON value at a time."""
+    
+    def __init__(self, fp: TextIO, chunk_size: int = CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+    
+    def _fill(self) -> bool:
+        """Read another chunk, dropping what was already consumed."""
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+    
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of input)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos:self.pos + 1]
+    
+    def expect(self, chars: str) -> str:
+        """Consume the next character, which must be one of chars."""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} at offset {self.pos}, found {char!r}")
+        self.pos += 1
+        return char
+    
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # a number may continue in the next chunk
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(fp: TextIO, key: str = 'responses', chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Iterate over the items of an array member of a top-level JSON object.
+    
+    Only one item is decoded at a time. Other members of the object are
+    decoded and skipped.
+    
+    Args:
+        fp: Text stream positioned at the start of the JSON document
+        key: Name of the array member
+        chunk_size: Characters read at a time
+    
+    Yields:
+        Decoded array items
+    
+    Raises:
+        ValueError: If the document is not an object or is malformed
+    
+    Example:
+        >>> with open('export.json') as fp:
+        ...     for response in iter_json_array(fp):
+        ...         print(response['responseId'])
+    """
+    stream = _JSONStream(fp, chunk_size)
+    stream.expect('{')
+    if stream.peek() == '}':
+        return
+    
+    while True:
+        name = stream.value()
+        stream.expect(':')
+        if name == key and stream.peek() == '[':
+            stream.expect('[')
+            if stream.peek() == ']':
+                stream.expect(']')
+            else:
+                while True:
+                    yield stream.value()
+                    if stream.expect(',]') == ']':
+                        break
+        else:
+            stream.value()
+        if stream.expect(',}') == '}':
+            return
+
+
+class JSONResponseWriter:
+    """
+    Write responses as an indented JSON export, one record at a time.
+    
+    The output is identical to json.dump({'responses': [...], **extra},
+    fp, indent=4), without building the list.
+    
+    Leaving the with block on an exception (including a generator that is
+    closed early) does not finish the document; write to atomic_output so
+    the unfinished file is discarded instead of replacing the last export.
+    
+    Example:
+        >>> with atomic_output('export.json', 'w') as fp:
+        ...     with JSONResponseWriter(fp, extra={'source': 'qualtrics'}) as writer:
+        ...         for response in responses:
+        ...             writer.write(response)
+    """
+    
+    def __init__(self, fp: TextIO, extra: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the writer.
+        
+        Args:
+            fp: Text stream to write to
+            extra: Top-level members written after the responses
+        """
+        self.fp = fp
+        self.extra = extra or {}
+        self.count = 0
+    
+    def write(self, response: Any) -> None:
+        """Write one response."""
+        self.fp.write(',\n        ' if self.count else '{\n    "responses": [\n        ')
+        self.fp.write(json.dumps(response, indent=4).replace('\n', '\n        '))
+        self.count += 1
+    
+    def close(self) -> None:
+        """Write the end of the array and the extra members."""
+        self.fp.write('\n    ]' if self.count else '{\n    "responses": []')
+        for key, value in self.extra.items():
+            self.fp.write(f',\n    {json.dumps(key)}: ')
+            self.fp.write(json.dumps(value, indent=4).replace('\n', '\n    '))
+        self.fp.write('\n}')
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+
+@contextmanager
+def atomic_output(path: str, mode: str = 'w') -> Iterator[IO]:
+    """
+    Open a temporary file that replaces path when the with block completes.
+    
+    The temporary file is created in the directory of path, so the final
+    os.replace is atomic. If the block raises, or a generator writing to the
+    file is closed before it finishes, the temporary file is removed and
+    path keeps its previous content.
+    
+    Args:
+        path: Destination file
+        mode: 'w' for text or 'wb' for binary output
+    
+    Yields:
+        File object to write to
+    
+    Example:
+        >>> with atomic_output('export.csv', 'wb') as out:
+        ...     shutil.copyfileobj(raw, out)
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode) as out:
+            yield out
+        # mkstemp creates the file readable by its owner only
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o777 if os.path.exists(path) else OUTPUT_FILE_MODE)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def iter_csv_records(fp: TextIO, header_rows: int = 3) -> Iterator[Dict[str, str]]:
+    """
+    Iterate over the records of a Qualtrics CSV export.
+    
+    Qualtrics writes three header rows (column names, question text and
+    import IDs). The first names the columns and the others are skipped.
+    
+    Args:
+        fp: Text stream opened with newline=''
+        header_rows: Number of header rows in the export
+    
+    Yields:
+        One dictionary per response, column name -> value
+    """
+    reader = csv.reader(fp)
+    columns = next(reader, None)
+    if columns is None:
+        return
+    for _ in range(header_rows - 1):
+        next(reader, None)
+    for row in reader:
+        yield dict(zip(columns, row))
+
+
+class TeeReader(io.RawIOBase):
+    """
+    Binary reader that copies every byte it reads to a sink.
+    
+    Used to save an export member unchanged while it is being parsed.
+    """
+    
+    def __init__(self, source: BinaryIO, sink: BinaryIO):
+        """
+        Initialize the reader.
+        
+        Args:
+            source: Binary stream to read from
+            sink: Binary stream that receives a copy of the data
+        """
+        self.source = source
+        self.sink = sink
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        data = self.source.read(len(buffer))
+        buffer[:len(data)] = data
+        self.sink.write(data)
+        return len(data)
@@ -0,0 +1,288 @@
+"""
+Precomputed UTC offsets of time zones over a date window.
+
+Scheduling converts many local wall times (a participant's time slots on
+each study day) to UTC. ZoneOffsetIndex looks up each zone's transitions
+once and keeps, for every local date of the window, the offset in effect
+before and after that date's transition and the local minute it happens
+at. Converting a wall time is then an array lookup.
+
+Wall times around a DST transition are handled by explicit policies:
+
+- nonexistent (skipped by a spring-forward transition, e.g. 02:30 on the
+  day clocks jump from 02:00 to 03:00)
+- ambiguous (repeated by a fall-back transition, e.g. 01:30 on the day
+  clocks go back from 02:00 to 01:00)
+
+Either can use the offset in effect 'before' the transition, the one in
+effect 'after' it, or 'raise' NonexistentTimeError/AmbiguousTimeError.
+'before' is what datetime(..., tzinfo=ZoneInfo(zone)) does (fold=0): a
+nonexistent 02:30 becomes 03:30 after the jump and an ambiguous 01:30 is
+its first occurrence.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Tuple, Union
+from zoneinfo import ZoneInfo
+import numpy as np
+
+
+# Minutes in a day, also the "no transition" marker of a date
+MINUTES_PER_DAY = 24 * 60
+
+# Offset policies for nonexistent and ambiguous wall times
+POLICIES = ('before', 'after', 'raise')
+
+_EPOCH = date(1970, 1, 1)
+
+# Scan step when looking for transitions (seconds), transitions are
+# further apart than this
+_SCAN_STEP = 3600
+
+
+class NonexistentTimeError(ValueError):
+    """A local wall time skipped by a DST transition."""
+    pass
+
+
+class AmbiguousTimeError(ValueError):
+    """A local wall time repeated by a DST transition."""
+    pass
+
+
+def epoch_days(day: Union[date, str]) -> int:
+    """
+    Days since 1970-01-01 of a date.
+    
+    Args:
+        day: date or ISO date string
+    
+    Returns:
+        Day number as used by ZoneOffsetIndex
+    """
+    if isinstance(day, str):
+        day = date.fromisoformat(day[:10])
+    return (day - _EPOCH).days
+
+
+def _offset_at(tz: ZoneInfo, timestamp: int) -> int:
+    """UTC offset (seconds) of a zone at a UTC instant."""
+    return int(datetime.fromtimestamp(timestamp, tz).utcoffset().total_seconds())
+
+
+def zone_transitions(zone: str, first_day: int, last_day: int) -> Tuple[int, List[Tuple[int, int, int]]]:
+    """
+    Offset changes of a zone around a range of local dates.
+    
+    Args:
+        zone: IANA time zone name
+        first_day: First local date (days since 1970-01-01)
+        last_day: Last local date (days since 1970-01-01)
+    
+    Returns:
+        (offset at the start of the range, [(UTC timestamp, offset before,
+        offset after), ...] in time order), offsets in seconds
+    """
+    tz = ZoneInfo(zone)
+    # local dates span UTC-14 to UTC+14, scan a day beyond on both sides
+    start = (first_day - 1) * 86400
+    end = (last_day + 2) * 86400
+    
+    initial = _offset_at(tz, start)
+    transitions = []
+    previous = initial
+    for timestamp in range(start + _SCAN_STEP, end + _SCAN_STEP, _SCAN_STEP):
+        offset = _offset_at(tz, timestamp)
+        if offset == previous:
+            continue
+        # first second with the new offset
+        low, high = timestamp - _SCAN_STEP, timestamp
+        while high - low > 1:
+            middle = (low + high) // 2
+            if _offset_at(tz, middle) == previous:
+                low = middle
+            else:
+                high = middle
+        transitions.append((high, previous, offset))
+        previous = offset
+    
+    return initial, transitions
+
+
+class ZoneOffsetIndex:
+    """
+    UTC offsets of several zones for every local date of a window.
+    
+    Example:
+        >>> index = ZoneOffsetIndex(['America/Chicago'], '2024-03-01', '2024-03-31')
+        >>> index.to_utc('America/Chicago', np.array(['2024-03-10T02:30'], 'datetime64[s]'))
+        array(['2024-03-10T08:30:00'], dtype='datetime64[s]')
+    """
+    
+    def __init__(
+        self,
+        zones: Iterable[str],
+        first_date: Union[date, str, int],
+        last_date: Union[date, str, int],
+        nonexistent: str = 'before',
+        ambiguous: str = 'before'
+    ):
+        """
+        Look up the transitions of each zone in the window.
+        
+        Args:
+            zones: IANA time zone names (duplicates are ignored)
+            first_date: First local date (date, ISO string or days since 1970-01-01)
+            last_date: Last local date, inclusive
+            nonexistent: Policy for wall times skipped by a transition
+            ambiguous: Policy for wall times repeated by a transition
+        
+        Raises:
+            ValueError: If a policy is unknown or the window is empty
+            ZoneInfoNotFoundError: If a zone is unknown
+        """
+        for name, policy in (('nonexistent', nonexistent), ('ambiguous', ambiguous)):
+            if policy not in POLICIES:
+                raise ValueError(f"{name} must be one of {POLICIES}, not {policy!r}")
+        
+        self.first_day = first_date if isinstance(first_date, int) else epoch_days(first_date)
+        self.last_day = last_date if isinstance(last_date, int) else epoch_days(last_date)
+        if self.last_day < self.first_day:
+            raise ValueError(f"Empty date window {first_date} to {last_date}")
+        
+        self.nonexistent = nonexistent
+        self.ambiguous = ambiguous
+        self.zones: Dict[str, int] = {}
+        for zone in zones:
+            self.zones.setdefault(zone, len(self.zones))
+        
+        shape = (len(self.zones), self.last_day - self.first_day + 1)
+        # offset before and after each date's transition, and its local minute
+        self.before = np.empty(shape, dtype=np.int64)
+        self.after = np.empty(shape, dtype=np.int64)
+        self.transition = np.full(shape, MINUTES_PER_DAY, dtype=np.int64)
+        
+        for zone, row in self.zones.items():
+            self._fill(zone, row)
+    
+    def _fill(self, zone: str, row: int) -> None:
+        """Fill one zone's row of the tables."""
+        initial, transitions = zone_transitions(zone, self.first_day, self.last_day)
+        
+        # Local wall time (seconds since the epoch) at which each transition
+        # happens, on the clock in effect before it
+        walls = [timestamp + before for timestamp, before, _ in transitions]
+        day_starts = (np.arange(self.first_day, self.last_day + 1) * 86400).tolist()
+        
+        for column, day_start in enumerate(day_starts):
+            # last transition before this date
+            k = int(np.searchsorted(walls, day_start, 'left'))
+            offset = transitions[k - 1][2] if k > 0 else initial
+            self.before[row, column] = self.after[row, column] = offset
+            
+            if k < len(walls) and walls[k] < day_start + 86400:
+                _, before, after = transitions[k]
+                self.before[row, column] = before
+                self.after[row, column] = after
+                self.transition[row, column] = (walls[k] - day_start) // 60
+    
+    def zone_index(self, zone: str) -> int:
+        """
+        Row of a zone in the tables.
+        
+        Raises:
+            KeyError: If the zone is not in the index
+        """
+        return self.zones[zone]
+    
+    def offsets(self, zone: np.ndarray, days: np.ndarray, minutes: np.ndarray) -> np.ndarray:
+        """
+        UTC offsets of local wall times.
+        
+        Args:
+            zone: Zone row of each wall time (see zone_index)
+            days: Local date of each wall time (days since 1970-01-01)
+            minutes: Minutes after local midnight of each wall time
+        
+        Returns:
+            Offset of each wall time in seconds (local = UTC + offset)
+        
+        Raises:
+            ValueError: If a date is outside the window
+            NonexistentTimeError: For a skipped wall time with nonexistent='raise'
+            AmbiguousTimeError: For a repeated wall time with ambiguous='raise'
+        """
+        zone = np.asarray(zone, dtype=np.int64)
+        column = np.asarray(days, dtype=np.int64) - self.first_day
+        minutes = np.asarray(minutes, dtype=np.int64)
+        
+        if column.size and (column.min() < 0 or column.max() > self.last_day - self.first_day):
+            raise ValueError(
+                f"Date outside the offset window {self._day(self.first_day)} to {self._day(self.last_day)}"
+            )
+        
+        before = self.before[zone, column]
+        after = self.after[zone, column]
+        transition = self.transition[zone, column]
+        gap = (after - before) // 60
+        
+        # Spring forward: [transition, transition + gap) does not exist
+        # Fall back: [transition + gap, transition) happens twice
+        nonexistent = (gap > 0) & (minutes >= transition) & (minutes < transition + gap)
+        ambiguous = (gap < 0) & (minutes >= transition + gap) & (minutes < transition)
+        
+        offset = np.where(minutes >= transition + np.maximum(gap, 0), after, before)
+        offset = self._apply(offset, nonexistent, self.nonexistent, before, after, NonexistentTimeError, zone, column, minutes)
+        offset = self._apply(offset, ambiguous, self.ambiguous, before, after, AmbiguousTimeError, zone, column, minutes)
+        return offset
+    
+    def _apply(self, offset, mask, policy, before, after, error, zone, column, minutes) -> np.ndarray:
+        """Resolve the wall times in mask with a policy."""
+        if not mask.any():
+            return offset
+        if policy == 'raise':
+            row = int(np.flatnonzero(mask)[0])
+            names = list(self.zones)
+            raise error(
+                f"{self._day(self.first_day + int(column[row]))} "
+                f"{int(minutes[row]) // 60:02d}:{int(minutes[row]) % 60:02d} in {names[zone[row]]}"
+            )
+        return np.where(mask, before if policy == 'before' else after, offset)
+    
+    def to_utc(self, zone: Union[str, np.ndarray], local: np.ndarray) -> np.ndarray:
+        """
+        Convert local wall times to UTC.
+        
+        Args:
+            zone: Zone name for all wall times, or an array of zone rows
+            local: Local wall times (datetime64)
+        
+        Returns:
+            UTC instants as datetime64[s]
+        """
+        local = np.asarray(local).astype('datetime64[s]')
+        seconds = local.astype(np.int64)
+        days = seconds // 86400
+        if isinstance(zone, str):
+            zone = np.full(local.shape, self.zone_index(zone), dtype=np.int64)
+        offset = self.offsets(zone, days, (seconds - days * 86400) // 60)
+        return local - offset.astype('timedelta64[s]')
+    
+    def convert(self, zone: str, local: datetime) -> datetime:
+        """
+        Convert one naive local datetime to a UTC datetime.
+        
+        Args:
+            zone: Zone name
+            local: Naive wall time in zone
+        
+        Returns:
+            Timezone-aware UTC datetime
+        """
+        day = epoch_days(local.date())
+        offset = self.offsets([self.zone_index(zone)], [day], [local.hour * 60 + local.minute])[0]
+        return (local - timedelta(seconds=int(offset))).replace(tzinfo=ZoneInfo("UTC"))
+    
+    @staticmethod
+    def _day(days: int) -> date:
+        return _EPOCH + timedelta(days=days)
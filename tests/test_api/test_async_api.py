@@ -0,0 +1,156 @@
+"""
+Unit tests for the asyncio API clients.
+
+Run with: pytest tests/test_api/test_async_api.py -v
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+import pytest
+from unittest.mock import patch
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.api.async_api import (
+    AsyncBaseQualtricsClient,
+    AsyncContactsAPI,
+    AsyncDistributionsAPI,
+    AsyncMessagesAPI,
+    AsyncSurveysAPI,
+)
+
+
+ASYNC_CLIENTS = [AsyncBaseQualtricsClient, AsyncContactsAPI, AsyncDistributionsAPI, AsyncMessagesAPI, AsyncSurveysAPI]
+
+
+class TestAsyncAPI:
+    """Test suite for the async API clients."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.api = AsyncContactsAPI(
+            api_token='test_token',
+            data_center='yul1',
+            directory_id='POOL_test',
+            mailing_list_id='CG_test',
+            max_concurrency=3
+        )
+    
+    def teardown_method(self):
+        asyncio.run(self.api.close())
+    
+    def test_init_delegates_attributes(self):
+        """Test that ids of the wrapped client are exposed."""
+        assert self.api.directory_id == 'POOL_test'
+        assert self.api.mailing_list_id == 'CG_test'
+        assert self.api.build_url('/API/v3/test') == 'https://yul1.qualtrics.com/API/v3/test'
+    
+    def test_update_contact_returns_sync_result(self):
+        """Test that coroutines return the synchronous result."""
+        with patch.object(self.api.client, 'update_contact', return_value=True) as mock_update:
+            result = asyncio.run(self.api.update_contact('CID_1', {'embeddedData': {}}))
+        
+        assert result is True
+        mock_update.assert_called_once_with('CID_1', {'embeddedData': {}})
+    
+    def test_concurrency_is_bounded(self):
+        """Test that no more than max_concurrency calls run at once."""
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+        
+        def slow_update(contact_id, data):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            return True
+        
+        async def run_all():
+            tasks = [self.api.update_contact(f'CID_{i}', {}) for i in range(12)]
+            return await asyncio.gather(*tasks)
+        
+        with patch.object(self.api.client, 'update_contact', side_effect=slow_update):
+            results = asyncio.run(run_all())
+        
+        assert results == [True] * 12
+        assert 1 < peak <= 3
+    
+    def test_calls_run_on_dedicated_pool(self):
+        """Test that calls run on the client's own threads, across event loops."""
+        threads = set()
+        
+        def update(contact_id, data):
+            threads.add(threading.current_thread().name)
+            return True
+        
+        async def run_all():
+            return await asyncio.gather(*[self.api.update_contact(f'CID_{i}', {}) for i in range(6)])
+        
+        with patch.object(self.api.client, 'update_contact', side_effect=update):
+            assert asyncio.run(run_all()) == [True] * 6
+            # a second loop gets its own semaphore
+            assert asyncio.run(run_all()) == [True] * 6
+        
+        assert threads and all(name.startswith('qualtrics-async') for name in threads)
+        assert len(threads) <= 3
+    
+    def test_shared_limit(self):
+        """Test that clients can share one concurrency budget."""
+        distributions_api = AsyncDistributionsAPI(
+            api_token='test_token',
+            data_center='yul1',
+            survey_id='SV_test',
+            limit=self.api.limit,
+            session=self.api.session
+        )
+        
+        assert distributions_api.limit is self.api.limit
+        assert distributions_api.session is self.api.session
+    
+    def test_iterators_become_async_generators(self):
+        """Test that iterator methods yield the items of the sync iterator."""
+        async def collect():
+            return [contact async for contact in self.api.iter_contacts(include_embedded=False)]
+        
+        contacts = [{'contactId': f'CID_{i}'} for i in range(3)]
+        with patch.object(self.api.client, 'iter_contacts', return_value=iter(contacts)) as mock_iter:
+            assert asyncio.run(collect()) == contacts
+        
+        mock_iter.assert_called_once_with(include_embedded=False)
+    
+    def test_blocking_methods_are_not_forwarded(self):
+        """Test that a sync method without an async version is refused."""
+        with patch.object(self.api.client, 'new_blocking_call', create=True):
+            with pytest.raises(AttributeError, match='no async version'):
+                self.api.new_blocking_call
+    
+    
+    def test_for_survey_shares_limit(self):
+        """Test that a client for another survey is async and shares the limit."""
+        surveys_api = AsyncSurveysAPI(api_token='test_token', data_center='yul1', survey_id='SV_1', limit=self.api.limit)
+        other = surveys_api.for_survey('SV_2')
+        
+        assert isinstance(other, AsyncSurveysAPI)
+        assert other.survey_id == 'SV_2'
+        assert other.limit is self.api.limit
+        assert other.session is surveys_api.session
+
+
+@pytest.mark.parametrize('async_class', ASYNC_CLIENTS, ids=lambda cls: cls.__name__)
+def test_every_sync_method_has_async_version(async_class):
+    """Test that each public method of the sync client is a coroutine or local helper."""
+    for name, member in inspect.getmembers(async_class.sync_class, callable):
+        if name.startswith('_') or name in async_class.LOCAL_METHODS or name == 'for_survey':
+            continue
+        method = getattr(async_class, name, None)
+        assert inspect.iscoroutinefunction(method) or inspect.isasyncgenfunction(method), name
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,79 @@
+"""
+Unit tests for the base API client.
+
+Run with: pytest tests/test_api/test_base.py -v
+"""
+
+import threading
+import pytest
+from unittest.mock import Mock, patch
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.api.base import BaseQualtricsClient
+
+
+def make_page(elements, next_page=None):
+    """Build a mock response for one page of results."""
+    response = Mock(ok=True)
+    response.json.return_value = {
+        'meta': {'httpStatus': '200 - OK'},
+        'result': {'elements': elements, 'nextPage': next_page}
+    }
+    return response
+
+
+class TestPagination:
+    """Test suite for paginated requests."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.client = BaseQualtricsClient(api_token='test_token', data_center='yul1', verbose=0)
+        self.pages = {
+            'https://yul1.qualtrics.com/p1': make_page([1, 2], 'https://yul1.qualtrics.com/p2'),
+            'https://yul1.qualtrics.com/p2': make_page([3, 4], 'https://yul1.qualtrics.com/p3'),
+            'https://yul1.qualtrics.com/p3': make_page([5]),
+        }
+    
+    def fake_request(self, method, url, **kwargs):
+        return self.pages[url]
+    
+    @pytest.mark.parametrize('prefetch', [False, True])
+    def test_get_paginated_collects_all_pages(self, prefetch):
+        """Test that all pages are collected in order."""
+        with patch.object(self.client.session, 'request', side_effect=self.fake_request):
+            elements = self.client.get_paginated('https://yul1.qualtrics.com/p1', prefetch=prefetch)
+        
+        assert elements == [1, 2, 3, 4, 5]
+    
+    @pytest.mark.parametrize('prefetch', [False, True])
+    def test_max_pages(self, prefetch):
+        """Test that max_pages stops the listing."""
+        with patch.object(self.client.session, 'request', side_effect=self.fake_request) as mock_request:
+            elements = self.client.get_paginated(
+                'https://yul1.qualtrics.com/p1', max_pages=2, prefetch=prefetch
+            )
+        
+        assert elements == [1, 2, 3, 4]
+        assert mock_request.call_count == 2
+    
+    def test_prefetch_downloads_next_page_while_consuming(self):
+        """Test that the next page is requested before the current one is consumed."""
+        second_page_requested = threading.Event()
+        
+        def fake_request(method, url, **kwargs):
+            if url.endswith('p2'):
+                second_page_requested.set()
+            return self.pages[url]
+        
+        with patch.object(self.client.session, 'request', side_effect=fake_request):
+            elements = self.client.iter_paginated('https://yul1.qualtrics.com/p1', prefetch=True)
+            assert next(elements) == 1
+            
+            # Still on the first page, but the second is already on its way
+            assert second_page_requested.wait(timeout=2)
+            assert list(elements) == [2, 3, 4, 5]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -46,7 +46,7 @@ class TestContactsAPI:
         url_with_params = self.api.build_url('/API/v3/test', {'param': 'value'})
         assert 'param=value' in url_with_params
     
-    @patch('qualtrics_util.api.contacts.requests.get')
+    @patch('qualtrics_util.api.base.requests.Session.request')
     def test_get_contact_list_success(self, mock_get):
         """Test successful contact list retrieval."""
         # Mock response
@@ -70,7 +70,7 @@ class TestContactsAPI:
         assert contacts[0]['firstName'] == 'John'
         mock_get.assert_called_once()
     
-    @patch('qualtrics_util.api.contacts.requests.get')
+    @patch('qualtrics_util.api.base.requests.Session.request')
     def test_get_contact_list_with_embedded(self, mock_get):
         """Test contact list retrieval with embedded data."""
         # Mock response
@@ -92,11 +92,253 @@ class TestContactsAPI:
         # Check that includeEmbedded was added to URL
         mock_get.assert_called_once()
     
+    @patch('qualtrics_util.api.base.requests.Session.request')
+    def test_get_contact_list_follows_next_page(self, mock_request):
+        """Test that contacts on later pages are not dropped."""
+        first_page = Mock(ok=True)
+        first_page.json.return_value = {
+            'meta': {'httpStatus': '200 - OK'},
+            'result': {
+                'elements': [{'contactId': 'CID_1'}, {'contactId': 'CID_2'}],
+                'nextPage': 'https://yul1.qualtrics.com/API/v3/next?skipToken=abc'
+            }
+        }
+        second_page = Mock(ok=True)
+        second_page.json.return_value = {
+            'meta': {'httpStatus': '200 - OK'},
+            'result': {'elements': [{'contactId': 'CID_3'}], 'nextPage': None}
+        }
+        mock_request.side_effect = [first_page, second_page]
+        
+        contacts = self.api.get_contact_list()
+        
+        assert [c['contactId'] for c in contacts] == ['CID_1', 'CID_2', 'CID_3']
+        assert mock_request.call_count == 2
+        assert 'pageSize=100' in mock_request.call_args_list[0].args[1]
+    
+    @patch('qualtrics_util.api.base.requests.Session.request')
+    def test_iter_contacts_is_lazy(self, mock_request):
+        """Test that iter_contacts only fetches pages as they are consumed."""
+        page = Mock(ok=True)
+        page.json.return_value = {
+            'result': {
+                'elements': [{'contactId': 'CID_1'}],
+                'nextPage': 'https://yul1.qualtrics.com/API/v3/next?skipToken=abc'
+            }
+        }
+        mock_request.return_value = page
+        
+        contacts = self.api.iter_contacts(page_size=1)
+        assert mock_request.call_count == 0
+        
+        assert next(contacts)['contactId'] == 'CID_1'
+        assert mock_request.call_count == 1
+        assert 'pageSize=1' in mock_request.call_args.args[1]
+    
+    def test_clients_share_session(self):
+        """Test that a shared session is reused rather than replaced."""
+        from qualtrics_util.api import DistributionsAPI, create_session
+        
+        session = create_session(pool_maxsize=4)
+        contacts_api = ContactsAPI(
+            api_token='test_token',
+            data_center='yul1',
+            directory_id='POOL_test',
+            mailing_list_id='CG_test',
+            session=session
+        )
+        distributions_api = DistributionsAPI(
+            api_token='test_token',
+            data_center='yul1',
+            survey_id='SV_test',
+            session=session
+        )
+        
+        assert contacts_api.session is session
+        assert distributions_api.session is session
+        assert session.get_adapter('https://yul1.qualtrics.com')._pool_maxsize == 4
+    
     def test_get_contact_list_error(self):
         """Test error handling in contact list retrieval."""
         with pytest.raises(Exception):
             # This will raise because we don't have a real token
             self.api.get_contact_list()
+    
+    
+    def test_update_embedded_skips_unchanged_contact(self):
+        """Test that no PUT is sent when nothing changes."""
+        contact = {
+            'contactId': 'CID_1',
+            'embeddedData': {'SurveysScheduled': '4', 'SendStatus': '0'}
+        }
+        defaults = {'SurveysScheduled': 0, 'SendStatus': 0}
+        
+        with patch.object(self.api, 'update_contact') as mock_update:
+            assert self.api.update_embedded(contact, defaults=defaults) is False
+            assert self.api.update_embedded(contact, {'SurveysScheduled': 4}) is False
+            mock_update.assert_not_called()
+            
+            assert self.api.update_embedded(contact, {'SurveysScheduled': 5}) is True
+            mock_update.assert_called_once_with(
+                'CID_1', {'embeddedData': {'SurveysScheduled': 5, 'SendStatus': '0'}}, default_language=False
+            )
+        
+        assert self.api.skipped_writes == 2
+        assert self.api.embedded_writes == 1
+    
+    def test_update_contact_language_default(self):
+        """Test that only full updates default the language to English."""
+        with patch.object(self.api, 'make_request') as mock_request:
+            self.api.update_contact('CID_1', {'firstName': 'Ana'})
+            assert mock_request.call_args.kwargs['json_data'] == {'firstName': 'Ana', 'language': 'en'}
+            
+            self.api.update_contact('CID_1', {'embeddedData': {'SendStatus': 1}}, default_language=False)
+            assert mock_request.call_args.kwargs['json_data'] == {'embeddedData': {'SendStatus': 1}}
+
+
+
+class FakeImportServer:
+    """Stand-in for the Qualtrics contact import endpoints."""
+    
+    def __init__(self, polls_until_complete=2, failed_rows=()):
+        self.polls_until_complete = polls_until_complete
+        self.failed_rows = failed_rows
+        self.jobs = {}
+        self.requests = []
+    
+    def response(self, result):
+        response = Mock(ok=True, status_code=200)
+        response.json.return_value = {'meta': {'httpStatus': '200 - OK'}, 'result': result}
+        return response
+    
+    def __call__(self, method, url, json=None, **kwargs):
+        self.requests.append((method, url))
+        path = url.split('/contactimports', 1)[1]
+        
+        if method == 'POST':
+            import_id = f'IMP_{len(self.jobs) + 1}'
+            self.jobs[import_id] = {'rows': json['contacts'], 'polls': 0}
+            return self.response({'id': import_id})
+        
+        import_id = path.strip('/').split('/')[0]
+        job = self.jobs[import_id]
+        
+        if path.endswith('/summary'):
+            failed = [i for i in self.failed_rows if i < len(job['rows'])]
+            return self.response({
+                'contacts': {'count': {'added': 0, 'updated': len(job['rows']) - len(failed), 'failed': len(failed)}},
+                'failures': [{'index': i, 'message': 'Invalid phone'} for i in failed],
+            })
+        
+        job['polls'] += 1
+        done = job['polls'] >= self.polls_until_complete
+        return self.response({
+            'status': 'complete' if done else 'in progress',
+            'percentComplete': 100 if done else 50,
+        })
+
+
+class TestContactImport:
+    """Test suite for bulk contact imports."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.api = ContactsAPI(
+            api_token='test_token',
+            data_center='yul1',
+            directory_id='POOL_test',
+            mailing_list_id='CG_test',
+            verbose=0
+        )
+        self.contacts = [
+            {'contactId': f'CID_{i}', 'email': f'p{i}@example.com', 'embeddedData': {'NumDays': '0'}}
+            for i in range(5000)
+        ]
+    
+    @patch('qualtrics_util.api.contacts.time.sleep')
+    def test_one_job_for_a_panel(self, mock_sleep):
+        """Test that 5,000 contacts are one job with per-row failures."""
+        server = FakeImportServer(failed_rows=(7, 4999))
+        
+        with patch.object(self.api.session, 'request', side_effect=server):
+            report = self.api.import_contacts(self.contacts)
+        
+        posts = [r for r in server.requests if r[0] == 'POST']
+        assert len(posts) == 1
+        assert len(server.requests) == 4  # submit, two polls, summary
+        assert report['importIds'] == ['IMP_1']
+        assert report['updated'] == 4998
+        assert report['failed'] == 2
+        assert [f['row'] for f in report['failures']] == [7, 4999]
+        assert report['failures'][0]['contact']['contactId'] == 'CID_7'
+        assert report['failures'][0]['error'] == 'Invalid phone'
+        
+        # contactId is not an import field
+        assert 'contactId' not in server.jobs['IMP_1']['rows'][0]
+    
+    @patch('qualtrics_util.api.contacts.time.sleep')
+    def test_batches_and_row_offsets(self, mock_sleep):
+        """Test that large lists are split into jobs with global row numbers."""
+        server = FakeImportServer(polls_until_complete=1, failed_rows=(1,))
+        
+        with patch.object(self.api.session, 'request', side_effect=server):
+            report = self.api.import_contacts(self.contacts, batch_size=2000)
+        
+        assert report['importIds'] == ['IMP_1', 'IMP_2', 'IMP_3']
+        assert [f['row'] for f in report['failures']] == [1, 2001, 4001]
+    
+    @patch('qualtrics_util.api.contacts.time.sleep')
+    def test_job_that_never_finishes(self, mock_sleep):
+        """Test that polling gives up after max_polls."""
+        server = FakeImportServer(polls_until_complete=100)
+        
+        with patch.object(self.api.session, 'request', side_effect=server):
+            with pytest.raises(Exception, match='did not finish'):
+                self.api.import_contacts(self.contacts[:10], max_polls=3)
+    
+    @patch('qualtrics_util.api.contacts.time.sleep')
+    def test_bulk_update_embedded_skips_unchanged(self, mock_sleep):
+        """Test that only changed contacts are submitted."""
+        server = FakeImportServer(polls_until_complete=1)
+        self.contacts[0]['embeddedData'] = {'NumDays': '7'}
+        
+        with patch.object(self.api.session, 'request', side_effect=server):
+            report = self.api.bulk_update_embedded(self.contacts[:3], updates={'NumDays': 7}, min_import=2)
+        
+        assert report['skipped'] == 1
+        rows = server.jobs['IMP_1']['rows']
+        assert [row['email'] for row in rows] == ['p1@example.com', 'p2@example.com']
+        assert rows[0]['embeddedData'] == {'NumDays': 7}
+    
+    @patch('qualtrics_util.api.contacts.time.sleep')
+    def test_bulk_update_embedded_ambiguous_contacts_use_put(self, mock_sleep):
+        """Test that contacts an import could mismatch are updated by contactId."""
+        server = FakeImportServer(polls_until_complete=1)
+        contacts = self.contacts[:60]
+        contacts[1] = dict(contacts[1], email='P0@example.com')  # shares contact 0's email
+        del contacts[2]['email']  # nothing to match on
+        
+        with patch.object(self.api.session, 'request', side_effect=server):
+            with patch.object(self.api, 'update_contact') as mock_update:
+                report = self.api.bulk_update_embedded(contacts, updates={'NumDays': 7})
+        
+        assert len(server.jobs['IMP_1']['rows']) == 57
+        assert [c.args[0] for c in mock_update.call_args_list] == ['CID_0', 'CID_1', 'CID_2']
+        mock_update.assert_called_with('CID_2', {'embeddedData': {'NumDays': 7}}, default_language=False)
+        assert report['individual'] == 3
+        assert report['submitted'] == 60
+        assert report['updated'] == 60
+    
+    def test_bulk_update_embedded_small_batch_uses_put(self):
+        """Test that a few changed contacts do not start an import job."""
+        with patch.object(self.api, 'update_contact') as mock_update:
+            with patch.object(self.api, 'start_contact_import') as mock_import:
+                report = self.api.bulk_update_embedded(self.contacts[:3], updates={'NumDays': 7})
+        
+        mock_import.assert_not_called()
+        assert mock_update.call_count == 3
+        assert report['individual'] == 3
+        assert self.api.embedded_writes == 3
 
 
 if __name__ == '__main__':
@@ -0,0 +1,90 @@
+"""
+Unit tests for the Distributions API.
+
+Run with: pytest tests/test_api/test_distributions.py -v
+"""
+
+import threading
+import pytest
+from unittest.mock import Mock, patch
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.api.distributions import DistributionsAPI
+
+
+def make_response(ok=True):
+    """Build a mock response for a delete."""
+    response = Mock(ok=ok, status_code=200 if ok else 404)
+    response.json.return_value = {'meta': {'httpStatus': '200 - OK' if ok else '404 - Not Found'}}
+    return response
+
+
+class TestDeleteDistributions:
+    """Test suite for bulk distribution deletes."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.api = DistributionsAPI(
+            api_token='test_token',
+            data_center='yul1',
+            survey_id='SV_test',
+            verbose=0
+        )
+    
+    def test_sms_report_per_id(self):
+        """Test that every ID gets its own result."""
+        def fake_request(method, url, **kwargs):
+            return make_response(ok='SMS_bad' not in url)
+        
+        with patch.object(self.api.session, 'request', side_effect=fake_request) as mock_request:
+            report = self.api.delete_distributions(['SMS_1', 'SMS_bad', 'SMS_2'])
+        
+        assert report == {'SMS_1': True, 'SMS_bad': False, 'SMS_2': True}
+        assert mock_request.call_count == 3
+        
+        urls = [call.args[1] for call in mock_request.call_args_list]
+        assert all('/API/v3/distributions/sms/' in url for url in urls)
+        assert all('surveyId=SV_test' in url for url in urls)
+    
+    def test_email_uses_email_endpoint(self):
+        """Test that email deletes use the distributions endpoint."""
+        with patch.object(self.api.session, 'request', return_value=make_response()) as mock_request:
+            report = self.api.delete_distributions(['EMD_1'], channel='email')
+        
+        assert report == {'EMD_1': True}
+        method, url = mock_request.call_args.args[:2]
+        assert method == 'DELETE'
+        assert url.endswith('/API/v3/distributions/EMD_1')
+    
+    def test_deletes_run_concurrently(self):
+        """Test that several deletes are in flight at once."""
+        barrier = threading.Barrier(3, timeout=2)
+        
+        def fake_request(method, url, **kwargs):
+            # Only returns once three requests are waiting together
+            barrier.wait()
+            return make_response()
+        
+        with patch.object(self.api.session, 'request', side_effect=fake_request):
+            report = self.api.delete_distributions(['SMS_1', 'SMS_2', 'SMS_3'], max_workers=3)
+        
+        assert all(report.values())
+    
+    def test_duplicates_and_empty(self):
+        """Test that duplicate IDs are deleted once and no IDs is a no-op."""
+        with patch.object(self.api.session, 'request', return_value=make_response()) as mock_request:
+            assert self.api.delete_distributions([]) == {}
+            report = self.api.delete_distributions(['SMS_1', 'SMS_1'])
+        
+        assert report == {'SMS_1': True}
+        assert mock_request.call_count == 1
+    
+    def test_unknown_channel(self):
+        """Test that an unknown channel is rejected."""
+        with pytest.raises(ValueError):
+            self.api.delete_distributions(['X_1'], channel='fax')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,117 @@
+"""
+Unit tests for the Messages API.
+
+Run with: pytest tests/test_api/test_messages.py -v
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.api.messages import MessagesAPI, MessageCache
+
+
+def make_message_response(messages):
+    """Build a mock response for a library message."""
+    response = Mock(ok=True, status_code=200)
+    response.json.return_value = {
+        'meta': {'httpStatus': '200 - OK'},
+        'result': {'messages': messages}
+    }
+    return response
+
+
+class TestMessageCache:
+    """Test suite for MessageCache."""
+    
+    def test_get_and_set(self):
+        """Test that entries are keyed by library, message and language."""
+        cache = MessageCache()
+        cache.set('UR_1', 'MS_1', 'en', 'Hello')
+        
+        assert cache.get('UR_1', 'MS_1', 'en') == 'Hello'
+        assert cache.get('UR_1', 'MS_1', 'fr') is None
+        assert cache.get('UR_2', 'MS_1', 'en') is None
+    
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL."""
+        cache = MessageCache(ttl=10)
+        
+        with patch('qualtrics_util.api.messages.time.monotonic', return_value=100.0):
+            cache.set('UR_1', 'MS_1', 'en', 'Hello')
+        with patch('qualtrics_util.api.messages.time.monotonic', return_value=105.0):
+            assert cache.get('UR_1', 'MS_1', 'en') == 'Hello'
+        with patch('qualtrics_util.api.messages.time.monotonic', return_value=111.0):
+            assert cache.get('UR_1', 'MS_1', 'en') is None
+        
+        assert len(cache) == 0
+    
+    def test_invalidate(self):
+        """Test that None arguments act as wildcards."""
+        cache = MessageCache()
+        cache.set('UR_1', 'MS_1', 'en', 'Hello')
+        cache.set('UR_1', 'MS_1', 'fr', 'Bonjour')
+        cache.set('UR_1', 'MS_2', 'en', 'Bye')
+        
+        assert cache.invalidate('UR_1', 'MS_1') == 2
+        assert cache.get('UR_1', 'MS_2', 'en') == 'Bye'
+        
+        assert cache.invalidate() == 1
+        assert len(cache) == 0
+
+
+class TestMessagesAPI:
+    """Test suite for MessagesAPI caching."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.api = MessagesAPI(
+            api_token='test_token',
+            data_center='yul1',
+            library_id='UR_test',
+            verbose=0
+        )
+        self.response = make_message_response({'en': 'Take the survey', 'es': 'Tome la encuesta'})
+    
+    def test_template_fetched_once(self):
+        """Test that repeated sends fetch the template once."""
+        with patch.object(self.api.session, 'request', return_value=self.response) as mock_request:
+            texts = [self.api.get_message_with_random_text('MS_1') for _ in range(56)]
+            spanish = self.api.get_message('MS_1', language='es')
+        
+        assert mock_request.call_count == 1
+        assert all(text.startswith('Take the survey\n[') for text in texts)
+        assert len(set(texts)) > 1
+        assert spanish == 'Tome la encuesta'
+    
+    def test_invalidate_message_refetches(self):
+        """Test that invalidation forces a new fetch."""
+        with patch.object(self.api.session, 'request', return_value=self.response) as mock_request:
+            self.api.get_message('MS_1')
+            assert self.api.invalidate_message('MS_1') == 2
+            self.api.get_message('MS_1')
+            self.api.get_message('MS_1', use_cache=False)
+        
+        assert mock_request.call_count == 3
+    
+    def test_shared_cache(self):
+        """Test that clients sharing a cache share templates."""
+        other = MessagesAPI(
+            api_token='test_token',
+            data_center='yul1',
+            library_id='UR_test',
+            message_cache=self.api.message_cache,
+            verbose=0
+        )
+        
+        with patch.object(self.api.session, 'request', return_value=self.response):
+            self.api.get_message('MS_1')
+        with patch.object(other.session, 'request') as mock_request:
+            assert other.get_message('MS_1') == 'Take the survey'
+        
+        mock_request.assert_not_called()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,174 @@
+"""
+Unit tests for adaptive polling.
+
+Run with: pytest tests/test_api/test_polling.py -v
+"""
+
+import time
+import pytest
+from unittest.mock import Mock, patch
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.api.polling import AdaptivePoller, PollTimeout
+from qualtrics_util.api.rate_limit import RateLimiter
+from qualtrics_util.api.surveys import SurveysAPI
+
+
+class FakeClock:
+    """time.monotonic and time.sleep that only move when slept."""
+    
+    def __init__(self):
+        # start from the real clock, rate limiter buckets may already exist
+        self.now = self.start = time.monotonic()
+        self.sleeps = []
+    
+    def monotonic(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeJob:
+    """Job that completes at a fixed rate (percent per second) of the fake clock."""
+    
+    def __init__(self, clock, rate, stall=0.0):
+        self.clock = clock
+        self.rate = rate
+        self.start = clock.now + stall
+        self.checks = 0
+    
+    def __call__(self):
+        self.checks += 1
+        percent = min(max(self.clock.now - self.start, 0.0) * self.rate, 100.0)
+        return percent >= 100.0, percent, {'percentComplete': percent}
+
+
+@pytest.fixture
+def clock():
+    fake = FakeClock()
+    with patch('time.monotonic', fake.monotonic), patch('time.sleep', fake.sleep):
+        yield fake
+
+
+class TestAdaptivePoller:
+    """Test suite for AdaptivePoller."""
+    
+    def test_interval_follows_estimated_completion(self):
+        """Test that the next check is scheduled at the expected completion."""
+        poller = AdaptivePoller(min_interval=0.5, max_interval=30.0)
+        
+        assert poller.next_interval(0.0, 0.0) == 1.0
+        # 20% in 4 seconds, 80% left at 5%/s
+        assert poller.next_interval(4.0, 20.0) == pytest.approx(16.0)
+    
+    def test_interval_is_bounded(self):
+        """Test that estimates are clamped to min_interval and max_interval."""
+        poller = AdaptivePoller(min_interval=0.5, max_interval=30.0)
+        poller.next_interval(0.0, 0.0)
+        
+        assert poller.next_interval(100.0, 1.0) == 30.0
+        assert poller.next_interval(101.0, 99.9) == 0.5
+    
+    def test_backoff_without_progress(self):
+        """Test that the interval grows while the job reports no progress."""
+        poller = AdaptivePoller(initial_interval=2.0)
+        
+        intervals = [poller.next_interval(t, 0.0) for t in (0.0, 2.0, 5.0)]
+        
+        assert intervals == [2.0, 3.0, 4.5]
+    
+    def test_fast_job_finishes_without_long_sleeps(self, clock):
+        """Test that a small job is picked up within a couple of seconds."""
+        job = FakeJob(clock, rate=50.0)
+        
+        result = AdaptivePoller().poll(job)
+        
+        assert result['percentComplete'] == 100.0
+        assert sum(clock.sleeps) < 3
+    
+    def test_slow_job_is_checked_sparingly(self, clock):
+        """Test that a long job is not polled at a fixed short interval."""
+        job = FakeJob(clock, rate=0.5)
+        
+        AdaptivePoller().poll(job)
+        
+        # 200 seconds of work, checked far less often than once a second
+        assert clock.now - clock.start >= 200
+        assert job.checks < 20
+    
+    def test_timeout(self, clock):
+        """Test that polling stops at the time budget."""
+        job = FakeJob(clock, rate=0.01)
+        
+        with pytest.raises(PollTimeout, match='not finished'):
+            AdaptivePoller(timeout=60).poll(job, description='Export ES_1')
+        
+        assert clock.now - clock.start == pytest.approx(60)
+    
+    def test_max_checks(self, clock):
+        """Test that polling stops after max_checks."""
+        job = FakeJob(clock, rate=0.0)
+        
+        with pytest.raises(PollTimeout):
+            AdaptivePoller(max_checks=3).poll(job)
+        
+        assert job.checks == 3
+        assert len(clock.sleeps) == 2
+
+
+class TestPollExport:
+    """Test suite for SurveysAPI.poll_export."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.api = SurveysAPI(
+            api_token='test_token',
+            data_center='yul1',
+            survey_id='SV_test',
+            verbose=0,
+            rate_limiter=RateLimiter(budgets={'exports': 600000}, brand_limit=600000)
+        )
+    
+    def progress(self, *results):
+        """Mock progress responses returned in order."""
+        responses = []
+        for result in results:
+            response = Mock(ok=True, status_code=200)
+            response.json.return_value = {'result': result}
+            responses.append(response)
+        return patch.object(self.api.session, 'request', side_effect=responses)
+    
+    def test_export_ready_without_fixed_wait(self, clock):
+        """Test that a quick export is not held back by a fixed 7.5 second sleep."""
+        with self.progress(
+            {'status': 'inProgress', 'percentComplete': 0},
+            {'status': 'complete', 'percentComplete': 100, 'fileId': 'FILE_1'},
+        ):
+            result = self.api.poll_export('ES_1')
+        
+        assert result['fileId'] == 'FILE_1'
+        assert clock.sleeps == [1.0]
+    
+    def test_failed_export(self, clock):
+        """Test that a failed export raises immediately."""
+        with self.progress({'status': 'failed', 'percentComplete': 10}):
+            with pytest.raises(Exception, match='failed'):
+                self.api.poll_export('ES_1')
+        
+        assert clock.sleeps == []
+    
+    def test_export_timeout(self, clock):
+        """Test that an export that never finishes stops at the timeout."""
+        stalled = [{'status': 'inProgress', 'percentComplete': 5}] * 50
+        with self.progress(*stalled):
+            with pytest.raises(PollTimeout):
+                self.api.poll_export('ES_1', timeout=30)
+        
+        assert sum(clock.sleeps) == pytest.approx(30)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,141 @@
+"""
+Unit tests for the rate limiter.
+
+Run with: pytest tests/test_api/test_rate_limit.py -v
+"""
+
+import time
+import pytest
+from unittest.mock import Mock, patch
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.api.base import QualtricsAPIError
+from qualtrics_util.api.contacts import ContactsAPI
+from qualtrics_util.api.rate_limit import THROUGHPUT_WINDOW, RateLimiter, TokenBucket, endpoint_family
+
+
+def make_response(status_code, headers=None, payload=None):
+    """Build a mock response with the given status."""
+    response = Mock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.headers = headers or {}
+    response.json.return_value = payload or {'result': {}}
+    response.text = ''
+    return response
+
+
+class TestRateLimiter:
+    """Test suite for RateLimiter."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.limiter = RateLimiter(budgets={'contacts': 600000}, brand_limit=600000)
+        self.api = ContactsAPI(
+            api_token='test_token',
+            data_center='yul1',
+            directory_id='POOL_test',
+            mailing_list_id='CG_test',
+            rate_limiter=self.limiter
+        )
+    
+    def test_endpoint_family(self):
+        """Test URL classification into endpoint families."""
+        base = 'https://yul1.qualtrics.com/API/v3'
+        assert endpoint_family(f'{base}/distributions/sms?surveyId=SV_1') == 'distributions'
+        assert endpoint_family(f'{base}/directories/POOL_1/contacts/CID_1') == 'contacts'
+        assert endpoint_family(f'{base}/libraries/UR_1/messages/MS_1') == 'libraries'
+        assert endpoint_family(f'{base}/surveys/SV_1/export-responses/ES_1') == 'exports'
+        assert endpoint_family(f'{base}/whoami') == 'default'
+    
+    def test_should_retry(self):
+        """Test which responses are retried."""
+        assert self.limiter.should_retry('GET', 429)
+        assert self.limiter.should_retry('POST', 429)
+        assert self.limiter.should_retry('PUT', 503)
+        assert not self.limiter.should_retry('POST', 500)
+        assert not self.limiter.should_retry('GET', 404)
+    
+    def test_post_retried_only_when_not_processed(self):
+        """Test that a POST is not retried on a 5xx that may have created it."""
+        assert self.limiter.should_retry('GET', 502)
+        for status_code in (502, 503, 504):
+            assert not self.limiter.should_retry('POST', status_code, make_response(status_code))
+        assert self.limiter.should_retry('POST', 503, make_response(503, headers={'Retry-After': '5'}))
+        assert not self.limiter.should_retry('POST', 503)
+    
+    def test_backoff_honors_retry_after(self):
+        """Test that Retry-After takes precedence over backoff."""
+        response = make_response(429, headers={'Retry-After': '7'})
+        assert self.limiter.backoff_delay(0, response) == 7.0
+        
+        # Long Retry-After values are capped
+        response = make_response(503, headers={'Retry-After': '3600'})
+        assert self.limiter.backoff_delay(0, response) == self.limiter.max_retry_after
+        
+        # Jittered backoff stays within the exponential ceiling
+        delay = self.limiter.backoff_delay(3)
+        assert 0 <= delay <= 8.0
+    
+    @patch('qualtrics_util.api.base.time.sleep')
+    @patch('qualtrics_util.api.base.requests.Session.request')
+    def test_make_request_retries_429(self, mock_request, mock_sleep):
+        """Test that a 429 is retried after the Retry-After delay."""
+        mock_request.side_effect = [
+            make_response(429, headers={'Retry-After': '2'}),
+            make_response(200, payload={'result': {'contactId': 'CID_1'}}),
+        ]
+        
+        contact = self.api.get_contact('CID_1')
+        
+        assert contact == {'contactId': 'CID_1'}
+        assert mock_request.call_count == 2
+        mock_sleep.assert_any_call(2.0)
+    
+    @patch('qualtrics_util.api.base.time.sleep')
+    @patch('qualtrics_util.api.base.requests.Session.request')
+    def test_make_request_gives_up(self, mock_request, mock_sleep):
+        """Test that retries stop after max_retries."""
+        self.limiter.max_retries = 2
+        mock_request.return_value = make_response(503)
+        
+        with pytest.raises(QualtricsAPIError) as excinfo:
+            self.api.get_contact('CID_1')
+        
+        assert excinfo.value.status_code == 503
+        assert mock_request.call_count == 3
+    
+    def test_throughput(self):
+        """Test throughput reporting per family."""
+        for _ in range(6):
+            self.limiter.acquire('https://yul1.qualtrics.com/API/v3/directories/POOL_1/contacts')
+        self.limiter.acquire('https://yul1.qualtrics.com/API/v3/distributions/sms')
+        
+        assert self.limiter.throughput(window=60.0) == pytest.approx(7 / 60.0)
+        assert self.limiter.throughput('contacts', window=60.0) == pytest.approx(6 / 60.0)
+    
+    def test_history_is_bounded(self):
+        """Test that requests older than the throughput window are forgotten."""
+        old = time.monotonic() - THROUGHPUT_WINDOW - 1
+        self.limiter._history.extend((old, 'contacts') for _ in range(1000))
+        
+        self.limiter.acquire('https://yul1.qualtrics.com/API/v3/distributions/sms')
+        
+        assert len(self.limiter._history) == 1
+        assert self.limiter.throughput() == pytest.approx(1 / THROUGHPUT_WINDOW)
+    
+    def test_token_bucket_waits_when_empty(self):
+        """Test that an empty bucket makes the caller wait."""
+        bucket = TokenBucket(rate=10.0, capacity=1.0)
+        
+        with patch('qualtrics_util.api.rate_limit.time.sleep') as mock_sleep:
+            assert bucket.acquire() == 0.0
+            wait = bucket.acquire()
+        
+        assert wait == pytest.approx(0.1, abs=0.01)
+        mock_sleep.assert_called_once()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
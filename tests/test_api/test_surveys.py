@@ -0,0 +1,151 @@
+"""
+Unit tests for the Surveys API export.
+
+Run with: pytest tests/test_api/test_surveys.py -v
+"""
+
+import io
+import json
+import os
+import zipfile
+import pytest
+from unittest.mock import Mock, patch
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.api.surveys import SurveysAPI
+
+
+RESPONSES = [{'responseId': f'R_{i}', 'values': {'Q1': i, 'text': f'answer {i}'}} for i in range(50)]
+
+CSV_EXPORT = (
+    '\ufeffResponseId,Q1\r\n'
+    'Response ID,Question 1\r\n'
+    '{"ImportId":"_recordId"},{"ImportId":"QID1"}\r\n'
+    'R_1,1\r\n'
+    'R_2,2\r\n'
+).encode('utf-8')
+
+
+def make_zip(file_format):
+    """Build the export zip Qualtrics returns."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        if file_format == 'json':
+            archive.writestr('EMA Survey: daily.json', json.dumps({'responses': RESPONSES}))
+        else:
+            archive.writestr('EMA Survey: daily.csv', CSV_EXPORT)
+    return buffer.getvalue()
+
+
+class FakeExportServer:
+    """Answer the export-responses start, progress and file requests."""
+    
+    def __init__(self, file_format):
+        self.content = make_zip(file_format)
+        self.polls = 0
+    
+    def request(self, method, url, **kwargs):
+        response = Mock(ok=True, status_code=200)
+        if method == 'POST':
+            response.json.return_value = {'result': {'progressId': 'ES_1'}}
+        elif url.endswith('/file'):
+            assert kwargs.get('stream') is True
+            chunks = [self.content[i:i + 100] for i in range(0, len(self.content), 100)]
+            response.iter_content.return_value = iter(chunks)
+            response.__enter__ = Mock(return_value=response)
+            response.__exit__ = Mock(return_value=False)
+        else:
+            self.polls += 1
+            done = self.polls > 1
+            response.json.return_value = {'result': {
+                'status': 'complete' if done else 'inProgress',
+                'percentComplete': 100 if done else 50,
+                **({'fileId': 'FILE_1'} if done else {}),
+            }}
+        return response
+
+
+class TestExport:
+    """Test suite for the streaming export."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.api = SurveysAPI(
+            api_token='test_token',
+            data_center='yul1',
+            survey_id='SV_test',
+            verbose=0
+        )
+    
+    def run(self, file_format, method, *args, **kwargs):
+        """Call an export method against the fake server."""
+        server = FakeExportServer(file_format)
+        with patch.object(self.api.session, 'request', side_effect=server.request), \
+                patch('time.sleep'):
+            result = getattr(self.api, method)(*args, **kwargs)
+            if method == 'iter_responses':
+                result = list(result)
+        return result
+    
+    def test_stream_json_matches_previous_output(self, tmp_path):
+        """Test that the JSON file is the same as the previous rewrite."""
+        path = self.run('json', 'stream_export', 'json', wait_time=0, output_dir=str(tmp_path))
+        
+        assert os.path.basename(path) == 'EMA_Survey_daily.json'
+        expected = io.StringIO()
+        json.dump({'responses': RESPONSES, 'source': 'qualtrics'}, expected, indent=4)
+        with open(path) as fp:
+            assert fp.read() == expected.getvalue()
+    
+    def test_stream_csv_is_copied_unchanged(self, tmp_path):
+        """Test that the CSV member is saved as is."""
+        path = self.run('csv', 'stream_export', 'csv', wait_time=0, output_dir=str(tmp_path))
+        
+        with open(path, 'rb') as fp:
+            assert fp.read() == CSV_EXPORT
+    
+    def test_iter_responses(self, tmp_path):
+        """Test iterating over records, with and without saving the file."""
+        assert self.run('json', 'iter_responses', 'json', wait_time=0) == RESPONSES
+        assert os.listdir(tmp_path) == []
+        
+        records = self.run('csv', 'iter_responses', 'csv', wait_time=0, output_dir=str(tmp_path))
+        assert records == [{'ResponseId': 'R_1', 'Q1': '1'}, {'ResponseId': 'R_2', 'Q1': '2'}]
+        with open(tmp_path / 'EMA_Survey_daily.csv', 'rb') as fp:
+            assert fp.read() == CSV_EXPORT
+    
+    def test_stopped_iteration_keeps_previous_file(self, tmp_path):
+        """Test that a partly read export does not replace the saved file."""
+        path = tmp_path / 'EMA_Survey_daily.json'
+        path.write_text('previous export')
+        server = FakeExportServer('json')
+        
+        with patch.object(self.api.session, 'request', side_effect=server.request), \
+                patch('time.sleep'):
+            records = self.api.iter_responses('json', wait_time=0, output_dir=str(tmp_path))
+            assert next(records) == RESPONSES[0]
+            records.close()
+        
+        assert path.read_text() == 'previous export'
+        assert os.listdir(tmp_path) == ['EMA_Survey_daily.json']
+    
+    def test_export_responses_return_formats(self, tmp_path, monkeypatch):
+        """Test that export_responses still returns a DataFrame or dict."""
+        monkeypatch.chdir(tmp_path)
+        
+        df = self.run('json', 'export_responses', 'json', wait_time=0)
+        assert list(df['responseId']) == [r['responseId'] for r in RESPONSES]
+        
+        ddict = self.run('json', 'export_responses', 'json', wait_time=0, return_format='dict')
+        assert ddict == {'responses': RESPONSES, 'source': 'qualtrics'}
+        
+        df = self.run('csv', 'export_responses', 'csv', wait_time=0)
+        assert list(df['ResponseId']) == ['R_1', 'R_2']
+        
+        path = self.run('json', 'export_responses', 'json', wait_time=0, return_format='path')
+        assert path == os.path.join(str(tmp_path), 'EMA_Survey_daily.json')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,55 @@
+"""
+Unit tests for the distribution index.
+
+Run with: pytest tests/test_models/test_distribution_index.py -v
+"""
+
+import pytest
+import sys
+sys.path.insert(0, 'src')
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from qualtrics_util.models.distribution_index import DistributionIndex
+
+
+def make_distribution(dist_id, lookup_id, send_date):
+    """Build a distribution as returned by the listing."""
+    return {'id': dist_id, 'sendDate': send_date, 'recipients': {'contactId': lookup_id}}
+
+
+class TestDistributionIndex:
+    """Test suite for DistributionIndex."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.index = DistributionIndex([
+            make_distribution('EMD_3', 'CGC_A', '2024-01-17T14:00:00Z'),
+            make_distribution('EMD_1', 'CGC_A', '2024-01-15T14:00:00Z'),
+            make_distribution('EMD_2', 'CGC_A', '2024-01-16T14:00:00Z'),
+            make_distribution('EMD_4', 'CGC_B', '2024-01-16T14:00:00Z'),
+            {'id': 'EMD_5', 'sendDate': '2024-01-16T14:00:00Z', 'recipients': {}},
+        ])
+    
+    def test_len_skips_distributions_without_contact(self):
+        """Test that only distributions with a recipient are indexed."""
+        assert len(self.index) == 4
+    
+    def test_for_contact_sorted_by_send_date(self):
+        """Test that a contact's distributions are ordered by sendDate."""
+        ids = [d['id'] for d in self.index.for_contact('CGC_A')]
+        assert ids == ['EMD_1', 'EMD_2', 'EMD_3']
+        assert self.index.for_contact('CGC_missing') == []
+    
+    def test_unsent(self):
+        """Test selecting distributions scheduled after now."""
+        now = datetime(2024, 1, 16, 8, 0, tzinfo=ZoneInfo('America/Chicago'))  # 14:00 UTC
+        
+        ids = [d['id'] for d in self.index.unsent('CGC_A', now=now)]
+        
+        assert ids == ['EMD_3']
+        assert self.index.unsent('CGC_B', now=now) == []
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,68 @@
+"""
+Unit tests for embedded data helpers.
+
+Run with: pytest tests/test_models/test_embedded_data.py -v
+"""
+
+import json
+import pytest
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.models.embedded_data import (
+    merge_embedded_data,
+    embedded_data_changed,
+    get_time_slots
+)
+
+
+class TestMergeEmbeddedData:
+    """Test suite for merge_embedded_data and embedded_data_changed."""
+    
+    def test_defaults_fill_missing_fields_only(self):
+        """Test that defaults never overwrite fetched values."""
+        current = {'NumDays': '7'}
+        merged = merge_embedded_data(current, {'NumDays': 0, 'SendStatus': 0})
+        
+        assert merged == {'NumDays': '7', 'SendStatus': 0}
+        assert current == {'NumDays': '7'}
+    
+    def test_dict_values_stored_as_json(self):
+        """Test that dictionary defaults and updates become JSON."""
+        merged = merge_embedded_data({}, {'LogData': {'action': 'init'}})
+        
+        assert json.loads(merged['LogData']) == {'action': 'init'}
+    
+    def test_log_data_is_appended(self):
+        """Test that LogData updates are appended to the log."""
+        merged = merge_embedded_data(
+            {'LogData': '{"action": "init"}'}, updates={'LogData': {'action': 'send'}}
+        )
+        
+        assert json.loads(merged['LogData']) == [{'action': 'init'}, {'action': 'send'}]
+    
+    def test_changed_compares_as_strings(self):
+        """Test the dirty check."""
+        current = {'SurveysScheduled': '4'}
+        
+        assert not embedded_data_changed(current, {'SurveysScheduled': 4})
+        assert embedded_data_changed(current, {'SurveysScheduled': 5})
+        assert embedded_data_changed(current, {'SurveysScheduled': '4', 'SendStatus': 0})
+
+
+class TestGetTimeSlots:
+    """Test suite for get_time_slots."""
+    
+    def test_time_slots_field(self):
+        """Test parsing the TimeSlots field."""
+        contact = {'embeddedData': {'TimeSlots': '800,[1200,1300]'}}
+        assert get_time_slots(contact) == [800, [1200, 1300]]
+    
+    def test_time_x_fields(self):
+        """Test the TimeX fallback with string values."""
+        contact = {'embeddedData': {'Time2': '1200', 'Time1': '800', 'TimeZone': 'UTC'}}
+        assert get_time_slots(contact) == [800, 1200]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,176 @@
+"""
+Unit tests for the survey export service.
+
+Run with: pytest tests/test_services/test_exporter.py -v
+"""
+
+import io
+import json
+import zipfile
+import pytest
+from unittest.mock import Mock, patch
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.api.rate_limit import RateLimiter
+from qualtrics_util.api.surveys import SurveysAPI
+from qualtrics_util.services.exporter import SurveyExporter, export_start_date
+from qualtrics_util.storage.export_state import ExportStateStore
+
+
+def make_response(index):
+    """Build a JSON export response recorded at minute index."""
+    return {
+        'responseId': f'R_{index}',
+        'values': {'recordedDate': f'2024-05-01T12:{index:02d}:30.250Z', 'QID1': index},
+    }
+
+
+class FakeIncrementalServer:
+    """Export-responses endpoint honoring startDate and continuation tokens."""
+    
+    def __init__(self):
+        self.responses = []
+        self.requests = []
+        self.reject_tokens = False
+    
+    def record(self, *indexes):
+        self.responses.extend(make_response(i) for i in indexes)
+    
+    def request(self, method, url, **kwargs):
+        response = Mock(ok=True, status_code=200)
+        if method == 'POST':
+            body = kwargs['json']
+            self.requests.append(body)
+            if 'continuationToken' in body and self.reject_tokens:
+                response.ok = False
+                response.status_code = 400
+                response.json.return_value = {'meta': {'error': {'errorMessage': 'Invalid token'}}}
+                return response
+            if 'continuationToken' in body:
+                selected = self.responses[int(body['continuationToken'].split('_')[1]):]
+            elif 'startDate' in body:
+                selected = [r for r in self.responses if r['values']['recordedDate'][:19] >= body['startDate'][:19]]
+            else:
+                selected = list(self.responses)
+            self.export = {'responses': selected, 'token': f'TOKEN_{len(self.responses)}'}
+            response.json.return_value = {'result': {'progressId': 'ES_1'}}
+        elif url.endswith('/file'):
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, 'w') as archive:
+                archive.writestr('Survey.json', json.dumps({'responses': self.export['responses']}))
+            response.iter_content.return_value = iter([buffer.getvalue()])
+            response.__enter__ = Mock(return_value=response)
+            response.__exit__ = Mock(return_value=False)
+        else:
+            response.json.return_value = {'result': {
+                'status': 'complete', 'percentComplete': 100, 'fileId': 'FILE_1',
+                'continuationToken': self.export['token'],
+            }}
+        return response
+
+
+class TestIncrementalExport:
+    """Test suite for SurveyExporter.export_incremental."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.api = SurveysAPI(
+            api_token='test_token',
+            data_center='yul1',
+            survey_id='SV_test',
+            rate_limiter=RateLimiter(budgets={'exports': 60000}),
+            verbose=0
+        )
+        self.exporter = SurveyExporter(self.api, verbose=0)
+        self.state = ExportStateStore(':memory:')
+        self.server = FakeIncrementalServer()
+    
+    def teardown_method(self):
+        self.state.close()
+    
+    def export(self, dataset, **kwargs):
+        with patch.object(self.api.session, 'request', side_effect=self.server.request):
+            return self.exporter.export_incremental(self.state, str(dataset), wait_time=0, **kwargs)
+    
+    def dataset_ids(self, dataset):
+        with open(dataset) as fp:
+            return [json.loads(line)['responseId'] for line in fp]
+    
+    def test_continuation_appends_only_new_responses(self, tmp_path):
+        """Test that the second export continues from the token."""
+        dataset = tmp_path / 'responses.jsonl'
+        self.server.record(1, 2, 3)
+        
+        report = self.export(dataset)
+        assert report['mode'] == 'full'
+        assert report['appended'] == 3
+        assert self.server.requests[-1] == {'format': 'json', 'allowContinuation': True}
+        
+        self.server.record(4, 5)
+        report = self.export(dataset)
+        
+        assert report['mode'] == 'continuation'
+        assert report['exported'] == 2
+        assert self.server.requests[-1]['continuationToken'] == 'TOKEN_3'
+        assert self.dataset_ids(dataset) == ['R_1', 'R_2', 'R_3', 'R_4', 'R_5']
+        assert self.state.watermark('SV_test')['recorded_date'] == '2024-05-01T12:05:30.250Z'
+    
+    def test_rejected_token_falls_back_to_start_date(self, tmp_path):
+        """Test that overlapping responses from a date export are de-duplicated."""
+        dataset = tmp_path / 'responses.jsonl'
+        self.server.record(1, 2, 3)
+        self.export(dataset)
+        
+        self.server.record(4)
+        self.server.reject_tokens = True
+        report = self.export(dataset)
+        
+        assert report['mode'] == 'since'
+        assert self.server.requests[-1]['startDate'] == '2024-05-01T12:03:30Z'
+        assert report['exported'] == 2
+        assert report['duplicates'] == 1
+        assert self.dataset_ids(dataset) == ['R_1', 'R_2', 'R_3', 'R_4']
+    
+    def test_full_export_keeps_dataset_unique(self, tmp_path):
+        """Test that a full re-export does not duplicate responses."""
+        dataset = tmp_path / 'responses.jsonl'
+        self.server.record(1, 2)
+        self.export(dataset)
+        self.server.record(3)
+        
+        report = self.export(dataset, full=True)
+        
+        assert report['mode'] == 'full'
+        assert report['duplicates'] == 2
+        assert self.dataset_ids(dataset) == ['R_1', 'R_2', 'R_3']
+        assert self.state.count('SV_test') == 3
+    
+    def test_unrecorded_lines_are_not_appended_again(self, tmp_path):
+        """Test that lines written by an interrupted export are recorded on the next run."""
+        dataset = tmp_path / 'responses.jsonl'
+        self.server.record(1)
+        self.export(dataset)
+        
+        # R_2 reached the dataset but the export stopped before recording it,
+        # and R_3 was cut off mid-line
+        with open(dataset, 'a') as fp:
+            fp.write(json.dumps(make_response(2)) + '\n')
+            fp.write(json.dumps(make_response(3))[:20])
+        self.server.record(2, 3)
+        
+        report = self.export(dataset, full=True)
+        
+        assert report['duplicates'] == 2
+        assert report['appended'] == 1
+        assert self.dataset_ids(dataset) == ['R_1', 'R_2', 'R_3']
+
+
+def test_export_start_date():
+    """Test formatting recordedDates as export start dates."""
+    assert export_start_date('2024-05-01T12:34:56.789Z') == '2024-05-01T12:34:56Z'
+    assert export_start_date('2024-05-01T07:34:56-05:00') == '2024-05-01T12:34:56Z'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
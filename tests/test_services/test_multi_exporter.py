@@ -0,0 +1,158 @@
+"""
+Unit tests for the concurrent multi-survey export.
+
+Run with: pytest tests/test_services/test_multi_exporter.py -v
+"""
+
+import io
+import json
+import re
+import threading
+import time
+import zipfile
+import pytest
+from unittest.mock import Mock, patch
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.api.polling import PollTimeout
+from qualtrics_util.api.rate_limit import RateLimiter
+from qualtrics_util.api.surveys import SurveysAPI
+from qualtrics_util.services.multi_exporter import MultiSurveyExporter
+
+
+class FakeMultiSurveyServer:
+    """Export-responses endpoints of several surveys, each ready after a number of checks."""
+    
+    def __init__(self, checks_until_ready):
+        self.checks_until_ready = checks_until_ready
+        self.checks = {survey_id: 0 for survey_id in checks_until_ready}
+        self.log = []
+        self.lock = threading.Lock()
+    
+    def request(self, method, url, **kwargs):
+        survey_id = re.search(r'/surveys/(\w+)/', url).group(1)
+        response = Mock(ok=True, status_code=200)
+        with self.lock:
+            if method == 'POST':
+                self.log.append(('start', survey_id))
+                response.json.return_value = {'result': {'progressId': f'ES_{survey_id}'}}
+            elif url.endswith('/file'):
+                self.log.append(('download', survey_id))
+                buffer = io.BytesIO()
+                with zipfile.ZipFile(buffer, 'w') as archive:
+                    responses = [{'responseId': f'R_{survey_id}_{i}', 'values': {'QID1': i}} for i in range(3)]
+                    archive.writestr(f'{survey_id}.json', json.dumps({'responses': responses}))
+                response.iter_content.return_value = iter([buffer.getvalue()])
+                response.__enter__ = Mock(return_value=response)
+                response.__exit__ = Mock(return_value=False)
+            else:
+                self.log.append(('check', survey_id))
+                self.checks[survey_id] += 1
+                ready = self.checks[survey_id] >= self.checks_until_ready[survey_id]
+                response.json.return_value = {'result': {
+                    'status': 'complete' if ready else 'inProgress',
+                    'percentComplete': 100 if ready else 10 * self.checks[survey_id],
+                    **({'fileId': f'FILE_{survey_id}'} if ready else {}),
+                }}
+        return response
+    
+    def count(self, kind):
+        return sum(1 for entry in self.log if entry[0] == kind)
+
+
+class TestMultiSurveyExporter:
+    """Test suite for MultiSurveyExporter."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.api = SurveysAPI(
+            api_token='test_token',
+            data_center='yul1',
+            survey_id='SV_main',
+            rate_limiter=RateLimiter(budgets={'exports': 60000}),
+            verbose=0
+        )
+        self.exporter = MultiSurveyExporter(self.api, verbose=0)
+    
+    def run(self, server, *args, **kwargs):
+        """Run an export against the fake server without sleeping."""
+        with patch.object(self.api.session, 'request', side_effect=server.request), \
+                patch('time.sleep') as mock_sleep:
+            result = self.exporter.export(*args, **kwargs)
+        return result, mock_sleep
+    
+    def test_starts_all_exports_before_waiting(self):
+        """Test that every export job is started before any is polled."""
+        server = FakeMultiSurveyServer({'SV_a': 3, 'SV_b': 1, 'SV_c': 2})
+        
+        data, mock_sleep = self.run(server, ['SV_a', 'SV_b', 'SV_c'])
+        
+        assert [entry[0] for entry in server.log[:3]] == ['start'] * 3
+        assert {k: [r['responseId'] for r in v] for k, v in data.items()} == {
+            survey_id: [f'R_{survey_id}_{i}' for i in range(3)] for survey_id in ('SV_a', 'SV_b', 'SV_c')
+        }
+        # polled together: one sleep per round, not per survey
+        assert mock_sleep.call_count == 2
+    
+    def test_downloads_while_others_run(self):
+        """Test that a finished export is downloaded before slower ones are ready."""
+        server = FakeMultiSurveyServer({'SV_fast': 1, 'SV_slow': 3})
+        downloaded = threading.Event()
+        seen_before_ready = []
+        
+        def request(method, url, **kwargs):
+            if url.endswith('FILE_SV_fast/file'):
+                downloaded.set()
+            elif 'SV_slow' in url and method == 'GET' and server.checks['SV_slow'] == 2:
+                # the last check of the slow export waits for the fast download
+                seen_before_ready.append(downloaded.wait(timeout=5))
+            return server.request(method, url, **kwargs)
+        
+        with patch.object(self.api.session, 'request', side_effect=request), patch('time.sleep'):
+            self.exporter.export(['SV_fast', 'SV_slow'])
+        
+        assert seen_before_ready == [True]
+    
+    def test_repeated_surveys_exported_once(self):
+        """Test that duplicate and already exported surveys are served from memory."""
+        server = FakeMultiSurveyServer({'SV_a': 1, 'SV_b': 1})
+        
+        first, _ = self.run(server, ['SV_a', 'SV_b', 'SV_a'])
+        with patch.object(self.api.session, 'request', side_effect=server.request):
+            again = self.exporter.responses('SV_b')
+        
+        assert list(first) == ['SV_a', 'SV_b']
+        assert again is first['SV_b']
+        assert server.count('start') == 2
+    
+    def test_refresh(self):
+        """Test that refresh exports a survey again."""
+        server = FakeMultiSurveyServer({'SV_a': 1})
+        
+        self.run(server, ['SV_a'])
+        self.run(server, ['SV_a'], refresh=True)
+        
+        assert server.count('start') == 2
+    
+    def test_timeout(self):
+        """Test that exports that never finish stop at the time budget."""
+        server = FakeMultiSurveyServer({'SV_a': 1, 'SV_b': 10 ** 6})
+        # start from the real clock, the rate limiter buckets already exist
+        clock = {'now': time.monotonic()}
+        start = clock['now']
+        
+        def sleep(seconds):
+            clock['now'] += seconds
+        
+        with patch.object(self.api.session, 'request', side_effect=server.request), \
+                patch('qualtrics_util.services.multi_exporter.time.monotonic', lambda: clock['now']), \
+                patch('qualtrics_util.services.multi_exporter.time.sleep', side_effect=sleep):
+            with pytest.raises(PollTimeout, match='SV_b'):
+                self.exporter.export(['SV_a', 'SV_b'], timeout=60)
+        
+        assert clock['now'] - start == pytest.approx(60)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,151 @@
+"""
+Unit tests for the send planner.
+
+Run with: pytest tests/test_services/test_planner.py -v
+"""
+
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import Mock
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.services.planner import SendPlan
+from qualtrics_util.services.send_engine import SendEngine
+from qualtrics_util.storage.ledger import DistributionLedger
+
+
+def make_contact(contact_id, method='SMS', scheduled=0, num_days=2, slots='800,1200', time_zone=None):
+    """Build a contact dictionary."""
+    embedded_data = {
+        'ContactMethod': method,
+        'SurveysScheduled': str(scheduled),
+        'NumDays': str(num_days),
+        'TimeSlots': slots,
+        'StartDate': '2030-01-01',
+    }
+    if time_zone:
+        embedded_data['TimeZone'] = time_zone
+    return {'contactId': contact_id, 'embeddedData': embedded_data}
+
+
+CONTACTS = [
+    make_contact('CID_1'),
+    make_contact('CID_2', method='EMAIL', time_zone='America/Chicago'),
+    make_contact('CID_3', scheduled=4),
+    make_contact('CID_4', num_days=1, slots='[900, 1000]'),
+]
+
+
+class TestSendPlan:
+    """Test suite for SendPlan."""
+    
+    def setup_method(self):
+        """Plan the test contacts."""
+        self.plan = SendPlan.from_contacts(CONTACTS, 'UTC')
+    
+    def test_from_contacts(self):
+        """Test that eligible contacts are planned day by day, slot by slot."""
+        rows = list(self.plan.rows())
+        
+        assert len(self.plan) == 4 + 4 + 1
+        assert [row['contact_id'] for row in rows] == ['CID_1'] * 4 + ['CID_2'] * 4 + ['CID_4']
+        assert [row['send_date'] for row in rows[:4]] == [
+            '2030-01-01T08:00:00Z', '2030-01-01T12:00:00Z', '2030-01-02T08:00:00Z', '2030-01-02T12:00:00Z'
+        ]
+        # America/Chicago is UTC-6 in January
+        assert rows[4] == {'contact_id': 'CID_2', 'channel': 'email',
+                           'send_date': '2030-01-01T14:00:00Z', 'expiration_date': '2030-01-01T15:00:00Z'}
+        assert '2030-01-01T09:00:00Z' <= rows[8]['send_date'] < '2030-01-01T10:00:00Z'
+        assert self.plan.counts() == {'email': {'contacts': 1, 'invitations': 4},
+                                      'sms': {'contacts': 2, 'invitations': 5}}
+    
+    def test_past_send_times_skipped(self):
+        """Test that a late enrollment only plans the send times still ahead."""
+        now = datetime(2030, 1, 1, 10, 0, tzinfo=timezone.utc)
+        
+        plan = SendPlan.from_contacts(CONTACTS, 'UTC', now=now)
+        everything = SendPlan.from_contacts(CONTACTS, 'UTC', now=now, future_only=False)
+        
+        assert [row['send_date'] for row in plan.rows() if row['contact_id'] == 'CID_1'] == [
+            '2030-01-01T12:00:00Z', '2030-01-02T08:00:00Z', '2030-01-02T12:00:00Z'
+        ]
+        assert plan.skipped == {'CID_1': 1, 'CID_4': 1}
+        assert len(everything) == len(plan) + 2 and everything.skipped == {}
+    
+    def test_no_eligible_contacts(self):
+        """Test that an empty plan has no rows."""
+        plan = SendPlan.from_contacts([make_contact('CID_3', scheduled=4)], 'UTC')
+        
+        assert len(plan) == 0
+        assert plan.send_params() == []
+    
+    def test_csv_round_trip(self, tmp_path):
+        """Test that a plan written to CSV reads back unchanged."""
+        path = str(tmp_path / 'plan.csv')
+        
+        self.plan.write(path)
+        
+        assert list(SendPlan.read(path).rows()) == list(self.plan.rows())
+    
+    def test_parquet_round_trip(self, tmp_path):
+        """Test that a plan written to Parquet reads back unchanged."""
+        pytest.importorskip('pyarrow')
+        path = str(tmp_path / 'plan.parquet')
+        
+        self.plan.write(path)
+        
+        assert list(SendPlan.read(path).rows()) == list(self.plan.rows())
+    
+    def test_diff_ledger(self):
+        """Test the diff against scheduled, deleted and unplanned ledger entries."""
+        ledger = DistributionLedger(':memory:')
+        rows = list(self.plan.rows())
+        for n, row in enumerate(rows[:3]):
+            ledger.record(f'EMD_{n}', row['contact_id'], None, row['send_date'],
+                          row['expiration_date'], row['channel'], mailing_list_id='CG_test')
+        ledger.record_deleted(['EMD_2'], 'sms')
+        ledger.record('EMD_x', 'CID_9', None, '2030-01-05T08:00:00Z', None, 'sms', mailing_list_id='CG_test')
+        
+        diff = self.plan.diff_ledger(ledger, mailing_list_id='CG_test')
+        
+        assert diff['scheduled'] == rows[:2]
+        assert diff['new'] == rows[2:]
+        assert [entry['distribution_id'] for entry in diff['unplanned']] == ['EMD_x']
+        ledger.close()
+    
+    def test_diff_distributions(self):
+        """Test the diff against a live listing keyed by contactLookupId."""
+        listing = [
+            {'id': 'EMD_a', 'recipients': {'contactId': 'CGC_2'}, 'sendDate': '2030-01-01T14:00:00Z'},
+            {'id': 'EMD_b', 'recipients': {'contactId': 'CGC_2'}, 'sendDate': '2030-01-01T14:30:00Z'},
+            {'id': 'EMD_c', 'recipients': {'contactId': 'CGC_unknown'}, 'sendDate': '2030-01-01T14:00:00Z'},
+        ]
+        
+        diff = self.plan.diff_distributions(listing, 'email', {'CGC_2': 'CID_2'})
+        
+        assert [row['send_date'] for row in diff['scheduled']] == ['2030-01-01T14:00:00Z']
+        assert len(diff['new']) == 3
+        assert all(row['channel'] == 'email' for row in diff['new'])
+        assert [entry['id'] for entry in diff['unplanned']] == ['EMD_b', 'EMD_c']
+    
+    def test_run_plan(self):
+        """Test that the engine posts the planned invitations without recomputing them."""
+        contacts_api = Mock(mailing_list_id='CG_test')
+        contacts_api.get_contact_lookup_id.side_effect = lambda ml, cid: f'CGC_{cid}'
+        distributions_api = Mock()
+        engine = SendEngine(contacts_api, distributions_api, Mock(), sms_message_id='MS_1', verbose=0)
+        rows = list(self.plan.rows())
+        
+        results = engine.run_plan(SendPlan.from_rows(rows[1:]))
+        
+        assert [(r['contactId'], r['scheduled']) for r in results] == [('CID_1', 3), ('CID_2', 4), ('CID_4', 1)]
+        posted = [call.args[1].strftime('%Y-%m-%dT%H:%M:%SZ')
+                  for call in distributions_api.send_sms_distribution.call_args_list
+                  if call.args[0] == 'CGC_CID_1']
+        assert posted == [row['send_date'] for row in rows[1:4]]
+        assert distributions_api.send_email_distribution.call_count == 4
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,119 @@
+"""
+Unit tests for schedule computation.
+
+Run with: pytest tests/test_services/test_scheduler.py -v
+"""
+
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import numpy as np
+import pytest
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.services.scheduler import build_schedule_batch, calculate_send_times
+
+
+def reference_times(params):
+    """Schedule of fixed slots computed one datetime at a time."""
+    start = datetime.fromisoformat(params['startDate'])
+    times = []
+    for day in range(params['numDays']):
+        for slot in params['timeSlots']:
+            local = datetime(start.year, start.month, start.day, slot // 100, slot % 100,
+                             tzinfo=ZoneInfo(params['timeZone'])) + timedelta(days=day)
+            send = local.astimezone(ZoneInfo('UTC'))
+            times.append((send, send + timedelta(minutes=params.get('ExpireMinutes', 60))))
+    return times
+
+
+def participant(start_date='2024-05-01', time_slots=(800, 1200), num_days=3,
+                time_zone='America/Chicago', **extra):
+    return {'startDate': start_date, 'timeSlots': list(time_slots), 'numDays': num_days,
+            'timeZone': time_zone, **extra}
+
+
+class TestScheduleBatch:
+    """Test suite for build_schedule_batch."""
+    
+    def test_matches_datetime_arithmetic(self):
+        """Test that batch instants equal the one-at-a-time computation."""
+        cohort = [
+            participant(),
+            participant('2024-10-30', (700, 2330), 7, 'Europe/London', ExpireMinutes=90),
+            participant('2024-12-31', (0, 1159), 2, 'Asia/Kolkata'),
+        ]
+        
+        batch = build_schedule_batch(cohort)
+        
+        for index, params in enumerate(cohort):
+            assert batch.for_participant(index) == reference_times(params)
+        assert len(batch) == 6 + 14 + 4
+    
+    def test_dst_transition_days(self):
+        """Test times in the spring gap and fall overlap resolve like datetime (fold=0)."""
+        spring = participant('2024-03-09', (130, 230, 330), 3)
+        fall = participant('2024-11-02', (30, 130, 230), 3)
+        
+        batch = build_schedule_batch([spring, fall])
+        
+        assert batch.for_participant(0) == reference_times(spring)
+        assert batch.for_participant(1) == reference_times(fall)
+    
+    def test_rows_are_day_major(self):
+        """Test that rows follow day, then slot, like calculate_send_times."""
+        batch = build_schedule_batch([participant(time_slots=(2000, 800), num_days=2)])
+        
+        sends = [send.strftime('%d %H:%M') for send, _ in batch.for_participant(0)]
+        
+        assert sends == ['02 01:00', '01 13:00', '03 01:00', '02 13:00']
+    
+    def test_range_slots_drawn_per_row(self):
+        """Test range draws stay within the range and repeat with the same generator."""
+        cohort = [participant(time_slots=([800, 900],), num_days=200, time_zone='UTC')]
+        
+        first = build_schedule_batch(cohort, rng=np.random.default_rng(7))
+        second = build_schedule_batch(cohort, rng=np.random.default_rng(7))
+        
+        minutes = (first.send_times - first.send_times.astype('datetime64[D]')).astype(int) // 60
+        assert minutes.min() >= 480 and minutes.max() < 540
+        assert len(set(minutes.tolist())) > 30
+        assert (first.send_times == second.send_times).all()
+    
+    def test_participant_rows(self):
+        """Test that rows() selects one participant's schedule."""
+        batch = build_schedule_batch([participant(num_days=1), participant(num_days=0), participant(num_days=2)])
+        
+        assert batch.participant.tolist() == [0, 0, 2, 2, 2, 2]
+        assert batch.for_participant(1) == []
+        assert len(batch.send_times[batch.rows(2)]) == 4
+    
+    def test_invalid_slots(self):
+        """Test that malformed and out-of-day slots raise ValueError."""
+        with pytest.raises(ValueError):
+            build_schedule_batch([participant(time_slots=('800',))])
+        with pytest.raises(ValueError):
+            build_schedule_batch([participant(time_slots=(2400,))])
+    
+    def test_future_only(self):
+        """Test that past send times are dropped and counted per participant."""
+        cohort = [participant('2024-05-01', num_days=3, time_zone='UTC'), participant('2024-05-03', num_days=1, time_zone='UTC')]
+        now = datetime(2024, 5, 2, 11, 50, tzinfo=ZoneInfo('UTC'))
+        
+        batch = build_schedule_batch(cohort).future_only(now)
+        graced = build_schedule_batch(cohort).future_only(now, grace_minutes=15)
+        
+        assert [send.strftime('%d %H:%M') for send, _ in batch.for_participant(0)] == ['02 12:00', '03 08:00', '03 12:00']
+        assert len(batch.for_participant(1)) == 2
+        assert batch.skipped_counts(2).tolist() == [3, 0]
+        assert graced.skipped_counts(2).tolist() == [4, 0]
+    
+    def test_calculate_send_times(self):
+        """Test the single-participant wrapper."""
+        params = participant(time_zone='Asia/Tokyo', ExpireMinutes=30)
+        
+        assert calculate_send_times(params) == reference_times(params)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,341 @@
+"""
+Unit tests for the send engine.
+
+Run with: pytest tests/test_services/test_send_engine.py -v
+"""
+
+import itertools
+import threading
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.api.base import QualtricsAPIError
+from qualtrics_util.services.send_engine import SendEngine, build_send_params
+from qualtrics_util.storage.journal import SendJournal
+from qualtrics_util.storage.ledger import DistributionLedger
+
+
+def make_contact(contact_id, method='SMS', scheduled=0, num_days=2, slots='800,1200', start_date='2030-01-01'):
+    """Build a contact dictionary."""
+    return {
+        'contactId': contact_id,
+        'email': f'{contact_id}@example.com',
+        'phone': '5555555555',
+        'embeddedData': {
+            'ContactMethod': method,
+            'SurveysScheduled': str(scheduled),
+            'NumDays': str(num_days),
+            'TimeSlots': slots,
+            'StartDate': start_date,
+        }
+    }
+
+
+class TestBuildSendParams:
+    """Test suite for build_send_params."""
+    
+    def test_eligible_contact(self):
+        """Test parameters of an eligible contact."""
+        params = build_send_params(make_contact('CID_1'), 'America/Chicago')
+        
+        assert params['contactId'] == 'CID_1'
+        assert params['method'] == 'SMS'
+        assert params['timeSlots'] == [800, 1200]
+        assert params['numDays'] == 2
+        assert params['timeZone'] == 'America/Chicago'
+    
+    def test_ineligible_contacts(self):
+        """Test that scheduled contacts and contacts without slots are skipped."""
+        assert build_send_params(make_contact('CID_1', scheduled=4), 'UTC') is None
+        assert build_send_params(make_contact('CID_1', num_days=0), 'UTC') is None
+        assert build_send_params(make_contact('CID_1', slots=''), 'UTC') is None
+
+
+class TestSendEngine:
+    """Test suite for SendEngine."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.contacts_api = Mock(mailing_list_id='CG_test')
+        self.contacts_api.get_contact_lookup_id.side_effect = lambda ml, cid: f'CGC_{cid}'
+        self.distributions_api = Mock()
+        self.messages_api = Mock()
+        self.messages_api.get_message.return_value = 'Take the survey'
+        self.messages_api.get_message_with_random_text.return_value = 'Take the survey [x]'
+        
+        self.engine = SendEngine(
+            self.contacts_api,
+            self.distributions_api,
+            self.messages_api,
+            sms_message_id='MS_sms',
+            email_message_id='MS_email',
+            max_workers=4,
+            verbose=0
+        )
+    
+    def test_per_contact_order_and_single_counter_update(self):
+        """Test that invites are posted in order and the counter is written once."""
+        contacts = [make_contact(f'CID_{i}') for i in range(10)]
+        
+        results = self.engine.run(contacts, default_time_zone='UTC')
+        
+        assert [r['scheduled'] for r in results] == [4] * 10
+        assert all(r['error'] is None for r in results)
+        
+        for i in range(10):
+            send_dates = [
+                call.args[1] for call in self.distributions_api.send_sms_distribution.call_args_list
+                if call.args[0] == f'CGC_CID_{i}'
+            ]
+            assert len(send_dates) == 4
+            assert send_dates == sorted(send_dates)
+        
+        assert self.contacts_api.update_contact.call_count == 10
+        self.contacts_api.update_contact.assert_any_call(
+            'CID_3', {'embeddedData': {'SurveysScheduled': 4}}, default_language=False
+        )
+    
+    def test_contacts_run_concurrently(self):
+        """Test that several contacts are scheduled at once."""
+        barrier = threading.Barrier(4, timeout=2)
+        self.contacts_api.get_contact_lookup_id.side_effect = lambda ml, cid: barrier.wait() and f'CGC_{cid}'
+        
+        results = self.engine.run([make_contact(f'CID_{i}') for i in range(4)], default_time_zone='UTC')
+        
+        assert all(r['error'] is None for r in results)
+    
+    def test_email_contacts(self):
+        """Test that email contacts use the email message and endpoint."""
+        self.engine.run([make_contact('CID_1', method='EMAIL')], default_time_zone='UTC')
+        
+        assert self.distributions_api.send_email_distribution.call_count == 4
+        self.distributions_api.send_sms_distribution.assert_not_called()
+        self.messages_api.get_message_with_random_text.assert_called_with('MS_email')
+    
+    def test_failure_stops_contact_and_records_progress(self):
+        """Test that a failed invite stops that contact only."""
+        def send(lookup_id, *args):
+            if lookup_id == 'CGC_CID_bad' and send.calls['bad'] == 2:
+                raise Exception('400 Bad Request')
+            if lookup_id == 'CGC_CID_bad':
+                send.calls['bad'] += 1
+        send.calls = {'bad': 0}
+        self.distributions_api.send_sms_distribution.side_effect = send
+        
+        results = self.engine.run(
+            [make_contact('CID_bad'), make_contact('CID_ok')], default_time_zone='UTC'
+        )
+        
+        by_id = {r['contactId']: r for r in results}
+        assert by_id['CID_bad']['scheduled'] == 2
+        assert '400' in by_id['CID_bad']['error']
+        assert by_id['CID_ok']['scheduled'] == 4
+        self.contacts_api.update_contact.assert_any_call(
+            'CID_bad', {'embeddedData': {'SurveysScheduled': 2}}, default_language=False
+        )
+    
+    
+    def test_past_send_times_skipped(self):
+        """Test that past send times never reach the API."""
+        contacts = [make_contact('CID_late'), make_contact('CID_past'), make_contact('CID_1')]
+        contacts[0]['embeddedData']['StartDate'] = (datetime.now(timezone.utc) - timedelta(days=1)).date().isoformat()
+        contacts[0]['embeddedData']['NumDays'] = '3'
+        contacts[1]['embeddedData']['StartDate'] = '2020-01-01'
+        
+        results = {r['contactId']: r for r in self.engine.run(contacts, default_time_zone='UTC')}
+        
+        assert results['CID_past'] == {'contactId': 'CID_past', 'scheduled': 0, 'total': 0, 'skipped': 4, 'error': None}
+        assert results['CID_late']['skipped'] >= 2
+        assert results['CID_late']['scheduled'] + results['CID_late']['skipped'] == 6
+        assert results['CID_1']['skipped'] == 0
+        looked_up = [call.args[1] for call in self.contacts_api.get_contact_lookup_id.call_args_list]
+        assert 'CID_past' not in looked_up
+        sent = [call.args[1] for call in self.distributions_api.send_sms_distribution.call_args_list]
+        assert len(sent) == 4 + results['CID_late']['scheduled']
+        assert min(sent) > datetime.now(timezone.utc) - timedelta(minutes=1)
+    
+    def test_invites_recorded_in_ledger(self):
+        """Test that every posted invite is recorded with its distribution ID."""
+        ids = itertools.count(1)
+        self.distributions_api.survey_id = 'SV_test'
+        self.distributions_api.send_sms_distribution.side_effect = lambda *args: Mock(
+            json=Mock(return_value={'result': {'id': f'EMD_{next(ids)}'}})
+        )
+        self.engine.ledger = DistributionLedger(':memory:')
+        
+        self.engine.run([make_contact('CID_1'), make_contact('CID_2')], default_time_zone='UTC')
+        
+        entries = self.engine.ledger.for_contact('CID_1')
+        assert len(entries) == 4
+        assert [e['send_date'] for e in entries] == sorted(e['send_date'] for e in entries)
+        assert entries[0]['lookup_id'] == 'CGC_CID_1'
+        assert entries[0]['channel'] == 'sms'
+        assert entries[0]['survey_id'] == 'SV_test'
+        assert self.engine.ledger.count() == 8
+        self.engine.ledger.close()
+
+
+class TestSendEngineJournal:
+    """Test suite for resumable runs with a SendJournal."""
+    
+    def setup_method(self):
+        """Set up an engine with a journal and a fake distributions endpoint."""
+        self.contacts_api = Mock(mailing_list_id='CG_test')
+        self.contacts_api.get_contact_lookup_id.side_effect = lambda ml, cid: f'CGC_{cid}'
+        self.posted = []
+        self.fail = {}
+        self.distributions_api = Mock()
+        self.distributions_api.send_sms_distribution.side_effect = self.send
+        self.distributions_api.iter_sms_distributions.side_effect = lambda: iter([
+            {'id': f'EMD_{n}', 'recipients': {'contactId': lookup_id}, 'sendDate': send_date}
+            for n, (lookup_id, send_date) in enumerate(self.posted)
+        ])
+        self.journal = SendJournal(':memory:')
+        self.engine = self.make_engine()
+    
+    def teardown_method(self):
+        self.journal.close()
+    
+    def make_engine(self):
+        return SendEngine(self.contacts_api, self.distributions_api, Mock(), sms_message_id='MS_sms',
+                          max_workers=2, journal=self.journal, verbose=0)
+    
+    def send(self, lookup_id, send_time, *args):
+        """Post an invite, failing the n-th post of a contact as configured."""
+        send_date = send_time.strftime('%Y-%m-%dT%H:%M:%SZ')
+        n = sum(1 for posted_id, _ in self.posted if posted_id == lookup_id)
+        error = self.fail.get((lookup_id, n))
+        if error is not None and error.status_code is not None:
+            raise error
+        self.posted.append((lookup_id, send_date))
+        if error is not None:
+            # created, but the response was lost
+            raise error
+        return Mock(json=Mock(return_value={'result': {'id': f'EMD_{len(self.posted)}'}}))
+    
+    def test_journal_written_before_posting(self):
+        """Test that every invite is journaled and marked done with its distribution ID."""
+        self.engine.run([make_contact('CID_1'), make_contact('CID_2')], default_time_zone='UTC')
+        
+        entries = self.journal.entries('CG_test', 'CID_1')
+        assert [e['state'] for e in entries] == ['done'] * 4
+        assert all(e['distribution_id'].startswith('EMD_') for e in entries)
+        assert self.journal.status('CG_test') == {'planned': 0, 'posting': 0, 'done': 8, 'skipped': 0}
+    
+    def test_resume_after_lost_response(self):
+        """Test that a post whose response was lost is found in the listing, not posted again."""
+        self.fail[('CGC_CID_1', 2)] = QualtricsAPIError('Request failed: connection reset')
+        
+        first = self.engine.run([make_contact('CID_1')], default_time_zone='UTC')
+        assert first[0]['scheduled'] == 2
+        assert [e['state'] for e in self.journal.entries('CG_test', 'CID_1')] == ['done', 'done', 'posting', 'planned']
+        
+        # the counter is 2 now, so the contact is only picked up from the journal
+        second = self.make_engine().run([make_contact('CID_1', scheduled=2)], default_time_zone='UTC')
+        
+        assert second[0]['scheduled'] == 4 and second[0]['error'] is None
+        assert len(self.posted) == 4
+        assert len(set(self.posted)) == 4
+        self.contacts_api.update_contact.assert_called_with(
+            'CID_1', {'embeddedData': {'SurveysScheduled': 4}}, default_language=False
+        )
+    
+    def test_rejected_post_retried(self):
+        """Test that a post Qualtrics rejected is planned again and posted on resume."""
+        self.fail[('CGC_CID_1', 1)] = QualtricsAPIError('API request failed with status 400', status_code=400)
+        
+        self.engine.run([make_contact('CID_1')], default_time_zone='UTC')
+        assert [e['state'] for e in self.journal.entries('CG_test', 'CID_1')] == ['done', 'planned', 'planned', 'planned']
+        assert '400' in self.journal.entries('CG_test', 'CID_1')[1]['error']
+        
+        del self.fail[('CGC_CID_1', 1)]
+        results = self.make_engine().run([], default_time_zone='UTC')
+        
+        assert results[0]['scheduled'] == 4
+        assert len(self.posted) == 4
+        self.distributions_api.iter_sms_distributions.assert_not_called()
+    
+    def test_passed_journal_entries_skipped(self):
+        """Test that journaled invites whose send time passed are skipped on resume."""
+        self.journal.add('CG_test', 'CID_1', 'sms', [
+            ('2020-01-01T08:00:00Z', '2020-01-01T09:00:00Z'), ('2099-01-01T08:00:00Z', '2099-01-01T09:00:00Z'),
+        ])
+        
+        results = self.engine.run([], default_time_zone='UTC')
+        
+        assert (results[0]['scheduled'], results[0]['skipped']) == (1, 1)
+        assert self.posted == [('CGC_CID_1', '2099-01-01T08:00:00Z')]
+        assert [e['state'] for e in self.journal.entries('CG_test', 'CID_1')] == ['skipped', 'done']
+        assert self.journal.unfinished('CG_test') == []
+    
+    def test_journaled_times_are_not_recomputed(self):
+        """Test that a resumed contact keeps the times drawn from its time range."""
+        self.fail[('CGC_CID_1', 1)] = QualtricsAPIError('API request failed with status 400', status_code=400)
+        self.engine.run([make_contact('CID_1', num_days=5, slots='[800, 1200]')], default_time_zone='UTC')
+        planned = [e['send_date'] for e in self.journal.entries('CG_test', 'CID_1')]
+        
+        del self.fail[('CGC_CID_1', 1)]
+        # still eligible, e.g. the counter update was lost
+        self.make_engine().run([make_contact('CID_1', num_days=5, slots='[800, 1200]')], default_time_zone='UTC')
+        
+        assert [send_date for _, send_date in self.posted] == planned
+        assert self.journal.count() == 5
+    
+    def test_new_start_date_scheduled_again(self):
+        """Test that a finished contact reset to 0 with a new StartDate gets a new generation."""
+        self.engine.run([make_contact('CID_1')], default_time_zone='UTC')
+        assert len(self.posted) == 4
+        
+        # the counter was set back to 0 for a second round
+        results = self.make_engine().run([make_contact('CID_1', start_date='2030-06-01')], default_time_zone='UTC')
+        
+        assert results[0]['scheduled'] == 4 and results[0]['error'] is None
+        assert len(self.posted) == 8
+        assert all(send_date[:10] in ('2030-06-01', '2030-06-02') for _, send_date in self.posted[4:])
+        assert self.journal.count() == 8
+        self.contacts_api.update_contact.assert_called_with(
+            'CID_1', {'embeddedData': {'SurveysScheduled': 4}}, default_language=False
+        )
+    
+    def test_same_schedule_not_posted_again(self):
+        """Test that a finished schedule whose counter update was lost is not posted again."""
+        self.engine.run([make_contact('CID_1')], default_time_zone='UTC')
+        
+        results = self.make_engine().run([make_contact('CID_1')], default_time_zone='UTC')
+        
+        assert results[0]['scheduled'] == 4
+        assert len(self.posted) == 4
+        assert self.journal.count() == 4
+    
+    def test_same_time_range_schedule_not_posted_again(self):
+        """Test that a finished schedule with time ranges is not drawn and posted again."""
+        self.engine.run([make_contact('CID_1', num_days=5, slots='[800, 1200]')], default_time_zone='UTC')
+        posted = list(self.posted)
+        
+        # the counter update was lost, the contact is still eligible
+        results = self.make_engine().run([make_contact('CID_1', num_days=5, slots='[800, 1200]')], default_time_zone='UTC')
+        
+        assert results[0]['scheduled'] == 5 and results[0]['error'] is None
+        assert self.posted == posted
+        assert self.journal.count() == 5
+    
+    
+    def test_passed_schedule_left_out(self):
+        """Test that a contact whose send times all passed is not processed again."""
+        results = self.engine.run([make_contact('CID_1', start_date='2020-01-01')], default_time_zone='UTC')
+        
+        assert results == [{'contactId': 'CID_1', 'scheduled': 0, 'total': 0, 'skipped': 4, 'error': None}]
+        assert self.journal.status('CG_test')['skipped'] == 4
+        
+        # the counter is still 0
+        assert self.make_engine().run([make_contact('CID_1', start_date='2020-01-01')], default_time_zone='UTC') == []
+        
+        results = self.make_engine().run([make_contact('CID_1')], default_time_zone='UTC')
+        assert results[0]['scheduled'] == 4
+        self.contacts_api.get_contact_lookup_id.assert_called_once_with('CG_test', 'CID_1')
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
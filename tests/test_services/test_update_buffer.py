@@ -0,0 +1,77 @@
+"""
+Unit tests for the contact update buffer.
+
+Run with: pytest tests/test_services/test_update_buffer.py -v
+"""
+
+import pytest
+from unittest.mock import Mock
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.services.update_buffer import ContactUpdateBuffer
+
+
+class TestContactUpdateBuffer:
+    """Test suite for ContactUpdateBuffer."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.contacts_api = Mock()
+        self.buffer = ContactUpdateBuffer(self.contacts_api)
+    
+    def test_coalesces_to_one_update_per_contact(self):
+        """Test that repeated changes become a single PUT."""
+        for count in range(1, 57):
+            self.buffer.update('CID_1', {'SurveysScheduled': count})
+        self.buffer.update('CID_1', {'SendStatus': 1})
+        
+        self.contacts_api.update_contact.assert_not_called()
+        assert self.buffer.flush('CID_1') == 1
+        
+        self.contacts_api.update_contact.assert_called_once_with(
+            'CID_1', {'embeddedData': {'SurveysScheduled': 56, 'SendStatus': 1}}, default_language=False
+        )
+        assert self.buffer.coalesced == 56
+        assert self.buffer.pending() == {}
+    
+    def test_flush_one_contact_leaves_others_pending(self):
+        """Test flushing a single contact."""
+        self.buffer.update('CID_1', {'SurveysScheduled': 1})
+        self.buffer.update('CID_2', {'SurveysScheduled': 2})
+        
+        self.buffer.flush('CID_1')
+        
+        assert self.buffer.pending() == {'CID_2': {'SurveysScheduled': 2}}
+        assert self.buffer.flush('CID_unknown') == 0
+    
+    def test_context_manager_flushes_on_interrupt(self):
+        """Test that pending changes are written when the run is interrupted."""
+        with pytest.raises(KeyboardInterrupt):
+            with self.buffer:
+                self.buffer.update('CID_1', {'SurveysScheduled': 3})
+                raise KeyboardInterrupt
+        
+        self.contacts_api.update_contact.assert_called_once_with(
+            'CID_1', {'embeddedData': {'SurveysScheduled': 3}}, default_language=False
+        )
+    
+    def test_failed_update_stays_pending(self):
+        """Test that a failed PUT keeps the changes and raises after the others."""
+        def update_contact(contact_id, data, **kwargs):
+            if contact_id == 'CID_bad':
+                raise Exception('500 Server Error')
+        self.contacts_api.update_contact.side_effect = update_contact
+        
+        self.buffer.update('CID_bad', {'SurveysScheduled': 1})
+        self.buffer.update('CID_ok', {'SurveysScheduled': 2})
+        
+        with pytest.raises(Exception, match='500'):
+            self.buffer.checkpoint()
+        
+        assert self.buffer.pending() == {'CID_bad': {'SurveysScheduled': 1}}
+        assert self.buffer.writes == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,194 @@
+"""
+Unit tests for the local contact store and its sync.
+
+Run with: pytest tests/test_storage/test_contact_store.py -v
+"""
+
+import sqlite3
+import pytest
+from unittest.mock import Mock
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.api.contacts import ContactsAPI
+from qualtrics_util.storage.contact_store import ContactStore
+
+
+def make_contact(contact_id, modified='2026-01-01T00:00:00Z', **embedded):
+    """Build a contact dictionary."""
+    return {
+        'contactId': contact_id,
+        'contactLookupId': f'CGC_{contact_id}',
+        'email': f'{contact_id}@example.com',
+        'lastModifiedDate': modified,
+        'embeddedData': {key: str(value) for key, value in embedded.items()},
+    }
+
+
+class TestContactStore:
+    """Test suite for ContactStore queries."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.store = ContactStore(':memory:')
+    
+    def teardown_method(self):
+        self.store.close()
+    
+    def test_contacts_per_mailing_list(self):
+        """Test that contacts are returned per mailing list in insertion order."""
+        self.store.upsert('CG_test', [make_contact('CID_1'), make_contact('CID_2')])
+        self.store.upsert('CG_other', [make_contact('CID_3')])
+        
+        assert [c['contactId'] for c in self.store.contacts('CG_test')] == ['CID_1', 'CID_2']
+        assert self.store.contacts('CG_test')[0]['contactLookupId'] == 'CGC_CID_1'
+        assert self.store.count() == 3
+    
+    def test_eligibility_queries(self):
+        """Test the indexed send and delete queries."""
+        self.store.upsert('CG_test', [
+            make_contact('CID_new', SurveysScheduled=0, NumDays=7),
+            make_contact('CID_done', SurveysScheduled=28, NumDays=7),
+            make_contact('CID_nodays', SurveysScheduled=0, NumDays=0),
+            make_contact('CID_withdraw', SurveysScheduled=28, NumDays=7, DeleteUnsent=1),
+        ])
+        
+        assert [c['contactId'] for c in self.store.eligible_for_send('CG_test')] == ['CID_new']
+        assert [c['contactId'] for c in self.store.pending_delete('CG_test')] == ['CID_withdraw']
+        assert self.store.eligible_for_send('CG_other') == []
+    
+    def test_mirror_without_indexed_columns_is_rebuilt(self, tmp_path):
+        """Test that a mirror created without the indexed columns is dropped."""
+        path = str(tmp_path / 'contacts.db')
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE contacts (mailing_list_id TEXT NOT NULL, contact_id TEXT NOT NULL, data TEXT NOT NULL, "
+            "content_hash TEXT NOT NULL, modified TEXT, PRIMARY KEY (mailing_list_id, contact_id))"
+        )
+        conn.execute("INSERT INTO contacts VALUES ('CG_test', 'CID_1', '{}', 'x', NULL)")
+        conn.commit()
+        conn.close()
+        
+        store = ContactStore(path)
+        
+        assert store.count() == 0
+        assert store.synced_at('CG_test') is None
+        store.close()
+    
+    def test_upsert_only_writes_changes(self):
+        """Test that unchanged contacts are not rewritten."""
+        contacts = [make_contact('CID_1', NumDays=7), make_contact('CID_2', NumDays=7)]
+        
+        assert self.store.upsert('CG_test', contacts) == 2
+        assert self.store.upsert('CG_test', contacts) == 0
+        
+        contacts[1]['embeddedData']['SurveysScheduled'] = '28'
+        assert self.store.upsert('CG_test', contacts) == 1
+        assert self.store.get('CG_test', 'CID_2')['embeddedData']['SurveysScheduled'] == '28'
+
+
+class TestContactSync:
+    """Test suite for ContactsAPI.sync_contact_store."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.store = ContactStore(':memory:')
+        self.api = ContactsAPI(
+            api_token='test_token',
+            data_center='yul1',
+            directory_id='POOL_test',
+            mailing_list_id='CG_test',
+            verbose=0
+        )
+        self.remote = {f'CID_{i}': make_contact(f'CID_{i}', NumDays=7) for i in range(10)}
+        self.api.iter_contacts = Mock(side_effect=self.listing)
+        self.api.get_contact = Mock(side_effect=lambda contact_id: dict(self.remote[contact_id]))
+    
+    def teardown_method(self):
+        self.store.close()
+    
+    def listing(self, include_embedded=True):
+        """Mailing-list listing, without embedded data unless asked."""
+        for contact in self.remote.values():
+            if include_embedded:
+                yield dict(contact)
+            else:
+                yield {k: v for k, v in contact.items() if k != 'embeddedData'}
+    
+    def test_first_sync_is_full(self):
+        """Test that an empty store gets a full download."""
+        report = self.api.sync_contact_store(self.store)
+        
+        assert report['mode'] == 'full'
+        assert report['changed'] == 10
+        self.api.iter_contacts.assert_called_once_with(include_embedded=True)
+        self.api.get_contact.assert_not_called()
+    
+    def test_incremental_fetches_only_modified(self):
+        """Test that only modified and new contacts are downloaded."""
+        self.api.sync_contact_store(self.store)
+        
+        self.remote['CID_3'] = make_contact('CID_3', modified='2026-02-01T00:00:00Z', NumDays=7, SurveysScheduled=28)
+        self.remote['CID_new'] = make_contact('CID_new', NumDays=7)
+        del self.remote['CID_9']
+        
+        report = self.api.sync_contact_store(self.store)
+        
+        assert report['mode'] == 'incremental'
+        assert report['fetched'] == 2
+        assert report['removed'] == 1
+        assert sorted(call.args[0] for call in self.api.get_contact.call_args_list) == ['CID_3', 'CID_new']
+        
+        assert self.store.get('CG_test', 'CID_3')['embeddedData']['SurveysScheduled'] == '28'
+        assert self.store.get('CG_test', 'CID_9') is None
+        assert self.store.count('CG_test') == 10
+        assert 'CID_3' not in [c['contactId'] for c in self.store.eligible_for_send('CG_test')]
+    
+    def test_contacts_keep_listing_order(self):
+        """Test that changed and new contacts keep the order of the mailing list."""
+        self.api.sync_contact_store(self.store)
+        self.remote['CID_2']['lastModifiedDate'] = '2026-02-01T00:00:00Z'
+        # a new member listed before the others
+        self.remote = dict(CID_new=make_contact('CID_new', NumDays=7), **self.remote)
+        
+        self.api.sync_contact_store(self.store)
+        
+        assert [c['contactId'] for c in self.store.contacts('CG_test')] == list(self.remote)
+    
+    def test_many_changes_switch_to_full_resync(self):
+        """Test that a mostly changed list is downloaded in one listing."""
+        self.api.sync_contact_store(self.store)
+        for contact_id in list(self.remote)[:5]:
+            self.remote[contact_id]['lastModifiedDate'] = '2026-03-01T00:00:00Z'
+        
+        report = self.api.sync_contact_store(self.store)
+        
+        assert report['mode'] == 'full'
+        self.api.get_contact.assert_not_called()
+    
+    def test_listing_without_modified_times_is_full(self):
+        """Test that a listing without modification times goes straight to a full resync."""
+        self.api.sync_contact_store(self.store)
+        for contact in self.remote.values():
+            del contact['lastModifiedDate']
+        self.api.iter_contacts.reset_mock()
+        
+        report = self.api.sync_contact_store(self.store)
+        
+        assert report['mode'] == 'full'
+        assert self.api.iter_contacts.call_count == 2
+        self.api.get_contact.assert_not_called()
+    
+    def test_max_age_skips_recent_sync(self):
+        """Test that a fresh store is used without any request."""
+        self.api.sync_contact_store(self.store)
+        self.api.iter_contacts.reset_mock()
+        
+        assert self.api.sync_contact_store(self.store, max_age=900)['mode'] == 'fresh'
+        self.api.iter_contacts.assert_not_called()
+        
+        assert self.api.sync_contact_store(self.store, max_age=900, full=True)['mode'] == 'full'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
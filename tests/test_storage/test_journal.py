@@ -0,0 +1,102 @@
+"""
+Unit tests for the send journal.
+
+Run with: pytest tests/test_storage/test_journal.py -v
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.storage.journal import SendJournal
+
+
+def send_times(count, hour=8):
+    """Daily (send, expiration) times from 2030-01-01."""
+    first = datetime(2030, 1, 1, hour, tzinfo=timezone.utc)
+    return [(first + timedelta(days=day), first + timedelta(days=day, hours=1)) for day in range(count)]
+
+
+class TestSendJournal:
+    """Test suite for SendJournal."""
+    
+    def setup_method(self):
+        """Set up a journal with two contacts."""
+        self.journal = SendJournal(':memory:')
+        self.journal.add('CG_test', 'CID_1', 'sms', send_times(3))
+        self.journal.add('CG_test', 'CID_2', 'email', send_times(2, hour=20))
+    
+    def teardown_method(self):
+        self.journal.close()
+    
+    def test_add_is_idempotent(self):
+        """Test that journaling the same invites again adds nothing."""
+        assert self.journal.add('CG_test', 'CID_1', 'sms', send_times(4)) == 1
+        assert self.journal.count() == 6
+        
+        entries = self.journal.entries('CG_test', 'CID_1')
+        assert [e['send_date'] for e in entries][:2] == ['2030-01-01T08:00:00Z', '2030-01-02T08:00:00Z']
+        assert entries[0]['expiration_date'] == '2030-01-01T09:00:00Z'
+        assert entries[0]['state'] == 'planned'
+    
+    def test_states(self):
+        """Test the planned -> posting -> done transitions and the status counts."""
+        first, second, third = [e['seq'] for e in self.journal.entries('CG_test', 'CID_1')]
+        
+        self.journal.mark_posting(first, 'CGC_1')
+        self.journal.mark_done(first, 'EMD_1')
+        self.journal.mark_posting(second, 'CGC_1')
+        self.journal.set_error(second, 'connection reset')
+        self.journal.mark_posting(third, 'CGC_1')
+        self.journal.mark_planned(third, '400 Bad Request')
+        
+        entries = self.journal.entries('CG_test', 'CID_1')
+        assert [(e['state'], e['distribution_id'], e['error']) for e in entries] == [
+            ('done', 'EMD_1', None), ('posting', None, 'connection reset'), ('planned', None, '400 Bad Request'),
+        ]
+        assert entries[0]['lookup_id'] == 'CGC_1'
+        assert self.journal.status('CG_test') == {'planned': 3, 'posting': 1, 'done': 1, 'skipped': 0}
+        assert self.journal.status('CG_other') == {'planned': 0, 'posting': 0, 'done': 0, 'skipped': 0}
+    
+    def test_unfinished(self):
+        """Test that contacts are unfinished until all their invites are done."""
+        assert self.journal.unfinished('CG_test') == [('CID_1', 'sms'), ('CID_2', 'email')]
+        
+        for entry in self.journal.entries('CG_test', 'CID_2'):
+            self.journal.mark_done(entry['seq'], 'EMD_x')
+        
+        assert self.journal.unfinished('CG_test') == [('CID_1', 'sms')]
+        assert self.journal.entries('CG_test', 'CID_2', channel='sms') == []
+    
+    def test_schedules(self):
+        """Test that a new schedule of a finished contact is journaled next to the old one."""
+        assert self.journal.unfinished_schedule('CG_test', 'CID_1', 'sms') == ''
+        for entry in self.journal.entries('CG_test', 'CID_1'):
+            self.journal.mark_skipped(entry['seq'])
+        assert self.journal.unfinished_schedule('CG_test', 'CID_1', 'sms') is None
+        
+        # same send dates, new schedule
+        assert self.journal.add('CG_test', 'CID_1', 'sms', send_times(3), '2030-01-01/800/3') == 3
+        
+        assert self.journal.unfinished_schedule('CG_test', 'CID_1', 'sms') == '2030-01-01/800/3'
+        assert len(self.journal.entries('CG_test', 'CID_1')) == 6
+        entries = self.journal.entries('CG_test', 'CID_1', schedule_id='2030-01-01/800/3')
+        assert [e['state'] for e in entries] == ['planned'] * 3
+    
+    
+    def test_skipped_schedules(self):
+        """Test that only schedules with every invite skipped are reported."""
+        assert self.journal.add('CG_test', 'CID_3', 'sms', send_times(2), '2020-01-01/800/2', state='skipped') == 2
+        entries = self.journal.entries('CG_test', 'CID_1')
+        for entry in entries[:-1]:
+            self.journal.mark_skipped(entry['seq'])
+        
+        assert self.journal.skipped_schedules('CG_test') == {('CID_3', 'sms', '2020-01-01/800/2')}
+        
+        self.journal.mark_skipped(entries[-1]['seq'])
+        assert ('CID_1', 'sms', '') in self.journal.skipped_schedules('CG_test')
+        assert self.journal.skipped_schedules('CG_other') == set()
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
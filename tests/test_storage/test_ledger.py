@@ -0,0 +1,93 @@
+"""
+Unit tests for the distribution ledger.
+
+Run with: pytest tests/test_storage/test_ledger.py -v
+"""
+
+import pytest
+from datetime import datetime, timezone
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.storage.ledger import DistributionLedger
+
+
+NOW = datetime(2030, 1, 2, 12, 0, tzinfo=timezone.utc)
+
+
+class TestDistributionLedger:
+    """Test suite for DistributionLedger."""
+    
+    def setup_method(self):
+        """Set up a ledger with two contacts, one day apart."""
+        self.ledger = DistributionLedger(':memory:')
+        for day in (1, 2, 3):
+            for hour, contact_id, channel in ((8, 'CID_1', 'sms'), (20, 'CID_2', 'email')):
+                send_time = datetime(2030, 1, day, hour, tzinfo=timezone.utc)
+                self.ledger.record(
+                    f'EMD_{contact_id}_{day}', contact_id, f'CGC_{contact_id}',
+                    send_time, send_time.replace(hour=hour + 1), channel,
+                    mailing_list_id='CG_test', survey_id='SV_test', config='config.yaml'
+                )
+    
+    def teardown_method(self):
+        self.ledger.close()
+    
+    def test_record_stores_utc_strings(self):
+        """Test that send dates are stored in the Qualtrics format."""
+        entry = self.ledger.for_contact('CID_1')[0]
+        
+        assert entry['send_date'] == '2030-01-01T08:00:00Z'
+        assert entry['expiration_date'] == '2030-01-01T09:00:00Z'
+        assert entry['config'] == 'config.yaml'
+        assert entry['deleted'] is False
+    
+    def test_unsent(self):
+        """Test that only future distributions that were not deleted are unsent."""
+        unsent = self.ledger.unsent('CID_1', now=NOW)
+        assert [e['distribution_id'] for e in unsent] == ['EMD_CID_1_3']
+        
+        unsent = self.ledger.unsent(now=NOW)
+        assert [e['distribution_id'] for e in unsent] == ['EMD_CID_2_2', 'EMD_CID_1_3', 'EMD_CID_2_3']
+        assert len(self.ledger.unsent(channel='email', now=NOW)) == 2
+    
+    def test_deletions_are_appended(self):
+        """Test that a deletion adds an entry and hides the distribution."""
+        assert self.ledger.record_deleted(['EMD_CID_2_2', 'EMD_CID_2_3'], 'email') == 2
+        
+        assert self.ledger.unsent('CID_2', now=NOW) == []
+        assert self.ledger.count() == 8
+        assert [e['deleted'] for e in self.ledger.for_contact('CID_2')] == [False, True, True]
+    
+    def test_live(self):
+        """Test that live entries include sent distributions but not deleted ones."""
+        self.ledger.record_deleted(['EMD_CID_2_3'], 'email')
+        
+        assert len(self.ledger.live()) == 5
+        assert [e['distribution_id'] for e in self.ledger.live(channel='email')] == ['EMD_CID_2_1', 'EMD_CID_2_2']
+        assert self.ledger.live(mailing_list_id='CG_other') == []
+    
+    def test_status(self):
+        """Test the per channel counts."""
+        self.ledger.record_deleted(['EMD_CID_1_3'], 'sms')
+        
+        status = self.ledger.status(now=NOW)
+        
+        assert status['sms'] == {'scheduled': 3, 'sent': 2, 'pending': 0, 'deleted': 1}
+        assert status['email'] == {'scheduled': 3, 'sent': 1, 'pending': 2, 'deleted': 0}
+    
+    def test_filter_by_mailing_list(self):
+        """Test that status and unsent can be limited to one mailing list."""
+        send_time = datetime(2030, 1, 3, 8, tzinfo=timezone.utc)
+        self.ledger.record('EMD_other', 'CID_9', 'CGC_9', send_time, None, 'sms', mailing_list_id='CG_other')
+        
+        assert self.ledger.status(now=NOW)['sms']['scheduled'] == 4
+        assert self.ledger.status(now=NOW, mailing_list_id='CG_test')['sms']['scheduled'] == 3
+        assert self.ledger.status(now=NOW, mailing_list_id='CG_other') == {
+            'sms': {'scheduled': 1, 'sent': 0, 'pending': 1, 'deleted': 0}
+        }
+        assert [e['distribution_id'] for e in self.ledger.unsent(now=NOW, mailing_list_id='CG_other')] == ['EMD_other']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
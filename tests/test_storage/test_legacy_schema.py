@@ -0,0 +1,72 @@
+"""
+Unit tests checking that the legacy script's cache tables match the stores.
+
+Run with: pytest tests/test_storage/test_legacy_schema.py -v
+"""
+
+import importlib.util
+import os
+import sqlite3
+import pytest
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.storage.journal import SendJournal
+from qualtrics_util.storage.ledger import DistributionLedger
+from qualtrics_util.storage.lookup_cache import LookupIdCache
+
+
+LEGACY_SCRIPT = os.path.join(os.path.dirname(__file__), '..', '..', 'qualtrics_util.py')
+
+# tables both the legacy script and the package create in the shared database
+SHARED_TABLES = {
+    'contact_lookup_ids': LookupIdCache,
+    'distribution_ledger': DistributionLedger,
+    'send_journal': SendJournal,
+}
+
+
+def load_legacy():
+    """Import qualtrics_util.py, which the qualtrics_util package shadows."""
+    spec = importlib.util.spec_from_file_location('qualtrics_util_legacy', LEGACY_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def describe(conn, table):
+    """Columns and indexes of a table, independent of how the SQL was written."""
+    columns = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    indexes = {}
+    for index in conn.execute(f"PRAGMA index_list({table})").fetchall():
+        name, unique = index[1], index[2]
+        if name.startswith('sqlite_autoindex'):
+            # PRIMARY KEY / UNIQUE constraints, named by position
+            name = f"auto_{unique}"
+        indexes.setdefault(name, []).append(
+            (unique, [row[2] for row in conn.execute(f"PRAGMA index_info({index[1]})")])
+        )
+    return columns, {name: sorted(value) for name, value in indexes.items()}
+
+
+def test_legacy_tables_match_stores(tmp_path):
+    """Test that the legacy open_cache creates the stores' tables."""
+    legacy = load_legacy()
+    dist = legacy.QualtricsDist.__new__(legacy.QualtricsDist)
+    dist.cfg = {'project': {'CACHE_FILE': str(tmp_path / 'legacy.db')}}
+    dist.open_cache()
+    
+    for table, store_class in SHARED_TABLES.items():
+        store = store_class(str(tmp_path / f'{table}.db'))
+        store.close()
+        conn = sqlite3.connect(tmp_path / f'{table}.db')
+        expected = describe(conn, table)
+        conn.close()
+        
+        assert describe(dist.cache, table) == expected, table
+    
+    dist.cache.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
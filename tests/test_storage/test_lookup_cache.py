@@ -0,0 +1,85 @@
+"""
+Unit tests for the contactLookupId cache.
+
+Run with: pytest tests/test_storage/test_lookup_cache.py -v
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.api.contacts import ContactsAPI
+from qualtrics_util.storage.base import default_db_path
+from qualtrics_util.storage.lookup_cache import LookupIdCache
+
+
+class TestLookupIdCache:
+    """Test suite for LookupIdCache."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.cache = LookupIdCache(':memory:')
+        self.api = ContactsAPI(
+            api_token='test_token',
+            data_center='yul1',
+            directory_id='POOL_test',
+            mailing_list_id='CG_test',
+            lookup_cache=self.cache,
+            verbose=0
+        )
+    
+    def teardown_method(self):
+        self.cache.close()
+    
+    def test_default_db_path(self):
+        """Test that the database sits next to the config file."""
+        assert default_db_path('config/config_ema.yaml') == 'config/config_ema.db'
+    
+    def test_set_and_get(self):
+        """Test storing and retrieving a lookup ID."""
+        assert self.cache.get('POOL_test', 'CG_test', 'CID_1') is None
+        
+        self.cache.set('POOL_test', 'CG_test', 'CID_1', 'CGC_1')
+        
+        assert self.cache.get('POOL_test', 'CG_test', 'CID_1') == 'CGC_1'
+        assert self.cache.get('POOL_test', 'CG_other', 'CID_1') is None
+    
+    def test_persists_across_instances(self, tmp_path):
+        """Test that the cache survives between runs."""
+        path = str(tmp_path / 'config_test.db')
+        with LookupIdCache(path) as cache:
+            cache.set('POOL_test', 'CG_test', 'CID_1', 'CGC_1')
+        
+        with LookupIdCache(path) as cache:
+            assert cache.get('POOL_test', 'CG_test', 'CID_1') == 'CGC_1'
+    
+    def test_warm_from_listing(self):
+        """Test bulk warm-up from contacts that were already listed."""
+        contacts = [
+            {'contactId': 'CID_1', 'contactLookupId': 'CGC_1'},
+            {'contactId': 'CID_2', 'contactLookupId': 'CGC_2'},
+            {'contactId': 'CID_3'},
+        ]
+        
+        assert self.api.warm_lookup_cache(contacts) == 2
+        assert self.cache.count() == 2
+        assert self.cache.get('POOL_test', 'CG_test', 'CID_2') == 'CGC_2'
+    
+    @patch('qualtrics_util.api.base.requests.Session.request')
+    def test_lookup_resolved_once(self, mock_request):
+        """Test that a resolved lookup ID is served from the cache."""
+        response = Mock(ok=True)
+        response.json.return_value = {
+            'result': {'mailingListMembership': {'CG_test': {'contactLookupId': 'CGC_9'}}}
+        }
+        mock_request.return_value = response
+        
+        assert self.api.get_contact_lookup_id('CG_test', 'CID_9') == 'CGC_9'
+        assert self.api.get_contact_lookup_id('CG_test', 'CID_9') == 'CGC_9'
+        
+        mock_request.assert_called_once()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
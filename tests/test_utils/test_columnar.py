@@ -0,0 +1,118 @@
+"""
+Unit tests for the columnar export helpers.
+
+Run with: pytest tests/test_utils/test_columnar.py -v
+"""
+
+import pytest
+from datetime import datetime, timezone
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.utils.columnar import (
+    _coerce,
+    column_kind,
+    flatten_response,
+    infer_column_types,
+    ParquetResponseWriter,
+)
+
+
+RESPONSES = [
+    {
+        'responseId': 'R_1',
+        'values': {
+            'recordedDate': '2024-05-01T12:00:00.500Z', 'finished': 1, 'duration': 95,
+            'QID1': 4, 'QID2': [1, 3], 'QID3_TEXT': 'fine', 'QID4': 2,
+            'SubjectID': 'S01', 'Wave': 'baseline',
+        },
+        'labels': {'QID1': 'Agree'},
+    },
+    {
+        'responseId': 'R_2',
+        'values': {
+            'recordedDate': '2024-05-01T13:00:00Z', 'finished': 0, 'duration': 12,
+            'QID1': 2, 'QID2': [2], 'QID4': 2.5, 'QID5': 'late question',
+            'SubjectID': 'S02', 'Wave': 3,
+        },
+    },
+]
+
+
+class TestInference:
+    """Test suite for column typing."""
+    
+    def test_column_kinds(self):
+        """Test that columns are classified as metadata, question or embedded."""
+        assert column_kind('recordedDate') == 'metadata'
+        assert column_kind('QID12_TEXT') == 'question'
+        assert column_kind('SubjectID') == 'embedded'
+    
+    def test_flatten_response(self):
+        """Test that labels are dropped and responseId comes first."""
+        row = flatten_response(RESPONSES[0])
+        
+        assert list(row)[0] == 'responseId'
+        assert 'labels' not in row
+        assert row['QID1'] == 4
+    
+    def test_infer_column_types(self):
+        """Test the inferred types across all responses."""
+        types = infer_column_types(iter(RESPONSES))
+        
+        assert types == {
+            'responseId': 'string',
+            'recordedDate': 'timestamp',
+            'finished': 'int64',
+            'duration': 'int64',
+            'QID1': 'int64',
+            'QID2': 'list<int64>',
+            'QID3_TEXT': 'string',
+            'QID4': 'float64',
+            'SubjectID': 'string',
+            'Wave': 'string',
+            'QID5': 'string',
+        }
+    
+    def test_unparsable_dates_stay_strings(self):
+        """Test that a date column with other text is a string column."""
+        types = infer_column_types([{'responseId': 'R_1', 'values': {'startDate': 'unknown'}}])
+        
+        assert types['startDate'] == 'string'
+    
+    def test_coerce(self):
+        """Test converting values to their column types."""
+        assert _coerce(3, 'float64') == 3.0
+        assert _coerce(3, 'string') == '3'
+        assert _coerce([1, 2], 'list<float64>') == [1.0, 2.0]
+        assert _coerce('2024-05-01T12:00:00Z', 'timestamp') == datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+        assert _coerce(None, 'int64') is None
+
+
+class TestParquetWriter:
+    """Test suite for ParquetResponseWriter."""
+    
+    def test_round_trip_in_row_groups(self, tmp_path):
+        """Test that the file has typed columns, kinds and row groups."""
+        pq = pytest.importorskip('pyarrow.parquet')
+        path = str(tmp_path / 'responses.parquet')
+        responses = RESPONSES * 5
+        
+        with ParquetResponseWriter(path, infer_column_types(responses), row_group_size=4) as writer:
+            for response in responses:
+                writer.write(response)
+        
+        parquet_file = pq.ParquetFile(path)
+        assert parquet_file.metadata.num_row_groups == 3
+        assert parquet_file.metadata.num_rows == 10
+        
+        schema = parquet_file.schema_arrow
+        assert str(schema.field('QID4').type) == 'double'
+        assert schema.field('SubjectID').metadata == {b'kind': b'embedded'}
+        
+        table = pq.read_table(path, columns=['responseId', 'QID2'])
+        assert table.column('QID2').to_pylist()[:2] == [[1, 3], [2]]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -92,6 +92,17 @@ class TestDateTimeUtils:
         # assert should_schedule_future_only(future_time) == True
         # assert should_schedule_future_only(past_time) == False
     
+    def test_should_schedule_future_only_with_grace(self):
+        """Test the future-only check against a fixed reference time."""
+        now = datetime(2030, 1, 1, 12, 0, tzinfo=ZoneInfo("UTC"))
+        
+        assert should_schedule_future_only(datetime(2030, 1, 1, 12, 1, tzinfo=ZoneInfo("UTC")), now=now)
+        assert not should_schedule_future_only(now, now=now)
+        assert not should_schedule_future_only(
+            datetime(2030, 1, 1, 12, 10, tzinfo=ZoneInfo("UTC")), now=now, grace_minutes=15
+        )
+        assert should_schedule_future_only(datetime(2030, 1, 1, 12, 16, tzinfo=ZoneInfo("UTC")), now=now, grace_minutes=15)
+    
     def test_validate_time_slots(self):
         """Test time slot validation."""
         # Valid integer slots
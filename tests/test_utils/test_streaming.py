@@ -0,0 +1,132 @@
+"""
+Unit tests for the streaming export helpers.
+
+Run with: pytest tests/test_utils/test_streaming.py -v
+"""
+
+import io
+import json
+import os
+import pytest
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.utils.streaming import (
+    JSONResponseWriter,
+    TeeReader,
+    atomic_output,
+    iter_csv_records,
+    iter_json_array,
+)
+
+
+RESPONSES = [
+    {'responseId': 'R_1', 'values': {'Q1': 1, 'duration': 12345, 'text': 'a, "b" ]}'}},
+    {'responseId': 'R_2', 'values': {'Q1': 2.5, 'finished': True, 'empty': None}},
+    {'responseId': 'R_3', 'labels': {}, 'displayedFields': ['Q1', 'Q2']},
+]
+
+
+class TestIterJsonArray:
+    """Test suite for iter_json_array."""
+    
+    @pytest.mark.parametrize('chunk_size', [1, 3, 7, 64 * 1024])
+    def test_items_across_chunk_boundaries(self, chunk_size):
+        """Test that items split over chunks decode the same."""
+        document = json.dumps({'meta': {'n': 3}, 'responses': RESPONSES, 'count': 12345}, indent=2)
+        
+        items = list(iter_json_array(io.StringIO(document), chunk_size=chunk_size))
+        
+        assert items == RESPONSES
+    
+    def test_empty_and_missing_arrays(self):
+        """Test empty arrays and documents without the key."""
+        assert list(iter_json_array(io.StringIO('{"responses": []}'))) == []
+        assert list(iter_json_array(io.StringIO('{"other": [1, 2]}'))) == []
+        assert list(iter_json_array(io.StringIO('{}'))) == []
+    
+    def test_numbers_are_not_cut(self):
+        """Test that a number ending a chunk is read completely."""
+        items = list(iter_json_array(io.StringIO('{"responses":[12345,678]}'), chunk_size=16))
+        
+        assert items == [12345, 678]
+    
+    def test_malformed_document(self):
+        """Test that a document that is not an object is rejected."""
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.StringIO('[1, 2]')))
+
+
+class TestJSONResponseWriter:
+    """Test suite for JSONResponseWriter."""
+    
+    @pytest.mark.parametrize('responses', [RESPONSES, []])
+    def test_matches_json_dump(self, responses):
+        """Test that the output is the same as an indented json.dump."""
+        out = io.StringIO()
+        with JSONResponseWriter(out, extra={'source': 'qualtrics'}) as writer:
+            for response in responses:
+                writer.write(response)
+        
+        expected = io.StringIO()
+        json.dump({'responses': responses, 'source': 'qualtrics'}, expected, indent=4)
+        assert out.getvalue() == expected.getvalue()
+        assert writer.count == len(responses)
+
+
+class TestAtomicOutput:
+    """Test suite for atomic_output."""
+    
+    def test_replaces_file_when_complete(self, tmp_path):
+        """Test that the file is replaced once the block completes."""
+        path = tmp_path / 'export.json'
+        path.write_text('old')
+        
+        with atomic_output(str(path)) as out:
+            out.write('new')
+            assert path.read_text() == 'old'
+        
+        assert path.read_text() == 'new'
+        assert os.listdir(tmp_path) == ['export.json']
+    
+    def test_keeps_file_on_error(self, tmp_path):
+        """Test that an unfinished document does not replace the file."""
+        path = tmp_path / 'export.json'
+        path.write_text('old')
+        
+        with pytest.raises(RuntimeError):
+            with atomic_output(str(path)) as out:
+                with JSONResponseWriter(out) as writer:
+                    writer.write(RESPONSES[0])
+                    raise RuntimeError('download failed')
+        
+        assert path.read_text() == 'old'
+        assert os.listdir(tmp_path) == ['export.json']
+
+
+class TestCsvRecords:
+    """Test suite for iter_csv_records and TeeReader."""
+    
+    def test_skips_qualtrics_header_rows(self):
+        """Test that the label and import ID rows are skipped."""
+        data = (
+            '\ufeffResponseId,Q1\r\n'
+            'Response ID,"How are you, today?"\r\n'
+            '{"ImportId":"_recordId"},{"ImportId":"QID1"}\r\n'
+            'R_1,"fine,\r\nthanks"\r\n'
+            'R_2,ok\r\n'
+        ).encode('utf-8')
+        sink = io.BytesIO()
+        
+        source = io.BufferedReader(TeeReader(io.BytesIO(data), sink))
+        records = list(iter_csv_records(io.TextIOWrapper(source, encoding='utf-8-sig', newline='')))
+        
+        assert records == [
+            {'ResponseId': 'R_1', 'Q1': 'fine,\r\nthanks'},
+            {'ResponseId': 'R_2', 'Q1': 'ok'},
+        ]
+        assert sink.getvalue() == data
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
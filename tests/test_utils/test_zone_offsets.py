@@ -0,0 +1,134 @@
+"""
+Unit tests for the zone offset index.
+
+Run with: pytest tests/test_utils/test_zone_offsets.py -v
+"""
+
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import numpy as np
+import pytest
+import sys
+sys.path.insert(0, 'src')
+
+from qualtrics_util.services.scheduler import build_schedule_batch
+from qualtrics_util.utils.datetime_utils import convert_to_utc
+from qualtrics_util.utils.zone_offsets import (
+    AmbiguousTimeError,
+    NonexistentTimeError,
+    ZoneOffsetIndex,
+    epoch_days,
+)
+
+
+ZONES = ['America/Chicago', 'Europe/London', 'Australia/Sydney', 'Australia/Lord_Howe', 'Asia/Kolkata']
+
+
+def datetime_offset(zone, day, minute, fold=0):
+    """Offset of a wall time computed by datetime."""
+    local = datetime(day.year, day.month, day.day, minute // 60, minute % 60, tzinfo=ZoneInfo(zone), fold=fold)
+    return int(local.utcoffset().total_seconds())
+
+
+class TestZoneOffsetIndex:
+    """Test suite for ZoneOffsetIndex."""
+    
+    def test_matches_datetime_every_minute_of_transition_days(self):
+        """Test the default policies against datetime (fold=0) around every 2024 transition."""
+        index = ZoneOffsetIndex(ZONES, '2024-01-01', '2024-12-31')
+        minutes = np.arange(24 * 60)
+        
+        for zone in ZONES:
+            row = index.zone_index(zone)
+            days = [d for d in range(index.first_day, index.last_day + 1)
+                    if index.transition[row, d - index.first_day] < 24 * 60]
+            for days_since_epoch in days + [epoch_days('2024-07-01')]:
+                day = datetime(1970, 1, 1) + timedelta(days=days_since_epoch)
+                offsets = index.offsets(np.full(len(minutes), row), np.full(len(minutes), days_since_epoch), minutes)
+                expected = [datetime_offset(zone, day, m) for m in minutes]
+                assert offsets.tolist() == expected, (zone, day)
+    
+    def test_transition_days(self):
+        """Test that transition days are found with their local minute."""
+        index = ZoneOffsetIndex(['America/Chicago', 'Asia/Kolkata'], '2024-01-01', '2024-12-31')
+        
+        chicago = np.flatnonzero(index.transition[0] < 24 * 60) + index.first_day
+        
+        assert chicago.tolist() == [epoch_days('2024-03-10'), epoch_days('2024-11-03')]
+        assert index.transition[0, chicago - index.first_day].tolist() == [120, 120]
+        assert (index.transition[1] == 24 * 60).all()
+        assert (index.before[1] == 19800).all()
+    
+    def test_nonexistent_policies(self):
+        """Test a wall time in the spring-forward gap under each policy."""
+        day = [epoch_days('2024-03-10')]
+        
+        before = ZoneOffsetIndex(['America/Chicago'], '2024-03-10', '2024-03-10')
+        after = ZoneOffsetIndex(['America/Chicago'], '2024-03-10', '2024-03-10', nonexistent='after')
+        strict = ZoneOffsetIndex(['America/Chicago'], '2024-03-10', '2024-03-10', nonexistent='raise')
+        
+        assert before.offsets([0], day, [150]).tolist() == [-6 * 3600]
+        assert after.offsets([0], day, [150]).tolist() == [-5 * 3600]
+        with pytest.raises(NonexistentTimeError, match='02:30'):
+            strict.offsets([0], day, [150])
+        # times outside the gap are not affected
+        assert strict.offsets([0, 0], day * 2, [119, 180]).tolist() == [-6 * 3600, -5 * 3600]
+    
+    def test_ambiguous_policies(self):
+        """Test a wall time repeated by the fall-back transition under each policy."""
+        day = [epoch_days('2024-11-03')]
+        
+        before = ZoneOffsetIndex(['America/Chicago'], '2024-11-03', '2024-11-03')
+        after = ZoneOffsetIndex(['America/Chicago'], '2024-11-03', '2024-11-03', ambiguous='after')
+        strict = ZoneOffsetIndex(['America/Chicago'], '2024-11-03', '2024-11-03', ambiguous='raise')
+        
+        assert before.offsets([0], day, [90]).tolist() == [-5 * 3600]
+        assert after.offsets([0], day, [90]).tolist() == [-6 * 3600]
+        with pytest.raises(AmbiguousTimeError, match='01:30'):
+            strict.offsets([0], day, [90])
+        assert strict.offsets([0, 0], day * 2, [59, 120]).tolist() == [-5 * 3600, -6 * 3600]
+    
+    def test_to_utc(self):
+        """Test converting wall times to UTC instants."""
+        index = ZoneOffsetIndex(['Europe/London'], '2024-03-30', '2024-04-01')
+        local = np.array(['2024-03-30T12:00', '2024-03-31T01:30', '2024-04-01T12:00'], dtype='datetime64[s]')
+        
+        utc = index.to_utc('Europe/London', local)
+        
+        assert utc.astype(str).tolist() == ['2024-03-30T12:00:00', '2024-03-31T01:30:00', '2024-04-01T11:00:00']
+    
+    def test_outside_window(self):
+        """Test that dates outside the window raise instead of guessing."""
+        index = ZoneOffsetIndex(['America/Chicago'], '2024-05-01', '2024-05-31')
+        
+        with pytest.raises(ValueError, match='outside'):
+            index.offsets([0], [epoch_days('2024-06-01')], [0])
+    
+    def test_invalid_policy(self):
+        """Test that unknown policies are rejected."""
+        with pytest.raises(ValueError):
+            ZoneOffsetIndex(['UTC'], '2024-05-01', '2024-05-31', nonexistent='shift')
+    
+    def test_convert_to_utc_with_index(self):
+        """Test convert_to_utc with and without an index."""
+        index = ZoneOffsetIndex(['America/Chicago'], '2024-03-01', '2024-03-31', nonexistent='after')
+        
+        assert convert_to_utc('2024-03-09', 2, 30, 'America/Chicago', days_offset=1) == \
+            datetime(2024, 3, 10, 8, 30, tzinfo=ZoneInfo('UTC'))
+        assert convert_to_utc('2024-03-09', 2, 30, 'America/Chicago', days_offset=1, offsets=index) == \
+            datetime(2024, 3, 10, 7, 30, tzinfo=ZoneInfo('UTC'))
+    
+    def test_schedule_batch_with_policy(self):
+        """Test that schedules follow the policies of a given index."""
+        params = {'startDate': '2024-03-09', 'timeSlots': [230], 'numDays': 3, 'timeZone': 'America/Chicago'}
+        strict = ZoneOffsetIndex(['America/Chicago'], '2024-03-01', '2024-03-31', nonexistent='raise')
+        
+        with pytest.raises(NonexistentTimeError):
+            build_schedule_batch([params], offsets=strict)
+        
+        with pytest.raises(ValueError, match='outside'):
+            build_schedule_batch([dict(params, startDate='2024-04-01')], offsets=strict)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])